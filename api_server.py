@@ -1,7 +1,16 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from functools import wraps
+import hashlib
+import hmac
 import logging
-from database import get_db_connection
+import os
+import time
+from config import EXPORT_DIR
+from utils.db_backends import get_backend
+from utils.repository import cases as case_repository, users as user_repository
+from utils.case_search import case_search
+from utils.exports import load_job
+from utils.password_hasher import authenticate as authenticate_user, HasherBusy, LoginThrottled
 import datetime
 from flask_cors import CORS
 from flask_socketio import SocketIO
@@ -40,8 +49,15 @@ def require_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         auth = request.authorization
-        if not auth or not verify_user_credentials(auth.username, auth.password):
+        if not auth:
             return authenticate()
+        try:
+            if not verify_user_credentials(auth.username, auth.password):
+                return authenticate()
+        except LoginThrottled as e:
+            return jsonify({'error': 'Too many login attempts'}), 429, {'Retry-After': str(int(e.retry_after) + 1)}
+        except HasherBusy:
+            return jsonify({'error': 'Server busy'}), 503, {'Retry-After': '2'}
         return f(*args, **kwargs)
     return decorated
 
@@ -51,29 +67,35 @@ def authenticate():
         'error': 'Authentication required'
     }), 401, {'WWW-Authenticate': 'Basic realm="Login Required"'}
 
+# Basic auth sends the password on every request. Remember recently verified
+# credentials (as a keyed digest, never the password) so that only the first
+# request in CREDENTIAL_CACHE_TTL pays for PBKDF2.
+CREDENTIAL_CACHE_TTL = 60  # seconds
+_credential_key = os.urandom(32)
+_verified_credentials = {}
+
+def _credential_digest(username, password):
+    return hmac.new(_credential_key, f"{username}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+
 # Function to verify user credentials against database
 def verify_user_credentials(username, password):
     """Verify user credentials against database"""
+    digest = _credential_digest(username, password)
+    cached = _verified_credentials.get(username)
+    if cached and cached[1] > time.monotonic() and hmac.compare_digest(cached[0], digest):
+        return True
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT * FROM users 
-            WHERE username = %s
-        """, (username,))
-
-        result = cur.fetchone()
-        if result:
-            # In a real application, verify password hash
-            return True
-        return False
+        user = authenticate_user(username, password, user_repository)
+    except (LoginThrottled, HasherBusy):
+        raise
     except Exception as e:
         logger.error(f"Database error: {str(e)}")
         return False
-    finally:
-        cur.close()
-        conn.close()
+    if not user:
+        _verified_credentials.pop(username, None)
+        return False
+    _verified_credentials[username] = (digest, time.monotonic() + CREDENTIAL_CACHE_TTL)
+    return True
 
 # Root endpoint with API information
 @app.route('/')
@@ -86,7 +108,10 @@ def root():
         'endpoints': [
             {'path': '/', 'method': 'GET', 'description': 'API information'},
             {'path': '/health', 'method': 'GET', 'description': 'Health check endpoint'},
-            {'path': '/api/cases', 'method': 'POST', 'description': 'Create new case'}
+            {'path': '/api/cases', 'method': 'POST', 'description': 'Create new case'},
+            {'path': '/api/cases/search', 'method': 'GET', 'description': 'Search cases by name, address, A-number or phone'},
+            {'path': '/api/exports/<job_id>', 'method': 'GET', 'description': 'Export job status'},
+            {'path': '/api/exports/<job_id>/download', 'method': 'GET', 'description': 'Download a finished export'}
         ]
     }), 200
 
@@ -95,8 +120,7 @@ def root():
 def health_check():
     try:
         # Test database connection
-        conn = get_db_connection()
-        conn.close()
+        get_backend().ping()
 
         return jsonify({
             'status': 'healthy',
@@ -134,32 +158,20 @@ def create_case():
         }), 400
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Insert new case
-        cur.execute("""
-            INSERT INTO cases (
-                first_name, last_name, a_number, court_address, court_phone,
-                client_phone, other_client_phone, client_address, client_email,
-                created_by
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        """, (
-            data['first_name'],
-            data['last_name'],
-            data['a_number'],
-            data['court_address'],
-            data['court_phone'],
-            data.get('client_phone'),
-            data.get('other_client_phone'),
-            data.get('client_address'),
-            data.get('client_email'),
-            1  # Default user ID for API calls
-        ))
-
-        case_id = cur.fetchone()[0]
-        conn.commit()
+        case_id = case_repository.insert({
+            'number': data.get('number', a_number),
+            'status': data.get('status', 'Positivo'),
+            'first_name': data['first_name'],
+            'last_name': data['last_name'],
+            'a_number': a_number,
+            'court_address': data['court_address'],
+            'court_phone': data['court_phone'],
+            'client_phone': data.get('client_phone'),
+            'other_client_phone': data.get('other_client_phone'),
+            'client_address': data.get('client_address'),
+            'client_email': data.get('client_email'),
+            'created_by': 1  # Default user ID for API calls
+        })
 
         return jsonify({
             'message': 'Case created successfully',
@@ -171,9 +183,73 @@ def create_case():
         return jsonify({
             'error': 'Internal server error'
         }), 500
-    finally:
-        cur.close()
-        conn.close()
+
+# Endpoint to search cases
+@app.route('/api/cases/search', methods=['GET'])
+@require_auth
+def search_cases():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({
+            'error': 'Missing query parameter q'
+        }), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({
+            'error': 'Invalid limit'
+        }), 400
+
+    try:
+        results = case_search.search(query, limit=limit)
+        return jsonify({
+            'query': query,
+            'count': len(results),
+            'results': results
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error searching cases: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error'
+        }), 500
+
+# Export links carry an unguessable job id instead of credentials, so they
+# work from a plain link in the dashboard until the export expires.
+def _export_job(job_id):
+    job = load_job(job_id)
+    if job is None or job.expired():
+        return None
+    return job
+
+@app.route('/api/exports/<job_id>', methods=['GET'])
+def export_status(job_id):
+    job = _export_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Export not found'}), 404
+    return jsonify({
+        'kind': job.kind,
+        'format': job.fmt,
+        'status': job.status,
+        'rows': job.rows,
+        'total': job.total,
+        'size_bytes': job.size_bytes,
+        'expires_at': job.expires_at,
+        'error': job.error
+    }), 200
+
+@app.route('/api/exports/<job_id>/download', methods=['GET'])
+def download_export(job_id):
+    job = _export_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Export not found'}), 404
+    if job.status != 'done':
+        return jsonify({'error': 'Export not ready', 'status': job.status}), 409
+    path = os.path.abspath(os.path.join(EXPORT_DIR, f"{job.job_id}{job.extension}"))
+    if not os.path.exists(path):
+        return jsonify({'error': 'Export not found'}), 404
+    return send_file(path, mimetype=job.mimetype, as_attachment=True, download_name=job.filename)
 
 # WebSocket event example (if using WebSocket)
 @socketio.on('message')
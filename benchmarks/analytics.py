@@ -0,0 +1,100 @@
+"""Supervisor analytics from Parquet snapshots versus the live tables.
+
+Seeds ``--calls`` phone_calls and ``--cases`` cases into a scratch SQLite
+database, writes a snapshot, and times each dashboard aggregate both ways:
+through ``CallRepository`` (SQL on the OLTP tables) and through Arrow compute
+on the snapshot. Also reports the snapshot build time and size on disk.
+
+    python benchmarks/analytics.py --calls 1000000 --cases 500000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
+from utils.repository import CallRepository
+from utils.snapshots import (
+    SnapshotStore, call_metrics, case_summary, daily_activity, monthly_counts, since_month, value_counts
+)
+
+def seed(path, calls, cases, rng):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('bench', 'bench@example.com', 'x', 'operator')"
+    )
+    statuses = ['initiated', 'successful', 'failed', 'no_answer']
+    conn.executemany(
+        "INSERT INTO phone_calls (call_uuid, user_id, call_status, call_duration, call_date) "
+        "VALUES (?, 1, ?, ?, datetime('now', ?))",
+        ((f"call-{i}", rng.choice(statuses), rng.randint(5, 600), f"-{rng.randint(0, 720)} days")
+         for i in range(calls))
+    )
+    conn.executemany(
+        "INSERT INTO cases (number, status, is_positive, first_name, last_name, a_number, "
+        "court_address, court_phone, created_by, created_at) "
+        "VALUES (?, ?, ?, 'Juan', 'Garcia', ?, 'Main St', '305', 1, datetime('now', ?))",
+        ((f"C{i}", 'Positivo' if i % 3 else 'Negativo', i % 3 != 0, f"{i:09d}", f"-{rng.randint(0, 720)} days")
+         for i in range(cases))
+    )
+    conn.commit()
+    conn.close()
+
+def timed(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return label, (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=300000)
+    parser.add_argument('--cases', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='analytics_bench_')
+    db_path = os.path.join(workdir, 'bench.db')
+    backend = SQLiteBackend(db_path)
+    MigrationRunner(backend).migrate()
+    seed(db_path, args.calls, args.cases, random.Random(args.seed))
+
+    store = SnapshotStore(backend, directory=os.path.join(workdir, 'snapshots'))
+    manifest = store.refresh()
+    size = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(os.path.join(store.directory, manifest['version'])) for name in names
+    )
+    print(f"snapshot of {manifest['rows']} in {manifest['duration']:.1f}s, {size / 1048576:.1f} MB on disk")
+
+    calls = CallRepository(backend)
+    pairs = [
+        (timed('metrics / sql', calls.get_metrics, args.repeat),
+         timed('metrics / snapshot',
+               lambda: call_metrics(store.table('phone_calls', ['call_status', 'call_duration'])), args.repeat)),
+        (timed('daily / sql', lambda: calls.get_daily_activity(30), args.repeat),
+         timed('daily / snapshot', lambda: daily_activity(
+             store.table('phone_calls', ['call_status', 'call_date'], since_month=since_month(30)), 30), args.repeat)),
+        (timed('status / sql', calls.get_status_counts, args.repeat),
+         timed('status / snapshot',
+               lambda: value_counts(store.table('phone_calls', ['call_status']), 'call_status'), args.repeat)),
+        (timed('cases / sql', lambda: backend.fetch_all(
+            "SELECT COUNT(*) AS n, SUM(is_positive) AS p, strftime('%Y-%m', created_at) AS month "
+            "FROM cases GROUP BY month"), args.repeat),
+         timed('cases / snapshot', lambda: (case_summary(store.table('cases', ['is_positive'])),
+                                            monthly_counts(store.table('cases', ['created_at']), 'created_at')),
+               args.repeat)),
+    ]
+    for (sql_label, sql_ms), (snap_label, snap_ms) in pairs:
+        print(f"{sql_label:18} {sql_ms:8.1f} ms   {snap_label:20} {snap_ms:8.1f} ms")
+    backend.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Block scheduler: hits per 1000 lookups versus the prefix walk and uniform random numbers.
+
+Uses the upstream simulator's case layout (no HTTP) with hits clustered in
+hot regions. Each strategy spends the same ``--budget`` lookups:
+
+- ``prefix``: ``NumberGenerator.generate_number``'s old walk from the seed
+  block;
+- ``random``: ``generate_random_number``'s uniform draw over 9-digit numbers;
+- ``scheduler``: ``BlockScheduler.next_number``, learning from every result.
+- ``plan``: ``BlockScheduler.plan`` ranges, as queued for the sweep workers.
+
+Beforehand every strategy gets the same ``--history`` lookups of uniform
+random numbers, standing in for past searches.
+
+    python benchmarks/block_scheduler.py --budget 20000 --hot-share 0.03 --hot-rate 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LIVE_FEED_ENABLED', 'false')
+
+from upstream_simulator import UpstreamSimulator
+from utils.block_scheduler import BlockScheduler
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
+
+def prefix_walk(seed_block):
+    number = seed_block * 1000
+    while True:
+        yield str(number).zfill(9)
+        number += 1
+
+def uniform(rng):
+    while True:
+        yield str(rng.randint(100000000, 999999999))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=int, default=20000)
+    parser.add_argument('--history', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--hit-rate', type=float, default=0.002, help="hit rate outside hot regions")
+    parser.add_argument('--hot-share', type=float, default=0.03)
+    parser.add_argument('--hot-rate', type=float, default=0.2)
+    parser.add_argument('--region-size', type=int, default=10000)
+    parser.add_argument('--step', type=int, default=100, help="lookups per plan draw")
+    args = parser.parse_args()
+
+    simulator = UpstreamSimulator(seed=args.seed, hit_rate=args.hit_rate, hot_share=args.hot_share,
+                                  hot_rate=args.hot_rate, region_size=args.region_size)
+    simulator.server.server_close()
+    rng = random.Random(args.seed)
+    history = [str(rng.randint(100000000, 999999999)) for _ in range(args.history)]
+    history_hits = sum(map(simulator.is_case, history))
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteBackend(os.path.join(directory, 'bench.db'))
+        MigrationRunner(backend).migrate()
+
+        def scheduler():
+            s = BlockScheduler(backend, rng=random.Random(args.seed), refresh_interval=float('inf'))
+            for number in history:
+                s.observe(number, simulator.is_case(number))
+            return s
+
+        results = {}
+        for name, numbers in (('prefix', prefix_walk(244206)), ('random', uniform(random.Random(args.seed + 1)))):
+            seen = set(history)
+            hits = searched = 0
+            for number in numbers:
+                if number in seen:
+                    continue
+                seen.add(number)
+                searched += 1
+                hits += simulator.is_case(number)
+                if searched == args.budget:
+                    break
+            results[name] = hits
+
+        s = scheduler()
+        hits = 0
+        for _ in range(args.budget):
+            number = s.next_number()
+            hit = simulator.is_case(number)
+            s.observe(number, hit)
+            hits += hit
+        results['scheduler'] = hits
+        top = s.top_blocks(5)
+
+        # Plans are made in rounds, each one seeing the previous round's results
+        s = scheduler()
+        hits = searched = 0
+        round_budget = max(args.budget // 10, args.step)
+        while searched < args.budget:
+            for start, count in s.plan(min(round_budget, args.budget - searched), args.step):
+                for n in range(start, start + count):
+                    number = str(n).zfill(9)
+                    hit = simulator.is_case(number)
+                    s.observe(number, hit)
+                    hits += hit
+                    searched += 1
+        results['plan'] = hits * args.budget / searched
+        backend.close()
+
+    print(f"{args.budget} lookups after {args.history} random ones ({history_hits} hits); "
+          f"{args.hot_share:.0%} of regions hit at {args.hot_rate:.0%}, the rest at {args.hit_rate:.1%}")
+    for name, hits in results.items():
+        print(f"  {name:<10}{hits:8.0f} hits  {1000 * hits / args.budget:7.1f} per 1000 lookups")
+    print()
+    print("  most promising blocks after the scheduler run:")
+    for row in top:
+        print(f"    {row['first_number']}  searched {row['searched']:>4}  hits {row['hits']:>4}  "
+              f"expected {row['expected_per_1000']}/1000")
+
+if __name__ == '__main__':
+    main()
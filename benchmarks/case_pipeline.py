@@ -0,0 +1,99 @@
+"""Case pipeline: hits per second versus handling each hit in turn.
+
+Feeds ``--hits`` EOIR hits through the staged pipeline with simulated EOIR
+and PDL latencies, against a scratch SQLite database, and compares the time
+with doing the same work one hit at a time (detail fetch, enrichment, dedup
+query and single-row insert per hit). Prints per-stage metrics at the end.
+
+    python benchmarks/case_pipeline.py --hits 500 --eoir-ms 40 --pdl-ms 150
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LIVE_FEED_ENABLED', 'false')
+
+from utils.case_pipeline import CasePipeline, build_case
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
+from utils.repository import CaseRepository
+
+class SlowEOIR:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def search(self, number):
+        time.sleep(self.latency)
+        return {'status': 'success', 'data': {'status': 'En proceso', 'court_address': 'Main St', 'court_phone': '305'}}
+
+class SlowPDL:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def search(self, number):
+        time.sleep(self.latency)
+        return {'status': 'success', 'data': {'first_name': 'Juan', 'last_name': 'Garcia', 'phone_numbers': ['+13055550100']}}
+
+def repository(directory, name):
+    backend = SQLiteBackend(os.path.join(directory, name))
+    MigrationRunner(backend).migrate()
+    backend.execute(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('bench', 'bench@example.com', 'x', 'operator')"
+    )
+    return CaseRepository(backend)
+
+def sequential(numbers, eoir, pdl, cases):
+    for number in numbers:
+        item = {'number': number, 'user_id': 1, 'eoir_data': eoir.search(number)['data']}
+        item['pdl_data'] = pdl.search(number)['data']
+        if cases.existing_numbers([number]):
+            continue
+        cases.insert(build_case(item))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hits', type=int, default=300)
+    parser.add_argument('--eoir-ms', type=float, default=40)
+    parser.add_argument('--pdl-ms', type=float, default=150)
+    parser.add_argument('--eoir-workers', type=int, default=2)
+    parser.add_argument('--pdl-workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--queue-size', type=int, default=100)
+    args = parser.parse_args()
+
+    eoir, pdl = SlowEOIR(args.eoir_ms / 1000), SlowPDL(args.pdl_ms / 1000)
+    numbers = [f"{200000000 + i:09d}" for i in range(args.hits)]
+    # Sweep hits carry no detail, so every hit pays for the EOIR fetch as well
+    hit = {'status': 'success', 'data': None}
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = repository(directory, 'sequential.db')
+        start = time.perf_counter()
+        sequential(numbers, eoir, pdl, cases)
+        sequential_s = time.perf_counter() - start
+
+        cases = repository(directory, 'pipeline.db')
+        pipeline = CasePipeline(eoir_scraper=eoir, pdl_scraper=pdl, case_repository=cases,
+                                eoir_workers=args.eoir_workers, pdl_workers=args.pdl_workers,
+                                batch_size=args.batch_size, queue_size=args.queue_size)
+        start = time.perf_counter()
+        for number in numbers:
+            pipeline.submit_result(number, hit, 1, timeout=None)
+        pipeline.close(timeout=600)
+        pipeline_s = time.perf_counter() - start
+        stored = cases.backend.fetch_one("SELECT COUNT(*) AS n FROM cases")['n']
+
+    print(f"{args.hits} hits, EOIR {args.eoir_ms:.0f} ms, PDL {args.pdl_ms:.0f} ms")
+    print(f"  one at a time: {sequential_s:7.2f} s  ({args.hits / sequential_s:6.1f} hits/s)")
+    print(f"  pipeline:      {pipeline_s:7.2f} s  ({args.hits / pipeline_s:6.1f} hits/s, {stored} cases stored)")
+    print()
+    print(f"  {'stage':<8}{'workers':>8}{'processed':>10}{'avg ms':>9}{'full s':>8}{'errors':>8}")
+    for stage in pipeline.get_stats()['stages']:
+        print(f"  {stage['stage']:<8}{stage['workers']:>8}{stage['processed']:>10}{stage['avg_ms']:>9}"
+              f"{stage['blocked_seconds']:>8}{stage['errors']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Case search latency benchmark on a synthetic SQLite database.
+
+Seeds ``--cases`` rows into a scratch database, applies the migrations (which
+build the search indexes) and times each query class (A-number, phone, prefix,
+name/address text) against a plain ``LIKE`` scan over the same data.
+
+    python benchmarks/case_search.py --cases 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.case_search import CaseSearch
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
+
+SCHEMA = """
+CREATE TABLE cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    number TEXT NOT NULL,
+    status TEXT NOT NULL,
+    is_positive BOOLEAN NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    a_number TEXT NOT NULL,
+    court_address TEXT NOT NULL,
+    court_phone TEXT NOT NULL,
+    client_phone TEXT,
+    other_client_phone TEXT,
+    client_address TEXT,
+    client_email TEXT,
+    created_by INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Rosa', 'Miguel', 'Elena']
+LAST_NAMES = ['Garcia', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Perez', 'Sanchez']
+STREETS = ['Main St', 'Oak Ave', 'Flagler St', 'Montgomery St', 'Biscayne Blvd', 'Calle Ocho']
+
+def _phone(rng):
+    return f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+def seed(path, count, rng):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    rows = (
+        (f"C{i}", 'Positivo', True, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+         str(100000000 + i), f"{rng.randint(1, 999)} {rng.choice(STREETS)}", _phone(rng),
+         _phone(rng), None, f"{rng.randint(1, 9999)} {rng.choice(STREETS)}", None, i % 50)
+        for i in range(count)
+    )
+    conn.executemany(
+        "INSERT INTO cases (number, status, is_positive, first_name, last_name, a_number, "
+        "court_address, court_phone, client_phone, other_client_phone, client_address, "
+        "client_email, created_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    phones = [r[0] for r in conn.execute("SELECT client_phone FROM cases ORDER BY random() LIMIT 1000")]
+    conn.close()
+    return phones
+
+def timed(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = os.path.join(tempfile.mkdtemp(prefix='case_search_bench_'), 'bench.db')
+    start = time.perf_counter()
+    phones = seed(path, args.cases, rng)
+    print(f"seeded {args.cases} cases in {time.perf_counter() - start:.1f}s")
+
+    backend = SQLiteBackend(path)
+    search = CaseSearch(backend)
+    start = time.perf_counter()
+    MigrationRunner(backend).migrate()
+    print(f"migrated in {time.perf_counter() - start:.1f}s")
+
+    n = args.queries
+    workloads = {
+        'a_number': [f"A{100000000 + rng.randrange(args.cases)}" for _ in range(n)],
+        'phone': [rng.choice(phones).replace('(', '').replace(') ', '-') for _ in range(n)],
+        'prefix': [str(100000000 + rng.randrange(args.cases))[:6] for _ in range(n)],
+        'text': [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(n)],
+    }
+
+    def like_scan(q):
+        pattern = f"%{q}%"
+        backend.fetch_all(
+            "SELECT * FROM cases WHERE a_number LIKE %s OR client_phone LIKE %s "
+            "OR first_name || ' ' || last_name LIKE %s OR client_address LIKE %s LIMIT 20",
+            (pattern, pattern, pattern, pattern)
+        )
+
+    print(f"{'query':<10} {'indexed p50':>12} {'p95':>8} {'LIKE p50':>10} {'p95':>8}  (ms)")
+    for kind, queries in workloads.items():
+        idx50, idx95 = timed(search.search, queries)
+        # The scan is slow; a handful of samples is enough to show the gap
+        like50, like95 = timed(like_scan, queries[:max(5, n // 20)])
+        print(f"{kind:<10} {idx50:>12.2f} {idx95:>8.2f} {like50:>10.2f} {like95:>8.2f}")
+    backend.close()
+
+if __name__ == '__main__':
+    main()
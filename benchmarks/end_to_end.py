@@ -0,0 +1,115 @@
+"""End to end: a sweep through worker slots, the case pipeline and SQLite, with no network.
+
+Starts the upstream simulator in-process and points EOIR_BASE_URL and
+PDL_BASE_URL at it. It then queues one sweep of ``--numbers`` A-numbers and
+runs a SweepWorker against a scratch SQLite database until the sweep is done
+and the pipeline has drained. Reports numbers per second, cases stored, and
+what the rate controllers and the simulator saw.
+
+    python benchmarks/end_to_end.py --numbers 2000 --slots 4 --hit-rate 0.05
+    python benchmarks/end_to_end.py --eoir-errors 0.05 --eoir-rps 20 --eoir-max-rate 0
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from upstream_simulator import SourceProfile, UpstreamSimulator
+
+API_KEY = 'simulator-key-0123456789abcdef'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--numbers', type=int, default=1000)
+    parser.add_argument('--start', type=int, default=200000000)
+    parser.add_argument('--slots', type=int, default=4, help="worker slots (chunks searched at once)")
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--hit-rate', type=float, default=0.05)
+    parser.add_argument('--match-rate', type=float, default=0.6)
+    parser.add_argument('--eoir-ms', type=float, default=80)
+    parser.add_argument('--pdl-ms', type=float, default=150)
+    parser.add_argument('--eoir-errors', type=float, default=0.0)
+    parser.add_argument('--eoir-throttle', type=float, default=0.0)
+    parser.add_argument('--eoir-rps', type=float, default=0.0, help="simulator's EOIR rate limit")
+    parser.add_argument('--pdl-errors', type=float, default=0.0)
+    parser.add_argument('--eoir-max-rate', type=float, default=0.0, help="client pacing (EOIR_MAX_RATE), 0 = none")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='end-to-end-')
+    simulator = UpstreamSimulator(
+        seed=args.seed, hit_rate=args.hit_rate, match_rate=args.match_rate, pdl_api_key=API_KEY,
+        eoir=SourceProfile(median_ms=args.eoir_ms, error_rate=args.eoir_errors,
+                           throttle_rate=args.eoir_throttle, rate_limit=args.eoir_rps),
+        pdl=SourceProfile(median_ms=args.pdl_ms, error_rate=args.pdl_errors),
+    ).start()
+    os.environ.update(
+        DATABASE_BACKEND='sqlite', SQLITE_PATH=os.path.join(directory, 'bench.db'), DATA_DIR=directory,
+        LIVE_FEED_ENABLED='false', EOIR_SIMULATOR='true', EOIR_BASE_URL=simulator.eoir_url, PDL_BASE_URL=simulator.pdl_url,
+        PDL_API_KEY=API_KEY, EOIR_MAX_RATE=str(args.eoir_max_rate), EOIR_MAX_CONCURRENCY=str(max(args.slots, 1)),
+    )
+
+    # config.py reads the environment at import time, so the app is imported only now
+    from utils.db_backends import get_backend
+    from utils.migrations import MigrationRunner
+    from utils.resources import resources
+    from utils.case_pipeline import get_case_pipeline
+    from utils.rate_control import upstream_stats
+    from utils.search_history import search_history_log
+    from utils.sweep_queue import SweepQueue
+    from worker import SweepWorker
+
+    backend = get_backend()
+    MigrationRunner(backend).migrate()
+    user_id = backend.insert(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('bench', 'bench@example.com', 'x', 'operator')"
+    )
+    queue = SweepQueue(backend)
+    sweep_id = queue.create_sweep(args.start, args.numbers, user_id, chunk_size=args.chunk_size)
+    worker = SweepWorker('bench', queue=queue, concurrency=args.slots, delay=0,
+                         heartbeat_interval=2, poll_interval=0.2)
+
+    thread = threading.Thread(target=worker.run, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    while True:
+        sweep = next(s for s in queue.list_sweeps() if s['id'] == sweep_id)
+        if sweep['status'] != 'active':
+            break
+        time.sleep(0.2)
+    sweep_s = time.perf_counter() - start
+    worker.stop()
+    thread.join()
+    get_case_pipeline().close(timeout=600)
+    total_s = time.perf_counter() - start
+
+    stored = backend.fetch_one("SELECT COUNT(*) AS n FROM cases")['n']
+    enriched = backend.fetch_one("SELECT COUNT(*) AS n FROM cases WHERE client_phone IS NOT NULL")['n']
+    expected = sum(simulator.is_case(f"{n:09d}") for n in range(args.start, args.start + args.numbers))
+    controllers = upstream_stats()
+    served = simulator.get_stats()
+    resources.close_all()
+    search_history_log.close()
+    simulator.close()
+
+    print(f"{args.numbers} numbers, {args.slots} slot(s), EOIR {args.eoir_ms:.0f} ms, PDL {args.pdl_ms:.0f} ms, "
+          f"hit rate {args.hit_rate:.0%}")
+    print(f"  sweep done:      {sweep_s:7.2f} s  ({args.numbers / sweep_s:7.1f} numbers/s, status {sweep['status']})")
+    print(f"  pipeline done:   {total_s:7.2f} s  ({stored}/{expected} cases stored, {enriched} with PDL data)")
+    print(f"  searched {sweep['searched']}, skipped {sweep['skipped']}, hits {sweep['hits']}, "
+          f"errors {sweep['errors']}, failed chunks {sweep['chunks_failed']}")
+    print()
+    print(f"  {'source':<7}{'state':>10}{'limit':>7}{'ok':>7}{'429':>6}{'5xx/to':>8}{'short':>7}{'lat ms':>8}{'timeout':>9}")
+    for name, stats in sorted(controllers.items()):
+        print(f"  {name:<7}{stats['state']:>10}{stats['limit']:>7}{stats['ok']:>7}{stats['overload']:>6}"
+              f"{stats['error']:>8}{stats['short_circuited']:>7}{stats['latency_ms'] or 0:>8}{stats['timeout']:>9}")
+    print()
+    print("  simulator: " + ", ".join(f"{key} {n}" for key, n in served.items()))
+
+if __name__ == '__main__':
+    main()
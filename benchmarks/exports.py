@@ -0,0 +1,87 @@
+"""Streaming exports: time, file size and peak memory per format.
+
+Seeds ``--rows`` search_history rows into a scratch SQLite database and
+exports them as CSV, gzip CSV and (with pyarrow) Parquet through
+``ExportManager``, measuring Python heap peak with tracemalloc. The peak
+should stay flat as ``--rows`` grows; compare with ``--in-memory``, which
+builds the whole CSV in a buffer the way the old export did.
+
+    python benchmarks/exports.py --rows 1000000
+"""
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backends import SQLiteBackend
+from utils.exports import ExportManager, available_formats
+from utils.migrations import MigrationRunner
+
+def seed(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('bench', 'bench@example.com', 'x', 'operator')"
+    )
+    conn.executemany(
+        "INSERT INTO search_history (number, source, status, eoir_found, is_positive, search_date, searched_by) "
+        "VALUES (?, ?, ?, ?, ?, ?, 1)",
+        ((str(100000000 + i), 'pdl' if i % 3 == 0 else 'eoir', 'success' if i % 7 == 0 else 'not_found',
+          i % 7 == 0, i % 11 == 0, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:{i % 60:02d}:00")
+         for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def in_memory_csv(backend):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in backend.fetch_all("SELECT * FROM search_history ORDER BY search_date DESC, id DESC"):
+        writer.writerow(row.values())
+    return buffer.getvalue().encode('utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--in-memory', action='store_true', help="also time the old all-in-memory CSV export")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='exports_bench_')
+    backend = SQLiteBackend(os.path.join(workdir, 'bench.db'))
+    MigrationRunner(backend).migrate()
+    seed(os.path.join(workdir, 'bench.db'), args.rows)
+    manager = ExportManager(backend, directory=os.path.join(workdir, 'exports'),
+                            batch_size=args.batch_size, inline_max_rows=args.rows)
+    print(f"{args.rows:,} rows, cursor batches of {args.batch_size}")
+
+    for fmt in available_formats():
+        job, elapsed, peak = measure(lambda: manager.export('search_history', fmt, requested_by=1))
+        assert job.status == 'done' and job.rows == args.rows, job.error
+        print(f"{fmt:8} {elapsed:6.1f}s {job.rows / elapsed:9,.0f} rows/s "
+              f"{job.size_bytes / 1048576:7.1f} MB file  peak heap {peak / 1048576:6.1f} MB")
+
+    if args.in_memory:
+        data, elapsed, peak = measure(lambda: in_memory_csv(backend))
+        print(f"{'old csv':8} {elapsed:6.1f}s {args.rows / elapsed:9,.0f} rows/s "
+              f"{len(data) / 1048576:7.1f} MB file  peak heap {peak / 1048576:6.1f} MB")
+    manager.close()
+    backend.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Known A-number pre-screen: memory, false positives and lookup cost.
+
+Seeds ``--cases`` cases and ``--searches`` search_history rows into a scratch
+SQLite database, builds the known-numbers filter from them, then compares a
+filter lookup with the indexed database lookup a sweep would otherwise need,
+measures the false-positive rate on numbers that are not in the database and
+times a restart (load from disk plus catch-up of new rows).
+
+    python benchmarks/known_numbers.py --cases 1000000 --searches 500000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backends import SQLiteBackend
+from utils.known_numbers import KnownNumbers
+from utils.migrations import MigrationRunner
+
+def seed(path, cases, searches, rng):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (username, email, password_hash, role) VALUES ('bench', 'bench@example.com', 'x', 'operator')"
+    )
+    numbers = rng.sample(range(100000000, 1000000000), cases + searches)
+    conn.executemany(
+        "INSERT INTO cases (number, status, is_positive, first_name, last_name, a_number, "
+        "court_address, court_phone, created_by) VALUES (?, 'Positivo', 1, 'Juan', 'Garcia', ?, 'Main St', '305', 1)",
+        ((f"C{i}", f"A{n}") for i, n in enumerate(numbers[:cases]))
+    )
+    conn.executemany(
+        "INSERT INTO search_history (number, eoir_found, searched_by) VALUES (?, 0, 1)",
+        ((str(n),) for n in numbers[cases:])
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS bench_cases_a_number ON cases (a_number)")
+    conn.commit()
+    conn.close()
+    return set(numbers)
+
+def per_call_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', type=int, default=200000)
+    parser.add_argument('--searches', type=int, default=100000)
+    parser.add_argument('--probes', type=int, default=100000)
+    parser.add_argument('--fp-rate', type=float, default=0.001)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='known_numbers_bench_')
+    db_path = os.path.join(workdir, 'bench.db')
+    filter_path = os.path.join(workdir, 'known.bloom')
+    backend = SQLiteBackend(db_path)
+    MigrationRunner(backend).migrate()
+    known_set = seed(db_path, args.cases, args.searches, rng)
+    total = args.cases + args.searches
+    capacity = max(total * 2, 1000)
+
+    start = time.perf_counter()
+    known = KnownNumbers(backend, path=filter_path, capacity=capacity, fp_rate=args.fp_rate, refresh_interval=3600)
+    known.save()
+    build_s = time.perf_counter() - start
+
+    stats = known.get_stats()
+    print(f"{total} known numbers, capacity {capacity}")
+    print(f"build {build_s:.1f}s, {stats['memory_bytes'] / 1048576:.2f} MB "
+          f"({stats['bits_per_number']:.1f} bits/number, {stats['hash_functions']} hashes)")
+
+    members = [str(n) for n in rng.sample(sorted(known_set), min(args.probes, total))]
+    misses = []
+    while len(misses) < args.probes:
+        n = rng.randrange(100000000, 1000000000)
+        if n not in known_set:
+            misses.append(str(n))
+    assert all(known.might_contain(n) for n in members), "filter lost a known number"
+    false_positives = sum(known.might_contain(n) for n in misses)
+    print(f"false positives {false_positives / len(misses):.4%} measured, "
+          f"{stats['expected_fp_rate']:.4%} expected")
+
+    def db_lookup(number):
+        backend.fetch_one(
+            "SELECT 1 FROM cases WHERE a_number = %s UNION ALL SELECT 1 FROM search_history WHERE number = %s LIMIT 1",
+            (f"A{number}", number)
+        )
+
+    sample = misses[:5000]
+    print(f"lookup: filter {per_call_us(known.might_contain, sample):.1f} us, "
+          f"database {per_call_us(db_lookup, sample):.1f} us (history column unindexed)")
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO search_history (number, eoir_found, searched_by) VALUES (?, 0, 1)",
+        ((m,) for m in misses[:1000])
+    )
+    conn.commit()
+    conn.close()
+    start = time.perf_counter()
+    reloaded = KnownNumbers(backend, path=filter_path, capacity=capacity, fp_rate=args.fp_rate)
+    print(f"restart (load + catch-up of 1000 rows) {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"new rows visible: {all(reloaded.might_contain(m) for m in misses[:1000])}")
+    backend.close()
+
+if __name__ == '__main__':
+    main()
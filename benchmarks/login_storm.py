@@ -0,0 +1,135 @@
+"""Login throughput when a whole floor signs in at once.
+
+Seeds ``--users`` accounts into a scratch SQLite database (a quarter of them
+with legacy unsalted SHA-256 hashes) and logs them all in concurrently, one
+thread per user as Streamlit does with sessions. Compares hashing inline on
+the calling thread with the shared process pool, and reports how late a 5 ms
+ticker thread (standing in for the server's event loop) ran during the storm.
+
+    python benchmarks/login_storm.py --users 50 --workers 4
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
+from utils.password_hasher import (
+    PasswordHasher, LoginRateLimiter, authenticate, _pbkdf2, _encode, is_legacy_hash
+)
+from utils.repository import UserRepository
+
+class InlineHasher(PasswordHasher):
+    """The previous behaviour: PBKDF2 on the caller's thread."""
+
+    def _derive(self, password, salt, iterations):
+        return _pbkdf2(password, salt, iterations)
+
+def seed(backend, count, iterations):
+    repo = UserRepository(backend)
+    for i in range(count):
+        password = f"clave{i}"
+        if i % 4 == 0:
+            stored = hashlib.sha256(password.encode()).hexdigest()
+        else:
+            salt = os.urandom(16)
+            stored = _encode(salt, _pbkdf2(password, salt, iterations), iterations)
+        repo.create(f"operador{i}", stored, f"operador{i}@example.com")
+    return repo
+
+class Ticker(threading.Thread):
+    """Wakes every 5 ms and records how late it was."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.lateness = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            start = time.perf_counter()
+            time.sleep(0.005)
+            self.lateness.append((time.perf_counter() - start - 0.005) * 1000)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+def storm(hasher, repo, count):
+    limiter = LoginRateLimiter()
+    latencies = [None] * count
+    failures = []
+    barrier = threading.Barrier(count)
+
+    def login(i):
+        barrier.wait()
+        start = time.perf_counter()
+        user = authenticate(f"operador{i}", f"clave{i}", repo, hasher=hasher, limiter=limiter)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        if not user:
+            failures.append(i)
+
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(count)]
+    ticker = Ticker()
+    ticker.start()
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ticker.stop()
+    latencies.sort()
+    return {
+        'elapsed': elapsed,
+        'throughput': count / elapsed,
+        'p50': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'tick_max': max(ticker.lateness) if ticker.lateness else 0.0,
+        'failures': len(failures),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    modes = {
+        'inline': lambda: InlineHasher(workers=1, iterations=args.iterations),
+        'pool': lambda: PasswordHasher(workers=args.workers, max_pending=args.users,
+                                       admit_timeout=60, iterations=args.iterations),
+    }
+    print(f"{args.users} concurrent logins, {args.workers} hash workers, {os.cpu_count()} CPUs")
+    print(f"{'mode':<8} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'ticker max late ms':>19} {'upgraded':>9}")
+    for mode, make_hasher in modes.items():
+        path = os.path.join(tempfile.mkdtemp(prefix='login_storm_'), 'bench.db')
+        backend = SQLiteBackend(path)
+        MigrationRunner(backend).migrate()
+        repo = seed(backend, args.users, args.iterations)
+        hasher = make_hasher()
+        if mode == 'pool':
+            hasher.warm_up()
+        result = storm(hasher, repo, args.users)
+        hasher.close()
+        legacy_left = sum(
+            1 for i in range(args.users)
+            if is_legacy_hash(repo.get_by_username(f"operador{i}")['password_hash'])
+        )
+        upgraded = (args.users + 3) // 4 - legacy_left
+        print(f"{mode:<8} {result['throughput']:>9.1f} {result['p50']:>8.0f} {result['p95']:>8.0f} "
+              f"{result['tick_max']:>19.1f} {upgraded:>9}")
+        if result['failures']:
+            print(f"  {result['failures']} logins failed")
+        backend.close()
+
+if __name__ == '__main__':
+    main()
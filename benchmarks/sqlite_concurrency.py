@@ -0,0 +1,125 @@
+"""Concurrency benchmark: legacy sqlite3 access vs the tuned SQLite backend.
+
+Simulates several agents saving and listing cases at the same time against a
+scratch copy of the schema. ``legacy`` reproduces what the pages used to do
+(a new rollback-journal connection per call); ``tuned`` goes through
+``SQLiteBackend`` (WAL, synchronous=NORMAL, thread-local connections,
+busy-timeout and retry).
+
+    python benchmarks/sqlite_concurrency.py --threads 16 --ops 200
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backends import SQLiteBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    number TEXT NOT NULL,
+    status TEXT NOT NULL,
+    is_positive BOOLEAN NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    a_number TEXT NOT NULL,
+    court_address TEXT NOT NULL,
+    court_phone TEXT NOT NULL,
+    created_by INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+INSERT = """
+    INSERT INTO cases (number, status, is_positive, first_name, last_name,
+                       a_number, court_address, court_phone, created_by)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+SELECT = "SELECT * FROM cases WHERE created_by = %s ORDER BY created_at DESC LIMIT 50"
+
+def _row(worker, i):
+    return (f"C{worker}-{i}", 'Positivo', True, 'Nombre', 'Apellido',
+            str(100000000 + worker * 100000 + i), 'Corte', '5550000', worker)
+
+def legacy_worker(path, worker, ops, write_ratio, errors):
+    for i in range(ops):
+        # Mirrors the old page code: connect, execute, commit, close
+        conn = sqlite3.connect(path)
+        try:
+            if i % 100 < write_ratio * 100:
+                conn.execute(INSERT.replace('%s', '?'), _row(worker, i))
+                conn.commit()
+            else:
+                conn.execute(SELECT.replace('%s', '?'), (worker,)).fetchall()
+        except sqlite3.OperationalError:
+            errors.append(worker)
+        finally:
+            conn.close()
+
+def tuned_worker(backend, worker, ops, write_ratio, errors):
+    for i in range(ops):
+        try:
+            if i % 100 < write_ratio * 100:
+                backend.insert(INSERT, _row(worker, i))
+            else:
+                backend.fetch_all(SELECT, (worker,))
+        except sqlite3.OperationalError:
+            errors.append(worker)
+
+def run(mode, threads, ops, write_ratio):
+    directory = tempfile.mkdtemp(prefix='sqlite_bench_')
+    path = os.path.join(directory, 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+
+    errors = []
+    if mode == 'legacy':
+        target, first_arg = legacy_worker, path
+    else:
+        # Legacy timeout is sqlite3's default of 5 s, so compare like for like
+        backend = SQLiteBackend(path)
+        target, first_arg = tuned_worker, backend
+
+    workers = [
+        threading.Thread(target=target, args=(first_arg, w, ops, write_ratio, errors))
+        for w in range(threads)
+    ]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if mode == 'tuned':
+        backend.close()
+    total = threads * ops
+    return {
+        'mode': mode,
+        'ops': total,
+        'seconds': elapsed,
+        'ops_per_sec': total / elapsed if elapsed else 0,
+        'locked_errors': len(errors)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=200, help='operations per thread')
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'ops':>7} {'seconds':>9} {'ops/s':>10} {'locked':>7}")
+    for mode in ('legacy', 'tuned'):
+        r = run(mode, args.threads, args.ops, args.write_ratio)
+        print(f"{r['mode']:<8} {r['ops']:>7} {r['seconds']:>9.2f} {r['ops_per_sec']:>10.0f} {r['locked_errors']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Import-time profile of the Streamlit entry point, with a startup budget.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter (what a
+cold Streamlit start pays before the login page can render), then prints the
+slowest imports by cumulative time.
+
+    python benchmarks/startup_imports.py             # report
+    python benchmarks/startup_imports.py --check     # exit 1 if over budget
+
+Streamlit itself is profiled as a baseline: its own imports (it loads pandas
+and numpy) are paid by any page and are not charged to the app. ``--check``
+fails when the time the app adds on top of the baseline exceeds
+``--budget-ms`` or when a module in ``--forbid`` that the baseline does not
+already load is imported on the login path.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must load on first use, not at startup
+DEFAULT_FORBIDDEN = (
+    'plotly', 'pandas', 'numpy', 'matplotlib', 'sounddevice', 'soundfile',
+    'bs4', 'psycopg2', 'requests', 'utils.phone_call', 'utils.supervisor_analytics',
+    'utils.report_generator', 'pages.dashboard'
+)
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def profile(entry: str, runs: int, allow_failure: bool = False):
+    """Return (total_us, {module: (self_us, cumulative_us, depth)}) of the fastest run."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {entry}'],
+            cwd=ROOT, capture_output=True, text=True,
+            env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        )
+        if proc.returncode != 0:
+            if allow_failure:
+                return 0, {}
+            tail = proc.stderr.strip().splitlines()[-5:]
+            raise SystemExit(f"import {entry} failed:\n" + '\n'.join(tail))
+        modules = {}
+        for line in proc.stderr.splitlines():
+            match = _LINE_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+        # Top-level imports (depth 0) add up to the whole import
+        total = sum(cum for _, cum, depth in modules.values() if depth == 0)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entry', default='main', help='module to import')
+    parser.add_argument('--runs', type=int, default=3, help='runs; the fastest is kept')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--check', action='store_true', help='fail when over budget')
+    parser.add_argument('--baseline', default='streamlit', help="module whose imports are not charged ('' for none)")
+    parser.add_argument('--budget-ms', type=float, default=300.0, help='import time the app may add over the baseline')
+    parser.add_argument('--forbid', default=','.join(DEFAULT_FORBIDDEN),
+                        help='comma separated modules that must not load at startup')
+    args = parser.parse_args()
+
+    total_us, modules = profile(args.entry, args.runs)
+    baseline_us, baseline = profile(args.baseline, args.runs, allow_failure=True) if args.baseline else (0, {})
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    ranked = sorted(modules.items(), key=lambda kv: kv[1][1], reverse=True)
+    for name, (self_us, cumulative_us, depth) in ranked[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+    added_us = max(total_us - baseline_us, 0)
+    print(f"\nimport {args.entry}: {total_us / 1000:.1f} ms, {len(modules)} modules")
+    if baseline:
+        print(f"import {args.baseline}: {baseline_us / 1000:.1f} ms, {len(baseline)} modules")
+    print(f"added by the app: {added_us / 1000:.1f} ms, {len(set(modules) - set(baseline))} modules")
+
+    if not args.check:
+        return
+
+    failures = []
+    if added_us / 1000 > args.budget_ms:
+        failures.append(f"app import time {added_us / 1000:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    forbidden = [m.strip() for m in args.forbid.split(',') if m.strip()]
+    loaded = sorted(m for m in forbidden if m in modules and m not in baseline)
+    if loaded:
+        failures.append(f"heavy modules imported at startup: {', '.join(loaded)}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK: within startup budget")
+
+if __name__ == '__main__':
+    main()
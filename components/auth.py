@@ -1,6 +1,5 @@
 import streamlit as st
-from database import get_user_by_username
-from utils.auth_utils import verify_password
+from utils.auth_utils import hash_password, login_error_message, HasherBusy, LoginThrottled
 
 def render_login_form():
     """Renderiza el formulario de login"""
@@ -20,8 +19,13 @@ def render_login_form():
                 return
 
             # Verificar credenciales
-            user = get_user_by_username(username)
-            if user and verify_password(password, user['password_hash']):
+            from utils.password_hasher import authenticate
+            try:
+                user = authenticate(username, password)
+            except (LoginThrottled, HasherBusy) as e:
+                st.warning(login_error_message(e))
+                return
+            if user:
                 # Guardar información en la sesión
                 st.session_state.user_id = user['id']
                 st.session_state.username = user['username']
@@ -83,9 +87,14 @@ def render_register_form():
 
             # Intentar registro
             from database import register_user
+            try:
+                password_hash = hash_password(password)
+            except HasherBusy as e:
+                st.warning(login_error_message(e))
+                return
             success, message = register_user(
                 username=username,
-                password=password,
+                password_hash=password_hash,
                 email=email,
                 first_name=first_name,
                 last_name=last_name,
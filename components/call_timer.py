@@ -0,0 +1,58 @@
+import json
+import os
+import streamlit.components.v1 as components
+from config import WEBRTC_PORT
+
+_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'call_timer.js')
+
+_STATE_LABELS = {
+    'connecting': 'Conectando',
+    'connected': 'En curso',
+    'on_hold': 'En espera',
+    'ended': 'Finalizada',
+    'idle': 'Sin llamada'
+}
+
+def _load_script():
+    with open(_SCRIPT_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def render_call_timer(call_id, state, started_at=None, elapsed=0, ws_url=None):
+    """Render a call duration timer that ticks in the browser.
+
+    The timer subscribes to ``call:<call_id>`` on the signaling server and only
+    changes on pushed ``call_status`` messages, so it never triggers a rerun.
+    """
+    config = {
+        'callId': call_id,
+        'state': state,
+        'startedAt': started_at,
+        'elapsed': elapsed,
+        'wsUrl': ws_url,
+        'wsPort': WEBRTC_PORT,
+        'labels': _STATE_LABELS
+    }
+    components.html(f"""
+        <style>
+        .call-timer {{
+            font-family: 'Courier New', Courier, monospace;
+            display: flex;
+            align-items: center;
+            gap: 1rem;
+        }}
+        #call-timer-display {{
+            font-size: 2rem;
+            font-weight: bold;
+        }}
+        .call-timer-state {{ font-size: 1rem; }}
+        .state-connected {{ color: #28a745; }}
+        .state-on_hold {{ color: #ffc107; }}
+        .state-ended {{ color: #6c757d; }}
+        </style>
+        <div class="call-timer">
+            <span id="call-timer-display">00:00</span>
+            <span id="call-timer-state" class="call-timer-state"></span>
+        </div>
+        <script>window.CALL_TIMER_CONFIG = {json.dumps(config)};</script>
+        <script>{_load_script()}</script>
+    """, height=60)
@@ -0,0 +1,53 @@
+import streamlit as st
+from utils.exports import EXPORTS, available_formats, get_exports
+
+FORMAT_LABELS = {'csv': 'CSV', 'csv.gz': 'CSV comprimido (gzip)', 'parquet': 'Parquet'}
+STATUS_LABELS = {'pending': 'En cola', 'running': 'Generando', 'done': 'Listo', 'failed': 'Error'}
+
+def render_export_panel(kind, requested_by, user_id=None, key=None):
+    """Botón de exportación y lista de las exportaciones recientes del usuario.
+
+    ``user_id`` limits the export to that user's rows; supervisors pass None.
+    Large exports run in the background and show up here with their link.
+    """
+    key = key or f"export_{kind}"
+    exports = get_exports()
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        fmt = st.selectbox(
+            "Formato", available_formats(), format_func=lambda f: FORMAT_LABELS.get(f, f), key=f"{key}_format"
+        )
+    with col2:
+        st.write("")
+        if st.button(f"Exportar {EXPORTS[kind]['label']}", key=f"{key}_start"):
+            try:
+                job = exports.export(kind, fmt, requested_by, user_id=user_id)
+                if not job.finished:
+                    st.info(f"Exportando {job.total:,} filas en segundo plano; el enlace aparecerá abajo.")
+            except Exception as e:
+                st.error(f"No se pudo iniciar la exportación: {str(e)}")
+
+    jobs = [job for job in exports.list_for_user(requested_by) if job.kind == kind]
+    for job in jobs:
+        status = STATUS_LABELS.get(job.status, job.status)
+        progress = f"{job.rows:,}/{job.total:,} filas" if job.total else f"{job.rows:,} filas"
+        if job.status == 'done':
+            st.markdown(
+                f"{job.filename} — {status}, {progress}, {job.size_bytes / 1048576:.1f} MB · "
+                f"[Descargar]({job.download_url})"
+            )
+            if job.total <= exports.inline_max_rows:
+                with open(exports.file_path(job), 'rb') as f:
+                    st.download_button(
+                        "Descargar aquí", data=f, file_name=job.filename, mime=job.mimetype,
+                        key=f"{key}_{job.job_id}_download"
+                    )
+        elif job.status == 'failed':
+            st.markdown(f"{job.filename} — {status}: {job.error}")
+        else:
+            st.markdown(f"{job.filename} — {status}, {progress}")
+            st.progress(min(job.rows / job.total, 1.0) if job.total else 0.0)
+
+    if any(not job.finished for job in jobs) and st.button("Actualizar", key=f"{key}_refresh"):
+        st.experimental_rerun()
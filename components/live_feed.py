@@ -0,0 +1,71 @@
+import json
+import os
+import streamlit.components.v1 as components
+from config import WEBRTC_PORT, SESSION_TIMEOUT
+from utils.live_feed import SUPERVISOR_CHANNEL, feed_token
+
+_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'live_feed.js')
+
+_TILE_LABELS = {
+    'active_calls': 'Llamadas activas',
+    'on_hold': 'En espera',
+    'calls_started': 'Llamadas hoy',
+    'cases_created': 'Casos creados hoy',
+    'sweep_hits': 'Hits de barrido hoy'
+}
+
+_EVENT_LABELS = {
+    'call': 'Llamada',
+    'case_created': 'Caso creado',
+    'sweep_hit': 'Hit de barrido',
+    'service_health': 'Servicio'
+}
+
+def _load_script():
+    with open(_SCRIPT_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def render_live_feed(ws_url=None, height=320):
+    """Render the supervisor activity tiles and recent events.
+
+    The browser subscribes to the ``supervisor`` channel on the signaling
+    server, gets the current tiles on connect and then one message per
+    event, so the tiles change without rerunning the page.
+    """
+    config = {
+        'channel': SUPERVISOR_CHANNEL,
+        'token': feed_token(SESSION_TIMEOUT),
+        'wsUrl': ws_url,
+        'wsPort': WEBRTC_PORT,
+        'tiles': _TILE_LABELS,
+        'events': _EVENT_LABELS
+    }
+    components.html(f"""
+        <style>
+        .live-feed {{ font-family: sans-serif; }}
+        .live-tiles {{ display: flex; flex-wrap: wrap; gap: 0.75rem; }}
+        .live-tile {{
+            flex: 1 1 8rem;
+            padding: 0.75rem;
+            border-radius: 0.5rem;
+            background-color: #f0f2f6;
+        }}
+        .live-tile .value {{ font-size: 1.6rem; font-weight: bold; }}
+        .live-tile .label {{ font-size: 0.85rem; color: #555; }}
+        .live-services span {{ margin-right: 1rem; font-weight: bold; }}
+        .svc-healthy {{ color: #28a745; }}
+        .svc-unhealthy {{ color: #dc3545; }}
+        .svc-unknown, .svc-warning {{ color: #6c757d; }}
+        .live-status {{ font-size: 0.8rem; color: #888; }}
+        #live-events {{ list-style: none; padding: 0; margin: 0.5rem 0 0; font-size: 0.85rem; max-height: 9rem; overflow-y: auto; }}
+        #live-events li {{ padding: 0.15rem 0; border-bottom: 1px solid #eee; }}
+        </style>
+        <div class="live-feed">
+            <div id="live-tiles" class="live-tiles"></div>
+            <p id="live-services" class="live-services"></p>
+            <span id="live-status" class="live-status">Conectando…</span>
+            <ul id="live-events"></ul>
+        </div>
+        <script>window.LIVE_FEED_CONFIG = {json.dumps(config)};</script>
+        <script>{_load_script()}</script>
+    """, height=height)
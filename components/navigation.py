@@ -1,9 +1,10 @@
 import streamlit as st
-from utils import check_role, UserRole, I18nManager
+from utils import check_role, UserRole
+from utils.resources import resources
 
 class Navigation:
     def __init__(self):
-        self.i18n = I18nManager()
+        self.i18n = resources.get('i18n')
         self._ = self.i18n.get_text
 
     def render(self):
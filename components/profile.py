@@ -1,10 +1,11 @@
 import streamlit as st
 from database import get_db_connection
-from utils import hash_password, I18nManager
+from utils import hash_password
+from utils.resources import resources
 
 class ProfileManager:
     def __init__(self):
-        self.i18n = I18nManager()
+        self.i18n = resources.get('i18n')
         self._ = self.i18n.get_text
         self.conn = get_db_connection()
 
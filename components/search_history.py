@@ -0,0 +1,44 @@
+import streamlit as st
+from config import SEARCH_HISTORY_PAGE_SIZE
+from utils.search_history import search_history_log
+
+def _cursor_key(key):
+    return f"{key}_cursors"
+
+def render_search_history(user_id, key="search_history", title="Historial de Búsquedas",
+                          page_size=SEARCH_HISTORY_PAGE_SIZE):
+    """Renderiza una página del historial guardado, con navegación anterior/siguiente.
+
+    Only the keyset cursors of the pages visited live in session state.
+    """
+    cursors = st.session_state.setdefault(_cursor_key(key), [None])
+    rows = search_history_log.page(user_id, page_size, cursors[-1], session_state=st.session_state)
+
+    st.markdown(f"<h3>{title}</h3>", unsafe_allow_html=True)
+    if not rows:
+        st.info("No hay búsquedas registradas")
+        return
+
+    for row in rows:
+        found = row['status'] == 'success'
+        status_text = "Positivo" if row.get('is_positive') else ("Encontrado" if found else "Negativo")
+        badge = row['source'].upper()
+        st.markdown(
+            f"<div class='number-item history-item{' found' if found else ''}'>"
+            f"{row['number']} - {status_text} <span class='source-badge {row['source']}-badge'>{badge}</span>"
+            f"<small> {str(row['search_date'])[:19]}</small></div>",
+            unsafe_allow_html=True
+        )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("← Anterior", key=f"{key}_prev"):
+            cursors.pop()
+            st.experimental_rerun()
+    with col2:
+        st.caption(f"Página {len(cursors)}")
+    with col3:
+        if len(rows) == page_size and st.button("Siguiente →", key=f"{key}_next"):
+            # Unflushed entries have no id yet; they sort after every stored row of their instant
+            cursors.append((rows[-1]['search_date'], rows[-1].get('id') or 2**31 - 1))
+            st.experimental_rerun()
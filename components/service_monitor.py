@@ -1,16 +1,15 @@
 import streamlit as st
-import asyncio
 from datetime import datetime
 import pandas as pd
-import time
 from utils.service_monitor import monitor
+from utils.event_loop import run_sync
 
 def render_service_status():
     """Render service monitoring dashboard with enhanced error handling and real-time updates"""
     st.markdown("### 🔄 Monitor de Servicios en Tiempo Real")
     st.markdown("""
         Este panel muestra el estado actual de todos los servicios críticos del sistema.
-        Se actualiza automáticamente cada 5 segundos.
+        Los cambios de estado aparecen en vivo en el panel de actividad.
     """)
     try:
         st.markdown("""
@@ -50,8 +49,10 @@ def render_service_status():
         </style>
         """, unsafe_allow_html=True)
 
-        # Update metrics
-        asyncio.run(monitor.monitor_services())
+        # Probes run in the background; changes are pushed through the live feed
+        monitor.start_background()
+        if not monitor.get_metrics():
+            run_sync(monitor.monitor_services(), timeout=15)
         metrics = monitor.get_metrics()
 
         # Overall system health
@@ -113,6 +114,8 @@ def render_service_status():
                 </div>
                 """, unsafe_allow_html=True)
 
+        render_upstream_status(metrics)
+
         # Detailed metrics table
         st.markdown("### 📊 Métricas Detalladas")
         
@@ -139,15 +142,39 @@ def render_service_status():
         except Exception as e:
             st.error(f"Error al generar tabla de métricas: {str(e)}")
 
-        # Auto-refresh with error handling
-        try:
-            time.sleep(5)
-            st.experimental_rerun()
-        except Exception as e:
-            st.warning(f"Error al actualizar automáticamente: {str(e)}")
-
     except Exception as e:
         st.error(f"Error en el monitor de servicios: {str(e)}")
-        st.info("Intentando recuperar en la próxima actualización...")
-        time.sleep(5)
-        st.experimental_rerun()
+        st.info("Recargue la página para reintentar.")
+
+BREAKER_LABELS = {'closed': 'Cerrado', 'half_open': 'Semiabierto', 'open': 'Abierto'}
+
+def render_upstream_status(metrics):
+    """Adaptive rate and circuit breaker of each upstream source, as seen by this process"""
+    upstream = {
+        name.split(':', 1)[1]: data['upstream']
+        for name, data in metrics.items() if name.startswith('upstream:')
+    }
+    st.markdown("### 🌍 Fuentes Externas")
+    if not upstream:
+        st.caption("Sin consultas a EOIR ni PDL en este proceso todavía.")
+        return
+
+    columns = st.columns(len(upstream))
+    for col, (source, stats) in zip(columns, sorted(upstream.items())):
+        with col:
+            st.metric(
+                f"{source.upper()} – circuito {BREAKER_LABELS.get(stats['state'], stats['state'])}",
+                f"{stats['rate']:.2f} req/s",
+                f"límite {stats['limit']:.1f}/{stats['max_limit']}",
+                delta_color='off'
+            )
+            latency = f"{stats['latency_ms']:.0f} ms" if stats['latency_ms'] is not None else "N/A"
+            st.caption(
+                f"En curso: {stats['in_flight']} · Latencia: {latency} · Timeout: {stats['timeout']:.1f} s · "
+                f"Errores: {stats['error_rate']:.0%} · 429/5xx: {stats['overload'] + stats['error']} · "
+                f"Rechazadas por circuito: {stats['short_circuited']}"
+            )
+            if stats['state'] != 'closed':
+                st.warning(f"{stats['reason'] or 'Fallos sostenidos'}; reintento en {stats['retry_after']:.0f} s")
+            elif stats['paused_for']:
+                st.info(f"En pausa {stats['paused_for']:.0f} s por sobrecarga")
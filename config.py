@@ -47,3 +47,136 @@ WEBRTC_BASE_URL = get_base_url('WEBRTC')
 
 # Session configuration
 SESSION_TIMEOUT = int(os.environ.get('SESSION_TIMEOUT', 3600))  # 1 hour in seconds
+
+# Password hashing and login throttling
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 100000))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))  # queued + running hashes
+PASSWORD_HASH_ADMIT_TIMEOUT = float(os.environ.get('PASSWORD_HASH_ADMIT_TIMEOUT', 5.0))  # seconds
+LOGIN_MAX_ATTEMPTS = int(os.environ.get('LOGIN_MAX_ATTEMPTS', 5))  # per username and window
+LOGIN_ATTEMPT_WINDOW = float(os.environ.get('LOGIN_ATTEMPT_WINDOW', 300))  # seconds
+
+# Local data directory (write-ahead files, caches, snapshots)
+DATA_DIR = os.environ.get('DATA_DIR', 'data')
+
+# Shared process-level resources
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 32))  # connections per host, shared by all sessions
+PDL_API_KEY = os.environ.get('PDL_API_KEY')
+SESSION_MEMORY_LIMIT_MB = float(os.environ.get('SESSION_MEMORY_LIMIT_MB', 50))
+SESSION_MEMORY_CHECK_INTERVAL = float(os.environ.get('SESSION_MEMORY_CHECK_INTERVAL', 60))  # seconds
+LOOKUP_CACHE_MAX_SIZE = int(os.environ.get('LOOKUP_CACHE_MAX_SIZE', 5000))  # EOIR/PDL results kept in memory
+LOOKUP_CACHE_TTL = float(os.environ.get('LOOKUP_CACHE_TTL', 3600))  # seconds
+
+# Shared HTTP response cache (EOIR pages) for the scrapers and the Scrapy crawl
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', os.path.join(DATA_DIR, 'http_cache'))
+HTTP_CACHE_MAX_AGE = float(os.environ.get('HTTP_CACHE_MAX_AGE', 86400))  # seconds before revalidating with upstream
+HTTP_CACHE_MAX_MB = float(os.environ.get('HTTP_CACHE_MAX_MB', 512))  # uncompressed bodies kept
+
+# Adaptive per-source request control (per process): AIMD concurrency, pacing, circuit breaker
+EOIR_MAX_CONCURRENCY = int(os.environ.get('EOIR_MAX_CONCURRENCY', 8))
+EOIR_MAX_RATE = float(os.environ.get('EOIR_MAX_RATE', 2.0))  # requests per second, 0 = unpaced
+EOIR_TIMEOUT = float(os.environ.get('EOIR_TIMEOUT', 10))  # ceiling of the adaptive timeout, seconds
+PDL_MAX_CONCURRENCY = int(os.environ.get('PDL_MAX_CONCURRENCY', 4))
+PDL_MAX_RATE = float(os.environ.get('PDL_MAX_RATE', 5.0))
+PDL_TIMEOUT = float(os.environ.get('PDL_TIMEOUT', 10))
+UPSTREAM_TARGET_LATENCY = float(os.environ.get('UPSTREAM_TARGET_LATENCY', 2.0))  # seconds; slower counts as congestion
+BREAKER_FAILURE_RATE = float(os.environ.get('BREAKER_FAILURE_RATE', 0.5))  # over the last BREAKER_WINDOW calls
+BREAKER_WINDOW = int(os.environ.get('BREAKER_WINDOW', 20))
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', 30))  # doubles on each failed probe
+BREAKER_MAX_OPEN_SECONDS = float(os.environ.get('BREAKER_MAX_OPEN_SECONDS', 300))
+
+# Upstream endpoints; point both at upstream_simulator.py to run without network
+EOIR_BASE_URL = os.environ.get('EOIR_BASE_URL', 'https://acis.eoir.justice.gov/en/')
+# The EOIR page parser (EOIRScraper, eoir_spider, sweeps) only understands the
+# simulator's markup; without this it refuses to search instead of misreading ACIS
+EOIR_SIMULATOR = os.environ.get('EOIR_SIMULATOR', 'false').lower() in ('1', 'true', 'yes')
+PDL_BASE_URL = os.environ.get('PDL_BASE_URL', 'https://api.peopledatalabs.com/v5/person/search')
+
+# Known A-numbers pre-screen for sweeps
+KNOWN_NUMBERS_PATH = os.environ.get('KNOWN_NUMBERS_PATH', os.path.join(DATA_DIR, 'known_numbers.bloom'))
+KNOWN_NUMBERS_CAPACITY = int(os.environ.get('KNOWN_NUMBERS_CAPACITY', 2000000))
+KNOWN_NUMBERS_FP_RATE = float(os.environ.get('KNOWN_NUMBERS_FP_RATE', 0.001))
+KNOWN_NUMBERS_REFRESH_INTERVAL = float(os.environ.get('KNOWN_NUMBERS_REFRESH_INTERVAL', 60))  # seconds
+
+# A-number block scheduler: Thompson sampling over per-block hit rates
+NUMBER_BLOCK_DIGITS = int(os.environ.get('NUMBER_BLOCK_DIGITS', 3))  # blocks of 10**digits consecutive numbers
+NUMBER_SEED_BLOCK = int(os.environ.get('NUMBER_SEED_BLOCK', 244206))  # starting block when there is no history
+BLOCK_PRIOR_RATE = float(os.environ.get('BLOCK_PRIOR_RATE', 0.01))  # assumed hit rate before any lookups
+BLOCK_PRIOR_STRENGTH = float(os.environ.get('BLOCK_PRIOR_STRENGTH', 20))  # prior weight, in lookups
+BLOCK_NEIGHBOURHOOD = int(os.environ.get('BLOCK_NEIGHBOURHOOD', 5))  # blocks on each side that inform the prior
+BLOCK_EXPLORE_CANDIDATES = int(os.environ.get('BLOCK_EXPLORE_CANDIDATES', 3))  # random blocks per draw
+BLOCK_STATS_REFRESH_INTERVAL = float(os.environ.get('BLOCK_STATS_REFRESH_INTERVAL', 300))  # seconds
+
+# Live supervisor feed, pushed through the signaling server's websocket
+LIVE_FEED_ENABLED = os.environ.get('LIVE_FEED_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LIVE_FEED_URL = os.environ.get('LIVE_FEED_URL', f"ws://localhost:{WEBRTC_PORT}")
+LIVE_FEED_SECRET = os.environ.get('LIVE_FEED_SECRET', '')  # shared by publishers, server and dashboard
+LIVE_FEED_INSECURE = os.environ.get('LIVE_FEED_INSECURE', 'false').lower() in ('1', 'true', 'yes')  # accept unsigned tokens without a secret (local development only)
+LIVE_FEED_MAX_PENDING = int(os.environ.get('LIVE_FEED_MAX_PENDING', 1000))  # events buffered while disconnected
+SERVICE_MONITOR_INTERVAL = float(os.environ.get('SERVICE_MONITOR_INTERVAL', 5))  # seconds between health probes
+
+# Case pipeline: sweep hit -> EOIR detail -> PDL enrichment -> dedup -> batched insert
+CASE_PIPELINE_QUEUE_SIZE = int(os.environ.get('CASE_PIPELINE_QUEUE_SIZE', 100))  # items waiting per stage
+CASE_PIPELINE_EOIR_WORKERS = int(os.environ.get('CASE_PIPELINE_EOIR_WORKERS', 2))
+CASE_PIPELINE_PDL_WORKERS = int(os.environ.get('CASE_PIPELINE_PDL_WORKERS', 4))
+CASE_PIPELINE_BATCH_SIZE = int(os.environ.get('CASE_PIPELINE_BATCH_SIZE', 50))  # cases per dedup query / insert
+CASE_PIPELINE_BATCH_TIMEOUT = float(os.environ.get('CASE_PIPELINE_BATCH_TIMEOUT', 1.0))  # seconds to fill a batch
+CASE_PIPELINE_SUBMIT_TIMEOUT = float(os.environ.get('CASE_PIPELINE_SUBMIT_TIMEOUT', 30))  # seconds a producer waits for room
+
+# Distributed sweeps: chunks of A-number ranges claimed by worker.py processes
+SWEEP_CHUNK_SIZE = int(os.environ.get('SWEEP_CHUNK_SIZE', 200))  # numbers per claimable chunk
+SWEEP_LEASE_SECONDS = float(os.environ.get('SWEEP_LEASE_SECONDS', 60))  # a chunk is reassigned after this without a heartbeat
+SWEEP_HEARTBEAT_INTERVAL = float(os.environ.get('SWEEP_HEARTBEAT_INTERVAL', 15))  # seconds; also how often progress is saved
+SWEEP_MAX_ATTEMPTS = int(os.environ.get('SWEEP_MAX_ATTEMPTS', 5))  # claims per chunk before it is marked failed
+SWEEP_WORKER_CONCURRENCY = int(os.environ.get('SWEEP_WORKER_CONCURRENCY', 2))  # chunks a worker process runs at once
+SWEEP_POLL_INTERVAL = float(os.environ.get('SWEEP_POLL_INTERVAL', 5))  # seconds between claims when the queue is empty
+SWEEP_DELAY = float(os.environ.get('SWEEP_DELAY', 0))  # extra pause per chunk; EOIR_MAX_RATE paces requests
+SWEEP_MAX_CONSECUTIVE_ERRORS = int(os.environ.get('SWEEP_MAX_CONSECUTIVE_ERRORS', 5))  # then the chunk is handed back
+
+# Call event pipeline configuration
+CALL_EVENTS_WAL = os.environ.get('CALL_EVENTS_WAL', os.path.join(DATA_DIR, 'call_events.wal'))
+CALL_EVENTS_BATCH_SIZE = int(os.environ.get('CALL_EVENTS_BATCH_SIZE', 200))
+CALL_EVENTS_FLUSH_INTERVAL = float(os.environ.get('CALL_EVENTS_FLUSH_INTERVAL', 2.0))  # seconds
+
+# Search history (every EOIR/PDL lookup) written in batches
+SEARCH_HISTORY_WAL = os.environ.get('SEARCH_HISTORY_WAL', os.path.join(DATA_DIR, 'search_history.wal'))
+SEARCH_HISTORY_BATCH_SIZE = int(os.environ.get('SEARCH_HISTORY_BATCH_SIZE', 500))
+SEARCH_HISTORY_FLUSH_INTERVAL = float(os.environ.get('SEARCH_HISTORY_FLUSH_INTERVAL', 2.0))  # seconds
+SEARCH_HISTORY_PAGE_SIZE = int(os.environ.get('SEARCH_HISTORY_PAGE_SIZE', 25))
+
+# Exports (CSV / CSV gzip / Parquet) written by background jobs and served by the API
+EXPORT_DIR = os.environ.get('EXPORT_DIR', os.path.join(DATA_DIR, 'exports'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 2))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 5000))  # rows per cursor fetch
+EXPORT_INLINE_MAX_ROWS = int(os.environ.get('EXPORT_INLINE_MAX_ROWS', 10000))  # larger exports run in the background
+EXPORT_TTL = float(os.environ.get('EXPORT_TTL', 24 * 3600))  # seconds a finished file stays downloadable
+EXPORT_DOWNLOAD_BASE_URL = os.environ.get('EXPORT_DOWNLOAD_BASE_URL', API_BASE_URL or f"http://localhost:{API_PORT}")
+
+# Columnar analytics snapshots (Parquet) used by reports instead of the live tables
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join(DATA_DIR, 'snapshots'))
+SNAPSHOT_INTERVAL = float(os.environ.get('SNAPSHOT_INTERVAL', 900))  # seconds before a snapshot is stale
+SNAPSHOT_KEEP = int(os.environ.get('SNAPSHOT_KEEP', 2))  # versions kept on disk for readers still using them
+RENDER_CACHE_MAX_ENTRIES = int(os.environ.get('RENDER_CACHE_MAX_ENTRIES', 256))  # charts and report results per process
+RENDER_CACHE_MAX_MB = float(os.environ.get('RENDER_CACHE_MAX_MB', 64))
+
+# Storage backend: 'postgresql' (production) or 'sqlite' (local/dev)
+DATABASE_BACKEND = os.environ.get(
+    'DATABASE_BACKEND',
+    'postgresql' if (os.environ.get('DATABASE_URL') or os.environ.get('PGHOST')) else 'sqlite'
+)
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'cases_database.db')
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 20))
+
+# Ordered SQL migrations, one directory per dialect
+MIGRATIONS_DIR = os.environ.get(
+    'MIGRATIONS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+)
+
+# SQLite tuning (local deployments)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+SQLITE_RETRY_ATTEMPTS = int(os.environ.get('SQLITE_RETRY_ATTEMPTS', 5))
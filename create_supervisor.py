@@ -1,5 +1,5 @@
 import sqlite3
-import hashlib
+from utils.auth_utils import hash_password
 
 def create_supervisor():
     conn = sqlite3.connect('cases_database.db')
@@ -12,7 +12,7 @@ def create_supervisor():
         email = 'supervisor@example.com'
         
         # Hash de la contraseña
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        password_hash = hash_password(password)
         
         # Insertar el supervisor
         cursor.execute("""
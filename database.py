@@ -1,7 +1,10 @@
 import os
+import time
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
+import streamlit as st
+from utils.repository import cases as case_repository, users as user_repository
 
 logger = logging.getLogger(__name__)
 
@@ -55,58 +58,11 @@ def get_db_connection(max_retries=3, retry_delay=2):
     raise psycopg2.OperationalError(f"Failed to connect to database after {max_retries} attempts. Last error: {last_error}")
 
 def init_db():
-    """Initialize the database by creating necessary tables."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        # Drop and recreate tables (for development purposes)
-        cur.execute("DROP TABLE IF EXISTS cases CASCADE")
-        cur.execute("DROP TABLE IF EXISTS users CASCADE")
-
-        # Create users table
-        cur.execute("""
-            CREATE TABLE users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                first_name VARCHAR(50),
-                last_name VARCHAR(50),
-                role VARCHAR(20) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create cases table
-        cur.execute("""
-            CREATE TABLE cases (
-                id SERIAL PRIMARY KEY,
-                number VARCHAR(50) UNIQUE NOT NULL,
-                status VARCHAR(20) NOT NULL,
-                is_positive BOOLEAN NOT NULL,
-                first_name VARCHAR(50) NOT NULL,
-                last_name VARCHAR(50) NOT NULL,
-                a_number VARCHAR(9) UNIQUE NOT NULL,
-                court_address TEXT NOT NULL,
-                court_phone VARCHAR(20) NOT NULL,
-                client_phone VARCHAR(20),
-                other_client_phone VARCHAR(20),
-                client_address TEXT,
-                client_email VARCHAR(100),
-                created_by INTEGER REFERENCES users(id),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        conn.commit()
-        logger.info("Database initialized successfully")
-    except psycopg2.Error as e:
-        logger.error(f"Error initializing database: {e}")
-        conn.rollback()
-        raise
-    finally:
-        cur.close()
-        conn.close()
+    """Bring the database schema up to date. Existing data is kept."""
+    from utils.migrations import MigrationRunner
+    applied = MigrationRunner().migrate()
+    logger.info(f"Database initialized successfully ({len(applied)} migration(s) applied)")
+    return applied
 
 def execute_query(query, params=None, max_retries=3):
     """
@@ -172,120 +128,73 @@ def execute_query(query, params=None, max_retries=3):
 
 def login_user(username, password):
     """Login user and return user data with enhanced role handling and logging."""
+    from utils.password_hasher import authenticate, HasherBusy, LoginThrottled
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        user = authenticate(username, password, user_repository)
 
-        # Buscar usuario con su rol
-        cur.execute("""
-            SELECT id, username, email, password_hash, role, 
-                   first_name, last_name, created_at
-            FROM users 
-            WHERE username = %s
-        """, (username,))
+        if user:
+            # Log successful login with role information
+            logger.info(f"Login successful - User: {username}, Role: {user['role']}")
 
-        user = cur.fetchone()
+            # Store role in session state
+            st.session_state.user_role = user['role']
+            st.session_state.user_id = user['id']
+            st.session_state.username = user['username']
 
-        if user:
-            logger.debug(f"User found: {user['username']} with role: {user['role']}")
-            from utils.auth_utils import verify_password
-            if verify_password(user['password_hash'], password):
-                # Log successful login with role information
-                logger.info(f"Login successful - User: {username}, Role: {user['role']}")
-                
-                # Store role in session state
-                st.session_state.user_role = user['role']
-                st.session_state.user_id = user['id']
-                st.session_state.username = user['username']
-                
-                logger.debug(f"Session state updated with role: {user['role']}")
-                return True, user
-            else:
-                logger.warning(f"Invalid password for user: {username}")
-        else:
-            logger.warning(f"User not found: {username}")
+            logger.debug(f"Session state updated with role: {user['role']}")
+            return True, user
 
+        logger.warning(f"Invalid credentials for user: {username}")
         return False, None
+    except (LoginThrottled, HasherBusy):
+        raise
     except Exception as e:
         logger.error(f"Error in login: {e}")
         return False, None
-    finally:
-        cur.close()
-        conn.close()
 
 def register_user(username, password_hash, email, first_name, last_name, role):
     """Register a new user."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        cur.execute("""
-            INSERT INTO users 
-            (username, email, password_hash, first_name, last_name, role)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id
-        """, (username, email, password_hash, first_name, last_name, role))
-
-        user_id = cur.fetchone()
-        conn.commit()
+        user_id = user_repository.create(
+            username=username,
+            password_hash=password_hash,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            role=role
+        )
 
         if user_id:
             return True, "Usuario registrado exitosamente"
         else:
             return False, "Error inesperado al registrar el usuario"
 
-    except psycopg2.IntegrityError as e:
-        conn.rollback()
-        if "username" in str(e):
-            return False, "El nombre de usuario ya está en uso"
-        elif "email" in str(e):
-            return False, "El correo electrónico ya está registrado"
-        return False, "Error al registrar usuario"
     except Exception as e:
-        conn.rollback()
+        # Unique violations look the same on every backend
+        if "unique" in str(e).lower() or "duplicate" in str(e).lower():
+            if "username" in str(e):
+                return False, "El nombre de usuario ya está en uso"
+            elif "email" in str(e):
+                return False, "El correo electrónico ya está registrado"
+            return False, "Error al registrar usuario"
         logger.error(f"Error in register: {e}")
         return False, "Error interno del servidor"
-    finally:
-        cur.close()
-        conn.close()
 
 def get_user_by_username(username):
     """Get user by username."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        cur.execute("""
-            SELECT * FROM users 
-            WHERE username = %s
-        """, (username,))
-
-        return cur.fetchone()
+        return user_repository.get_by_username(username)
     except Exception as e:
         logger.error(f"Error getting user by username: {e}")
         return None
-    finally:
-        cur.close()
-        conn.close()
 
 def get_user_by_id(user_id):
     """Get user by ID."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        cur.execute("""
-            SELECT * FROM users 
-            WHERE id = %s
-        """, (user_id,))
-
-        return cur.fetchone()
+        return user_repository.get_by_id(user_id)
     except Exception as e:
         logger.error(f"Error getting user by ID: {e}")
         return None
-    finally:
-        cur.close()
-        conn.close()
 
 def update_user_profile(user_id, updates):
     """Update user profile with given data."""
@@ -296,22 +205,11 @@ def update_user_profile(user_id, updates):
 
 def insert_case(case_data):
     """Insert a new case into the database."""
-    query = """
-        INSERT INTO cases (number, status, is_positive, first_name, last_name, a_number,
-                           court_address, court_phone, client_phone, other_client_phone,
-                           client_address, client_email, created_by)
-        VALUES (%(number)s, %(status)s, %(is_positive)s, %(first_name)s, %(last_name)s, %(a_number)s,
-                %(court_address)s, %(court_phone)s, %(client_phone)s, %(other_client_phone)s,
-                %(client_address)s, %(client_email)s, %(created_by)s)
-        RETURNING id
-    """
-    result = execute_query(query, case_data)
-    return result[0]['id'] if result else None
+    return case_repository.insert(case_data)
 
 def get_cases_by_user(user_id):
     """Retrieve all cases created by a specific user."""
-    query = "SELECT * FROM cases WHERE created_by = %s ORDER BY created_at DESC"
-    return execute_query(query, (user_id,))
+    return case_repository.list_by_user(user_id)
 
 def verify_user_credentials(username, password):
     """Verify user credentials."""
@@ -0,0 +1,87 @@
+"""Headless-browser helpers for the Playwright spider: request blocking and a page pool."""
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# Nothing here is needed to read the case fields out of the DOM
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'beacon', 'imageset', 'ping'}
+
+# Analytics and tag managers; a host matches itself and its subdomains
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'analytics.google.com',
+    'googlesyndication.com', 'digitalgov.gov', 'dap.digitalgov.gov', 'newrelic.com', 'nr-data.net',
+    'hotjar.com', 'facebook.net', 'clarity.ms', 'segment.io',
+)
+
+def abort_request(request) -> bool:
+    """``PLAYWRIGHT_ABORT_REQUEST``: drop what the case page does not need to render."""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlsplit(request.url).hostname or ''
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in BLOCKED_HOSTS)
+
+# Chromium only; None elsewhere
+HEAP_SCRIPT = "() => performance.memory ? performance.memory.usedJSHeapSize : null"
+
+class PagePool:
+    """A fixed set of browser pages spread over ``contexts`` contexts, reused request after request.
+
+    The pool starts with one empty slot per page; ``acquire`` returns
+    ``(None, context)`` for an empty slot, and the download handler opens a
+    page in that context. Pages go back with ``release``; a closed or broken
+    page leaves its slot empty again. Waiting in ``acquire`` is what bounds
+    the number of pages in flight.
+    """
+
+    def __init__(self, contexts: int, pages_per_context: int, prefix: str = 'eoir'):
+        self.context_names = [f"{prefix}-{i}" for i in range(contexts)]
+        self.size = contexts * pages_per_context
+        self._slots = asyncio.Queue()
+        # Interleaved so the first pages are spread over all contexts
+        for _ in range(pages_per_context):
+            for name in self.context_names:
+                self._slots.put_nowait((None, name))
+        self.rendered = 0
+        self.heap = defaultdict(dict)
+        self.started = time.monotonic()
+
+    async def acquire(self):
+        """``(page, context)``; ``page`` is None when a new page should be opened."""
+        return await self._slots.get()
+
+    async def release(self, page, context: str):
+        """Return a page after its response was parsed; ``page`` is None if it was never opened."""
+        if page is None or page.is_closed():
+            if page is not None:
+                self.heap[context].pop(id(page), None)
+            self._slots.put_nowait((None, context))
+            return
+        self.rendered += 1
+        try:
+            heap = await page.evaluate(HEAP_SCRIPT)
+        except Exception:
+            heap = None
+        if heap is not None:
+            self.heap[context][id(page)] = heap
+        self._slots.put_nowait((page, context))
+
+    async def close(self):
+        while not self._slots.empty():
+            page, _ = self._slots.get_nowait()
+            if page is not None and not page.is_closed():
+                await page.close()
+
+    def get_stats(self):
+        minutes = max(time.monotonic() - self.started, 1e-9) / 60
+        return {
+            'size': self.size,
+            'pages_idle': self._slots.qsize(),
+            'rendered': self.rendered,
+            'pages_per_minute': round(self.rendered / minutes, 1),
+            # JS heap of each context's pages, as last sampled
+            'heap_mb': {
+                name: round(sum(pages.values()) / 2**20, 1)
+                for name, pages in sorted(self.heap.items())
+            },
+        }
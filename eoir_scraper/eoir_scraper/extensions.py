@@ -0,0 +1,63 @@
+import logging
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserStats:
+    """Log the Playwright spider's page pool every ``LOGSTATS_INTERVAL`` seconds.
+
+    Pages/minute over the last interval, JS heap per browser context and
+    how many browser requests ``abort_request`` dropped; the crawl totals
+    end up in the Scrapy stats under ``browser/``.
+    """
+
+    def __init__(self, stats, interval):
+        self.stats = stats
+        self.interval = interval
+        self.task = None
+        self.last_rendered = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat('LOGSTATS_INTERVAL')
+        if not interval:
+            raise NotConfigured
+        ext = cls(crawler.stats, interval)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.spider = spider
+        self.task = task.LoopingCall(self.log)
+        self.task.start(self.interval, now=False)
+
+    def log(self):
+        pool = getattr(self.spider, 'pool', None)
+        if pool is None:
+            return
+        stats = pool.get_stats()
+        rate = (stats['rendered'] - self.last_rendered) * 60 / self.interval
+        self.last_rendered = stats['rendered']
+        heap = ', '.join(f"{name} {mb} MB" for name, mb in stats['heap_mb'].items()) or 'n/a'
+        logger.info(
+            f"Browser: {rate:.0f} pages/min, {stats['size'] - stats['pages_idle']}/{stats['size']} pages busy, "
+            f"JS heap {heap}, {self.stats.get_value('playwright/request_count/aborted', 0)} requests blocked",
+            extra={'spider': self.spider}
+        )
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        pool = getattr(spider, 'pool', None)
+        if pool is None:
+            return
+        stats = pool.get_stats()
+        self.stats.set_value('browser/pages_rendered', stats['rendered'])
+        self.stats.set_value('browser/pages_per_minute', stats['pages_per_minute'])
+        for name, mb in stats['heap_mb'].items():
+            self.stats.set_value(f'browser/heap_mb/{name}', mb)
@@ -0,0 +1,98 @@
+"""Scrapy's HTTPCACHE on top of the app's shared ``utils.http_cache.HttpCache``.
+
+Pages fetched by the crawl are served to the scrapers and the other way
+round. ``HTTP_CACHE_MAX_AGE`` decides freshness for both; a stale page with
+an ETag or Last-Modified is revalidated with a conditional request.
+"""
+import gzip
+import zlib
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+
+class SharedCacheStorage:
+    """``HTTPCACHE_STORAGE`` backed by the shared cache.
+
+    Bodies are stored decoded, since the requests scrapers read them; a
+    response with an encoding other than gzip or deflate is not stored.
+    """
+
+    def __init__(self, settings):
+        self.cache = None
+
+    def open_spider(self, spider):
+        from utils.resources import resources
+        self.cache = resources.get('http_cache')
+
+    def close_spider(self, spider):
+        self.cache.prune()
+
+    def retrieve_response(self, spider, request):
+        cached = self.cache.get(request.method, request.url)
+        if cached is None:
+            return None
+        request.meta['http_cache_fresh'] = self.cache.is_fresh(cached)
+        request.meta['cache_timestamp'] = cached.validated_at
+        headers = Headers(cached.headers)
+        respcls = responsetypes.from_args(headers=headers, url=cached.url, body=cached.body)
+        return respcls(url=request.url, status=cached.status, headers=headers, body=cached.body)
+
+    def store_response(self, spider, request, response):
+        headers = [
+            (name.decode('latin-1'), b', '.join(values).decode('latin-1'))
+            for name, values in response.headers.items()
+        ]
+        if 'cached' in response.flags:
+            # A 304 revalidated the stored copy
+            self.cache.revalidated(request.method, request.url, headers)
+            return
+        body = _decode(response)
+        if body is not None:
+            self.cache.put(request.method, request.url, response.status, headers, body)
+
+
+class SharedCachePolicy:
+    """``HTTPCACHE_POLICY``: fresh per ``HTTP_CACHE_MAX_AGE``, then a conditional refetch."""
+
+    def __init__(self, settings):
+        self.ignore_schemes = settings.getlist('HTTPCACHE_IGNORE_SCHEMES')
+        self.ignore_http_codes = [int(x) for x in settings.getlist('HTTPCACHE_IGNORE_HTTP_CODES')]
+
+    def should_cache_request(self, request):
+        return request.method == 'GET' and request.url.split(':', 1)[0] not in self.ignore_schemes
+
+    def should_cache_response(self, response, request):
+        from utils.http_cache import CACHEABLE_STATUS
+        return response.status in CACHEABLE_STATUS and response.status not in self.ignore_http_codes
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        if request.meta.get('http_cache_fresh'):
+            return True
+        etag = cachedresponse.headers.get('ETag')
+        last_modified = cachedresponse.headers.get('Last-Modified')
+        if etag:
+            request.headers.setdefault('If-None-Match', etag)
+        if last_modified:
+            request.headers.setdefault('If-Modified-Since', last_modified)
+        return False
+
+    def is_cached_response_valid(self, cachedresponse, response, request):
+        return response.status == 304
+
+
+def _decode(response):
+    encoding = response.headers.get('Content-Encoding', b'').decode('latin-1').strip().lower()
+    if encoding in ('', 'identity'):
+        return response.body
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            return gzip.decompress(response.body)
+        if encoding == 'deflate':
+            try:
+                return zlib.decompress(response.body)
+            except zlib.error:
+                return zlib.decompress(response.body, -zlib.MAX_WBITS)
+    except (OSError, zlib.error):
+        return None
+    return None
@@ -6,7 +6,10 @@
 import scrapy
 
 
-class EoirScraperItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+class EoirCaseItem(scrapy.Item):
+    """One A-number lookup, shaped like ``EOIRScraper.search``'s result."""
+    number = scrapy.Field()
+    status = scrapy.Field()       # success, not_found or error
+    data = scrapy.Field()         # case fields when status is success
+    error = scrapy.Field()
+    searched_at = scrapy.Field()
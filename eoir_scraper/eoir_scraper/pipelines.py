@@ -3,11 +3,83 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import logging
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from twisted.internet.threads import deferToThread
 
+logger = logging.getLogger(__name__)
 
-class EoirScraperPipeline:
-    def process_item(self, item, spider):
-        return item
+
+class EoirStorePipeline:
+    """Store lookups the way a sweep worker does.
+
+    Every answered lookup goes to ``search_history_log`` (a write-ahead file
+    flushed to ``search_history`` in batches) and numbers without a case go
+    into the known-numbers filter. Hits are collected and handed to the case
+    pipeline ``EOIR_STORE_BATCH_SIZE`` at a time from a thread, since the
+    pipeline blocks when its queues are full and the reactor must not.
+    Failed lookups are only exported to the feed.
+    """
+
+    def __init__(self, crawler, batch_size=100):
+        self.crawler = crawler
+        self.batch_size = batch_size
+        self.hits = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler, crawler.settings.getint('EOIR_STORE_BATCH_SIZE', 100))
+
+    # Newer Scrapy versions no longer pass the spider; it is read from the crawler
+    def open_spider(self, spider=None):
+        # config.py reads the environment set up in settings.py, so import late
+        from utils.resources import resources
+        from utils.search_history import search_history_log
+        from utils.case_pipeline import get_case_pipeline
+        self.user_id = self.crawler.spider.user_id
+        self.history = search_history_log
+        self.known = resources.get('known_numbers')
+        self.pipeline = get_case_pipeline()
+        self.counts = {'searched': 0, 'hits': 0, 'errors': 0}
+
+    def process_item(self, item, spider=None):
+        adapter = ItemAdapter(item)
+        status = adapter.get('status')
+        if status == 'error':
+            self.counts['errors'] += 1
+            return item
+
+        number = adapter['number']
+        result = {'status': status, 'data': adapter.get('data'), 'error': adapter.get('error')}
+        self.history.record(number, self.user_id, result, 'eoir')
+        self.counts['searched'] += 1
+        if status == 'not_found':
+            self.known.add(number)
+            return item
+
+        self.counts['hits'] += 1
+        self.hits.append((number, result))
+        if len(self.hits) < self.batch_size:
+            return item
+        batch, self.hits = self.hits, []
+        # Scrapy waits on the deferred, so a slow pipeline slows the crawl down
+        return deferToThread(self._submit, batch).addCallback(lambda _: item)
+
+    def close_spider(self, spider=None):
+        batch, self.hits = self.hits, []
+        return deferToThread(self._close, batch)
+
+    def _submit(self, batch):
+        for number, result in batch:
+            self.pipeline.submit_result(number, result, self.user_id, timeout=None)
+
+    def _close(self, batch):
+        self._submit(batch)
+        # Wait for queued cases to be stored, then flush history and the filter
+        self.pipeline.close(timeout=600)
+        self.history.flush()
+        self.known.save()
+        logger.info(f"Stored {self.counts['searched']} lookups ({self.counts['hits']} hits); "
+                    f"{self.counts['errors']} failed lookups only in the feed")
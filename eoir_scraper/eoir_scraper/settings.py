@@ -1,4 +1,17 @@
 # settings.py
+import os
+import sys
+
+# Los pipelines guardan en la base de datos de la aplicación: sus paquetes
+# (config, utils, scrapers) tienen que poder importarse desde aquí
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Rutas relativas de config.py (base SQLite, data/) resueltas contra la raíz del
+# repositorio y no contra eoir_scraper/, desde donde se lanza scrapy
+os.environ.setdefault('SQLITE_PATH', os.path.join(ROOT, 'cases_database.db'))
+os.environ.setdefault('DATA_DIR', os.path.join(ROOT, 'data'))
 
 # Configuración general de Scrapy
 BOT_NAME = 'eoir_scraper'
@@ -8,31 +21,58 @@ NEWSPIDER_MODULE = 'eoir_scraper.spiders'
 
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
-# Usar Playwright como el downloader middleware
-DOWNLOADER_MIDDLEWARES = {
-    'scrapy_playwright.middleware.PlaywrightMiddleware': 1,
-}
-
-# Usar Chromium para el scraping
-PLAYWRIGHT_BROWSER_TYPE = 'chromium'
-PLAYWRIGHT_LAUNCH_OPTIONS = {'headless': True}
-
-# Configuración de Scrapy para manejar el contenido dinámico
+# eoir_spider descarga HTML sin navegador y solo reconoce la página de
+# upstream_simulator.py, así que no arranca sin EOIR_SIMULATOR=true. El portal
+# real de EOIR (ACIS) es una aplicación JavaScript: contra producción hay que
+# usar la araña eoir_playwright, que la ejecuta en Chromium (con
+# EOIRScraper.CASE_FIELDS ajustado a ese DOM)
 DOWNLOAD_DELAY = 1
 CONCURRENT_REQUESTS = 8
 FEED_EXPORT_ENCODING = 'utf-8'
 
-# Exportar los resultados a un archivo JSON
-FEED_FORMAT = 'json'
-FEED_URI = 'results.json'
+# Guardar cada resultado en search_history y cada caso encontrado en cases, por lotes
+ITEM_PIPELINES = {
+    'eoir_scraper.pipelines.EoirStorePipeline': 300,
+}
+EOIR_STORE_BATCH_SIZE = int(os.environ.get('EOIR_STORE_BATCH_SIZE', 100))  # Casos por envío al pipeline de casos
 
-# Configuración de caché para evitar descargar la misma página repetidamente
-HTTPCACHE_ENABLED = True
-HTTPCACHE_EXPIRATION_SECS = 86400
-HTTPCACHE_IGNORE_HTTP_CODES = [403, 500, 502, 503, 504]
+# Exportar a JSON Lines: un resultado por línea, así que un rastreo interrumpido
+# deja un archivo válido y cada ejecución escribe archivos nuevos en lugar de
+# añadir otro array a results.json. Se abre un archivo nuevo cada
+# FEED_BATCH_ITEMS resultados.
+FEEDS = {
+    'output/%(name)s-%(batch_time)s-%(batch_id)05d.jsonl': {
+        'format': 'jsonlines',
+        'encoding': 'utf8',
+        'batch_item_count': int(os.environ.get('FEED_BATCH_ITEMS', 10000)),
+    },
+}
+
+# Pausar y reanudar: con JOBDIR, Ctrl-C (una sola vez) guarda la cola de
+# peticiones, las ya vistas y el cursor de la araña; el mismo comando continúa
+# donde se quedó. Un directorio por rastreo:
+#   scrapy crawl eoir_spider -a start=244206000 -a count=100000 -a user_id=1 -s JOBDIR=crawls/244206
+JOBDIR = os.environ.get('EOIR_CRAWL_JOBDIR') or None
+
+# Araña eoir_playwright: páginas de navegador reutilizables, repartidas en contextos
+EOIR_BROWSER_CONTEXTS = int(os.environ.get('EOIR_BROWSER_CONTEXTS', 2))  # Contextos de Chromium (cookies/caché separadas)
+EOIR_PAGES_PER_CONTEXT = int(os.environ.get('EOIR_PAGES_PER_CONTEXT', 4))  # Páginas por contexto; el total limita las peticiones en curso
+EOIR_RESULT_TIMEOUT_MS = int(os.environ.get('EOIR_RESULT_TIMEOUT_MS', 15000))  # Espera máxima al número de caso o al aviso de "sin caso"
+
+# Caché HTTP compartida con los scrapers de la aplicación (utils/http_cache.py):
+# una página descargada por cualquiera de los dos no se vuelve a pedir mientras
+# tenga menos de HTTP_CACHE_MAX_AGE segundos; después se revalida con ETag/Last-Modified
+HTTPCACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTPCACHE_STORAGE = 'eoir_scraper.httpcache.SharedCacheStorage'
+HTTPCACHE_POLICY = 'eoir_scraper.httpcache.SharedCachePolicy'
+HTTPCACHE_IGNORE_HTTP_CODES = [403, 429, 500, 502, 503, 504]
 
 # Activar AutoThrottle para limitar la tasa de peticiones
 AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 2
 AUTOTHROTTLE_MAX_DELAY = 10
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+
+# Reintentar también las respuestas 429 de EOIR
+RETRY_TIMES = 3
+RETRY_HTTP_CODES = [429, 500, 502, 503, 504, 522, 524, 408]
@@ -0,0 +1,103 @@
+from eoir_scraper.browser import PagePool
+from eoir_scraper.spiders.eoir_spider import EoirSpiderSpider
+
+
+class EoirPlaywrightSpider(EoirSpiderSpider):
+    """``eoir_spider`` rendered in headless Chromium, for when the case page needs JavaScript.
+
+        scrapy crawl eoir_playwright -a start=244206000 -a count=10000 -a user_id=1 \\
+            -s EOIR_BROWSER_CONTEXTS=2 -s EOIR_PAGES_PER_CONTEXT=4
+
+    Pages come from a ``PagePool`` and are reused for the whole crawl instead
+    of being opened per request; images, fonts, media, stylesheets and
+    analytics are aborted (``eoir_scraper.browser.abort_request``). A lookup
+    is done as soon as the case number or the "no case" message is in the
+    DOM. ``BrowserStats`` logs pages/minute and JS heap per context.
+
+    Requests hold live pages and are never written to JOBDIR, so the resume
+    cursor only moves past a number once its page is back in the pool.
+    """
+    name = "eoir_playwright"
+
+    custom_settings = {
+        'DOWNLOAD_HANDLERS': {
+            'http': 'scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler',
+            'https': 'scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler',
+        },
+        'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
+        'PLAYWRIGHT_BROWSER_TYPE': 'chromium',
+        'PLAYWRIGHT_LAUNCH_OPTIONS': {'headless': True},
+        'PLAYWRIGHT_ABORT_REQUEST': 'eoir_scraper.browser.abort_request',
+        'EXTENSIONS': {'eoir_scraper.extensions.BrowserStats': 500},
+        # The shared HTTP cache holds raw pages, which the requests scrapers read; not rendered DOMs
+        'HTTPCACHE_ENABLED': False,
+    }
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        contexts = settings.getint('EOIR_BROWSER_CONTEXTS')
+        pages = settings.getint('EOIR_PAGES_PER_CONTEXT')
+        # Service workers would fetch past the abort_request route
+        settings.set('PLAYWRIGHT_CONTEXTS', {f"eoir-{i}": {'service_workers': 'block'} for i in range(contexts)},
+                     priority='spider')
+        settings.set('PLAYWRIGHT_MAX_CONTEXTS', contexts, priority='spider')
+        settings.set('PLAYWRIGHT_MAX_PAGES_PER_CONTEXT', pages, priority='spider')
+        settings.set('CONCURRENT_REQUESTS', contexts * pages, priority='spider')
+
+    async def start(self):
+        from scrapers.eoir_scraper import EOIRScraper
+        settings = self.crawler.settings
+        self.pool = PagePool(settings.getint('EOIR_BROWSER_CONTEXTS'), settings.getint('EOIR_PAGES_PER_CONTEXT'))
+        self.result_selector = f"{EOIRScraper.CASE_FIELDS['a_number']}, div.error-message"
+        self.result_timeout = settings.getint('EOIR_RESULT_TIMEOUT_MS')
+        self.cursor = getattr(self, 'state', {})
+        # Numbers whose page is out, oldest first
+        self.in_flight = {}
+        self.queued_to = None
+
+        for number in self._numbers(cursor={}):
+            page, context = await self.pool.acquire()
+            self.in_flight[number] = None
+            self.queued_to = int(number) + 1
+            self._move_cursor()
+            yield self._request(number, page, context)
+        self._move_cursor()
+
+    def _request(self, number, page=None, context=None):
+        # Imported here so eoir_spider loads without scrapy-playwright installed
+        from scrapy_playwright.page import PageMethod
+        request = super()._request(
+            number,
+            playwright=True,
+            playwright_include_page=True,
+            playwright_context=context,
+            playwright_page_methods=[
+                PageMethod('wait_for_selector', self.result_selector, state='attached',
+                           timeout=self.result_timeout),
+            ],
+            eoir_context=context,
+        )
+        if page is not None:
+            request.meta['playwright_page'] = page
+        # The cursor, not the dupefilter, decides what a resumed crawl repeats
+        return request.replace(dont_filter=True)
+
+    async def parse(self, response, number):
+        item = self._item(response, number)
+        await self._done(response.meta, number)
+        yield item
+
+    async def failed(self, failure):
+        for item in super().failed(failure):
+            yield item
+        await self._done(failure.request.meta, failure.request.cb_kwargs['number'])
+
+    async def _done(self, meta, number):
+        await self.pool.release(meta.get('playwright_page'), meta['eoir_context'])
+        self.in_flight.pop(number, None)
+        self._move_cursor()
+
+    def _move_cursor(self):
+        if self.queued_to is not None:
+            self.cursor['next_number'] = int(next(iter(self.in_flight), self.queued_to))
@@ -1,10 +1,117 @@
+from datetime import datetime
+
 import scrapy
 
+from eoir_scraper.items import EoirCaseItem
+
 
 class EoirSpiderSpider(scrapy.Spider):
+    """Look up ``count`` consecutive A-numbers from ``start`` on the EOIR case page.
+
+        scrapy crawl eoir_spider -a start=244206000 -a count=10000 -a user_id=1 -s JOBDIR=crawls/244206
+
+    ``user_id`` is who the lookups are recorded for in ``search_history``.
+    Numbers the known-numbers filter has already seen are skipped unless
+    ``-a skip_known=0``.
+
+    With ``JOBDIR`` the crawl can be stopped with a single Ctrl-C and resumed
+    with the same command: Scrapy keeps the pending requests and the seen
+    fingerprints there, and the spider keeps how far it has queued numbers in
+    ``self.state``.
+
+    Its selectors only match upstream_simulator.py, so it refuses to start
+    unless ``EOIR_SIMULATOR`` is set; use eoir_playwright against ACIS.
+    """
     name = "eoir_spider"
-    allowed_domains = ["acis.eoir.justice.gov"]
-    start_urls = ["https://acis.eoir.justice.gov"]
 
-    def parse(self, response):
-        pass
+    def __init__(self, start=None, count=1000, user_id=None, skip_known='1', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from config import EOIR_SIMULATOR
+        if not EOIR_SIMULATOR:
+            from scrapers.eoir_scraper import SIMULATOR_ONLY
+            raise ValueError(SIMULATOR_ONLY)
+        if start is None or user_id is None:
+            raise ValueError("eoir_spider needs -a start=<first A-number> and -a user_id=<user id>")
+        self.first_number = int(start)
+        self.count = int(count)
+        self.user_id = int(user_id)
+        self.skip_known = skip_known not in ('0', 'false', 'no')
+
+    async def start(self):
+        # Scrapy 2.13+ entry point; older versions call start_requests directly
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for number in self._numbers():
+            yield self._request(number)
+
+    def _numbers(self, cursor=None):
+        # cursor gets the queue position as numbers are yielded; the JOBDIR state by default
+        from scrapers.eoir_scraper import EOIRScraper
+        from utils.resources import resources
+        self.case_fields = EOIRScraper.CASE_FIELDS
+        known = resources.get('known_numbers') if self.skip_known else None
+
+        # Only set when running with JOBDIR
+        state = getattr(self, 'state', {})
+        cursor = state if cursor is None else cursor
+        end = self.first_number + self.count
+        first = state.get('next_number', self.first_number)
+        if first > self.first_number:
+            self.logger.info(f"Resuming at {first:09d} ({first - self.first_number} of {self.count} numbers queued before)")
+
+        for n in range(first, end):
+            number = f"{n:09d}"
+            # Set before the yield: a number queued just before a pause is
+            # queued again on resume, and the dupefilter drops it
+            cursor['next_number'] = n
+            if known is not None and known.might_contain(number):
+                self.crawler.stats.inc_value('eoir/skipped_known')
+                continue
+            yield number
+        cursor['next_number'] = end
+
+    def _request(self, number, **meta):
+        from config import EOIR_BASE_URL
+        return scrapy.Request(
+            f"{EOIR_BASE_URL}?caseNumber={number}",
+            callback=self.parse,
+            errback=self.failed,
+            cb_kwargs={'number': number},
+            meta=meta,
+        )
+
+    def parse(self, response, number):
+        yield self._item(response, number)
+
+    def failed(self, failure):
+        # Retries are exhausted by now; the feed keeps the number so it can be searched again
+        number = failure.request.cb_kwargs['number']
+        self.crawler.stats.inc_value('eoir/error')
+        yield EoirCaseItem(number=number, status='error', data=None, error=repr(failure.value),
+                           searched_at=datetime.now().isoformat(sep=' '))
+
+    def _item(self, response, number):
+        item = EoirCaseItem(number=number, searched_at=datetime.now().isoformat(sep=' '))
+        message = ' '.join(response.css('div.error-message ::text').getall())
+        if "No case information found" in message:
+            item['status'], item['data'] = 'not_found', None
+        else:
+            data = self._case_info(response)
+            item['status'], item['data'] = ('success', data) if data else ('error', None)
+            if not data:
+                # Same rule as EOIRScraper._fetch: an unrecognized page is not a "no case" answer
+                item['error'] = 'unrecognized EOIR page: no case fields and no no-case message'
+        self.crawler.stats.inc_value(f"eoir/{item['status']}")
+        return item
+
+    def _case_info(self, response):
+        # Same fields and selectors as EOIRScraper._extract_case_info
+        case_info = {}
+        for field, selector in self.case_fields.items():
+            element = response.css(selector)[:1]
+            text = ''.join(element.css('::text').getall()).strip()
+            if text:
+                case_info[field] = text
+        return case_info
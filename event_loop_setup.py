@@ -1,10 +0,0 @@
-import asyncio
-import nest_asyncio
-
-def setup_event_loop():
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    nest_asyncio.apply()
\ No newline at end of file
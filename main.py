@@ -1,17 +1,14 @@
 import streamlit as st
 import logging
 import os
-import asyncio
 import sys
 from pathlib import Path
-from event_loop_setup import setup_event_loop
 from utils.session_manager import initialize_session_state
 from utils.auth_middleware import AuthMiddleware
 from utils.auth_utils import check_role
-from utils.i18n import I18nManager
-from pages.dashboard import DashboardApp
+from utils.resources import resources
 from components.auth import render_login_form, render_register_form
-from database import init_db
+from utils.migrations import ensure_schema
 from config import (
     STREAMLIT_PORT,
     STREAMLIT_HOST,
@@ -21,7 +18,6 @@ from config import (
     WEBRTC_PORT,
     WEBRTC_HOST
 )
-import requests
 
 # Configure logging with enhanced format and file output
 log_dir = Path("logs")
@@ -67,13 +63,13 @@ def configure_environment():
         raise
 
 # Inicialización de servicios
-async def initialize_services():
+def initialize_services():
     try:
-        await asyncio.to_thread(init_db)
-        logger.info("Database initialization completed")
+        ensure_schema()
+        logger.info("Database schema is up to date")
         initialize_session_state()
         logger.info("Session state initialized")
-        I18nManager()  # Initialize i18n manager
+        resources.get('i18n')  # Shared i18n catalog, loaded once per process
         logger.info("I18n manager initialized")
         return True
     except Exception as e:
@@ -82,6 +78,8 @@ async def initialize_services():
 
 # Crear un nuevo caso usando la API
 def create_case(name, description):
+    import requests
+
     api_url = f"http://{API_HOST}:{API_PORT}/api/cases"
     data = {"name": name, "description": description}
     try:
@@ -112,10 +110,10 @@ def render_error_page(error_msg):
         st.experimental_rerun()
 
 # Manejo de la autenticación y verificación de roles
-async def handle_auth_middleware():
+def handle_auth_middleware():
     try:
         auth = AuthMiddleware()
-        is_auth = await auth.is_authenticated()
+        is_auth = auth.is_authenticated()
         if not is_auth:
             logger.warning("Usuario no autenticado, redirigiendo a página de login")
             render_auth_page()
@@ -150,7 +148,7 @@ def render_dashboard():
             st.error("Por favor, complete todos los campos.")
 
 # Función principal para la ejecución de la aplicación
-async def main():
+def main():
     try:
         # Inicialización de la sesión de usuario
         if not st.session_state.get('_session_initialized'):
@@ -168,11 +166,11 @@ async def main():
         logger.info("Page configuration completed")
 
         # Inicialización de servicios
-        await initialize_services()
+        initialize_services()
         logger.info("Services initialized successfully")
 
         # Manejo de la autenticación
-        if not await handle_auth_middleware():
+        if not handle_auth_middleware():
             return
 
         # Renderización del dashboard
@@ -185,7 +183,7 @@ async def main():
 if __name__ == "__main__":
     try:
         logger.info("Iniciando aplicación...")
-        asyncio.run(main())
+        main()
         logger.info("Aplicación iniciada correctamente")
     except Exception as e:
         logger.critical(f"Error fatal en la aplicación: {str(e)}")
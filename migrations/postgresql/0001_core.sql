@@ -0,0 +1,48 @@
+-- Users, cases and search history.
+-- Replaces the drop-and-recreate in database.init_db and schema.sql.
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(100) UNIQUE,
+    password_hash TEXT NOT NULL,
+    first_name VARCHAR(50),
+    last_name VARCHAR(50),
+    role VARCHAR(20) NOT NULL DEFAULT 'operator',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Databases created by utils/database.init_db only had username/password_hash/role_id
+ALTER TABLE users ADD COLUMN IF NOT EXISTS email VARCHAR(100);
+ALTER TABLE users ADD COLUMN IF NOT EXISTS first_name VARCHAR(50);
+ALTER TABLE users ADD COLUMN IF NOT EXISTS last_name VARCHAR(50);
+ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(20) NOT NULL DEFAULT 'operator';
+ALTER TABLE users ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS cases (
+    id SERIAL PRIMARY KEY,
+    number VARCHAR(50) UNIQUE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    is_positive BOOLEAN NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    a_number VARCHAR(9) UNIQUE NOT NULL,
+    court_address TEXT NOT NULL,
+    court_phone VARCHAR(20) NOT NULL,
+    client_phone VARCHAR(20),
+    other_client_phone VARCHAR(20),
+    client_address TEXT,
+    client_email VARCHAR(100),
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_cases_created_by ON cases (created_by, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS search_history (
+    id SERIAL PRIMARY KEY,
+    number VARCHAR(50) NOT NULL,
+    eoir_found BOOLEAN NOT NULL,
+    is_positive BOOLEAN,
+    search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    searched_by INTEGER NOT NULL REFERENCES users(id)
+);
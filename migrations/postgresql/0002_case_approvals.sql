@@ -0,0 +1,29 @@
+-- Case approvals, approval periods and notifications (from update_schema.sql).
+CREATE TABLE IF NOT EXISTS case_approvals (
+    id SERIAL PRIMARY KEY,
+    case_id INTEGER NOT NULL REFERENCES cases(id),
+    approved_by INTEGER NOT NULL REFERENCES users(id),
+    approval_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    approval_number VARCHAR(50) UNIQUE NOT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    approval_status VARCHAR(20) NOT NULL,
+    notification_sent BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS approval_periods (
+    id SERIAL PRIMARY KEY,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    case_id INTEGER NOT NULL REFERENCES cases(id),
+    message TEXT NOT NULL,
+    read BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,59 @@
+-- Phone calls, call events, call logs and verification forms.
+-- phone_calls is the projection maintained from call_events by CallRepository.
+CREATE TABLE IF NOT EXISTS phone_calls (
+    id SERIAL PRIMARY KEY,
+    call_uuid VARCHAR(36) UNIQUE,
+    search_id INTEGER,
+    user_id INTEGER REFERENCES users(id),
+    phone_number VARCHAR(20),
+    call_status VARCHAR(50),
+    call_duration INTEGER,
+    call_notes TEXT,
+    recording_url VARCHAR(255),
+    call_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE phone_calls ADD COLUMN IF NOT EXISTS call_uuid VARCHAR(36) UNIQUE;
+ALTER TABLE phone_calls ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id);
+ALTER TABLE phone_calls ADD COLUMN IF NOT EXISTS recording_url VARCHAR(255);
+
+CREATE INDEX IF NOT EXISTS idx_phone_calls_search_id ON phone_calls (search_id);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_user_id ON phone_calls (user_id);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_status ON phone_calls (call_status);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_date ON phone_calls (call_date);
+
+-- Append-only call state changes
+CREATE TABLE IF NOT EXISTS call_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_id VARCHAR(36) UNIQUE NOT NULL,
+    call_uuid VARCHAR(36) NOT NULL,
+    search_id INTEGER,
+    user_id INTEGER,
+    phone_number VARCHAR(20),
+    status VARCHAR(50) NOT NULL,
+    duration INTEGER,
+    notes TEXT,
+    occurred_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_events_call_uuid ON call_events (call_uuid, occurred_at);
+
+CREATE TABLE IF NOT EXISTS call_logs (
+    id SERIAL PRIMARY KEY,
+    call_id INTEGER REFERENCES phone_calls(id),
+    event_type VARCHAR(50) NOT NULL,
+    event_data JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_logs_call_id ON call_logs (call_id);
+
+CREATE TABLE IF NOT EXISTS verification_forms (
+    id SERIAL PRIMARY KEY,
+    search_id INTEGER,
+    verified_by INTEGER REFERENCES users(id),
+    form_data JSONB,
+    status VARCHAR(50),
+    notes TEXT,
+    verification_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,59 @@
+-- Roles and permissions (from datebase/add_user_roles.sql).
+-- utils/database.init_db used the name user_roles for a plain roles table;
+-- keep that data aside so the junction table below can be created.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'user_roles' AND column_name = 'name'
+    ) THEN
+        ALTER TABLE user_roles RENAME TO legacy_user_roles;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS roles (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) UNIQUE NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_roles (
+    user_id INTEGER REFERENCES users(id),
+    role_id INTEGER REFERENCES roles(id),
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, role_id)
+);
+
+CREATE TABLE IF NOT EXISTS permissions (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) UNIQUE NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS role_permissions (
+    role_id INTEGER REFERENCES roles(id),
+    permission_id INTEGER REFERENCES permissions(id),
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (role_id, permission_id)
+);
+
+INSERT INTO roles (name, description) VALUES
+('admin', 'Administrator with full access'),
+('supervisor', 'Supervisor with management access'),
+('agent', 'Call center agent'),
+('user', 'Regular user')
+ON CONFLICT (name) DO NOTHING;
+
+INSERT INTO permissions (name, description) VALUES
+('manage_users', 'Can manage users'),
+('view_analytics', 'Can view analytics'),
+('make_calls', 'Can make phone calls'),
+('export_data', 'Can export data'),
+('manage_roles', 'Can manage roles')
+ON CONFLICT (name) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_user_roles_user_id ON user_roles (user_id);
+CREATE INDEX IF NOT EXISTS idx_user_roles_role_id ON user_roles (role_id);
+CREATE INDEX IF NOT EXISTS idx_role_permissions_role_id ON role_permissions (role_id);
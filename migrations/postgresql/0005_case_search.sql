@@ -0,0 +1,22 @@
+-- Indexes behind utils/case_search.py. Phone numbers are indexed in
+-- digits-only form so "(555) 123-4567" matches "5551234567".
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE cases ADD COLUMN IF NOT EXISTS client_phone_digits TEXT
+    GENERATED ALWAYS AS (regexp_replace(coalesce(client_phone, ''), '\D', '', 'g')) STORED;
+ALTER TABLE cases ADD COLUMN IF NOT EXISTS other_client_phone_digits TEXT
+    GENERATED ALWAYS AS (regexp_replace(coalesce(other_client_phone, ''), '\D', '', 'g')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_cases_a_number ON cases (a_number text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_cases_client_phone_digits ON cases (client_phone_digits text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_cases_other_client_phone_digits ON cases (other_client_phone_digits text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_cases_name_trgm
+    ON cases USING gin ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cases_client_address_trgm
+    ON cases USING gin (coalesce(client_address, '') gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cases_court_address_trgm
+    ON cases USING gin (coalesce(court_address, '') gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cases_fulltext ON cases USING gin (
+    to_tsvector('simple', first_name || ' ' || last_name || ' ' ||
+                coalesce(client_address, '') || ' ' || coalesce(court_address, '')));
@@ -0,0 +1,49 @@
+-- Sweeps over A-number ranges, split into chunks that worker processes
+-- (worker.py) claim with FOR UPDATE SKIP LOCKED and hold under a lease.
+-- next_number is the chunk's checkpoint, so a reassigned chunk resumes
+-- where the previous worker stopped.
+CREATE TABLE IF NOT EXISTS sweeps (
+    id SERIAL PRIMARY KEY,
+    start_number BIGINT NOT NULL,
+    end_number BIGINT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'active',
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweeps_created_by ON sweeps (created_by, id DESC);
+
+CREATE TABLE IF NOT EXISTS sweep_chunks (
+    id SERIAL PRIMARY KEY,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id) ON DELETE CASCADE,
+    start_number BIGINT NOT NULL,
+    end_number BIGINT NOT NULL,
+    next_number BIGINT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner VARCHAR(100),
+    lease_expires_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    searched INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweep_chunks_sweep ON sweep_chunks (sweep_id);
+-- Claims only look at open chunks, which stay few however many are done
+CREATE INDEX IF NOT EXISTS idx_sweep_chunks_open ON sweep_chunks (id)
+    WHERE status IN ('pending', 'running');
+
+CREATE TABLE IF NOT EXISTS sweep_workers (
+    worker_id VARCHAR(100) PRIMARY KEY,
+    hostname VARCHAR(255),
+    pid INTEGER,
+    started_at TIMESTAMP NOT NULL,
+    last_seen TIMESTAMP NOT NULL,
+    chunks_done INTEGER NOT NULL DEFAULT 0
+);
@@ -1,13 +1,20 @@
--- Tabla de usuarios para autenticación
+-- Users, cases and search history (from schema.sql).
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT UNIQUE NOT NULL,
     password_hash TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE,
+    first_name TEXT,
+    last_name TEXT,
+    role TEXT DEFAULT 'operator',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Tabla principal de casos
+-- Older databases were created from schema.sql without these columns
+ALTER TABLE users ADD COLUMN first_name TEXT;
+ALTER TABLE users ADD COLUMN last_name TEXT;
+ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'operator';
+
 CREATE TABLE IF NOT EXISTS cases (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     number TEXT NOT NULL,
@@ -27,7 +34,8 @@ CREATE TABLE IF NOT EXISTS cases (
     FOREIGN KEY (created_by) REFERENCES users(id)
 );
 
--- Tabla para el historial de búsquedas
+CREATE INDEX IF NOT EXISTS idx_cases_created_by ON cases (created_by, created_at DESC);
+
 CREATE TABLE IF NOT EXISTS search_history (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     number TEXT NOT NULL,
@@ -37,12 +45,3 @@ CREATE TABLE IF NOT EXISTS search_history (
     searched_by INTEGER NOT NULL,
     FOREIGN KEY (searched_by) REFERENCES users(id)
 );
-
--- Insertar usuario admin por defecto
--- Contraseña: admin123 (hasheada)
-INSERT OR IGNORE INTO users (username, password_hash, email) 
-VALUES (
-    'admin', 
-    '240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9', -- Este es el hash de 'admin123'
-    'admin@example.com'
-);
\ No newline at end of file
@@ -1,4 +1,4 @@
--- Tabla para el estado de los casos aprobados
+-- Case approvals, approval periods and notifications (from update_schema.sql).
 CREATE TABLE IF NOT EXISTS case_approvals (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     case_id INTEGER NOT NULL,
@@ -13,7 +13,6 @@ CREATE TABLE IF NOT EXISTS case_approvals (
     FOREIGN KEY (approved_by) REFERENCES users(id)
 );
 
--- Tabla para períodos de aprobación
 CREATE TABLE IF NOT EXISTS approval_periods (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     start_date DATE NOT NULL,
@@ -22,7 +21,6 @@ CREATE TABLE IF NOT EXISTS approval_periods (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Tabla para notificaciones
 CREATE TABLE IF NOT EXISTS notifications (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
@@ -32,4 +30,4 @@ CREATE TABLE IF NOT EXISTS notifications (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id),
     FOREIGN KEY (case_id) REFERENCES cases(id)
-);
\ No newline at end of file
+);
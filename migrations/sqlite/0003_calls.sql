@@ -0,0 +1,55 @@
+-- Phone calls, call events, call logs and verification forms.
+-- phone_calls is the projection maintained from call_events by CallRepository.
+CREATE TABLE IF NOT EXISTS phone_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_uuid TEXT UNIQUE,
+    search_id INTEGER,
+    user_id INTEGER REFERENCES users(id),
+    phone_number TEXT,
+    call_status TEXT,
+    call_duration INTEGER,
+    call_notes TEXT,
+    recording_url TEXT,
+    call_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_phone_calls_search_id ON phone_calls (search_id);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_user_id ON phone_calls (user_id);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_status ON phone_calls (call_status);
+CREATE INDEX IF NOT EXISTS idx_phone_calls_date ON phone_calls (call_date);
+
+-- Append-only call state changes
+CREATE TABLE IF NOT EXISTS call_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT UNIQUE NOT NULL,
+    call_uuid TEXT NOT NULL,
+    search_id INTEGER,
+    user_id INTEGER,
+    phone_number TEXT,
+    status TEXT NOT NULL,
+    duration INTEGER,
+    notes TEXT,
+    occurred_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_events_call_uuid ON call_events (call_uuid, occurred_at);
+
+CREATE TABLE IF NOT EXISTS call_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_id INTEGER REFERENCES phone_calls(id),
+    event_type TEXT NOT NULL,
+    event_data TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_logs_call_id ON call_logs (call_id);
+
+CREATE TABLE IF NOT EXISTS verification_forms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_id INTEGER,
+    verified_by INTEGER REFERENCES users(id),
+    form_data TEXT,
+    status TEXT,
+    notes TEXT,
+    verification_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
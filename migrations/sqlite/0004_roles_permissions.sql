@@ -1,12 +1,11 @@
--- Create roles table
+-- Roles and permissions (from datebase/add_user_roles.sql).
 CREATE TABLE IF NOT EXISTS roles (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(50) UNIQUE NOT NULL,
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
     description TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create user_roles junction table
 CREATE TABLE IF NOT EXISTS user_roles (
     user_id INTEGER REFERENCES users(id),
     role_id INTEGER REFERENCES roles(id),
@@ -14,15 +13,13 @@ CREATE TABLE IF NOT EXISTS user_roles (
     PRIMARY KEY (user_id, role_id)
 );
 
--- Create permissions table
 CREATE TABLE IF NOT EXISTS permissions (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(50) UNIQUE NOT NULL,
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
     description TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create role_permissions junction table
 CREATE TABLE IF NOT EXISTS role_permissions (
     role_id INTEGER REFERENCES roles(id),
     permission_id INTEGER REFERENCES permissions(id),
@@ -30,7 +27,6 @@ CREATE TABLE IF NOT EXISTS role_permissions (
     PRIMARY KEY (role_id, permission_id)
 );
 
--- Insert default roles
 INSERT INTO roles (name, description) VALUES
 ('admin', 'Administrator with full access'),
 ('supervisor', 'Supervisor with management access'),
@@ -38,7 +34,6 @@ INSERT INTO roles (name, description) VALUES
 ('user', 'Regular user')
 ON CONFLICT (name) DO NOTHING;
 
--- Insert default permissions
 INSERT INTO permissions (name, description) VALUES
 ('manage_users', 'Can manage users'),
 ('view_analytics', 'Can view analytics'),
@@ -47,7 +42,6 @@ INSERT INTO permissions (name, description) VALUES
 ('manage_roles', 'Can manage roles')
 ON CONFLICT (name) DO NOTHING;
 
--- Create indexes
-CREATE INDEX idx_user_roles_user_id ON user_roles(user_id);
-CREATE INDEX idx_user_roles_role_id ON user_roles(role_id);
-CREATE INDEX idx_role_permissions_role_id ON role_permissions(role_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_user_roles_user_id ON user_roles (user_id);
+CREATE INDEX IF NOT EXISTS idx_user_roles_role_id ON user_roles (role_id);
+CREATE INDEX IF NOT EXISTS idx_role_permissions_role_id ON role_permissions (role_id);
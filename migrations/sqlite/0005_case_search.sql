@@ -0,0 +1,40 @@
+-- Indexes behind utils/case_search.py. Phone numbers are indexed in
+-- digits-only form so "(555) 123-4567" matches "5551234567".
+ALTER TABLE cases ADD COLUMN client_phone_digits TEXT GENERATED ALWAYS AS (
+    replace(replace(replace(replace(replace(replace(
+        coalesce(client_phone, ''), '-', ''), ' ', ''), '(', ''), ')', ''), '+', ''), '.', '')
+) VIRTUAL;
+ALTER TABLE cases ADD COLUMN other_client_phone_digits TEXT GENERATED ALWAYS AS (
+    replace(replace(replace(replace(replace(replace(
+        coalesce(other_client_phone, ''), '-', ''), ' ', ''), '(', ''), ')', ''), '+', ''), '.', '')
+) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_cases_a_number ON cases (a_number);
+CREATE INDEX IF NOT EXISTS idx_cases_client_phone_digits ON cases (client_phone_digits);
+CREATE INDEX IF NOT EXISTS idx_cases_other_client_phone_digits ON cases (other_client_phone_digits);
+
+-- Trigram full-text index over names and addresses, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+    first_name, last_name, client_address, court_address,
+    content='cases', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_ai AFTER INSERT ON cases BEGIN
+    INSERT INTO cases_fts (rowid, first_name, last_name, client_address, court_address)
+    VALUES (new.id, new.first_name, new.last_name, new.client_address, new.court_address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_ad AFTER DELETE ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, first_name, last_name, client_address, court_address)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.client_address, old.court_address);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cases_fts_au AFTER UPDATE ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, first_name, last_name, client_address, court_address)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.client_address, old.court_address);
+    INSERT INTO cases_fts (rowid, first_name, last_name, client_address, court_address)
+    VALUES (new.id, new.first_name, new.last_name, new.client_address, new.court_address);
+END;
+
+-- Index the rows that existed before the triggers did
+INSERT INTO cases_fts (cases_fts) VALUES ('rebuild');
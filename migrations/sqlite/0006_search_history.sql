@@ -0,0 +1,11 @@
+-- search_history becomes the persistent record of every EOIR/PDL lookup,
+-- written in batches by utils/search_history.py. entry_id makes replays of
+-- the write-ahead file idempotent.
+ALTER TABLE search_history ADD COLUMN entry_id TEXT;
+ALTER TABLE search_history ADD COLUMN source TEXT NOT NULL DEFAULT 'eoir';
+ALTER TABLE search_history ADD COLUMN status TEXT;
+ALTER TABLE search_history ADD COLUMN result_data TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_search_history_entry_id ON search_history (entry_id);
+CREATE INDEX IF NOT EXISTS idx_search_history_user_date ON search_history (searched_by, search_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_search_history_number ON search_history (number);
@@ -0,0 +1,49 @@
+-- Sweeps over A-number ranges, split into chunks that worker processes
+-- (worker.py) claim under a lease. SQLite serializes writers, so a single
+-- UPDATE ... RETURNING claims a chunk atomically without SKIP LOCKED.
+-- next_number is the chunk's checkpoint, so a reassigned chunk resumes
+-- where the previous worker stopped.
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_number INTEGER NOT NULL,
+    end_number INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_by INTEGER REFERENCES users(id),
+    created_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweeps_created_by ON sweeps (created_by, id DESC);
+
+CREATE TABLE IF NOT EXISTS sweep_chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id) ON DELETE CASCADE,
+    start_number INTEGER NOT NULL,
+    end_number INTEGER NOT NULL,
+    next_number INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    searched INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweep_chunks_sweep ON sweep_chunks (sweep_id);
+CREATE INDEX IF NOT EXISTS idx_sweep_chunks_open ON sweep_chunks (id)
+    WHERE status IN ('pending', 'running');
+
+CREATE TABLE IF NOT EXISTS sweep_workers (
+    worker_id TEXT PRIMARY KEY,
+    hostname TEXT,
+    pid INTEGER,
+    started_at TIMESTAMP NOT NULL,
+    last_seen TIMESTAMP NOT NULL,
+    chunks_done INTEGER NOT NULL DEFAULT 0
+);
@@ -1,24 +1,27 @@
 import streamlit as st
-import sqlite3
 from datetime import datetime, timedelta
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.auth import check_role, logout
 from components.service_monitor import render_service_status
+from components.exports import render_export_panel
+from components.live_feed import render_live_feed
 from utils.service_monitor import monitor
-import asyncio
+from utils.event_loop import run_sync
+from utils.lookups import lookups
+from utils.resources import resources
 
 class SupervisorDashboard:
     def __init__(self):
-        self.conn = sqlite3.connect('cases_database.db')
-        self.conn.row_factory = sqlite3.Row
         self.monitor = monitor
 
-    async def update_metrics(self):
-        """Update service metrics asynchronously"""
+    def update_metrics(self):
+        """Latest probe results; probes run on the background loop between renders"""
         try:
-            await self.monitor.monitor_services()
+            self.monitor.start_background()
+            if not self.monitor.get_metrics():
+                run_sync(self.monitor.monitor_services(), timeout=15)
             return self.monitor.get_metrics()
         except Exception as e:
             st.error(f"Error actualizando métricas: {str(e)}")
@@ -26,6 +29,10 @@ class SupervisorDashboard:
 
     def render_dashboard(self):
         st.title("Dashboard del Supervisor")
+
+        # Live tiles, updated from the event stream without rerunning the page
+        st.subheader("📡 Actividad en Vivo")
+        render_live_feed()
         
         # Add monitoring section first
         st.subheader("🖥️ Estado de los Servicios")
@@ -35,7 +42,7 @@ class SupervisorDashboard:
         
         try:
             # Get initial metrics
-            metrics = asyncio.run(self.update_metrics())
+            metrics = self.update_metrics()
             overall_health = self.monitor.get_overall_health()
             
             # Display metrics in columns
@@ -80,15 +87,72 @@ class SupervisorDashboard:
                     </div>
                 """, unsafe_allow_html=True)
 
+            self.render_lookup_stats()
+            self.render_case_pipeline()
+            self.render_exports()
+
             # Render detailed service status
             render_service_status()
 
         except Exception as e:
             st.error(f"Error al cargar el monitor de servicios: {str(e)}")
 
-    def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
+    def render_lookup_stats(self):
+        """EOIR/PDL lookups served from cache or shared, and numbers skipped by sweeps"""
+        stats = lookups.get_stats()
+        sources = stats['sources'].values()
+        st.subheader("🔎 Búsquedas Externas (EOIR / PDL)")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Solicitudes", sum(s['calls'] for s in sources))
+        col2.metric("Llamadas a la red", sum(s['fetches'] for s in sources))
+        col3.metric("Desde caché", sum(s['cache_hits'] for s in sources))
+        col4.metric("Compartidas en vuelo", stats['coalesced'])
+
+        known = resources.peek('known_numbers')
+        if known is not None:
+            known_stats = known.get_stats()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Números conocidos", f"{known_stats['numbers']:,}")
+            col2.metric("Memoria del filtro", f"{known_stats['memory_bytes'] / 1048576:.1f} MB")
+            col3.metric("Falsos positivos (est.)", f"{known_stats['expected_fp_rate']:.3%}")
+            col4.metric("Omitidos en barridos", f"{known_stats['skip_rate']:.1%}")
+
+    def render_case_pipeline(self):
+        """Throughput and queue depth of each stage that turns sweep hits into cases"""
+        pipeline = resources.peek('case_pipeline')
+        if pipeline is None:
+            return
+        stats = pipeline.get_stats()
+        st.subheader("🏭 Registro Automático de Casos")
+        stages = stats['stages']
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Resultados recibidos", stages[0]['received'])
+        col2.metric("Casos creados", stages[-1]['emitted'])
+        col3.metric("Duplicados omitidos", next(s['dropped'] for s in stages if s['stage'] == 'dedup'))
+        col4.metric("Rechazados (cola llena)", stats['rejected'])
+        st.dataframe(pd.DataFrame([{
+            'Etapa': s['stage'],
+            'Workers': f"{s['busy']}/{s['workers']}",
+            'En cola': f"{s['queue_depth']}/{s['queue_size']}",
+            'Por segundo': s['throughput'],
+            'ms promedio': s['avg_ms'],
+            'Procesados': s['processed'],
+            'Errores': s['errors'],
+            'Cola llena (s)': s['blocked_seconds'],
+        } for s in stages]), use_container_width=True, hide_index=True)
+        errors = [f"{s['stage']}: {s['last_error']}" for s in stages if s['last_error']]
+        if errors:
+            st.caption("Último error — " + "; ".join(errors))
+
+    def render_exports(self):
+        """All cases and search history, exported by background jobs"""
+        st.subheader("📤 Exportar Datos")
+        requested_by = st.session_state.get('user_id')
+        tab_cases, tab_history = st.tabs(["Casos", "Historial de Búsquedas"])
+        with tab_cases:
+            render_export_panel('cases', requested_by, key="supervisor_export_cases")
+        with tab_history:
+            render_export_panel('search_history', requested_by, key="supervisor_export_history")
 
 def page_render():
     if not check_role('supervisor'):
@@ -1,33 +1,14 @@
 import streamlit as st
-import sqlite3
 from datetime import datetime
-
-def get_db_connection():
-    conn = sqlite3.connect('cases_database.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+from utils.repository import cases as case_repository
+from utils.case_search import case_search
 
 def update_case(case_id, **updates):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        update_fields = ', '.join([f"{k} = ?" for k in updates.keys()])
-        update_values = list(updates.values())
-
-        cursor.execute(f"""
-            UPDATE cases 
-            SET {update_fields}
-            WHERE id = ? AND created_by = ?
-        """, (*update_values, case_id, st.session_state.user_id))
-
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
+        return case_repository.update(case_id, st.session_state.user_id, updates)
+    except Exception as e:
         st.error(f"Error al actualizar el caso: {e}")
         return False
-    finally:
-        conn.close()
 
 class CaseRecordsManagement:
     def __init__(self):
@@ -92,25 +73,25 @@ class CaseRecordsManagement:
             """, unsafe_allow_html=True)
 
         # Obtener y mostrar casos
-        conn = get_db_connection()
-        cur = conn.cursor()
-
         if st.session_state.get('user_id'):
-            cur.execute("""
-                SELECT id, number, status, first_name, last_name, a_number, 
-                       court_address, court_phone, client_phone, other_client_phone, 
-                       client_address, client_email 
-                FROM cases 
-                WHERE created_by = %s 
-                ORDER BY created_at DESC
-            """, (st.session_state.user_id,))
-
-            cases = cur.fetchall()
-
             st.markdown("### 📁 Mis Casos")
 
+            query = st.text_input(
+                "Buscar casos",
+                placeholder="Nombre, dirección, A-number o teléfono",
+                key="case_search_query"
+            ).strip()
+            if query:
+                try:
+                    cases = case_search.search(query, limit=50, created_by=st.session_state.user_id)
+                except Exception as e:
+                    st.error(f"Error en la búsqueda: {e}")
+                    cases = []
+            else:
+                cases = case_repository.list_by_user(st.session_state.user_id)
+
             if not cases:
-                st.info("📭 No hay casos registrados")
+                st.info("🔍 No se encontraron casos" if query else "📭 No hay casos registrados")
             else:
                 for case in cases:
                     with st.expander(f"📋 {case['first_name']} {case['last_name']} - A{case['a_number']}"):
@@ -157,9 +138,6 @@ class CaseRecordsManagement:
                                         st.success("✅ Caso actualizado correctamente")
                                         st.rerun()
 
-        cur.close()
-        conn.close()
-
     def initialize_styles(self):
         st.markdown("""
         <style>
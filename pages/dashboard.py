@@ -1,5 +1,6 @@
 import streamlit as st
 from database import get_cases_by_user
+from utils.case_search import case_search
 
 class DashboardApp:
     def run(self):
@@ -7,10 +8,15 @@ class DashboardApp:
 
         # Obtener casos del usuario actual
         user_id = st.session_state.get('user_id')
-        cases = get_cases_by_user(user_id)
 
         # Mostrar lista de casos
         st.subheader("Casos Asignados")
+        query = st.text_input("Buscar casos", placeholder="Nombre, dirección, A-number o teléfono").strip()
+        if query:
+            cases = case_search.search(query, limit=50, created_by=user_id)
+        else:
+            cases = get_cases_by_user(user_id)
+
         if cases:
             for case in cases:
                 with st.expander(f"Caso #{case['number']}"):
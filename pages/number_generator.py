@@ -1,40 +1,11 @@
 import streamlit as st
-import sqlite3
-import requests
-from bs4 import BeautifulSoup
-import time
-import hashlib
 from functools import wraps
-import random
 import pandas as pd
-
-# Clase para interactuar con EOIR
-class EOIRScraper:
-    BASE_URL = "https://acis.eoir.justice.gov/en/"
-
-    def search(self, number):
-        response = requests.get(self.BASE_URL, params={'caseNumber': number})
-
-        if response.status_code == 200:
-            if "No case found" in response.text:
-                return {'status': 'not_found'}
-            else:
-                data = self.extract_case_info(response.text)
-                return {'status': 'success', 'data': data}
-        else:
-            return {'status': 'error', 'error': response.text}
-
-    def extract_case_info(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        a_number_element = soup.select_one('div.case-number')
-        status_element = soup.select_one('div.case-status')
-
-        case_info = {
-            'a_number': a_number_element.text.strip() if a_number_element else "No encontrado",
-            'status': status_element.text.strip() if status_element else "No encontrado",
-        }
-
-        return case_info
+from utils.repository import cases as case_repository, users as user_repository
+from utils.resources import resources
+from utils.case_pipeline import get_case_pipeline
+from utils.search_history import search_history_log
+from components.search_history import render_search_history
 
 # Clase generadora de números
 class NumberGenerator:
@@ -49,22 +20,29 @@ class NumberGenerator:
         if 'current_prefix' not in st.session_state:
             st.session_state.current_prefix = 244206
 
+    def _is_new(self, number):
+        """Not generated in this session and not already a case or a past search"""
+        if number in self.used_numbers:
+            return False
+        return not resources.get('known_numbers').might_contain(number)
+
+    def _next_from_scheduler(self, random_offset):
+        """Next number from the most promising block (see utils/block_scheduler.py)"""
+        scheduler = resources.get('block_scheduler')
+        new_number = scheduler.next_number(random_offset=random_offset, is_new=self._is_new)
+        if new_number is None:
+            return None
+        self.used_numbers.add(new_number)
+        st.session_state.current_prefix = int(new_number) // 1000
+        return new_number
+
     def generate_number(self):
-        """Generate a new unique number"""
-        while True:
-            new_number = str(st.session_state.current_prefix * 1000 + 
-                           len(st.session_state.generated_numbers)).zfill(9)
-            if new_number not in self.used_numbers:
-                self.used_numbers.add(new_number)
-                return new_number
+        """Next number of the block with the best expected hit rate"""
+        return self._next_from_scheduler(random_offset=False)
 
     def generate_random_number(self):
-        """Generate a random number"""
-        while True:
-            new_number = str(random.randint(100000000, 999999999))
-            if new_number not in self.used_numbers:
-                self.used_numbers.add(new_number)
-                return new_number
+        """Random number inside a block drawn by expected hit rate"""
+        return self._next_from_scheduler(random_offset=True)
 
     def reset(self):
         """Reset the generator state"""
@@ -100,16 +78,22 @@ class NumberGenerator:
         with col1:
             if st.button("Generar Siguiente Número", type="primary"):
                 new_number = self.generate_number()
-                st.session_state.generated_numbers.append(new_number)
-                st.success(f"Nuevo número generado: {new_number}")
-                st.rerun()
+                if new_number is None:
+                    st.warning("No quedan números por buscar en los bloques candidatos")
+                else:
+                    st.session_state.generated_numbers.append(new_number)
+                    st.success(f"Nuevo número generado: {new_number}")
+                    st.rerun()
 
         with col2:
             if st.button("Generar Número Aleatorio", type="secondary"):
                 new_number = self.generate_random_number()
-                st.session_state.generated_numbers.append(new_number)
-                st.success(f"Número aleatorio generado: {new_number}")
-                st.rerun()
+                if new_number is None:
+                    st.warning("No quedan números por buscar en los bloques candidatos")
+                else:
+                    st.session_state.generated_numbers.append(new_number)
+                    st.success(f"Número aleatorio generado: {new_number}")
+                    st.rerun()
 
         with col3:
             if st.button("Reiniciar", type="secondary"):
@@ -126,12 +110,6 @@ class NumberGenerator:
             st.dataframe(history_df, use_container_width=True)
 
 
-# Función para conectar a la base de datos SQLite
-def get_db_connection():
-    conn = sqlite3.connect('cases_database.db')
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def require_auth(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -149,52 +127,56 @@ def save_to_db(case_number, case_status, first_name, last_name, a_number,
         st.error("Por favor, inicie sesión para guardar casos")
         return False
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        is_positive = case_status == "Positivo"
-        cursor.execute('''
-        INSERT INTO cases (
-            number, status, is_positive, first_name, last_name, a_number,
-            court_address, court_phone, client_phone, other_client_phone,
-            client_address, client_email, created_by
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (case_number, case_status, is_positive, first_name, last_name, 
-              a_number, court_address, court_phone, client_phone, 
-              other_client_phone, client_address, client_email,
-              st.session_state.user_id))
-
-        conn.commit()
+        case_repository.insert({
+            'number': case_number,
+            'status': case_status,
+            'is_positive': case_status == "Positivo",
+            'first_name': first_name,
+            'last_name': last_name,
+            'a_number': a_number,
+            'court_address': court_address,
+            'court_phone': court_phone,
+            'client_phone': client_phone,
+            'other_client_phone': other_client_phone,
+            'client_address': client_address,
+            'client_email': client_email,
+            'created_by': st.session_state.user_id
+        })
         return True
-    except sqlite3.Error as e:
+    except Exception as e:
         st.error(f"Error en la base de datos: {e}")
         return False
-    finally:
-        conn.close()
 
 # Función para inicializar el estado de la sesión
 def initialize_session_state():
     if 'generated_numbers' not in st.session_state:
         st.session_state.generated_numbers = []
-    if 'search_history' not in st.session_state:
-        st.session_state.search_history = []
     if 'number_generator' not in st.session_state:
         st.session_state.number_generator = NumberGenerator()
     if 'search_in_progress' not in st.session_state:
         st.session_state.search_in_progress = False
-    if 'eoir_scraper' not in st.session_state:
-        st.session_state.eoir_scraper = EOIRScraper()
 
 # Función para realizar la búsqueda del número
 def search_number(number, report_placeholder):
     report_placeholder.info(f"Buscando número: {number}")
 
-    eoir_result = st.session_state.eoir_scraper.search(number)
+    # The shared client: coalesced with sweeps and other agents, paced by the EOIR controller
+    eoir_result = resources.get('eoir_scraper').search(number)
+    # Errors are shown but not recorded, as in the sweeps: they say nothing about the number
+    if eoir_result['status'] in ('success', 'not_found'):
+        search_history_log.record(number, st.session_state.user_id, eoir_result, 'eoir', st.session_state)
+        resources.get('known_numbers').add(number)
+        resources.get('block_scheduler').observe(number, eoir_result['status'] == 'success')
 
     if eoir_result['status'] == 'success':
         report_placeholder.success("¡Caso encontrado en EOIR!")
-        case_status = eoir_result['data']['status'].lower()
+        # Detail, PDL enrichment and the case record happen in the pipeline
+        if get_case_pipeline().submit_result(number, eoir_result, st.session_state.user_id, timeout=5):
+            st.info("El caso se registrará automáticamente con los datos de EOIR y PDL.")
+        else:
+            st.warning("La cola de registro está llena; registre el caso manualmente.")
+        case_status = (eoir_result['data'].get('status') or '').lower()
         is_positive = "positivo" in case_status or "en proceso" in case_status
         return {'number': number, 'eoir_found': True, 'is_positive': is_positive, 'eoir_data': eoir_result['data']}
     elif eoir_result['status'] == 'not_found':
@@ -211,16 +193,15 @@ def login_form():
 
     if st.button("Ingresar"):
         if username and password:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                'SELECT id, password_hash FROM users WHERE username = ?', 
-                (username,)
-            )
-            user = cursor.fetchone()
-            conn.close()
-
-            if user and user['password_hash'] == hashlib.sha256(password.encode()).hexdigest():
+            from utils.auth_utils import login_error_message
+            from utils.password_hasher import authenticate, HasherBusy, LoginThrottled
+            try:
+                user = authenticate(username, password, user_repository)
+            except (LoginThrottled, HasherBusy) as e:
+                st.warning(login_error_message(e))
+                return
+
+            if user:
                 st.session_state.user_id = user['id']
                 st.success("¡Inicio de sesión exitoso!")
                 st.rerun()
@@ -266,14 +247,6 @@ def render_form():
         else:
             st.error("Por favor, complete todos los campos obligatorios (marcados con *)")
 
-# Función para renderizar el historial de búsqueda
-def render_search_history():
-    if st.session_state.search_history:
-        st.markdown("<h3>Historial de Búsquedas</h3>", unsafe_allow_html=True)
-        for item in reversed(st.session_state.search_history):
-            status_text = "Positivo" if item.get('is_positive') else "Negativo"
-            st.markdown(f"<div class='number-item'>{item['number']} - {status_text}</div>", unsafe_allow_html=True)
-
 # Función para renderizar la página principal
 def page_render():
     initialize_session_state()
@@ -290,13 +263,11 @@ def page_render():
         report_placeholder = st.empty()
         if st.button("Buscar"):
             if specific_number:
-                search_result = search_number(specific_number, report_placeholder)
-                st.session_state.search_history.append(search_result)
+                search_number(specific_number.strip(), report_placeholder)
             else:
                 st.error("Por favor, ingrese un número para buscar.")
 
-
-        render_search_history()
+        render_search_history(st.session_state.user_id, key="number_generator_history")
 
         # Agregar Iframe de EOIR
         st.subheader("Página EOIR")
@@ -1,9 +1,6 @@
 import streamlit as st
-from scrapers.pdl_scraper import PDLScraper
-from scrapers.eoir_scraper import EOIRScraper
-import pandas as pd
-from datetime import datetime
-import json
+from components.search_history import render_search_history
+from components.exports import render_export_panel
 
 def page_render():
     if not st.session_state.get('user_id'):
@@ -122,42 +119,10 @@ def page_render():
 
     # Export section
     st.subheader("Exportar Resultados")
-    if st.button("Exportar Reporte"):
-        if 'search_history' in st.session_state and st.session_state.search_history:
-            df = pd.DataFrame([{
-                'Número': item['number'],
-                'Fecha': item['timestamp'],
-                'PDL Encontrado': item['pdl_found'],
-                'EOIR Encontrado': item['eoir_found'],
-                'Fuentes': ('PDL ' if item['pdl_found'] else '') + 
-                          ('EOIR' if item['eoir_found'] else '')
-            } for item in st.session_state.search_history])
-            
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Descargar Reporte CSV",
-                data=csv,
-                file_name=f"reporte_busquedas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+    render_export_panel('search_history', st.session_state.user_id, user_id=st.session_state.user_id)
 
     # Search history
-    st.subheader("Historial de Búsquedas")
-    if 'search_history' in st.session_state:
-        for item in reversed(st.session_state.search_history):
-            success_class = " found" if item['pdl_found'] or item['eoir_found'] else ""
-            st.markdown(f"""
-                <div class="history-item{success_class}">
-                    <span>{item['number']}</span>
-                    <div>
-                        {f'<span class="source-badge pdl-badge">PDL</span>' if item['pdl_found'] else ''}
-                        {f'<span class="source-badge eoir-badge">EOIR</span>' if item['eoir_found'] else ''}
-                        <button class="copy-button" onclick="navigator.clipboard.writeText('{item['number']}')">
-                            Copiar
-                        </button>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
+    render_search_history(st.session_state.user_id, key="search_results_history")
 
 if __name__ == "__main__":
     page_render()
@@ -1,23 +1,90 @@
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from config import HTTP_POOL_MAXSIZE, EOIR_BASE_URL, EOIR_SIMULATOR
+from utils.lookups import lookups
+from utils.live_feed import live_feed
+from utils.rate_control import CircuitOpen, controller_for
+from utils.http_cache import CachingAdapter
+
+SIMULATOR_ONLY = ('La búsqueda en EOIR solo reconoce las páginas de upstream_simulator.py (EOIR_SIMULATOR=true); '
+                  'el portal ACIS real requiere la araña eoir_playwright')
 
 class EOIRScraper:
-    BASE_URL = "https://acis.eoir.justice.gov/en/"
+    BASE_URL = EOIR_BASE_URL
+
+    # Case page field -> selector. These describe the page upstream_simulator.py
+    # serves; the real ACIS site is a JavaScript app and matches none of them
+    CASE_FIELDS = {
+        'a_number': 'div.case-number',
+        'first_name': 'div.first-name',
+        'last_name': 'div.last-name',
+        'status': 'div.case-status',
+        'court_address': 'div.court-address',
+        'court_phone': 'div.court-phone',
+        'next_hearing': 'div.next-hearing',
+    }
 
-    def __init__(self):
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, cache=None, simulator: bool = EOIR_SIMULATOR):
+        # One instance is shared by all sessions, so size the pool for them
         self.session = requests.Session()
+        self.cache = cache
+        # CASE_FIELDS only match the simulator; against ACIS every lookup would be misread
+        self.simulator = simulator
+        for prefix in ('https://', 'http://'):
+            if cache is not None:
+                adapter = CachingAdapter(cache, pool_connections=4, pool_maxsize=pool_maxsize)
+            else:
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+            self.session.mount(prefix, adapter)
+        self.controller = controller_for('eoir')
+        self._stats_lock = threading.Lock()
+        self.search_stats = {
+            'total_attempts': 0,
+            'successful_attempts': 0,
+            'not_found_attempts': 0,
+            'failed_attempts': 0,
+            'skipped_known': 0,
+            'last_number': None,
+            'last_error': None
+        }
 
-    def search(self, number):
-        result = {'status': 'error', 'data': None}
+    def close(self):
+        self.session.close()
 
+    def search(self, number):
         if not number.isdigit() or len(number) != 9:
-            result['error'] = 'Formato de número de caso inválido. Debe ser un número de 9 dígitos.'
-            return result
+            return {
+                'status': 'error',
+                'data': None,
+                'error': 'Formato de número de caso inválido. Debe ser un número de 9 dígitos.'
+            }
+        if not self.simulator:
+            return {'status': 'error', 'data': None, 'error': SIMULATOR_ONLY}
+
+        # Sessions searching the same number at once share one request
+        return lookups.call('eoir', number, lambda: self._fetch(number))
 
+    def _fetch(self, number):
+        result = {'status': 'error', 'data': None}
         try:
-            response = self.session.get(self.BASE_URL, params={'caseNumber': number}, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            url = requests.Request('GET', self.BASE_URL, params={'caseNumber': number}).prepare().url
+            cached = self.cache.get('GET', url) if self.cache is not None else None
+            if cached is not None and self.cache.is_fresh(cached):
+                # Fetched recently by this or another process (or the Scrapy crawl):
+                # read the stored page, no request and no pacing
+                if cached.status >= 400:
+                    raise requests.HTTPError(f'{cached.status} Error (en caché) para {url}')
+                html = cached.body.decode('utf-8', errors='replace')
+            else:
+                with self.controller.request() as call:
+                    response = self.session.get(url, timeout=call.timeout)
+                    call.observe(response.status_code, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                html = response.text
+            soup = BeautifulSoup(html, 'html.parser')
 
             error_message = soup.find('div', class_='error-message')
             if error_message and "No case information found" in error_message.text:
@@ -29,15 +96,143 @@ class EOIRScraper:
                 result['status'] = 'success'
                 result['data'] = case_info
             else:
-                result['status'] = 'not_found'
+                # Neither a case nor the no-case message: not a page this parser
+                # understands (e.g. the ACIS app shell), so nothing is learned
+                result['error'] = 'Respuesta de EOIR no reconocida: sin datos de caso ni aviso de caso inexistente'
             return result
 
+        except CircuitOpen as e:
+            result['error'] = f'EOIR no disponible temporalmente; reintento en {e.retry_after:.0f} s'
+            result['retry_after'] = e.retry_after
+            return result
         except requests.RequestException as e:
             result['error'] = f'Error de conexión: {str(e)}'
             return result
 
+    def _record(self, number, result):
+        with self._stats_lock:
+            stats = self.search_stats
+            stats['total_attempts'] += 1
+            stats['last_number'] = number
+            if result['status'] == 'success':
+                stats['successful_attempts'] += 1
+            elif result['status'] == 'not_found':
+                stats['not_found_attempts'] += 1
+            else:
+                stats['failed_attempts'] += 1
+                stats['last_error'] = result.get('error')
+
+    def sweep(self, first, count, delay=0.0, stop_flag=None, skip_known=True, retries=2):
+        """Search ``count`` consecutive numbers from ``first``, yielding ``(number, result)``.
+
+        Numbers already in ``cases`` or searched before are skipped using the
+        in-memory known-numbers filter, so they cost neither a request nor a
+        database round trip; those are yielded with ``result=None``. Numbers
+        EOIR has no case for are added to the filter. Stops early when
+        ``stop_flag`` is set.
+
+        Requests are paced by the EOIR rate controller; ``delay`` is an extra
+        pause on top. A failed lookup is retried up to ``retries`` times; while
+        the circuit is open the same number is retried and yielded with
+        status ``'paused'`` every few seconds.
+
+        Raises RuntimeError before any request unless the scraper points at
+        the simulator.
+        """
+        if not self.simulator:
+            raise RuntimeError(SIMULATOR_ONLY)
+        known = None
+        if skip_known:
+            from utils.resources import resources
+            known = resources.get('known_numbers')
+
+        for number in range(int(first), int(first) + count):
+            if stop_flag is not None and stop_flag.is_set():
+                return
+
+            number = str(number).zfill(9)
+            if known is not None and known.might_contain(number):
+                with self._stats_lock:
+                    self.search_stats['skipped_known'] += 1
+                yield number, None
+                continue
+
+            result = self.search(number)
+            attempts = 1
+            while result['status'] == 'error':
+                if result.get('retry_after') is not None:
+                    # Circuit open: wait on the same number instead of burning through
+                    # the range; yielding 'paused' lets the caller keep its lease alive
+                    yield number, {'status': 'paused', 'data': None, 'error': result.get('error'),
+                                   'retry_after': result['retry_after']}
+                    wait = min(result['retry_after'], 5.0)
+                    if stop_flag is not None:
+                        if stop_flag.wait(wait):
+                            return
+                    else:
+                        time.sleep(wait)
+                elif attempts > retries:
+                    break
+                else:
+                    # Transient 5xx/429/timeout; the controller spaces the retry out
+                    attempts += 1
+                result = self.search(number)
+
+            self._record(number, result)
+            if result['status'] == 'not_found' and known is not None:
+                known.add(number)
+            yield number, result
+
+            if delay:
+                if stop_flag is not None:
+                    stop_flag.wait(delay)
+                else:
+                    time.sleep(delay)
+
+    def search_until_found(self, start_number, max_attempts=1000, delay=0.0,
+                           progress_callback=None, stop_flag=None, skip_known=True,
+                           on_result=None):
+        """Sweep consecutive numbers from ``start_number`` until EOIR has a case.
+
+        ``on_result(number, result)`` is called after every lookup (e.g. to
+        record it in the search history).
+        """
+        searched = skipped = 0
+        for number, result in self.sweep(start_number, max_attempts, delay, stop_flag, skip_known):
+            if result is None:
+                skipped += 1
+                continue
+            if result['status'] == 'paused':
+                continue
+
+            searched += 1
+            if on_result:
+                on_result(number, result)
+            if progress_callback:
+                progress_callback((int(number) - int(start_number) + 1) * 100 / max_attempts, number)
+
+            if result['status'] == 'success':
+                live_feed.publish('sweep_hit', number=number, searched=searched, skipped_known=skipped)
+                return {
+                    'status': 'found',
+                    'found_case': {'number': number, **(result['data'] or {})},
+                    'searched': searched,
+                    'skipped_known': skipped
+                }
+
+        if stop_flag is not None and stop_flag.is_set():
+            return {'status': 'stopped', 'searched': searched, 'skipped_known': skipped}
+        return {'status': 'not_found', 'searched': searched, 'skipped_known': skipped}
+
+    def get_search_stats(self):
+        with self._stats_lock:
+            return dict(self.search_stats)
+
     def _extract_case_info(self, soup):
-        # Implementa la lógica para extraer información del caso aquí
+        # Empty when the page has none of the case fields
         case_info = {}
-        # Ejemplo de extracción de datos...
+        for field, selector in self.CASE_FIELDS.items():
+            element = soup.select_one(selector)
+            if element and element.text.strip():
+                case_info[field] = element.text.strip()
         return case_info
\ No newline at end of file
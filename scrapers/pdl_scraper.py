@@ -1,45 +1,25 @@
 import requests
-import time
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional
-import json
-
-class PDLCache:
-    def __init__(self, max_size: int = 1000):
-        self.cache = {}
-        self.max_size = max_size
-
-    def get(self, key: str) -> Optional[Dict]:
-        if key in self.cache:
-            entry = self.cache[key]
-            if time.time() - entry['timestamp'] < 3600:  # 1 hour cache
-                return entry['data']
-            else:
-                del self.cache[key]
-        return None
-
-    def set(self, key: str, value: Dict):
-        if len(self.cache) >= self.max_size:
-            oldest = min(self.cache.items(), key=lambda x: x[1]['timestamp'])
-            del self.cache[oldest[0]]
-
-        self.cache[key] = {
-            'data': value,
-            'timestamp': time.time()
-        }
+from config import HTTP_POOL_MAXSIZE, PDL_BASE_URL
+from utils.lookups import lookups
+from utils.rate_control import CircuitOpen, controller_for
 
 class PDLScraper:
-    BASE_URL = "https://api.peopledatalabs.com/v5/person/search"
+    BASE_URL = PDL_BASE_URL
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool_maxsize: int = HTTP_POOL_MAXSIZE):
         self.api_key = api_key
-        self.cache = PDLCache()
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize))
+        self.controller = controller_for('pdl')
         self.search_stats = {
             'total_attempts': 0,
             'successful_attempts': 0,
             'not_found_attempts': 0,
             'failed_attempts': 0,
             'error_attempts': 0,
-            'cache_errors': 0,
             'last_number': None,
             'last_error': None
         }
@@ -57,11 +37,11 @@ class PDLScraper:
         self.search_stats['total_attempts'] += 1
         self.search_stats['last_number'] = number
 
-        # Check cache first
-        cached_result = self._check_cache(number)
-        if cached_result:
-            return cached_result
+        # PDL bills per request: concurrent searches for the same number share
+        # one call and results are served from the process-wide lookup cache
+        return lookups.call('pdl', number, lambda: self._fetch(number))
 
+    def _fetch(self, number: str) -> Dict:
         try:
             headers = {
                 'X-Api-Key': self.api_key,
@@ -80,12 +60,16 @@ class PDLScraper:
                 }
             }
 
-            response = requests.post(
-                self.BASE_URL,
-                headers=headers,
-                json=payload,
-                timeout=10
-            )
+            # 401/402/403 open the circuit: a bad key or exhausted credits won't
+            # fix themselves by retrying every number
+            with self.controller.request() as call:
+                response = self.session.post(
+                    self.BASE_URL,
+                    headers=headers,
+                    json=payload,
+                    timeout=call.timeout
+                )
+                call.observe(response.status_code, response.headers.get('Retry-After'))
 
             if response.status_code == 200:
                 data = response.json()
@@ -101,6 +85,13 @@ class PDLScraper:
                         'error': 'No matches found'
                     }
                     self.search_stats['not_found_attempts'] += 1
+            elif response.status_code == 404:
+                # PDL answers "no match" with a 404
+                result = {
+                    'status': 'not_found',
+                    'error': 'No matches found'
+                }
+                self.search_stats['not_found_attempts'] += 1
             elif response.status_code == 401:
                 result = {
                     'status': 'error',
@@ -114,12 +105,14 @@ class PDLScraper:
                 }
                 self.search_stats['failed_attempts'] += 1
 
-            # Cache successful results
-            if result['status'] == 'success':
-                self._cache_result(number, result)
-
             return result
 
+        except CircuitOpen as e:
+            return {
+                'status': 'error',
+                'error': f'PDL unavailable, retry in {e.retry_after:.0f}s',
+                'retry_after': e.retry_after
+            }
         except Exception as e:
             self.search_stats['error_attempts'] += 1
             self.search_stats['last_error'] = str(e)
@@ -128,21 +121,9 @@ class PDLScraper:
                 'error': f'Request failed: {str(e)}'
             }
 
-    def _check_cache(self, number: str) -> Optional[Dict]:
-        try:
-            return self.cache.get(number)
-        except Exception as e:
-            self.search_stats['cache_errors'] += 1
-            self.search_stats['last_error'] = f'Cache error: {str(e)}'
-            return None
-
-    def _cache_result(self, number: str, result: Dict):
-        try:
-            self.cache.set(number, result)
-        except Exception as e:
-            self.search_stats['cache_errors'] += 1
-            self.search_stats['last_error'] = f'Cache write error: {str(e)}'
-
     def get_stats(self) -> Dict:
         return self.search_stats.copy()
 
+    def close(self):
+        self.session.close()
+
@@ -78,7 +78,7 @@ cleanup() {
     local reason=$1
     log "INFO" "Cleaning up services... Reason: $reason"
     
-    for pid in $API_PID $WEBRTC_PID $STREAMLIT_PID; do
+    for pid in $API_PID $WEBRTC_PID $WORKER_PID $STREAMLIT_PID; do
         if [ ! -z "$pid" ] && kill -0 $pid 2>/dev/null; then
             kill $pid 2>/dev/null || log "WARN" "Failed to kill process $pid"
         fi
@@ -114,7 +114,12 @@ initialize_services() {
     WEBRTC_PID=$!
     wait_for_service $WEBRTC_PORT "WebRTC Signaling"
 
-    # 3. Start Streamlit (Frontend application)
+    # 3. Start a sweep worker (more can run on other machines against the same database)
+    log "INFO" "Starting sweep worker..."
+    python3 worker.py > "$LOGDIR/worker.log" 2>&1 &
+    WORKER_PID=$!
+
+    # 4. Start Streamlit (Frontend application)
     log "INFO" "Starting Streamlit App on port $STREAMLIT_PORT..."
     streamlit run main.py \
         --server.port $STREAMLIT_PORT \
@@ -135,7 +140,7 @@ initialize_services
 
 # Monitor services with enhanced error detection
 while true; do
-    for service in "API Server:$API_PID" "WebRTC Signaling:$WEBRTC_PID" "Streamlit App:$STREAMLIT_PID"; do
+    for service in "API Server:$API_PID" "WebRTC Signaling:$WEBRTC_PID" "Sweep Worker:$WORKER_PID" "Streamlit App:$STREAMLIT_PID"; do
         IFS=: read name pid <<< "$service"
         if ! kill -0 $pid 2>/dev/null; then
             handle_error "$name" "Service stopped unexpectedly"
@@ -0,0 +1,85 @@
+// Client-side call duration timer.
+// The server pushes call_status messages only on state transitions; the
+// display is advanced locally every second, so no Streamlit rerun is needed.
+(function () {
+    const config = window.CALL_TIMER_CONFIG;
+    const display = document.getElementById('call-timer-display');
+    const stateLabel = document.getElementById('call-timer-state');
+
+    let state = config.state;
+    let startedAt = config.startedAt;   // epoch seconds of the current running segment
+    let elapsed = config.elapsed || 0;  // seconds accumulated before the current segment
+    let ws = null;
+    let reconnectAttempts = 0;
+    const MAX_RECONNECT_ATTEMPTS = 5;
+
+    function format(seconds) {
+        seconds = Math.max(0, Math.floor(seconds));
+        const h = Math.floor(seconds / 3600);
+        const m = Math.floor((seconds % 3600) / 60);
+        const s = seconds % 60;
+        const pad = (n) => String(n).padStart(2, '0');
+        return (h ? pad(h) + ':' : '') + pad(m) + ':' + pad(s);
+    }
+
+    function currentDuration() {
+        if (state === 'connected' && startedAt) {
+            return elapsed + (Date.now() / 1000 - startedAt);
+        }
+        return elapsed;
+    }
+
+    function render() {
+        display.textContent = format(currentDuration());
+        stateLabel.textContent = config.labels[state] || state;
+        stateLabel.className = 'call-timer-state state-' + state;
+    }
+
+    function wsUrl() {
+        if (config.wsUrl) {
+            return config.wsUrl;
+        }
+        // Components render in a srcdoc iframe, so use the parent's location
+        let loc = window.location;
+        try {
+            loc = window.parent.location;
+        } catch (e) { /* cross-origin parent, fall back to own location */ }
+        const protocol = loc.protocol === 'https:' ? 'wss:' : 'ws:';
+        return `${protocol}//${loc.hostname}:${config.wsPort}`;
+    }
+
+    function connect() {
+        ws = new WebSocket(wsUrl());
+        ws.onopen = () => {
+            reconnectAttempts = 0;
+            ws.send(JSON.stringify({ type: 'subscribe', channel: 'call:' + config.callId }));
+        };
+        ws.onmessage = (event) => {
+            let message;
+            try {
+                message = JSON.parse(event.data);
+            } catch (e) {
+                return;
+            }
+            if (message.type !== 'call_status' || message.callId !== config.callId) {
+                return;
+            }
+            state = message.state;
+            startedAt = message.startedAt;
+            elapsed = message.elapsed || 0;
+            render();
+        };
+        ws.onclose = () => {
+            if (state !== 'ended' && reconnectAttempts < MAX_RECONNECT_ATTEMPTS) {
+                reconnectAttempts++;
+                setTimeout(connect, 1000 * reconnectAttempts);
+            }
+        };
+    }
+
+    render();
+    setInterval(render, 1000);
+    if (config.callId) {
+        connect();
+    }
+})();
@@ -0,0 +1,125 @@
+// Supervisor activity feed.
+// The signaling server sends the current tiles on subscribe and then one
+// message per event with the updated tiles; only changed values are redrawn.
+(function () {
+    const config = window.LIVE_FEED_CONFIG;
+    const tilesEl = document.getElementById('live-tiles');
+    const servicesEl = document.getElementById('live-services');
+    const statusEl = document.getElementById('live-status');
+    const eventsEl = document.getElementById('live-events');
+    const MAX_EVENTS = 30;
+    const MAX_RECONNECT_DELAY = 30;
+
+    const tileValues = {};
+    let lastSeq = 0;
+    let reconnectAttempts = 0;
+
+    // One element per tile, created once
+    const tileEls = {};
+    Object.keys(config.tiles).forEach((key) => {
+        const tile = document.createElement('div');
+        tile.className = 'live-tile';
+        tile.innerHTML = '<div class="value">–</div><div class="label"></div>';
+        tile.querySelector('.label').textContent = config.tiles[key];
+        tilesEl.appendChild(tile);
+        tileEls[key] = tile.querySelector('.value');
+    });
+
+    function renderTiles(tiles) {
+        Object.keys(tileEls).forEach((key) => {
+            if (tiles[key] !== undefined && tiles[key] !== tileValues[key]) {
+                tileValues[key] = tiles[key];
+                tileEls[key].textContent = tiles[key];
+            }
+        });
+        const services = tiles.services || {};
+        servicesEl.innerHTML = '';
+        Object.keys(services).sort().forEach((name) => {
+            const span = document.createElement('span');
+            span.className = 'svc-' + services[name];
+            span.textContent = name + ': ' + String(services[name]).toUpperCase();
+            servicesEl.appendChild(span);
+        });
+    }
+
+    function describe(event) {
+        const label = config.events[event.kind] || event.kind;
+        switch (event.kind) {
+            case 'call':
+                return `${label} ${event.status}` + (event.user_id ? ` (usuario ${event.user_id})` : '');
+            case 'case_created':
+                return `${label} ` + (event.case_id ? `#${event.case_id}` : event.number)
+                    + (event.status ? ` – ${event.status}` : '');
+            case 'sweep_hit':
+                return `${label}: ${event.number}`;
+            case 'service_health':
+                return `${label} ${event.service}: ${String(event.status).toUpperCase()}`;
+            default:
+                return label;
+        }
+    }
+
+    function addEvent(event) {
+        if (event.seq && event.seq <= lastSeq) {
+            return;  // already shown (replayed on reconnect)
+        }
+        lastSeq = event.seq || lastSeq;
+        const item = document.createElement('li');
+        const at = event.at ? new Date(event.at * 1000).toLocaleTimeString() : '';
+        item.textContent = `${at} ${describe(event)}`;
+        eventsEl.insertBefore(item, eventsEl.firstChild);
+        while (eventsEl.children.length > MAX_EVENTS) {
+            eventsEl.removeChild(eventsEl.lastChild);
+        }
+    }
+
+    function wsUrl() {
+        if (config.wsUrl) {
+            return config.wsUrl;
+        }
+        // Components render in a srcdoc iframe, so use the parent's location
+        let loc = window.location;
+        try {
+            loc = window.parent.location;
+        } catch (e) { /* cross-origin parent, fall back to own location */ }
+        const protocol = loc.protocol === 'https:' ? 'wss:' : 'ws:';
+        return `${protocol}//${loc.hostname}:${config.wsPort}`;
+    }
+
+    function connect() {
+        const ws = new WebSocket(wsUrl());
+        ws.onopen = () => {
+            reconnectAttempts = 0;
+            statusEl.textContent = 'En vivo';
+            ws.send(JSON.stringify({ type: 'subscribe', channel: config.channel, token: config.token }));
+        };
+        ws.onmessage = (event) => {
+            let message;
+            try {
+                message = JSON.parse(event.data);
+            } catch (e) {
+                return;
+            }
+            if (message.type === 'feed_state' && message.channel === config.channel) {
+                if (message.seq < lastSeq) {
+                    lastSeq = 0;  // the server restarted and numbers events from scratch
+                }
+                renderTiles(message.tiles);
+                (message.recent || []).forEach(addEvent);
+            } else if (message.type === 'event' && message.channel === config.channel) {
+                renderTiles(message.tiles);
+                addEvent(message.event);
+            } else if (message.type === 'error') {
+                statusEl.textContent = 'Error: ' + message.message;
+            }
+        };
+        ws.onclose = () => {
+            reconnectAttempts++;
+            const delay = Math.min(MAX_RECONNECT_DELAY, 2 ** reconnectAttempts);
+            statusEl.textContent = `Desconectado; reintentando en ${delay}s`;
+            setTimeout(connect, delay * 1000);
+        };
+    }
+
+    connect();
+})();
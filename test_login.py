@@ -1,5 +1,5 @@
 import sqlite3
-import hashlib
+from utils.password_hasher import PasswordHasher, is_legacy_hash
 
 def test_login(username, password):
     print(f"\nProbando login para usuario: {username}")
@@ -10,10 +10,6 @@ def test_login(username, password):
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
-        # Obtener hash de la contraseña proporcionada
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        print(f"Hash generado para la contraseña: {password_hash}")
-
         # Buscar usuario
         cursor.execute("""
             SELECT id, username, password_hash, role 
@@ -30,7 +26,16 @@ def test_login(username, password):
             print(f"Role: {user['role']}")
             print(f"Password hash almacenado: {user['password_hash']}")
 
-            if user['password_hash'] == password_hash:
+            if is_legacy_hash(user['password_hash']):
+                print("Formato: SHA-256 sin sal (se actualizará en el próximo inicio de sesión)")
+
+            hasher = PasswordHasher(workers=1)
+            try:
+                matches = hasher.verify(user['password_hash'], password)
+            finally:
+                hasher.close()
+
+            if matches:
                 print("\n✅ Login exitoso - Hash coincide")
             else:
                 print("\n❌ Login fallido - Hash no coincide")
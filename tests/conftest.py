@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# config.py reads the environment at import time: point it at throwaway
+# storage before any application module is imported
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_BACKEND', 'sqlite')
+os.environ.setdefault('LIVE_FEED_ENABLED', 'false')
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='tests-data-'))
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """A migrated SQLite database for one test."""
+    from utils.db_backends import SQLiteBackend
+    from utils.migrations import MigrationRunner
+    backend = SQLiteBackend(str(tmp_path / 'test.db'))
+    MigrationRunner(backend).migrate()
+    yield backend
+    backend.close()
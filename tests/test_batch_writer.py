@@ -0,0 +1,168 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from utils.batch_writer import BatchWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Sink:
+    """flush_fn that records batches and fails while ``failing`` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+
+    def __call__(self, rows):
+        if self.failing:
+            raise RuntimeError('database down')
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+@pytest.fixture
+def sink():
+    return Sink()
+
+
+def writer(sink, wal_path=None, max_batch=3):
+    # A long interval keeps the background thread out of the way; tests flush explicitly
+    return BatchWriter('test', sink, max_batch=max_batch, flush_interval=60, wal_path=wal_path)
+
+
+def crash(w):
+    """Drop a writer the way a dying process would: no flush, WAL and lock released."""
+    w._wal.close()
+    w._owner_lock.close()
+
+
+def writer_process(wal_path, rows, wait=False):
+    """Another process appending ``rows`` to ``wal_path``, then exiting without close()."""
+    code = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {ROOT!r})
+        from utils.batch_writer import BatchWriter
+        w = BatchWriter('other', lambda rows: None, flush_interval=60, wal_path={wal_path!r})
+        for row in {rows!r}:
+            w.append(row)
+        print('ready', flush=True)
+        if {wait!r}:
+            sys.stdin.readline()
+        os._exit(0)
+    """)
+    proc = subprocess.Popen([sys.executable, '-c', code], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, text=True)
+    assert proc.stdout.readline().strip() == 'ready'
+    return proc
+
+
+def test_flush_writes_in_batches_of_max_batch(sink):
+    w = writer(sink)
+    for i in range(7):
+        w.append({'i': i})
+    assert w.flush() == 7
+    assert [len(batch) for batch in sink.batches] == [3, 3, 1]
+    assert w.pending() == 0
+    w.close()
+
+
+def test_failed_flush_keeps_rows_for_the_next_one(sink, tmp_path):
+    w = writer(sink, str(tmp_path / 'rows.wal'))
+    w.append({'i': 1})
+    sink.failing = True
+    assert w.flush() == 0
+    assert w.pending() == 1 and w.get_stats()['failed_batches'] == 1
+    sink.failing = False
+    w.append({'i': 2})
+    assert w.flush() == 2
+    assert sink.rows == [{'i': 1}, {'i': 2}]
+    w.close()
+
+
+def test_unflushed_rows_are_replayed_after_a_crash(sink, tmp_path):
+    wal = str(tmp_path / 'rows.wal')
+    crashed = writer(Sink(), wal)
+    crashed.append({'i': 1})
+    crashed.append({'i': 2})
+    crash(crashed)
+    # No close(): the next writer finds the rows in the WAL
+    restarted = writer(sink, wal)
+    assert restarted.get_stats()['replayed'] == 2
+    restarted.close()
+    assert sink.rows == [{'i': 1}, {'i': 2}]
+
+
+def test_rows_of_a_failed_flush_survive_a_crash(tmp_path):
+    wal = str(tmp_path / 'rows.wal')
+    down = Sink()
+    down.failing = True
+    crashed = writer(down, wal)
+    crashed.append({'i': 1})
+    crashed.flush()
+    crash(crashed)
+    sink = Sink()
+    restarted = writer(sink, wal)
+    restarted.close()
+    assert sink.rows == [{'i': 1}]
+
+
+def test_torn_last_line_is_skipped(sink, tmp_path):
+    wal = tmp_path / 'rows.wal'
+    wal.write_text('{"i": 1}\n{"i": 2\n')
+    w = writer(sink, str(wal))
+    w.close()
+    assert sink.rows == [{'i': 1}]
+
+
+def test_close_flushes_and_leaves_no_segments(sink, tmp_path):
+    wal = str(tmp_path / 'rows.wal')
+    w = writer(sink, wal)
+    w.append({'i': 1})
+    w.close()
+    assert sink.rows == [{'i': 1}]
+    # Only the shared replay lock is left behind
+    assert os.listdir(tmp_path) == ['rows.wal.lock']
+
+
+def test_segments_of_dead_processes_are_adopted(sink, tmp_path):
+    wal = str(tmp_path / 'rows.wal')
+    writer_process(wal, [{'i': 1}, {'i': 2}]).wait()
+    writer_process(wal, [{'i': 3}]).wait()
+    w = writer(sink, wal)
+    assert w.get_stats()['replayed'] == 3
+    w.close()
+    assert sorted(row['i'] for row in sink.rows) == [1, 2, 3]
+    # Adopted segments and their locks are gone
+    assert sorted(os.listdir(tmp_path)) == ['rows.wal.lock']
+
+
+def test_live_writers_keep_their_segment(sink, tmp_path):
+    wal = str(tmp_path / 'rows.wal')
+    other = writer_process(wal, [{'i': 1}], wait=True)
+    try:
+        w = writer(sink, wal)
+        assert w.get_stats()['replayed'] == 0
+        w.close()
+    finally:
+        other.communicate('\n')
+    # Once its owner has exited the segment is picked up
+    w = writer(sink, wal)
+    w.close()
+    assert sink.rows == [{'i': 1}]
+
+
+def test_legacy_shared_wal_is_replayed(sink, tmp_path):
+    wal = tmp_path / 'rows.wal'
+    (tmp_path / 'rows.wal.flushing').write_text('{"i": 1}\n')
+    wal.write_text('{"i": 2}\n')
+    w = writer(sink, str(wal))
+    w.close()
+    assert sink.rows == [{'i': 1}, {'i': 2}]
+    assert not wal.exists()
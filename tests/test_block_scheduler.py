@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from utils.block_scheduler import BlockScheduler
+
+
+@pytest.fixture
+def scheduler(backend):
+    return BlockScheduler(backend, block_digits=3, seed_block=244206, explore=0, rng=random.Random(7))
+
+
+def handed_out(ranges):
+    return [n for start, count in ranges for n in range(start, start + count)]
+
+
+def test_plan_spends_the_budget_from_the_seed_block(scheduler):
+    ranges = scheduler.plan(250, step=100)
+    assert sum(count for _, count in ranges) == 250
+    assert ranges == [(244206000, 250)]
+
+
+def test_successive_plans_do_not_overlap(scheduler):
+    first = handed_out(scheduler.plan(300, step=50))
+    second = handed_out(scheduler.plan(300, step=50))
+    assert len(set(first)) == 300 and not set(first) & set(second)
+
+
+def test_searched_numbers_do_not_count_against_the_budget(scheduler):
+    for offset in range(10):
+        scheduler.observe(244206000 + offset, hit=False)
+    # The range spans them (the sweep skips known numbers itself) but spends budget only on new ones
+    assert scheduler.plan(10, step=10) == [(244206000, 20)]
+
+
+def test_budget_goes_mostly_near_hits(scheduler):
+    for offset in range(200):
+        scheduler.observe(100000000 + offset, hit=offset % 4 == 0)
+    for offset in range(200):
+        scheduler.observe(300000000 + offset, hit=False)
+    numbers = handed_out(scheduler.plan(2000, step=100))
+    near = sum(abs(n // 1000 - 100000) <= scheduler.neighbourhood for n in numbers)
+    assert near / len(numbers) > 0.9
+
+
+def test_exhausted_block_is_dropped(backend):
+    scheduler = BlockScheduler(backend, block_digits=1, seed_block=5, explore=0, neighbourhood=0,
+                               rng=random.Random(1))
+    scheduler.observe(51, hit=True)
+    # Block 5 is the only candidate: one range over its 9 untaken numbers, then nothing is left
+    assert scheduler.plan(100, step=3) == [(50, 10)]
+    assert scheduler.plan(10) == []
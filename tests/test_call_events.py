@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils import repository
+from utils.call_events import CallEventLog, CallStatus, get_call_event_log
+from utils.repository import CallRepository
+from utils.resources import resources
+
+
+@pytest.fixture
+def calls(backend, monkeypatch):
+    repo = CallRepository(backend)
+    monkeypatch.setattr(repository, 'calls', repo)
+    return repo
+
+
+def test_import_does_not_open_the_log(tmp_path):
+    wal = tmp_path / 'call_events.wal'
+    subprocess.run(
+        [sys.executable, '-c', 'import utils.call_events, utils.phone_call'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, 'CALL_EVENTS_WAL': str(wal)}, capture_output=True
+    )
+    # Whether or not the UI modules import here, nothing touched the WAL
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_log_is_shared_and_closed_with_the_registry(calls):
+    log = get_call_event_log()
+    assert get_call_event_log() is log
+    log.record('c1', CallStatus.INITIATED, phone_number='555', user_id=3)
+    resources.reset('call_event_log')
+    assert calls.backend.fetch_one("SELECT user_id FROM phone_calls WHERE call_uuid = 'c1'")['user_id'] == 3
+    assert get_call_event_log() is not log
+    resources.reset('call_event_log')
+
+
+def test_events_are_written_in_batches(calls, tmp_path):
+    log = CallEventLog(wal_path=str(tmp_path / 'call_events.wal'), max_batch=100, flush_interval=60)
+    call_id = CallEventLog.new_call_id()
+    log.record(call_id, CallStatus.INITIATED, phone_number='555', user_id=1)
+    log.record(call_id, CallStatus.ENDED, duration=12)
+    assert log.get_stats()['pending'] == 2
+    assert log.flush() == 2
+    row = calls.backend.fetch_one("SELECT call_status, call_duration FROM phone_calls")
+    assert (row['call_status'], row['call_duration']) == ('ended', 12)
+    log.close()
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from utils.case_pipeline import CasePipeline, build_case
+from utils.repository import CaseRepository
+
+
+class Scraper:
+    """Canned search results by number; anything else is not found."""
+
+    def __init__(self, results=None, error=None):
+        self.results = results or {}
+        self.error = error
+        self.searched = []
+
+    def search(self, number):
+        self.searched.append(number)
+        if self.error:
+            raise self.error
+        return self.results.get(number, {'status': 'not_found'})
+
+
+def hit(status='Positivo'):
+    return {'status': 'success', 'data': {'status': status, 'court_address': 'Calle 1',
+                                          'court_phone': '555-0100'}}
+
+
+PERSON = {'status': 'success', 'data': {'first_name': 'Ana', 'last_name': 'Ruiz',
+                                        'phone_numbers': ['5550001', '5550002'],
+                                        'personal_emails': ['ana@example.com']}}
+
+
+@pytest.fixture
+def cases(backend):
+    return CaseRepository(backend)
+
+
+@pytest.fixture
+def pipeline(cases):
+    pipeline = CasePipeline(Scraper(), Scraper({'244206001': PERSON}), cases, batch_size=10)
+    yield pipeline
+    pipeline.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_build_case_merges_eoir_and_pdl():
+    case = build_case({'number': '244206001', 'user_id': 3, 'eoir_data': hit()['data'],
+                       'pdl_data': PERSON['data']})
+    assert case['status'] == 'Positivo' and case['a_number'] == '244206001'
+    assert (case['first_name'], case['last_name']) == ('Ana', 'Ruiz')
+    assert (case['client_phone'], case['other_client_phone']) == ('5550001', '5550002')
+    assert case['client_email'] == 'ana@example.com' and case['created_by'] == 3
+
+    bare = build_case({'number': '244206002', 'eoir_data': hit('Negativo')['data']})
+    assert bare['status'] == 'Negativo' and bare['client_phone'] is None
+
+
+def test_only_hits_pass_the_first_stage(pipeline):
+    assert pipeline._accept_hit({'number': '1', 'eoir_result': {'status': 'not_found'}}) is None
+    assert pipeline._accept_hit({'number': '1', 'eoir_result': {'status': 'error'}}) is None
+    assert pipeline._accept_hit({'number': '1', 'eoir_result': hit(), 'user_id': 2})['eoir_data']
+
+
+def test_hits_without_an_owner_are_dropped(pipeline):
+    assert pipeline._accept_hit({'number': '1', 'eoir_result': hit(), 'user_id': None}) is None
+
+
+def test_failed_enrichment_keeps_the_case(cases):
+    pipeline = CasePipeline(Scraper(), Scraper(error=RuntimeError('pdl down')), cases)
+    item = pipeline._enrich({'number': '244206001'})
+    assert item['pdl_data'] is None
+
+
+def test_dedup_skips_stored_and_in_flight_numbers(pipeline, cases):
+    cases.insert(build_case({'number': '244206001', 'user_id': 1, 'eoir_data': hit()['data']}))
+    fresh = pipeline._dedup([{'number': n} for n in ('244206001', '244206002', '244206002')])
+    assert [item['number'] for item in fresh] == ['244206002']
+    # Still in flight from the previous batch
+    assert pipeline._dedup([{'number': '244206002'}]) == []
+
+
+def test_hits_become_enriched_cases(pipeline, cases):
+    assert pipeline.submit_result('244206001', hit(), user_id=1)
+    assert pipeline.submit_result('244206002', {'status': 'not_found'}, user_id=1)
+    assert pipeline.submit_result('244206001', hit(), user_id=1)
+    wait_for(lambda: pipeline.get_stats()['stages'][-1]['processed'] >= 1)
+    pipeline.close()
+
+    rows = cases.list_by_user(1)
+    assert [(r['a_number'], r['first_name']) for r in rows] == [('244206001', 'Ana')]
+    sweep = pipeline.get_stats()['stages'][0]
+    assert sweep['received'] == 3 and sweep['dropped'] == 1
+
+
+def test_insert_many_announces_only_stored_rows(backend, cases, monkeypatch):
+    announced = []
+    monkeypatch.setattr('utils.repository.live_feed.publish',
+                        lambda event, **fields: announced.append(fields['number']))
+    backend.execute("CREATE UNIQUE INDEX test_cases_a_number ON cases (a_number)")
+    rows = [build_case({'number': n, 'user_id': 1, 'eoir_data': hit()['data']})
+            for n in ('244206001', '244206001', '244206002')]
+    assert cases.insert_many(rows) == 2
+    assert announced == ['244206001', '244206002']
+
+
+def test_failed_insert_releases_the_dedup_claim(pipeline, monkeypatch):
+    item = {'number': '244206001', 'user_id': 1, 'eoir_data': hit()['data']}
+    assert pipeline._dedup([item]) == [item]
+
+    def down(rows):
+        raise RuntimeError('database down')
+
+    monkeypatch.setattr(pipeline.cases, 'insert_many', down)
+    with pytest.raises(RuntimeError):
+        pipeline._insert([item])
+    # A later hit for the same number is no longer treated as in flight
+    assert pipeline._dedup([item]) == [item]
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+import pytest
+
+from utils.db_backends import SQLiteBackend
+
+
+@pytest.fixture
+def make_backend(tmp_path):
+    backends = []
+
+    def make(**kwargs):
+        backend = SQLiteBackend(str(tmp_path / 'test.db'), **kwargs)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        backend.close()
+
+
+def test_connections_are_tuned(make_backend):
+    backend = make_backend(busy_timeout_ms=1234, cache_size_kb=4096)
+    assert backend.fetch_one("PRAGMA journal_mode")['journal_mode'] == 'wal'
+    assert backend.fetch_one("PRAGMA synchronous")['synchronous'] == 1  # NORMAL
+    assert backend.fetch_one("PRAGMA busy_timeout")['timeout'] == 1234
+    assert backend.fetch_one("PRAGMA cache_size")['cache_size'] == -4096
+
+
+def test_a_thread_reuses_its_connection(make_backend):
+    backend = make_backend()
+    with backend.session() as s:
+        first = s.conn
+    with backend.session() as s:
+        assert s.conn is first
+
+
+def test_threads_get_their_own_connection_and_give_it_back(make_backend):
+    backend = make_backend()
+    seen = []
+
+    def use():
+        with backend.session() as s:
+            seen.append(s.conn)
+
+    with backend.session() as s:
+        main = s.conn
+    thread = threading.Thread(target=use)
+    thread.start()
+    thread.join()
+    assert seen[0] is not main
+    # The finished thread's connection went back to the idle pool for the next thread
+    thread = threading.Thread(target=use)
+    thread.start()
+    thread.join()
+    assert seen[1] is seen[0]
+
+
+def hold_write_lock(path, seconds):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(seconds, lambda: (conn.execute("COMMIT"), conn.close()))
+    timer.start()
+    return timer
+
+
+def test_locked_writes_are_retried(make_backend, tmp_path):
+    backend = make_backend(busy_timeout_ms=20, retry_attempts=8)
+    backend.execute("CREATE TABLE t (x INTEGER)")
+    timer = hold_write_lock(str(tmp_path / 'test.db'), 0.2)
+    assert backend.execute("INSERT INTO t (x) VALUES (%s)", (1,)) == 1
+    timer.join()
+    assert backend.fetch_one("SELECT COUNT(*) AS n FROM t")['n'] == 1
+
+
+def test_gives_up_after_retry_attempts(make_backend, tmp_path):
+    backend = make_backend(busy_timeout_ms=20, retry_attempts=1)
+    backend.execute("CREATE TABLE t (x INTEGER)")
+    timer = hold_write_lock(str(tmp_path / 'test.db'), 0.5)
+    with pytest.raises(sqlite3.OperationalError):
+        backend.execute("INSERT INTO t (x) VALUES (%s)", (1,))
+    timer.join()
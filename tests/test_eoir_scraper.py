@@ -0,0 +1,21 @@
+import pytest
+
+from scrapers.eoir_scraper import SIMULATOR_ONLY, EOIRScraper
+
+
+@pytest.fixture
+def production():
+    scraper = EOIRScraper(simulator=False)
+    scraper.session.get = lambda *args, **kwargs: pytest.fail("request sent outside the simulator")
+    yield scraper
+    scraper.close()
+
+
+def test_search_refuses_without_the_simulator(production):
+    result = production.search('123456789')
+    assert result['status'] == 'error' and result['error'] == SIMULATOR_ONLY
+
+
+def test_sweep_refuses_without_the_simulator(production):
+    with pytest.raises(RuntimeError, match='EOIR_SIMULATOR'):
+        next(production.sweep(123456789, 10, skip_known=False))
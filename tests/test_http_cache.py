@@ -0,0 +1,135 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from utils import http_cache
+from utils.http_cache import CachingAdapter, HttpCache, canonical_url
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(t=1_000_000.0)
+    monkeypatch.setattr(http_cache, 'time', SimpleNamespace(time=lambda: now.t))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = HttpCache(str(tmp_path / 'http'), max_age=60, max_bytes=1 << 20)
+    yield cache
+    cache.close()
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """Serves a page with an ETag and answers If-None-Match with 304."""
+
+    requests = []
+    etag = '"v1"'
+
+    def do_GET(self):
+        Upstream.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == Upstream.etag:
+            self.send_response(304)
+            self.send_header('ETag', Upstream.etag)
+            self.end_headers()
+            return
+        body = f"page {self.path}".encode()
+        self.send_response(200)
+        self.send_header('ETag', Upstream.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    Upstream.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Upstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_urls_are_canonicalized():
+    assert canonical_url('HTTP://Example.com?b=2&a=1#top') == 'http://example.com/?a=1&b=2'
+
+
+def test_put_and_get_round_trip(cache):
+    assert cache.put('GET', 'http://x/a?q=1', 200, [('ETag', '"1"'), ('Set-Cookie', 's')], b'body')
+    cached = cache.get('GET', 'http://X/a?q=1')
+    assert (cached.status, cached.body) == (200, b'body')
+    assert cached.headers == {'ETag': '"1"'}
+    assert cached.validators() == {'If-None-Match': '"1"'}
+
+
+def test_errors_and_non_get_are_not_stored(cache):
+    assert not cache.put('GET', 'http://x/a', 503, [], b'down')
+    assert not cache.put('POST', 'http://x/a', 200, [], b'ok')
+    assert cache.get('GET', 'http://x/a') is None
+
+
+def test_freshness_and_renewal(cache, clock):
+    cache.put('GET', 'http://x/a', 200, [('ETag', '"1"')], b'body')
+    assert cache.has_fresh('GET', 'http://x/a')
+    clock.t += 61
+    assert not cache.has_fresh('GET', 'http://x/a')
+    assert not cache.is_fresh(cache.get('GET', 'http://x/a'))
+
+    cache.revalidated('GET', 'http://x/a', [('ETag', '"2"'), ('Server', 'ignored')])
+    assert cache.has_fresh('GET', 'http://x/a')
+    assert cache.get('GET', 'http://x/a').headers == {'ETag': '"2"'}
+
+
+def test_identical_bodies_are_stored_once(cache):
+    cache.put('GET', 'http://x/a', 200, [], b'same')
+    cache.put('GET', 'http://x/b', 200, [], b'same')
+    stats = cache.get_stats()
+    assert (stats['entries'], stats['bodies'], stats['deduplicated']) == (2, 1, 1)
+
+
+def test_prune_drops_oldest_beyond_the_limit(cache, clock):
+    cache.max_bytes = 10
+    cache.put('GET', 'http://x/old', 200, [], b'0123456789')
+    clock.t += 1
+    cache.put('GET', 'http://x/new', 200, [], b'abcdefghij')
+    assert cache.prune() == 1
+    assert cache.get('GET', 'http://x/old') is None
+    assert cache.get('GET', 'http://x/new').body == b'abcdefghij'
+    assert cache.get_stats()['bodies'] == 1
+
+
+def test_adapter_serves_fresh_then_revalidates(cache, clock, upstream):
+    session = requests.Session()
+    session.mount('http://', CachingAdapter(cache))
+
+    first = session.get(f"{upstream}/case")
+    assert first.text == 'page /case' and 'X-Http-Cache' not in first.headers
+    second = session.get(f"{upstream}/case")
+    assert second.headers['X-Http-Cache'] == 'hit' and second.text == 'page /case'
+    assert Upstream.requests == [None]
+
+    clock.t += 61
+    third = session.get(f"{upstream}/case")
+    assert third.headers['X-Http-Cache'] == 'revalidated' and third.text == 'page /case'
+    assert Upstream.requests == [None, '"v1"']
+    assert cache.has_fresh('GET', f"{upstream}/case")
+
+
+def test_scraper_reads_fresh_pages_without_a_request(cache):
+    from scrapers.eoir_scraper import EOIRScraper
+
+    scraper = EOIRScraper(cache=cache, simulator=True)
+    scraper.session.get = lambda *args, **kwargs: pytest.fail("fresh page requested again")
+    url = requests.Request('GET', scraper.BASE_URL, params={'caseNumber': '123456789'}).prepare().url
+    cache.put('GET', url, 200, [], b'<div class="case-number">123456789</div>')
+    result = scraper._fetch('123456789')
+    assert result['status'] == 'success' and result['data'] == {'a_number': '123456789'}
+    scraper.close()
@@ -0,0 +1,118 @@
+from utils.known_numbers import BloomFilter, KnownNumbers, normalize_a_number
+from utils.repository import CaseRepository
+
+
+def numbers(count, first=0):
+    return [str(n).zfill(9) for n in range(first, first + count)]
+
+
+def add_case(backend, a_number):
+    CaseRepository(backend).insert({
+        'number': a_number, 'a_number': a_number, 'status': 'Positivo', 'first_name': 'Ana',
+        'last_name': 'Ruiz', 'court_address': 'Calle 1', 'court_phone': '555', 'created_by': 1
+    })
+
+
+def add_search(backend, number, status=None):
+    backend.execute(
+        "INSERT INTO search_history (number, eoir_found, searched_by, status) VALUES (%s, %s, %s, %s)",
+        (number, status == 'success', 1, status)
+    )
+
+
+def known(backend, path):
+    return KnownNumbers(backend, path=str(path), capacity=1000, fp_rate=0.001, refresh_interval=3600)
+
+
+def test_normalize_a_number():
+    assert normalize_a_number('A123-456-789') == '123456789'
+    assert normalize_a_number('12345678') == '012345678'
+    assert normalize_a_number('1234') is None
+    assert normalize_a_number(None) is None
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter.for_capacity(10000, 0.01)
+    for number in numbers(10000):
+        bloom.add(number)
+    assert all(number in bloom for number in numbers(10000))
+
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter.for_capacity(10000, 0.01)
+    for number in numbers(10000):
+        bloom.add(number)
+    false_positives = sum(number in bloom for number in numbers(20000, first=500000000))
+    assert false_positives / 20000 < 0.02
+    assert 0.005 < bloom.false_positive_rate() < 0.02
+
+
+def test_re_adding_does_not_count():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    assert bloom.add('000000001')
+    assert not bloom.add('000000001')
+    for _ in range(3):
+        for number in numbers(500):
+            bloom.add(number)
+    assert bloom.count == 500
+
+
+def test_round_trips_through_its_bits():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    for number in numbers(100):
+        bloom.add(number)
+    copy = BloomFilter(bloom.num_bits, bloom.num_hashes, bytearray(bloom.bits), bloom.count)
+    assert all(number in copy for number in numbers(100))
+    assert copy.false_positive_rate() == bloom.false_positive_rate()
+
+
+def test_loads_cases_and_searches_and_catches_up(backend, tmp_path):
+    add_case(backend, 'A244-206-001')
+    add_search(backend, '244206002')
+    seen = known(backend, tmp_path / 'known.bin')
+    assert seen.might_contain('244206001') and seen.might_contain('A244206002')
+    assert not seen.might_contain('244206003')
+
+    # Rows inserted by another process show up on the next refresh
+    add_case(backend, '244206003')
+    seen.refresh(force=True)
+    assert seen.might_contain('244206003')
+    assert seen.get_stats()['numbers'] == 3
+
+
+def test_failed_lookups_do_not_make_a_number_known(backend, tmp_path):
+    add_search(backend, '244206001', 'error')
+    add_search(backend, '244206002', 'not_found')
+    add_search(backend, '244206003', 'success')
+    seen = known(backend, tmp_path / 'known.bin')
+    assert not seen.might_contain('244206001')
+    assert seen.might_contain('244206002') and seen.might_contain('244206003')
+
+
+def test_saved_filter_only_scans_new_rows(backend, tmp_path):
+    path = tmp_path / 'known.bin'
+    add_case(backend, '244206001')
+    first = known(backend, path)
+    first.add('244206002')
+    first.close()
+
+    add_search(backend, '244206003')
+    second = known(backend, path)
+    assert all(second.might_contain(n) for n in ('244206001', '244206002', '244206003'))
+    # The case row was not scanned (and counted) again
+    assert second.get_stats()['numbers'] == 3
+
+
+def test_unreadable_file_is_rebuilt_from_the_database(backend, tmp_path):
+    path = tmp_path / 'known.bin'
+    path.write_bytes(b'garbage')
+    add_case(backend, '244206001')
+    assert known(backend, path).might_contain('244206001')
+
+
+def test_outgrowing_capacity_rebuilds_larger(backend, tmp_path):
+    seen = KnownNumbers(backend, path=str(tmp_path / 'known.bin'), capacity=10,
+                            fp_rate=0.01, refresh_interval=3600)
+    for number in numbers(11, first=244206000):
+        seen.add(number)
+    assert seen.capacity == 20 and seen.get_stats()['rebuilds'] == 1
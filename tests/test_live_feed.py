@@ -0,0 +1,21 @@
+from utils.live_feed import feed_token, verify_feed_token
+
+
+def test_signed_token_verifies_until_it_expires():
+    token = feed_token(60, secret='s3cret')
+    assert verify_feed_token(token, secret='s3cret')
+    assert not verify_feed_token(token, secret='other')
+    assert not verify_feed_token(feed_token(-1, secret='s3cret'), secret='s3cret')
+
+
+def test_forged_or_missing_tokens_are_rejected():
+    expires = feed_token(60, secret='s3cret').split('.')[0]
+    assert not verify_feed_token(f"{expires}.deadbeef", secret='s3cret')
+    assert not verify_feed_token(expires, secret='s3cret')
+    assert not verify_feed_token(None, secret='s3cret')
+
+
+def test_without_a_secret_the_feed_is_closed_unless_insecure():
+    token = feed_token(60, secret=None)
+    assert not verify_feed_token(token, secret=None, insecure=False)
+    assert verify_feed_token(None, secret=None, insecure=True)
@@ -0,0 +1,109 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from utils import lookups
+from utils.lookups import LookupCache, SingleFlight, normalize_query
+
+
+class Fetch:
+    """A fetch that blocks until released and counts its calls."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result if result is not None else {'status': 'success', 'names': []}
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(flight, fetch, queries, source='eoir'):
+    results, errors = [], []
+
+    def call(query):
+        try:
+            results.append(flight.call(source, query, fetch))
+        except Exception as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call, args=(queries[0],))
+    leader.start()
+    fetch.started.wait(5)
+    followers = [threading.Thread(target=call, args=(q,)) for q in queries[1:]]
+    for thread in followers:
+        thread.start()
+    while flight.get_stats()['coalesced'] < len(followers):
+        time.sleep(0.01)
+    fetch.release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    return results, errors
+
+
+def test_queries_are_normalized():
+    assert normalize_query('A-244-206-123') == '244206123'
+    assert normalize_query('+1 (555) 123-4567') == '5551234567'
+    assert normalize_query(' Ana ') == 'ana'
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight(LookupCache())
+    fetch = Fetch()
+    results, errors = run_concurrently(flight, fetch, ['244206123', 'A244-206-123', '244 206 123'])
+    assert fetch.calls == 1 and errors == []
+    assert results == [fetch.result] * 3
+    # Each caller got its own copy
+    results[0]['names'].append('x')
+    assert results[1]['names'] == []
+    assert flight.in_flight() == 0
+
+
+def test_result_is_served_from_cache_afterwards():
+    flight = SingleFlight(LookupCache())
+    fetch = Fetch()
+    fetch.release.set()
+    flight.call('eoir', '244206123', fetch)
+    flight.call('eoir', '244206123', fetch)
+    assert fetch.calls == 1
+    assert flight.get_stats()['sources']['eoir']['cache_hits'] == 1
+    # Sources are cached separately
+    flight.call('pdl', '244206123', fetch)
+    assert fetch.calls == 2
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight = SingleFlight(LookupCache())
+    fetch = Fetch(error=RuntimeError('timeout'))
+    results, errors = run_concurrently(flight, fetch, ['244206123', '244206123'])
+    assert results == [] and len(errors) == 2
+    assert all(str(e) == 'timeout' for e in errors)
+    assert flight.in_flight() == 0
+
+    fetch.error = None
+    fetch.result = {'status': 'error'}
+    flight.call('eoir', '244206123', fetch)
+    flight.call('eoir', '244206123', fetch)
+    # An 'error' result is returned but not cached either
+    assert fetch.calls == 3
+
+
+def test_cache_expires_and_evicts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(lookups, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    cache = LookupCache(max_size=2, ttl=10, ttls={'pdl': 100})
+    cache.set(('eoir', '1'), 'a')
+    cache.set(('pdl', '1'), 'b')
+    now[0] = 11
+    assert cache.get(('eoir', '1')) is None
+    assert cache.get(('pdl', '1')) == 'b'
+    cache.set(('eoir', '2'), 'c')
+    cache.set(('eoir', '3'), 'd')
+    assert cache.get(('pdl', '1')) is None and len(cache) == 2
@@ -0,0 +1,73 @@
+import shutil
+
+import pytest
+
+from config import MIGRATIONS_DIR
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationError, MigrationRunner
+
+
+@pytest.fixture
+def migrations(tmp_path):
+    """A copy of the migration files that a test may edit."""
+    directory = tmp_path / 'migrations'
+    shutil.copytree(MIGRATIONS_DIR, directory)
+    return directory
+
+
+@pytest.fixture
+def empty_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'test.db'))
+    yield backend
+    backend.close()
+
+
+def test_applies_every_migration_in_order(empty_backend, migrations):
+    runner = MigrationRunner(empty_backend, str(migrations))
+    done = runner.migrate()
+    assert [m.version for m in done] == [m.version for m in runner.available()]
+    rows = empty_backend.fetch_all("SELECT version, name, checksum FROM schema_migrations ORDER BY version")
+    assert [(r['version'], r['name'], r['checksum']) for r in rows] == \
+        [(m.version, m.name, m.checksum) for m in runner.available()]
+    assert empty_backend.fetch_one("SELECT COUNT(*) AS n FROM cases")['n'] == 0
+
+
+def test_second_run_is_a_no_op(empty_backend, migrations):
+    runner = MigrationRunner(empty_backend, str(migrations))
+    runner.migrate()
+    assert runner.migrate() == []
+    assert runner.pending() == []
+    assert all(row['applied'] and not row['modified'] for row in runner.status())
+
+
+def test_only_new_files_are_applied(empty_backend, migrations):
+    runner = MigrationRunner(empty_backend, str(migrations))
+    runner.migrate()
+    (migrations / 'sqlite' / '9999_extra.sql').write_text("CREATE TABLE extra (id INTEGER);\n")
+    assert [m.name for m in runner.pending()] == ['extra']
+    assert [m.version for m in runner.migrate()] == [9999]
+    assert empty_backend.fetch_one("SELECT COUNT(*) AS n FROM extra")['n'] == 0
+
+
+def test_modified_applied_migration_is_rejected(empty_backend, migrations):
+    runner = MigrationRunner(empty_backend, str(migrations))
+    runner.migrate()
+    first = runner.available()[0]
+    with open(first.path, 'a', encoding='utf-8') as f:
+        f.write("\n-- edited after release\n")
+    with pytest.raises(MigrationError):
+        runner.migrate()
+    assert [row['modified'] for row in runner.status()][0] is True
+
+
+def test_failed_migration_is_not_recorded(empty_backend, migrations):
+    runner = MigrationRunner(empty_backend, str(migrations))
+    runner.migrate()
+    (migrations / 'sqlite' / '9999_broken.sql').write_text(
+        "CREATE TABLE half (id INTEGER);\nINSERT INTO missing_table VALUES (1);\n"
+    )
+    with pytest.raises(Exception):
+        runner.migrate()
+    assert 9999 not in runner.applied()
+    tables = empty_backend.fetch_all("SELECT name FROM sqlite_master WHERE name = 'half'")
+    assert tables == []
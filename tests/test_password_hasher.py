@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils import password_hasher
+from utils.password_hasher import (
+    LoginRateLimiter, LoginThrottled, PasswordHasher, _pbkdf2, authenticate, is_legacy_hash
+)
+
+
+class Users:
+    """In-memory stand-in for the user repository."""
+
+    def __init__(self, **hashes):
+        self.rows = {name: {'id': i, 'username': name, 'password_hash': h}
+                     for i, (name, h) in enumerate(hashes.items(), start=1)}
+        self.updates = []
+
+    def get_by_username(self, username):
+        return self.rows.get(username)
+
+    def update_password_hash(self, user_id, new_hash):
+        self.updates.append(user_id)
+        for row in self.rows.values():
+            if row['id'] == user_id:
+                row['password_hash'] = new_hash
+
+
+@pytest.fixture(scope='module')
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=2, iterations=1000)
+    yield hasher
+    hasher.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Replace the module's time rather than time.monotonic itself, which the
+    # process pool's own waits rely on
+    now = [1000.0]
+    monkeypatch.setattr(password_hasher, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_hash_is_salted_and_verifies(hasher):
+    first, second = hasher.hash('s3cret'), hasher.hash('s3cret')
+    assert first != second
+    assert hasher.verify(first, 's3cret')
+    assert not hasher.verify(first, 'wrong')
+    assert not hasher.verify('', 's3cret')
+    assert not hasher.needs_rehash(first)
+
+
+def test_hash_records_its_iterations(hasher):
+    algorithm, iterations, salt, digest = hasher.hash('s3cret').split('$')
+    assert (algorithm, iterations) == ('pbkdf2_sha256', '1000')
+    assert len(base64.b64decode(salt)) == 16 and len(base64.b64decode(digest)) == 32
+
+
+def test_changed_iterations_still_verify_and_are_rehashed(hasher):
+    stronger = PasswordHasher(workers=1, max_pending=2, iterations=2000)
+    try:
+        users = Users(ana=hasher.hash('s3cret'))
+        assert stronger.needs_rehash(users.rows['ana']['password_hash'])
+        assert authenticate('ana', 's3cret', users, stronger, LoginRateLimiter())
+        assert users.rows['ana']['password_hash'].startswith('pbkdf2_sha256$2000$')
+        assert not stronger.needs_rehash(users.rows['ana']['password_hash'])
+    finally:
+        stronger.close()
+
+
+def test_bare_base64_hashes_verify_at_100k_and_are_rehashed(hasher):
+    salt = os.urandom(16)
+    bare = base64.b64encode(salt + _pbkdf2('s3cret', salt, 100000)).decode()
+    users = Users(ana=bare)
+    assert hasher.verify(bare, 's3cret') and hasher.needs_rehash(bare)
+    assert authenticate('ana', 's3cret', users, hasher, LoginRateLimiter())
+    assert users.rows['ana']['password_hash'].startswith('pbkdf2_sha256$1000$')
+
+
+def test_legacy_sha256_is_rehashed_on_login(hasher):
+    legacy = hashlib.sha256(b's3cret').hexdigest()
+    users = Users(ana=legacy)
+    assert is_legacy_hash(legacy)
+
+    user = authenticate('ana', 's3cret', users, hasher, LoginRateLimiter())
+    assert user['id'] == 1 and users.updates == [1]
+    assert not is_legacy_hash(users.rows['ana']['password_hash'])
+    assert hasher.verify(users.rows['ana']['password_hash'], 's3cret')
+
+    # The upgraded hash keeps working and is not rewritten again
+    assert authenticate('ana', 's3cret', users, hasher, LoginRateLimiter())
+    assert users.updates == [1]
+
+
+def test_wrong_password_and_unknown_user_are_rejected(hasher):
+    users = Users(ana=hasher.hash('s3cret'))
+    limiter = LoginRateLimiter()
+    assert authenticate('ana', 'wrong', users, hasher, limiter) is None
+    assert authenticate('nobody', 's3cret', users, hasher, limiter) is None
+    assert users.updates == []
+
+
+def test_limiter_blocks_inside_the_window(clock):
+    limiter = LoginRateLimiter(max_attempts=3, window=60)
+    for _ in range(3):
+        limiter.check('Ana')
+    clock[0] += 20
+    with pytest.raises(LoginThrottled) as raised:
+        limiter.check(' ana ')
+    assert raised.value.retry_after == pytest.approx(40)
+    limiter.check('other')
+
+
+def test_limiter_window_slides(clock):
+    limiter = LoginRateLimiter(max_attempts=2, window=60)
+    limiter.check('ana')
+    clock[0] += 30
+    limiter.check('ana')
+    clock[0] += 31
+    # The first attempt has left the window
+    limiter.check('ana')
+    with pytest.raises(LoginThrottled):
+        limiter.check('ana')
+
+
+def test_expired_usernames_are_pruned_as_checks_go_by(clock, monkeypatch):
+    monkeypatch.setattr(LoginRateLimiter, '_PRUNE_EVERY', 10)
+    limiter = LoginRateLimiter(max_attempts=10, window=60)
+    for n in range(5):
+        limiter.check(f"made-up-{n}")
+    clock[0] += 61
+    for _ in range(5):
+        limiter.check('ana')
+    assert list(limiter._attempts) == ['ana']
+
+
+def test_successful_login_resets_the_window(hasher, clock):
+    users = Users(ana=hasher.hash('s3cret'))
+    limiter = LoginRateLimiter(max_attempts=2, window=60)
+    assert authenticate('ana', 'wrong', users, hasher, limiter) is None
+    assert authenticate('ana', 's3cret', users, hasher, limiter)
+    assert authenticate('ana', 'wrong', users, hasher, limiter) is None
+    assert authenticate('ana', 's3cret', users, hasher, limiter)
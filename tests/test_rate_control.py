@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from utils import rate_control
+from utils.rate_control import AdaptiveController, CircuitBreaker, CircuitOpen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Module time that only moves when the test says so."""
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(rate_control, 'time', SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def respond(controller, status_code, latency=0.0, clock=None, retry_after=None):
+    with controller.request() as call:
+        if clock is not None:
+            clock.t += latency
+        call.observe(status_code, retry_after)
+
+
+def test_fast_successes_raise_the_limit_additively(clock):
+    controller = AdaptiveController('t', max_limit=4, initial_limit=2, target_latency=1.0)
+    respond(controller, 200)
+    assert controller.limit == pytest.approx(2.5)
+    for _ in range(50):
+        respond(controller, 200)
+    assert controller.limit == 4
+
+
+def test_overload_halves_the_limit_and_pauses(clock):
+    controller = AdaptiveController('t', max_limit=8, initial_limit=8)
+    respond(controller, 429, retry_after='30')
+    assert controller.limit == 4
+    assert controller.get_stats()['paused_for'] == 30
+    # Throttling alone never opens the circuit
+    assert controller.breaker.state == CircuitBreaker.CLOSED
+    assert controller.counts['overload'] == 1
+
+
+def test_failures_in_one_round_trip_cut_once(clock):
+    controller = AdaptiveController('t', max_limit=8, initial_limit=8,
+                                    breaker=CircuitBreaker('t', window=100))
+    respond(controller, 503)
+    # Past the backoff pause but still within the same round trip
+    clock.t = controller._paused_until
+    respond(controller, 503)
+    assert controller.limit == 4
+    clock.t = controller._paused_until + 1.0
+    respond(controller, 503)
+    assert controller.limit == 2
+
+
+def test_slow_success_counts_as_congestion(clock):
+    controller = AdaptiveController('t', max_limit=8, initial_limit=8, target_latency=1.0)
+    respond(controller, 200, latency=3.0, clock=clock)
+    assert controller.limit == 4
+    assert controller.srtt == 3.0
+
+
+def test_timeouts_are_errors(clock):
+    controller = AdaptiveController('t', max_limit=8, initial_limit=8)
+    with pytest.raises(requests.Timeout):
+        with controller.request():
+            raise requests.Timeout()
+    assert controller.counts['error'] == 1 and controller.limit == 4
+
+
+def test_timeout_follows_observed_latency(clock):
+    controller = AdaptiveController('t', min_timeout=2.0, max_timeout=10.0, target_latency=5.0)
+    assert controller.timeout() == 10.0
+    for _ in range(20):
+        respond(controller, 200, latency=0.5, clock=clock)
+    assert controller.timeout() == 2.0
+
+
+def test_breaker_opens_on_failure_rate_then_probes(clock):
+    breaker = CircuitBreaker('t', failure_rate=0.5, window=4, open_seconds=10, max_open_seconds=40)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen) as raised:
+        breaker.allow()
+    assert raised.value.retry_after == 10
+
+    clock.t += 10
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+    # A failed probe reopens for twice as long
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.retry_after() == 20
+    clock.t += 20
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow() is False
+
+
+def test_rejected_credentials_trip_the_breaker(clock):
+    controller = AdaptiveController('t', auth_open_seconds=300)
+    respond(controller, 403)
+    assert controller.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        respond(controller, 200)
+    assert controller.counts['short_circuited'] == 1
+
+
+def test_not_found_is_an_answer(clock):
+    controller = AdaptiveController('t', max_limit=8, initial_limit=2, target_latency=1.0)
+    respond(controller, 404)
+    assert controller.counts['ok'] == 1 and controller.limit == 2.5
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.db_backends import _to_numbered, _to_qmark
+from utils.repository import CallRepository, CaseRepository, UserRepository
+
+
+def case(number, **fields):
+    return {'number': number, 'a_number': number, 'status': 'Positivo', 'first_name': 'Ana',
+            'last_name': 'Ruiz', 'court_address': 'Calle 1', 'court_phone': '555', 'created_by': 1, **fields}
+
+
+def event(event_id, call_uuid, status, at, **fields):
+    return {'event_id': event_id, 'call_uuid': call_uuid, 'status': status,
+            'occurred_at': f"2026-01-01 10:00:{at:02d}", **fields}
+
+
+def test_placeholders_are_translated_per_dialect():
+    sql = "SELECT * FROM t WHERE a = %s AND b = %(name)s AND c LIKE '10%%'"
+    assert _to_qmark(sql) == "SELECT * FROM t WHERE a = ? AND b = :name AND c LIKE '10%'"
+    assert _to_numbered("UPDATE t SET a = %s WHERE id = %s") == "UPDATE t SET a = $1 WHERE id = $2"
+
+
+def test_session_rolls_back_on_error(backend):
+    with pytest.raises(RuntimeError):
+        with backend.session() as s:
+            s.insert("INSERT INTO users (username, password_hash) VALUES (%s, %s)", ('ana', 'h'))
+            raise RuntimeError('abort')
+    assert backend.fetch_one("SELECT COUNT(*) AS n FROM users")['n'] == 0
+
+
+def test_users_round_trip(backend):
+    users = UserRepository(backend)
+    user_id = users.create('ana', 'hash', 'ana@example.com', role='agent')
+    assert users.get_by_username('ana')['id'] == user_id
+    users.update_password_hash(user_id, 'new-hash')
+    assert users.get_by_id(user_id)['password_hash'] == 'new-hash'
+
+
+def test_case_insert_derives_is_positive(backend):
+    cases = CaseRepository(backend)
+    positive = cases.insert(case('000000001'))
+    negative = cases.insert(case('000000002', status='Negativo'))
+    assert cases.get(positive)['is_positive'] == 1
+    assert cases.get(negative)['is_positive'] == 0
+    assert [row['id'] for row in cases.list_by_user(1)] and cases.list_by_user(2) == []
+
+
+def test_case_update_only_by_its_owner(backend):
+    cases = CaseRepository(backend)
+    case_id = cases.insert(case('000000001'))
+    assert not cases.update(case_id, 2, {'first_name': 'Eva'})
+    assert not cases.update(case_id, 1, {'created_by': 2})
+    assert cases.update(case_id, 1, {'status': 'Negativo', 'first_name': 'Eva'})
+    row = cases.get(case_id)
+    assert (row['first_name'], row['is_positive'], row['created_by']) == ('Eva', 0, 1)
+
+
+def test_phone_calls_follow_the_latest_state_event(backend):
+    calls = CallRepository(backend)
+    calls.add_events([
+        event('e1', 'c1', 'initiated', 0, phone_number='555'),
+        event('e2', 'c1', 'note', 5, notes='buzón de voz'),
+    ])
+    calls.add_events([event('e3', 'c1', 'successful', 9, duration=42)])
+    rows = backend.fetch_all("SELECT * FROM phone_calls")
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row['call_status'], row['call_duration'], row['call_notes']) == ('successful', 42, 'buzón de voz')
+    assert row['call_date'] == '2026-01-01 10:00:00'
+
+
+def test_projection_keeps_the_callers_user_id(backend):
+    calls = CallRepository(backend)
+    calls.add_events([event('e1', 'c1', 'initiated', 0, user_id=7), event('e2', 'c1', 'ringing', 1)])
+    # A later batch without a user_id does not clear it
+    calls.add_events([event('e3', 'c1', 'successful', 5, duration=4)])
+    assert backend.fetch_one("SELECT user_id FROM phone_calls WHERE call_uuid = 'c1'")['user_id'] == 7
+
+
+def test_replayed_events_are_not_duplicated(backend):
+    calls = CallRepository(backend)
+    batch = [event('e1', 'c1', 'initiated', 0), event('e2', 'c1', 'successful', 3, duration=10)]
+    calls.add_events(batch)
+    calls.add_events(batch)
+    assert backend.fetch_one("SELECT COUNT(*) AS n FROM call_events")['n'] == 2
+    assert calls.get_metrics()['total_searches'] == 1
+
+
+def test_call_metrics_and_status_counts(backend):
+    calls = CallRepository(backend)
+    calls.add_events([
+        event('e1', 'c1', 'successful', 0, duration=10),
+        event('e2', 'c2', 'successful', 1, duration=20),
+        event('e3', 'c3', 'failed', 2, duration=0),
+    ])
+    metrics = calls.get_metrics()
+    assert (metrics['successful_calls'], metrics['success_rate'], metrics['avg_duration']) == (2, 66.67, 10.0)
+    assert {r['call_status']: r['count'] for r in calls.get_status_counts()} == {'successful': 2, 'failed': 1}
+
+
+def test_metrics_of_an_empty_table_are_zero(backend):
+    metrics = CallRepository(backend).get_metrics()
+    assert (metrics['total_searches'], metrics['successful_calls'],
+            metrics['success_rate'], metrics['avg_duration']) == (0, 0, 0, 0)
+
+
+def test_daily_activity_covers_the_last_days(backend):
+    calls = CallRepository(backend)
+
+    def days_ago(days):
+        return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    calls.add_events([
+        event('e1', 'c1', 'successful', 0, occurred_at=days_ago(2)),
+        event('e2', 'c2', 'initiated', 0, occurred_at=days_ago(2)),
+        event('e3', 'c3', 'successful', 0, occurred_at=days_ago(40)),
+    ])
+    rows = calls.get_daily_activity(days=30)
+    assert [(r['searches'], r['calls']) for r in rows] == [(1, 1)]
+    assert len(calls.get_daily_activity(days=60)) == 2
@@ -0,0 +1,86 @@
+import pytest
+
+from utils import repository
+from utils.repository import SearchHistoryRepository
+from utils.search_history import RECENT_PER_SESSION, SearchHistoryLog
+
+
+@pytest.fixture
+def history(backend, monkeypatch):
+    repo = SearchHistoryRepository(backend)
+    monkeypatch.setattr(repository, 'search_history', repo)
+    return repo
+
+
+@pytest.fixture
+def log(history, tmp_path):
+    log = SearchHistoryLog(wal_path=str(tmp_path / 'search_history.wal'), max_batch=100,
+                           flush_interval=60)
+    yield log
+    log.close()
+
+
+def found(status='Positivo'):
+    return {'status': 'success', 'data': {'status': status, 'name': 'Ana Ruiz'}}
+
+
+def add(history, count, user_id=1):
+    history.add_many([
+        {'entry_id': f"e{user_id}-{n}", 'number': str(244206000 + n), 'source': 'eoir',
+         'status': 'not_found', 'searched_at': '2026-01-01 10:00:00', 'searched_by': user_id}
+        for n in range(count)
+    ])
+
+
+def test_record_derives_the_row(log, history):
+    positive = log.record('244206001', 1, found())
+    negative = log.record('244206002', 1, found('Negativo'), source='pdl')
+    missing = log.record('244206003', 1, {'status': 'not_found'})
+    assert positive['eoir_found'] and positive['is_positive']
+    assert not negative['eoir_found'] and not negative['is_positive']
+    assert missing['data'] is None and not missing['eoir_found']
+    assert history.count() == 0
+
+    assert log.flush() == 3
+    assert history.count(1) == 3
+    assert history.latest_for_number('244206001')['is_positive'] == 1
+
+
+def test_replayed_entries_are_not_duplicated(log, history):
+    entry = log.record('244206001', 1, found())
+    log.flush()
+    history.add_many([entry])
+    assert history.count() == 1
+
+
+def test_pages_are_keyset_paginated_newest_first(history):
+    add(history, 7)
+    add(history, 2, user_id=2)
+    first = history.page(1, limit=3)
+    second = history.page(1, limit=3, before=(first[-1]['search_date'], first[-1]['id']))
+    assert [r['id'] for r in first] == sorted((r['id'] for r in first), reverse=True)
+    assert first[-1]['id'] > second[0]['id']
+    assert len(history.page(None, limit=50)) == 9
+    assert [r['number'] for r in history.iter_all(1, batch_size=3)] == \
+        [str(244206000 + n) for n in reversed(range(7))]
+
+
+def test_first_page_shows_unflushed_entries_of_this_session(log, history):
+    add(history, 2)
+    session = {}
+    log.record('244206999', 1, found(), session_state=session)
+    log.record('244206998', 2, found(), session_state=session)
+    page = log.page(1, limit=10, session_state=session)
+    assert page[0]['number'] == '244206999'
+    assert len(page) == 3
+
+    # Once flushed the entry comes from the database, once
+    log.flush()
+    assert len(log.page(1, limit=10, session_state=session)) == 3
+
+
+def test_session_keeps_a_bounded_tail(log):
+    session = {}
+    for n in range(RECENT_PER_SESSION + 5):
+        log.record(str(244206000 + n), 1, {'status': 'not_found'}, session_state=session)
+    assert len(session['recent_searches']) == RECENT_PER_SESSION
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'benchmarks', 'startup_imports.py')
+
+
+def loaded_modules(statement):
+    """Modules present in a fresh interpreter after running ``statement``."""
+    proc = subprocess.run(
+        [sys.executable, '-c', f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return set(proc.stdout.split())
+
+
+def test_utils_package_resolves_exports_lazily():
+    modules = loaded_modules('import utils')
+    assert not modules & {'utils.phone_call', 'utils.supervisor_analytics', 'utils.report_generator'}
+    assert not modules & {'plotly', 'pandas', 'sounddevice', 'soundfile'}
+
+
+def test_main_import_is_within_budget():
+    pytest.importorskip('streamlit')
+    proc = subprocess.run(
+        [sys.executable, SCRIPT, '--check', '--runs', '1'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
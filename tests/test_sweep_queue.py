@@ -0,0 +1,135 @@
+import pytest
+
+from utils.sweep_queue import SweepQueue
+
+
+@pytest.fixture
+def queue(backend):
+    return SweepQueue(backend, lease_seconds=60, max_attempts=2)
+
+
+def expired(queue):
+    """A queue on the same database whose leases are already over when granted."""
+    return SweepQueue(queue.backend, lease_seconds=-60, max_attempts=queue.max_attempts)
+
+
+def sweep(queue, sweep_id):
+    return next(s for s in queue.list_sweeps() if s['id'] == sweep_id)
+
+
+def test_create_sweep_splits_into_chunks(queue):
+    sweep_id = queue.create_sweep(1000, 25, 1, chunk_size=10)
+    chunks = queue.backend.fetch_all(
+        "SELECT start_number, end_number, next_number, status FROM sweep_chunks WHERE sweep_id = %s ORDER BY id",
+        (sweep_id,)
+    )
+    assert [(c['start_number'], c['end_number']) for c in chunks] == [(1000, 1010), (1010, 1020), (1020, 1025)]
+    assert all(c['next_number'] == c['start_number'] and c['status'] == 'pending' for c in chunks)
+
+
+def test_create_sweep_rejects_empty_ranges(queue):
+    with pytest.raises(ValueError):
+        queue.create_sweep(1000, 0, 1)
+
+
+def test_create_sweep_requires_an_owner(queue):
+    with pytest.raises(ValueError):
+        queue.create_sweep(1000, 10, None)
+
+
+def test_claim_hands_out_each_chunk_once(queue):
+    queue.create_sweep(0, 20, 1, chunk_size=10)
+    first = queue.claim('w1')
+    second = queue.claim('w2')
+    assert (first['start_number'], first['lease_owner'], first['attempts']) == (0, 'w1', 1)
+    assert (second['start_number'], second['lease_owner']) == (10, 'w2')
+    assert queue.claim('w3') is None
+
+
+def test_expired_lease_is_taken_over_from_checkpoint(queue):
+    queue.create_sweep(0, 10, 1, chunk_size=10)
+    stale = expired(queue)
+    chunk = stale.claim('w1')
+    assert stale.heartbeat(chunk['id'], 'w1', 4, {'searched': 4})
+    taken = queue.claim('w2')
+    assert taken['id'] == chunk['id']
+    assert taken['next_number'] == 4 and taken['searched'] == 4 and taken['attempts'] == 2
+    # The first worker finds out at its next heartbeat
+    assert not queue.heartbeat(chunk['id'], 'w1', 5, {})
+
+
+def test_heartbeat_keeps_a_live_lease(queue):
+    queue.create_sweep(0, 10, 1, chunk_size=10)
+    chunk = queue.claim('w1')
+    assert queue.heartbeat(chunk['id'], 'w1', 3, {'hits': 1})
+    assert queue.claim('w2') is None
+
+
+def test_release_without_error_does_not_count_an_attempt(queue):
+    queue.create_sweep(0, 10, 1, chunk_size=10)
+    for _ in range(3):
+        chunk = queue.claim('w1')
+        assert chunk['attempts'] == 1
+        assert queue.release(chunk['id'], 'w1', 2, {})
+    assert queue.claim('w1')['next_number'] == 2
+
+
+def test_release_with_error_fails_the_chunk_after_max_attempts(queue):
+    sweep_id = queue.create_sweep(0, 10, 1, chunk_size=10)
+    chunk = queue.claim('w1')
+    assert queue.release(chunk['id'], 'w1', 0, {}, error='boom')
+    assert sweep(queue, sweep_id)['status'] == 'active'
+    chunk = queue.claim('w1')
+    assert chunk['attempts'] == 2
+    assert queue.release(chunk['id'], 'w1', 0, {}, error='boom again')
+    assert queue.claim('w1') is None
+    closed = sweep(queue, sweep_id)
+    assert closed['status'] == 'failed' and closed['finished_at'] is not None
+    assert closed['chunks_failed'] == 1
+
+
+def test_release_by_another_worker_is_ignored(queue):
+    queue.create_sweep(0, 10, 1, chunk_size=10)
+    chunk = queue.claim('w1')
+    assert not queue.release(chunk['id'], 'w2', 5, {})
+
+
+def test_completing_every_chunk_closes_the_sweep(queue):
+    sweep_id = queue.create_sweep(0, 20, 1, chunk_size=10)
+    queue.register_worker('w1')
+    first = queue.claim('w1')
+    second = queue.claim('w1')
+    assert queue.complete(first['id'], 'w1', {'searched': 10, 'hits': 1})
+    assert sweep(queue, sweep_id)['status'] == 'active'
+    assert queue.complete(second['id'], 'w1', {'searched': 10})
+    done = sweep(queue, sweep_id)
+    assert done['status'] == 'done' and done['finished_at'] is not None
+    assert (done['chunks_done'], done['numbers_done'], done['hits']) == (2, 20, 1)
+    assert queue.active_workers()[0]['chunks_done'] == 2
+
+
+def test_lease_expiry_past_max_attempts_fails_and_closes_the_sweep(queue):
+    sweep_id = queue.create_sweep(0, 10, 1, chunk_size=10)
+    stale = expired(queue)
+    stale.claim('w1')
+    stale.claim('w2')
+    assert queue.claim('w3') is None
+    closed = sweep(queue, sweep_id)
+    assert closed['status'] == 'failed' and closed['finished_at'] is not None
+
+
+def test_cancel_drops_open_chunks(queue):
+    sweep_id = queue.create_sweep(0, 20, 7, chunk_size=10)
+    chunk = queue.claim('w1')
+    assert not queue.cancel_sweep(sweep_id, user_id=8)
+    assert queue.cancel_sweep(sweep_id, user_id=7)
+    assert sweep(queue, sweep_id)['status'] == 'cancelled'
+    assert not queue.heartbeat(chunk['id'], 'w1', 5, {})
+    assert queue.claim('w2') is None
+    assert not queue.cancel_sweep(sweep_id)
+
+
+def test_active_workers_uses_last_seen(queue):
+    queue.register_worker('w1')
+    assert [w['worker_id'] for w in queue.active_workers()] == ['w1']
+    assert queue.active_workers(within=-60) == []
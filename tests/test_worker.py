@@ -0,0 +1,72 @@
+import pytest
+
+import worker
+from utils.sweep_queue import SweepQueue
+
+
+class FakeScraper:
+    """Answers from a script: number -> list of statuses, one per lookup."""
+
+    def __init__(self, script):
+        self.script = {number: list(statuses) for number, statuses in script.items()}
+        self.searched = []
+
+    def search(self, number):
+        self.searched.append(number)
+        statuses = self.script.get(number) or ['not_found']
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        return {'status': status, 'error': 'boom' if status == 'error' else None}
+
+    def sweep(self, start, count, delay, stop_flag):
+        for n in range(start, start + count):
+            yield str(n), self.search(str(n))
+
+
+class FakePipeline:
+    def __init__(self):
+        self.submitted = []
+
+    def submit_result(self, number, result, user_id, timeout=None):
+        self.submitted.append(number)
+
+
+@pytest.fixture
+def queue(backend):
+    return SweepQueue(backend, lease_seconds=60, max_attempts=2)
+
+
+@pytest.fixture(autouse=True)
+def quiet_history(monkeypatch):
+    monkeypatch.setattr(worker.search_history_log, 'record', lambda *args, **kwargs: None)
+
+
+def run_one(queue, scraper):
+    sweep_worker = worker.SweepWorker('w1', queue=queue, scraper=scraper, pipeline=FakePipeline(),
+                                      delay=0, heartbeat_interval=0, max_consecutive_errors=3)
+    chunk = queue.claim('w1')
+    sweep_worker.run_chunk(chunk)
+    return queue.backend.fetch_one("SELECT * FROM sweep_chunks WHERE id = %s", (chunk['id'],)), sweep_worker
+
+
+def test_clean_chunk_completes(queue):
+    queue.create_sweep(100, 5, 1, chunk_size=5)
+    chunk, sweep_worker = run_one(queue, FakeScraper({'102': ['success']}))
+    assert chunk['status'] == 'done' and chunk['searched'] == 5 and chunk['hits'] == 1
+    assert sweep_worker.pipeline.submitted == ['102']
+
+
+def test_isolated_error_is_retried_before_completing(queue):
+    queue.create_sweep(100, 5, 1, chunk_size=5)
+    scraper = FakeScraper({'101': ['error', 'success']})
+    chunk, sweep_worker = run_one(queue, scraper)
+    assert chunk['status'] == 'done' and chunk['searched'] == 5 and chunk['errors'] == 1
+    assert scraper.searched.count('101') == 2
+    assert sweep_worker.pipeline.submitted == ['101']
+
+
+def test_unresolved_error_holds_the_checkpoint(queue):
+    queue.create_sweep(100, 5, 1, chunk_size=5)
+    chunk, _ = run_one(queue, FakeScraper({'101': ['error']}))
+    # Later numbers answered fine, but the chunk resumes at the one that never did
+    assert chunk['status'] == 'pending' and chunk['next_number'] == 101
+    assert chunk['attempts'] == 1 and 'still failing' in chunk['last_error']
@@ -1,18 +1,12 @@
-import sqlite3
+from utils.db_backends import SQLiteBackend
+from utils.migrations import MigrationRunner
 
 def update_database():
-    conn = sqlite3.connect('cases_database.db')
-
-    with open('update_schema.sql', 'r') as sql_file:
-        sql_script = sql_file.read()
-
     try:
-        conn.executescript(sql_script)
-        print("Tablas creadas exitosamente")
-    except sqlite3.Error as e:
+        applied = MigrationRunner(SQLiteBackend('cases_database.db')).migrate()
+        print(f"Tablas creadas exitosamente ({len(applied)} migraciones aplicadas)")
+    except Exception as e:
         print(f"Error al crear las tablas: {e}")
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
-    update_database()
\ No newline at end of file
+    update_database()
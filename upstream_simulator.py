@@ -0,0 +1,356 @@
+"""Offline stand-in for EOIR and People Data Labs, for benchmarks and local runs.
+
+    python upstream_simulator.py --port 8900 --hit-rate 0.05 --eoir-ms 150 --eoir-errors 0.01
+
+    EOIR_SIMULATOR=true EOIR_BASE_URL=http://localhost:8900/en/ \\
+    PDL_BASE_URL=http://localhost:8900/v5/person/search \\
+    PDL_API_KEY=simulator-key-0123456789abcdef python worker.py
+
+Routes:
+- ``GET /en/?caseNumber=N``: an EOIR case page with the markup the scrapers
+  parse, or the "No case information found" message. Pages carry an ETag
+  and answer a matching If-None-Match with 304.
+- ``POST /v5/person/search``: PDL-style JSON. Returns 404 when there is no
+  match and 401 when ``--pdl-api-key`` is set and the key doesn't match.
+- ``GET /stats``: responses served per source and outcome.
+- ``GET /health``.
+
+Which numbers are cases, and which of those PDL matches, depends only on
+the number and ``--seed``, so runs are repeatable. With ``--hot-share``,
+that share of regions of ``--region-size`` numbers hit at ``--hot-rate``
+instead, the way real A-numbers cluster. Latency is log-normal around each
+source's median. Errors (500/503), 429s and hangs are injected at the
+given rates. ``--eoir-rps`` / ``--pdl-rps`` cap each source with a
+token bucket and answer 429 with Retry-After past it.
+
+Standard library only, so it runs wherever the benchmarks do.
+"""
+import json
+import math
+import random
+import hashlib
+import argparse
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIRST_NAMES = ['Maria', 'Jose', 'Juan', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Rosa', 'Jorge', 'Elena']
+LAST_NAMES = ['Garcia', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Perez', 'Sanchez']
+CASE_STATUSES = ['En proceso', 'Positivo', 'Pendiente', 'Cerrado']
+COURTS = [
+    ('333 S Miami Ave, Suite 700, Miami, FL 33130', '(305) 789-4221'),
+    ('26 Federal Plaza, 12th Floor, New York, NY 10278', '(917) 454-1040'),
+    ('1545 Hawthorne Blvd, Suite 1100, Houston, TX 77074', '(832) 203-4500'),
+    ('606 S Olive St, 15th Floor, Los Angeles, CA 90014', '(213) 894-2811'),
+]
+
+class SourceProfile:
+    """Latency and fault injection for one simulated source."""
+
+    def __init__(self, median_ms: float = 100.0, sigma: float = 0.5, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, hang_rate: float = 0.0, hang_seconds: float = 30.0,
+                 rate_limit: float = 0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rate_limit = rate_limit
+        self._tokens = max(rate_limit, 1.0)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take_token(self) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._refilled) * self.rate_limit, max(self.rate_limit, 1.0))
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def latency(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms / 1000 * math.exp(self.sigma * rng.gauss(0, 1))
+
+class UpstreamSimulator:
+    """HTTP server simulating both upstreams; ``start()`` runs it on a daemon thread."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, seed: int = 1, hit_rate: float = 0.02,
+                 match_rate: float = 0.6, eoir: Optional[SourceProfile] = None,
+                 pdl: Optional[SourceProfile] = None, pdl_api_key: Optional[str] = None,
+                 hot_share: float = 0.0, hot_rate: float = 0.0, region_size: int = 10000):
+        self.seed = seed
+        self.hit_rate = hit_rate
+        self.hot_share = hot_share
+        self.hot_rate = hot_rate
+        self.region_size = region_size
+        self.match_rate = match_rate
+        self.profiles = {'eoir': eoir or SourceProfile(), 'pdl': pdl or SourceProfile(median_ms=200)}
+        self.pdl_api_key = pdl_api_key
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def eoir_url(self) -> str:
+        return f"{self.url}/en/"
+
+    @property
+    def pdl_url(self) -> str:
+        return f"{self.url}/v5/person/search"
+
+    def start(self) -> 'UpstreamSimulator':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='upstream-simulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {f"{source}.{outcome}": n for (source, outcome), n in sorted(self.stats.items())}
+
+    # ----------------------------------------------------------- behaviour
+    def _fraction(self, kind: str, number: str) -> float:
+        digest = hashlib.sha1(f"{self.seed}:{kind}:{number}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+    def case_rate(self, number: str) -> float:
+        """Hit rate around ``number``: ``hot_rate`` in the hot regions, ``hit_rate`` elsewhere."""
+        if self.hot_share and number.isdigit():
+            region = int(number) // self.region_size
+            if self._fraction('region', str(region)) < self.hot_share:
+                return self.hot_rate
+        return self.hit_rate
+
+    def is_case(self, number: str) -> bool:
+        return self._fraction('case', number) < self.case_rate(number)
+
+    def has_match(self, number: str) -> bool:
+        return self.is_case(number) and self._fraction('match', number) < self.match_rate
+
+    def person(self, number: str) -> Dict[str, Any]:
+        pick = random.Random(f"{self.seed}:{number}")
+        return {
+            'first_name': pick.choice(FIRST_NAMES),
+            'last_name': pick.choice(LAST_NAMES),
+            'status': pick.choice(CASE_STATUSES),
+            'court': pick.choice(COURTS),
+            'phone': f"+1305{pick.randrange(10 ** 7):07d}",
+            'hearing': f"2026-{pick.randint(1, 12):02d}-{pick.randint(1, 28):02d}",
+        }
+
+    def fault(self, source: str) -> Optional[str]:
+        """Decide this request's fate ('throttle', 'error', 'hang' or None) and sleep its latency."""
+        profile = self.profiles[source]
+        if not profile.take_token():
+            return 'rate_limited'
+        with self._rng_lock:
+            roll, latency = self._rng.random(), profile.latency(self._rng)
+        if roll < profile.throttle_rate:
+            return 'throttle'
+        roll -= profile.throttle_rate
+        if roll < profile.error_rate:
+            return 'error'
+        roll -= profile.error_rate
+        if roll < profile.hang_rate:
+            time.sleep(profile.hang_seconds)
+            return 'hang'
+        time.sleep(latency)
+        return None
+
+    def count(self, source: str, outcome: str):
+        with self._stats_lock:
+            self.stats[(source, outcome)] += 1
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def sim(self) -> UpstreamSimulator:
+        return self.server.simulator
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8',
+              headers: Optional[Dict[str, str]] = None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_page(self, source: str, body: str):
+        etag = '"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            self.sim.count(source, 'not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._send(200, body, headers={'ETag': etag})
+
+    def _send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(data), 'application/json', headers)
+
+    def _fail(self, source: str, fault: str) -> bool:
+        """Answer an injected fault; False when the request should be served normally."""
+        if fault is None:
+            return False
+        self.sim.count(source, fault)
+        if fault in ('throttle', 'rate_limited'):
+            rate = self.sim.profiles[source].rate_limit
+            retry_after = str(max(1, math.ceil(1 / rate))) if rate > 0 else '1'
+            self._send_json(429, {'error': 'Too Many Requests'}, {'Retry-After': retry_after})
+        elif fault == 'error':
+            self._send(random.choice((500, 503)), '<html><body>Service Unavailable</body></html>')
+        else:
+            self._send(504, '<html><body>Gateway Timeout</body></html>')
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send_json(200, {'status': 'healthy'})
+        elif url.path == '/stats':
+            self._send_json(200, self.sim.get_stats())
+        elif url.path.rstrip('/') == '/en':
+            self._eoir(parse_qs(url.query).get('caseNumber', [''])[0])
+        else:
+            self._send(404, '<html><body>Not Found</body></html>')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if urlparse(self.path).path != '/v5/person/search':
+            self._send(404, '<html><body>Not Found</body></html>')
+            return
+        self._pdl(body)
+
+    def _eoir(self, number: str):
+        if self._fail('eoir', self.sim.fault('eoir')):
+            return
+        if not self.sim.is_case(number):
+            self.sim.count('eoir', 'not_found')
+            self._send_page('eoir', f'<html><body><div class="error-message">No case information found for {number}.'
+                            f'</div></body></html>')
+            return
+        self.sim.count('eoir', 'hit')
+        person = self.sim.person(number)
+        address, phone = person['court']
+        self._send_page('eoir', f"""<html><body><div class="case-details">
+<div class="case-number">A{number}</div>
+<div class="first-name">{person['first_name']}</div>
+<div class="last-name">{person['last_name']}</div>
+<div class="case-status">{person['status']}</div>
+<div class="court-address">{address}</div>
+<div class="court-phone">{phone}</div>
+<div class="next-hearing">{person['hearing']}</div>
+</div></body></html>""")
+
+    def _pdl(self, body: bytes):
+        if self.sim.pdl_api_key and self.headers.get('X-Api-Key') != self.sim.pdl_api_key:
+            self.sim.count('pdl', 'unauthorized')
+            self._send_json(401, {'status': 401, 'error': {'type': 'authentication_error', 'message': 'Invalid API key'}})
+            return
+        if self._fail('pdl', self.sim.fault('pdl')):
+            return
+        try:
+            query = json.loads(body or b'{}')
+            terms = query['query']['must'][0]['any']
+            number = next(str(value) for term in terms for value in term.values())
+        except (ValueError, KeyError, IndexError, StopIteration):
+            self.sim.count('pdl', 'bad_request')
+            self._send_json(400, {'status': 400, 'error': {'type': 'invalid_request_error', 'message': 'Bad query'}})
+            return
+        if not self.sim.has_match(number):
+            self.sim.count('pdl', 'not_found')
+            self._send_json(404, {'status': 404, 'error': {'type': 'not_found',
+                                                           'message': 'No records were found matching your search'}})
+            return
+        self.sim.count('pdl', 'match')
+        person = self.sim.person(number)
+        first, last = person['first_name'].lower(), person['last_name'].lower()
+        self._send_json(200, {'status': 200, 'total': 1, 'data': [{
+            'id': hashlib.sha1(number.encode()).hexdigest()[:20],
+            'full_name': f"{first} {last}",
+            'first_name': first,
+            'last_name': last,
+            'mobile_phone': person['phone'],
+            'phone_numbers': [person['phone']],
+            'emails': [{'address': f"{first}.{last}{number[-3:]}@example.com", 'type': 'personal'}],
+            'personal_emails': [f"{first}.{last}{number[-3:]}@example.com"],
+            'location_name': 'miami, florida, united states',
+            'location_street_address': f"{int(number[-4:])} nw 7th st",
+        }]})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--hit-rate', type=float, default=0.02, help="share of numbers that are EOIR cases")
+    parser.add_argument('--hot-share', type=float, default=0.0, help="share of regions with --hot-rate instead")
+    parser.add_argument('--hot-rate', type=float, default=0.0)
+    parser.add_argument('--region-size', type=int, default=10000, help="numbers per hot/cold region")
+    parser.add_argument('--match-rate', type=float, default=0.6, help="share of cases PDL has a person for")
+    parser.add_argument('--pdl-api-key', help="reject other keys with 401")
+    for source, median in (('eoir', 100.0), ('pdl', 200.0)):
+        group = parser.add_argument_group(source.upper())
+        group.add_argument(f'--{source}-ms', type=float, default=median, help="median latency")
+        group.add_argument(f'--{source}-sigma', type=float, default=0.5, help="log-normal spread of the latency")
+        group.add_argument(f'--{source}-errors', type=float, default=0.0, help="share answered 500/503")
+        group.add_argument(f'--{source}-throttle', type=float, default=0.0, help="share answered 429")
+        group.add_argument(f'--{source}-hangs', type=float, default=0.0, help="share held for --hang-seconds")
+        group.add_argument(f'--{source}-rps', type=float, default=0.0, help="token-bucket rate limit, 0 = none")
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    args = parser.parse_args()
+
+    def profile(source):
+        return SourceProfile(
+            median_ms=getattr(args, f'{source}_ms'), sigma=getattr(args, f'{source}_sigma'),
+            error_rate=getattr(args, f'{source}_errors'), throttle_rate=getattr(args, f'{source}_throttle'),
+            hang_rate=getattr(args, f'{source}_hangs'), hang_seconds=args.hang_seconds,
+            rate_limit=getattr(args, f'{source}_rps')
+        )
+
+    simulator = UpstreamSimulator(args.host, args.port, args.seed, args.hit_rate, args.match_rate,
+                                  profile('eoir'), profile('pdl'), args.pdl_api_key,
+                                  args.hot_share, args.hot_rate, args.region_size)
+    print("EOIR_SIMULATOR=true")
+    print(f"EOIR_BASE_URL={simulator.eoir_url}")
+    print(f"PDL_BASE_URL={simulator.pdl_url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,24 @@
-from .number_search import number_search_page
-from .phone_call import PhoneCallPage
-from .supervisor_analytics import SupervisorAnalytics
-from .report_generator import ReportGenerator
-from .auth_utils import hash_password, verify_password, check_role
-from .auth_middleware import AuthMiddleware
-from .i18n import I18nManager
-from .user_role import UserRole
-from .session_manager import initialize_session_state
+"""Application helpers.
+
+Names are resolved on first access (PEP 562) so that ``import utils`` or
+``from utils import check_role`` does not pull in the phone, analytics and
+report modules, and with them plotly, pandas and sounddevice.
+"""
+import importlib
+
+_LAZY_ATTRS = {
+    'number_search_page': '.number_search',
+    'PhoneCallPage': '.phone_call',
+    'SupervisorAnalytics': '.supervisor_analytics',
+    'ReportGenerator': '.report_generator',
+    'hash_password': '.auth_utils',
+    'verify_password': '.auth_utils',
+    'check_role': '.auth_utils',
+    'AuthMiddleware': '.auth_middleware',
+    'I18nManager': '.i18n',
+    'UserRole': '.user_role',
+    'initialize_session_state': '.session_manager',
+}
 
 __all__ = [
     'number_search_page',
@@ -17,3 +29,14 @@ __all__ = [
     'verify_password',
     'check_role',
 ]
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -1,9 +1,11 @@
 import logging
 import streamlit as st
-import hashlib
-import os
-import base64
-import hmac
+
+from utils.password_hasher import (
+    authenticate, get_hasher, HasherBusy, LoginThrottled
+)
+from utils.resources import forget_session
+from utils.session_manager import current_session_id
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -12,48 +14,30 @@ logger = logging.getLogger(__name__)
 def hash_password(password: str) -> str:
     """Creates a secure password hash using PBKDF2 with a random salt."""
     try:
-        salt = os.urandom(16)
-        iterations = 100000
-        hash_bytes = hashlib.pbkdf2_hmac(
-            'sha256', 
-            password.encode('utf-8'), 
-            salt,
-            iterations
-        )
-
-        combined = salt + hash_bytes
-        encoded = base64.b64encode(combined).decode('utf-8')
-
-        logger.debug("Password hashed successfully")
-        return encoded
-
+        return get_hasher().hash(password)
+    except HasherBusy:
+        raise
     except Exception as e:
         logger.error(f"Error hashing password: {str(e)}")
         raise RuntimeError("Error creating password hash")
 
 def verify_password(stored_password_hash: str, provided_password: str) -> bool:
-    """Verifies a password against its hash."""
+    """Verifies a password against its hash (PBKDF2 or legacy SHA-256)."""
     try:
-        decoded = base64.b64decode(stored_password_hash.encode('utf-8'))
-        salt = decoded[:16]
-        stored_hash = decoded[16:]
-
-        iterations = 100000
-        calculated_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            provided_password.encode('utf-8'),
-            salt,
-            iterations
-        )
-
-        matches = hmac.compare_digest(calculated_hash, stored_hash)
-        logger.debug("Password verification completed")
-        return matches
-
+        return get_hasher().verify(stored_password_hash, provided_password)
+    except HasherBusy:
+        raise
     except Exception as e:
         logger.error(f"Error verifying password: {str(e)}")
         return False
 
+def login_error_message(error: Exception) -> str:
+    """User-facing text for a throttled or rejected login."""
+    if isinstance(error, LoginThrottled):
+        minutes = max(1, int(error.retry_after // 60) + 1)
+        return f"Demasiados intentos de inicio de sesión. Intente de nuevo en {minutes} minuto(s)."
+    return "El servidor está ocupado. Intente de nuevo en unos segundos."
+
 def check_authentication():
     """Verifies if the user is authenticated in the current session."""
     try:
@@ -130,6 +114,7 @@ def logout():
     try:
         for key in list(st.session_state.keys()):
             del st.session_state[key]
+        forget_session(current_session_id())
         logger.info("User logged out successfully")
         return True
     except Exception as e:
@@ -0,0 +1,256 @@
+import os
+import glob
+import json
+import time
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locks, only this process's own segments are replayed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class BatchWriter:
+    """Buffers rows in memory and flushes them in batches from a background thread.
+
+    Rows are appended to an optional write-ahead file before they are buffered,
+    so rows that were accepted but not yet flushed survive a process crash and
+    are replayed the next time the writer is created.
+
+    Several processes (the app, worker.py, scrapy crawls) can share one
+    ``wal_path``: each writes its own ``<wal_path>.<host>-<pid>`` segment and
+    holds a lock on ``<segment>.lock`` while it lives. At startup a writer
+    adopts the segments of owners whose lock is free (they died), under
+    ``<wal_path>.lock`` so two starting processes don't adopt the same rows.
+    """
+
+    def __init__(self, name: str, flush_fn: Callable[[List[Dict[str, Any]]], None],
+                 max_batch: int = 200, flush_interval: float = 2.0,
+                 wal_path: Optional[str] = None):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.wal_base = wal_path
+        self.wal_path = f"{wal_path}.{socket.gethostname()}-{os.getpid()}" if wal_path else None
+        self._owner_lock = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._wal = None
+        self.stats = {
+            'appended': 0,
+            'flushed': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'replayed': 0,
+            'last_error': None
+        }
+
+        if self.wal_path:
+            self._replay_wal()
+            if self._buffer:
+                self._ensure_started()
+
+    # ------------------------------------------------------------------ WAL
+    def _open_wal(self):
+        if self._wal is None:
+            directory = os.path.dirname(self.wal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+        return self._wal
+
+    def _write_wal(self, rows: List[Dict[str, Any]]):
+        wal = self._open_wal()
+        for row in rows:
+            wal.write(json.dumps(row, default=str) + '\n')
+        wal.flush()
+
+    def _lock_file(self, path: str, blocking: bool = True):
+        """An open file holding an exclusive lock on ``path``, or None if someone else holds it."""
+        f = open(path, 'a')
+        if fcntl is None:
+            return f
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            f.close()
+            return None
+        return f
+
+    def _orphans(self) -> List[List[str]]:
+        """Segment files left by dead writers, grouped per writer; locks are held until deleted."""
+        groups = [[self.wal_path + '.flushing', self.wal_path],
+                  # Written before segments were per process
+                  [self.wal_base + '.flushing', self.wal_base]]
+        if fcntl is None:
+            return groups
+        for lock_path in glob.glob(glob.escape(self.wal_base) + '.*.lock'):
+            segment = lock_path[:-len('.lock')]
+            if segment == self.wal_path:
+                continue
+            held = self._lock_file(lock_path, blocking=False)
+            if held is None:
+                continue  # owner alive
+            self._adopted_locks.append((held, lock_path))
+            groups.append([segment + '.flushing', segment])
+        return groups
+
+    def _replay_wal(self):
+        """Load rows left behind by previous processes into the buffer."""
+        directory = os.path.dirname(self.wal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._owner_lock = self._lock_file(self.wal_path + '.lock')
+        self._adopted_locks = []
+        replay_lock = self._lock_file(self.wal_base + '.lock')
+        try:
+            paths = [path for group in self._orphans() for path in group if os.path.exists(path)]
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self._buffer.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            # A torn last line from a crash mid-write is expected
+                            logger.warning(f"{self.name}: skipping corrupt WAL line")
+            if self._buffer:
+                self.stats['replayed'] = len(self._buffer)
+                logger.info(f"{self.name}: replaying {len(self._buffer)} rows from {len(paths)} WAL segment(s)")
+                # Consolidate everything into this process's segment before removing the others
+                with open(self.wal_path + '.tmp', 'w', encoding='utf-8') as f:
+                    for row in self._buffer:
+                        f.write(json.dumps(row, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(self.wal_path + '.tmp', self.wal_path)
+            for path in paths:
+                if path != self.wal_path:
+                    os.remove(path)
+            for held, lock_path in self._adopted_locks:
+                os.remove(lock_path)
+                held.close()
+        finally:
+            replay_lock.close()
+            self._adopted_locks = []
+
+    def _rotate_wal(self) -> Optional[str]:
+        """Move the current WAL segment aside so new appends go to a fresh file."""
+        if not self.wal_path:
+            return None
+        if self._wal is not None:
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._wal.close()
+            self._wal = None
+        if not os.path.exists(self.wal_path):
+            return None
+        segment = self.wal_path + '.flushing'
+        os.replace(self.wal_path, segment)
+        return segment
+
+    # -------------------------------------------------------------- buffer
+    def append(self, row: Dict[str, Any]):
+        """Accept a row for writing. Never touches the database."""
+        with self._lock:
+            if self.wal_path:
+                self._write_wal([row])
+            self._buffer.append(row)
+            self.stats['appended'] += 1
+            full = len(self._buffer) >= self.max_batch
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write all buffered rows through ``flush_fn``. Returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                rows, self._buffer = self._buffer, []
+                segment = self._rotate_wal()
+
+            try:
+                for start in range(0, len(rows), self.max_batch):
+                    self.flush_fn(rows[start:start + self.max_batch])
+                    self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['failed_batches'] += 1
+                self.stats['last_error'] = str(e)
+                logger.error(f"{self.name}: batch flush failed, keeping {len(rows)} rows: {e}")
+                with self._lock:
+                    # Put the rows back in front and make them durable again
+                    self._buffer = rows + self._buffer
+                    if self.wal_path:
+                        self._write_wal(rows)
+                if segment:
+                    os.remove(segment)
+                return 0
+
+            if segment:
+                os.remove(segment)
+            self.stats['flushed'] += len(rows)
+            return len(rows)
+
+    # -------------------------------------------------------------- thread
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"batch-writer-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"{self.name}: unexpected flush error: {e}")
+                time.sleep(self.flush_interval)
+
+    def close(self, timeout: float = 10.0):
+        """Stop the background thread and flush whatever is left."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        with self._lock:
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+            if self._owner_lock is not None and not self._buffer:
+                # Everything is in the database; leave nothing for others to adopt
+                for path in (self.wal_path, self.wal_path + '.lock'):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._owner_lock.close()
+                self._owner_lock = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['pending'] = self.pending()
+        return stats
@@ -0,0 +1,337 @@
+import random
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    NUMBER_BLOCK_DIGITS, NUMBER_SEED_BLOCK, BLOCK_PRIOR_RATE, BLOCK_PRIOR_STRENGTH, BLOCK_NEIGHBOURHOOD,
+    BLOCK_EXPLORE_CANDIDATES, BLOCK_STATS_REFRESH_INTERVAL
+)
+from utils.db_backends import DatabaseBackend, get_backend
+from utils.known_numbers import normalize_a_number
+
+logger = logging.getLogger(__name__)
+
+class _Block:
+    """Lookups seen in one block: ``observed`` from results, ``taken`` also counts numbers handed out."""
+
+    __slots__ = ('observed', 'taken', 'searched', 'hits', 'handed_out', 'cursor')
+
+    def __init__(self, size: int):
+        self.observed = bytearray((size + 7) // 8)
+        self.taken = bytearray((size + 7) // 8)
+        self.searched = 0
+        self.hits = 0
+        self.handed_out = 0
+        self.cursor = 0
+
+    @staticmethod
+    def _has(bits: bytearray, offset: int) -> bool:
+        return bool(bits[offset >> 3] & (1 << (offset & 7)))
+
+    @staticmethod
+    def _set(bits: bytearray, offset: int):
+        bits[offset >> 3] |= 1 << (offset & 7)
+
+    def observe(self, offset: int, hit: bool) -> bool:
+        if self._has(self.observed, offset):
+            return False
+        self._set(self.observed, offset)
+        if not self._has(self.taken, offset):
+            self._set(self.taken, offset)
+            self.handed_out += 1
+        self.searched += 1
+        self.hits += hit
+        return True
+
+    def take(self, offset: int) -> bool:
+        if self._has(self.taken, offset):
+            return False
+        self._set(self.taken, offset)
+        self.handed_out += 1
+        return True
+
+class BlockScheduler:
+    """Decides which A-number blocks to search next, from where hits have come from.
+
+    Numbers are grouped in blocks of ``10**block_digits`` (the old fixed
+    prefix walk used blocks of 1000). Each block's hit rate gets a Beta
+    posterior. The prior for a block is the distance-weighted hit rate of its
+    ``neighbourhood`` blocks on each side, shrunk towards the global rate, so
+    the blocks next to a productive one start out promising. ``prior_strength``
+    lookups' worth of evidence moves a block away from it.
+
+    Each draw is a Thompson sample: one rate is sampled from every candidate
+    block's posterior and the highest wins. Candidates are the blocks with
+    hits and their neighbourhoods, plus a few random blocks per draw, so
+    effort goes mostly to productive areas and some to the unknown. A block
+    stops being a candidate once every number in it is taken.
+
+    History is read incrementally from ``search_history`` (EOIR results) and
+    ``cases.a_number``, as ``KnownNumbers`` does. ``observe`` adds results
+    from this process straight away; numbers seen twice count once.
+    """
+
+    _SCAN_BATCH = 50000
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None, block_digits: int = NUMBER_BLOCK_DIGITS,
+                 prior_rate: float = BLOCK_PRIOR_RATE, prior_strength: float = BLOCK_PRIOR_STRENGTH,
+                 neighbourhood: int = BLOCK_NEIGHBOURHOOD, explore: int = BLOCK_EXPLORE_CANDIDATES,
+                 seed_block: int = NUMBER_SEED_BLOCK, refresh_interval: float = BLOCK_STATS_REFRESH_INTERVAL,
+                 redraw_every: int = 10, rng: Optional[random.Random] = None):
+        self._backend = backend
+        self.block_size = 10 ** block_digits
+        self.num_blocks = 10 ** (9 - block_digits)
+        self.prior_rate = prior_rate
+        self.prior_strength = prior_strength
+        self.neighbourhood = neighbourhood
+        self.explore = explore
+        self.seed_block = seed_block
+        self.refresh_interval = refresh_interval
+        self.rng = rng or random.Random()
+        self._blocks: Dict[int, _Block] = {}
+        self._searched = 0
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._cases_watermark = 0
+        self._history_watermark = 0
+        self._last_refresh = 0.0
+        self.redraw_every = redraw_every
+        self._current: Optional[int] = None
+        self._current_left = 0
+        self.stats = {'draws': 0, 'handed_out': 0, 'exhausted_draws': 0}
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    # ------------------------------------------------------------- evidence
+    def _split(self, value: Any) -> Optional[Tuple[int, int]]:
+        number = normalize_a_number(value)
+        if number is None:
+            return None
+        return divmod(int(number), self.block_size)
+
+    def _block(self, block: int) -> _Block:
+        entry = self._blocks.get(block)
+        if entry is None:
+            entry = self._blocks[block] = _Block(self.block_size)
+        return entry
+
+    def _observe_all(self, results: Iterable[Tuple[Any, bool]]):
+        for value, hit in results:
+            split = self._split(value)
+            if split is None:
+                continue
+            if self._block(split[0]).observe(split[1], bool(hit)):
+                self._searched += 1
+                self._hits += bool(hit)
+
+    def observe(self, number: Any, hit: bool):
+        """Record an EOIR result (found or not) from this process."""
+        with self._lock:
+            self._observe_all(((number, hit),))
+
+    def _scan(self, sql: str, watermark: int, result: Callable[[Dict[str, Any]], Optional[Tuple[Any, bool]]]) -> int:
+        while True:
+            rows = self.backend.fetch_all(sql, (watermark, self._SCAN_BATCH))
+            if not rows:
+                return watermark
+            with self._lock:
+                self._observe_all(r for r in map(result, rows) if r is not None)
+            watermark = rows[-1]['id']
+
+    @staticmethod
+    def _history_result(row: Dict[str, Any]) -> Optional[Tuple[Any, bool]]:
+        # Errors say nothing about the number; rows from before 0006 have no status
+        if row['status'] not in (None, 'success', 'not_found'):
+            return None
+        return row['number'], bool(row['eoir_found'])
+
+    def refresh(self, force: bool = False):
+        """Read results added since the last scan (by any process)."""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=force):
+            return
+        try:
+            self._last_refresh = now
+            self._history_watermark = self._scan(
+                "SELECT id, number, eoir_found, status FROM search_history "
+                "WHERE id > %s AND source = 'eoir' ORDER BY id LIMIT %s",
+                self._history_watermark, self._history_result
+            )
+            self._cases_watermark = self._scan(
+                "SELECT id, a_number FROM cases WHERE id > %s ORDER BY id LIMIT %s",
+                self._cases_watermark, lambda row: (row['a_number'], True)
+            )
+        except Exception as e:
+            logger.error(f"Could not refresh block statistics: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    # ---------------------------------------------------------------- model
+    def _global_rate(self) -> float:
+        k = self.prior_strength
+        return (self._hits + self.prior_rate * k) / (self._searched + k)
+
+    def _posterior(self, block: int, global_rate: float) -> Tuple[float, float]:
+        hits = searched = 0.0
+        for distance in range(1, self.neighbourhood + 1):
+            weight = 1.0 / (1 + distance)
+            for neighbour in (block - distance, block + distance):
+                entry = self._blocks.get(neighbour)
+                if entry is not None:
+                    hits += weight * entry.hits
+                    searched += weight * entry.searched
+        k = self.prior_strength
+        mean = (hits + global_rate * k) / (searched + k)
+        entry = self._blocks.get(block)
+        own_hits, own_searched = (entry.hits, entry.searched) if entry is not None else (0, 0)
+        return mean * k + own_hits, (1 - mean) * k + own_searched - own_hits
+
+    def _open(self, block: int) -> bool:
+        if not 0 <= block < self.num_blocks:
+            return False
+        entry = self._blocks.get(block)
+        return entry is None or entry.handed_out < self.block_size
+
+    def _candidates(self) -> set:
+        # Blocks with only misses away from any hit are left to the random picks
+        candidates = set()
+        for block, entry in self._blocks.items():
+            if entry.hits:
+                candidates.update(range(block - self.neighbourhood, block + self.neighbourhood + 1))
+        if not candidates:
+            candidates.add(self.seed_block)
+        candidates.update(self.rng.randrange(self.num_blocks) for _ in range(self.explore))
+        return {block for block in candidates if self._open(block)}
+
+    def _sample_block(self, candidates: Optional[set] = None) -> Optional[int]:
+        global_rate = self._global_rate()
+        best, best_draw = None, -1.0
+        for block in candidates if candidates is not None else self._candidates():
+            draw = self.rng.betavariate(*self._posterior(block, global_rate))
+            if draw > best_draw:
+                best, best_draw = block, draw
+        self.stats['draws'] += 1
+        return best
+
+    # ------------------------------------------------------------ decisions
+    def _take_offset(self, entry: _Block, random_offset: bool) -> Optional[int]:
+        if random_offset:
+            for _ in range(32):
+                offset = self.rng.randrange(self.block_size)
+                if entry.take(offset):
+                    return offset
+        while entry.cursor < self.block_size:
+            offset, entry.cursor = entry.cursor, entry.cursor + 1
+            if entry.take(offset):
+                return offset
+        # Cursor ran off the end; random picks may have left gaps behind it
+        for offset in range(self.block_size):
+            if entry.take(offset):
+                return offset
+        return None
+
+    def next_number(self, random_offset: bool = False, is_new: Optional[Callable[[str], bool]] = None,
+                    max_draws: int = 100) -> Optional[str]:
+        """Next number to search: a Thompson-sampled block, then its next free number.
+
+        ``random_offset`` picks a random free number in the block instead of
+        the next one. ``is_new(number)`` can veto numbers known elsewhere (the
+        known-numbers filter, the session's own list); vetoed numbers count as
+        taken. The block is redrawn every ``redraw_every`` numbers rather than
+        on every call, which keeps sampling all candidates off the hot path.
+        """
+        self.refresh()
+        with self._lock:
+            for _ in range(max_draws):
+                if self._current is None or self._current_left <= 0:
+                    self._current, self._current_left = self._sample_block(), self.redraw_every
+                    if self._current is None:
+                        return None
+                block = self._current
+                self._current_left -= 1
+                entry = self._block(block)
+                offset = self._take_offset(entry, random_offset)
+                if offset is None:
+                    self.stats['exhausted_draws'] += 1
+                    self._current = None
+                    continue
+                number = str(block * self.block_size + offset).zfill(9)
+                if is_new is not None and not is_new(number):
+                    continue
+                self.stats['handed_out'] += 1
+                return number
+        return None
+
+    def plan(self, budget: int, step: int = 100) -> List[Tuple[int, int]]:
+        """Split ``budget`` lookups into sweep ranges ``(start_number, count)``.
+
+        One Thompson draw per ``step`` lookups, so the budget spreads over the
+        blocks in proportion to how likely each is to be the most productive.
+        Each range continues its block from its cursor. The numbers are marked
+        taken, so the next plan moves on. Numbers already known inside a range
+        are skipped by the sweep itself.
+        """
+        self.refresh()
+        ranges: List[List[int]] = []
+        last: Dict[int, List[int]] = {}
+        with self._lock:
+            candidates = self._candidates()
+            remaining = budget
+            while remaining > 0 and candidates:
+                block = self._sample_block(candidates)
+                entry = self._block(block)
+                if entry.cursor >= self.block_size:
+                    # Only gaps behind the cursor are left (random picks); walk again
+                    entry.cursor = 0
+                first, taken = entry.cursor, 0
+                while taken < min(step, remaining) and entry.cursor < self.block_size:
+                    offset, entry.cursor = entry.cursor, entry.cursor + 1
+                    taken += entry.take(offset)
+                start = block * self.block_size + first
+                span = last.get(block)
+                if span is not None and span[0] + span[1] == start:
+                    span[1] += entry.cursor - first
+                else:
+                    span = last[block] = [start, entry.cursor - first]
+                    ranges.append(span)
+                remaining -= taken
+                if entry.handed_out >= self.block_size:
+                    candidates.discard(block)
+        return sorted((start, count) for start, count in ranges)
+
+    # ---------------------------------------------------------------- stats
+    def top_blocks(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Blocks with the highest posterior mean hit rate."""
+        self.refresh()
+        with self._lock:
+            global_rate = self._global_rate()
+            rows = []
+            for block in self._candidates():
+                alpha, beta = self._posterior(block, global_rate)
+                entry = self._blocks.get(block)
+                rows.append({
+                    'block': block,
+                    'first_number': str(block * self.block_size).zfill(9),
+                    'searched': entry.searched if entry else 0,
+                    'hits': entry.hits if entry else 0,
+                    'expected_per_1000': round(1000 * alpha / (alpha + beta), 1),
+                })
+        rows.sort(key=lambda row: row['expected_per_1000'], reverse=True)
+        return rows[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'blocks': len(self._blocks),
+                'searched': self._searched,
+                'hits': self._hits,
+                'hits_per_1000': round(1000 * self._hits / self._searched, 2) if self._searched else None,
+                **self.stats,
+            }
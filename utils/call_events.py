@@ -0,0 +1,78 @@
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import CALL_EVENTS_WAL, CALL_EVENTS_BATCH_SIZE, CALL_EVENTS_FLUSH_INTERVAL
+from utils.batch_writer import BatchWriter
+from utils.live_feed import live_feed
+
+logger = logging.getLogger(__name__)
+
+class CallStatus:
+    INITIATED = "initiated"
+    IN_PROGRESS = "in_progress"
+    ON_HOLD = "on_hold"
+    NOTE = "note"
+    ENDED = "ended"
+
+def _flush_call_events(events):
+    # Imported lazily so the call UI never waits on a database driver import
+    from utils.repository import calls
+    calls.add_events(events)
+
+class CallEventLog:
+    """Append-only log of call state changes.
+
+    ``record`` only appends to a local write-ahead file and an in-memory buffer;
+    a background thread writes the events to ``call_events`` in batches and
+    refreshes the derived ``phone_calls`` rows.
+    """
+
+    def __init__(self, wal_path: Optional[str] = CALL_EVENTS_WAL,
+                 max_batch: int = CALL_EVENTS_BATCH_SIZE,
+                 flush_interval: float = CALL_EVENTS_FLUSH_INTERVAL):
+        self.writer = BatchWriter(
+            'call_events',
+            _flush_call_events,
+            max_batch=max_batch,
+            flush_interval=flush_interval,
+            wal_path=wal_path
+        )
+
+    @staticmethod
+    def new_call_id() -> str:
+        return str(uuid.uuid4())
+
+    def record(self, call_uuid: str, status: str, phone_number: Optional[str] = None,
+               user_id: Optional[int] = None, search_id: Optional[int] = None,
+               duration: int = 0, notes: Optional[str] = None) -> Dict[str, Any]:
+        event = {
+            'event_id': str(uuid.uuid4()),
+            'call_uuid': call_uuid,
+            'search_id': search_id,
+            'user_id': user_id,
+            'phone_number': phone_number,
+            'status': status,
+            'duration': int(duration or 0),
+            'notes': notes,
+            'occurred_at': datetime.now().isoformat()
+        }
+        self.writer.append(event)
+        live_feed.publish('call', call_uuid=call_uuid, status=status, user_id=user_id, duration=event['duration'])
+        logger.debug(f"Call event recorded: {call_uuid} -> {status}")
+        return event
+
+    def flush(self) -> int:
+        return self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.writer.get_stats()
+
+def get_call_event_log() -> CallEventLog:
+    """The process's event log, created (and its WAL replayed) on first use."""
+    from utils.resources import resources
+    return resources.shared('call_event_log', CallEventLog, close=lambda log: log.close())
@@ -0,0 +1,378 @@
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config import (
+    CASE_PIPELINE_QUEUE_SIZE, CASE_PIPELINE_EOIR_WORKERS, CASE_PIPELINE_PDL_WORKERS,
+    CASE_PIPELINE_BATCH_SIZE, CASE_PIPELINE_BATCH_TIMEOUT, CASE_PIPELINE_SUBMIT_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+class Stage:
+    """One step of a pipeline: a bounded input queue and ``workers`` tasks.
+
+    ``handler`` is a blocking function run in the pipeline's thread pool. It
+    gets one item (or a list of up to ``batch_size`` items when batching) and
+    returns the item(s) for the next stage; ``None`` drops an item. When the
+    input queue is full, the stage before it waits, so a slow stage slows
+    the producers instead of growing memory; ``blocked_seconds`` is how long
+    they waited on this stage.
+    """
+
+    THROUGHPUT_WINDOW = 60.0  # seconds
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], workers: int = 1,
+                 queue_size: int = CASE_PIPELINE_QUEUE_SIZE, batch_size: int = 1,
+                 batch_timeout: float = CASE_PIPELINE_BATCH_TIMEOUT):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue: Optional[asyncio.Queue] = None
+        self.busy = 0
+        self.stats = {'received': 0, 'processed': 0, 'emitted': 0, 'dropped': 0, 'errors': 0,
+                      'busy_seconds': 0.0, 'blocked_seconds': 0.0, 'last_error': None}
+        self._completed: Deque[float] = deque(maxlen=10000)
+
+    async def _next_batch(self) -> List[Any]:
+        items = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_timeout
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    def record(self, items: int, outputs: int, elapsed: float, failed: bool = False):
+        now = time.monotonic()
+        self.stats['processed'] += items
+        self.stats['emitted'] += outputs
+        if not failed:
+            self.stats['dropped'] += max(items - outputs, 0)
+        self.stats['busy_seconds'] += elapsed
+        self._completed.extend([now] * items)
+
+    def throughput(self) -> float:
+        """Items per second over the last minute."""
+        cutoff = time.monotonic() - self.THROUGHPUT_WINDOW
+        while self._completed and self._completed[0] < cutoff:
+            self._completed.popleft()
+        return len(self._completed) / self.THROUGHPUT_WINDOW
+
+    def get_stats(self) -> Dict[str, Any]:
+        processed = self.stats['processed']
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'busy': self.busy,
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'queue_size': self.queue_size,
+            'throughput': round(self.throughput(), 2),
+            'avg_ms': round(self.stats['busy_seconds'] * 1000 / processed, 1) if processed else 0.0,
+            **{k: v for k, v in self.stats.items() if k != 'busy_seconds'},
+            'blocked_seconds': round(self.stats['blocked_seconds'], 2),
+        }
+
+class Pipeline:
+    """Stages connected by bounded queues, running on the background loop.
+
+    Producers in other threads call ``submit``, which blocks while the first
+    queue is full (up to ``timeout``). Each stage's handlers run in a thread
+    pool sized to the total number of workers, so blocking HTTP and database
+    calls never stall the loop.
+    """
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = stages
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started = False
+        self.rejected = 0
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            from utils.event_loop import background_loop
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=sum(stage.workers for stage in self.stages),
+                thread_name_prefix=self.name
+            )
+            background_loop.run_sync(self._start())
+            # Finish queued work before the loop goes away at exit
+            background_loop.on_shutdown(self._stop)
+            self._started = True
+
+    async def _start(self):
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+        for index, stage in enumerate(self.stages):
+            downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for n in range(stage.workers):
+                self._tasks.append(asyncio.ensure_future(self._work(stage, downstream)))
+
+    async def _work(self, stage: Stage, downstream: Optional[Stage]):
+        loop = asyncio.get_running_loop()
+        while True:
+            if stage.batch_size > 1:
+                items = await stage._next_batch()
+                payload = items
+            else:
+                items = [await stage.queue.get()]
+                payload = items[0]
+
+            stage.busy += 1
+            started = time.monotonic()
+            try:
+                result = await loop.run_in_executor(self._executor, stage.handler, payload)
+                if stage.batch_size > 1:
+                    outputs = [item for item in (result or []) if item is not None]
+                else:
+                    outputs = [] if result is None else [result]
+                stage.record(len(items), len(outputs), time.monotonic() - started)
+            except Exception as e:
+                outputs = []
+                stage.stats['errors'] += len(items)
+                stage.stats['last_error'] = str(e)
+                stage.record(len(items), 0, time.monotonic() - started, failed=True)
+                logger.error(f"{self.name}: stage {stage.name} failed on {len(items)} item(s): {e}")
+            finally:
+                stage.busy -= 1
+
+            try:
+                if downstream is not None:
+                    for item in outputs:
+                        await self._put(downstream, item)
+            finally:
+                # Only done once handed on, so draining stage by stage loses nothing
+                for _ in items:
+                    stage.queue.task_done()
+
+    async def _put(self, stage: Stage, item: Any):
+        stage.stats['received'] += 1
+        if stage.queue.full():
+            waited = time.monotonic()
+            await stage.queue.put(item)
+            stage.stats['blocked_seconds'] += time.monotonic() - waited
+        else:
+            stage.queue.put_nowait(item)
+
+    def submit(self, item: Any, timeout: Optional[float] = CASE_PIPELINE_SUBMIT_TIMEOUT) -> bool:
+        """Hand an item to the first stage, waiting while it is full.
+
+        Returns False if there was no room within ``timeout``.
+        """
+        self.start()
+        from utils.event_loop import run_sync
+        try:
+            run_sync(asyncio.wait_for(self._put(self.stages[0], item), timeout), timeout=None)
+            return True
+        except asyncio.TimeoutError:
+            self.stages[0].stats['received'] -= 1
+            self.rejected += 1
+            logger.warning(f"{self.name}: intake full for {timeout}s, item rejected")
+            return False
+
+    async def _stop(self, timeout: float = 10.0):
+        if not self._tasks:
+            return
+
+        async def _drain():
+            for stage in self.stages:
+                await stage.queue.join()
+
+        try:
+            await asyncio.wait_for(_drain(), timeout)
+        except asyncio.TimeoutError:
+            pending = sum(stage.queue.qsize() + stage.busy for stage in self.stages)
+            logger.warning(f"{self.name}: stopping with {pending} item(s) unfinished")
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        self._started = False
+
+    def close(self, timeout: float = 10.0):
+        """Finish queued items (up to ``timeout``), then stop the workers."""
+        if not self._started:
+            return
+        from utils.event_loop import run_sync
+        try:
+            run_sync(self._stop(timeout))
+        except Exception as e:
+            logger.error(f"{self.name}: error stopping workers: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._started,
+            'rejected': self.rejected,
+            'stages': [stage.get_stats() for stage in self.stages],
+        }
+
+# ---------------------------------------------------------------- case stages
+
+def _is_positive(eoir_data: Dict[str, Any]) -> bool:
+    # Same rule the number generator page uses for a single search
+    status = str((eoir_data or {}).get('status') or '').lower()
+    return 'positivo' in status or 'en proceso' in status
+
+def _first(value: Any) -> Optional[str]:
+    """First entry of a PDL list field (strings or dicts with an ``address``/``number``)."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get('address') or value.get('number') or value.get('name')
+    return str(value) if value else None
+
+def build_case(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Case row from an EOIR hit and its (optional) PDL person record.
+
+    Court fields come from EOIR, the client's name and contact details from
+    PDL; anything neither source knows is left blank for the agent to fill
+    in on the case record.
+    """
+    eoir = item.get('eoir_data') or {}
+    person = item.get('pdl_data') or {}
+    phones = [p for p in (person.get('phone_numbers') or []) if p]
+    return {
+        'number': item['number'],
+        'status': 'Positivo' if _is_positive(eoir) else 'Negativo',
+        'first_name': (person.get('first_name') or eoir.get('first_name') or '')[:50],
+        'last_name': (person.get('last_name') or eoir.get('last_name') or '')[:50],
+        'a_number': item['number'],
+        'court_address': eoir.get('court_address') or '',
+        'court_phone': (eoir.get('court_phone') or '')[:20],
+        'client_phone': (person.get('mobile_phone') or _first(phones) or None),
+        'other_client_phone': _first(phones[1:]) if len(phones) > 1 else None,
+        'client_address': person.get('location_street_address') or person.get('location_name'),
+        'client_email': _first(person.get('personal_emails') or person.get('emails')),
+        'created_by': item.get('user_id'),
+    }
+
+class CasePipeline(Pipeline):
+    """Turns EOIR sweep hits into cases without an agent re-typing them.
+
+    Stages, each with its own queue and concurrency:
+
+    ``sweep``      keeps EOIR results that found a case
+    ``eoir``       fetches the case detail (served from the lookup cache when
+                   the sweep just fetched it)
+    ``pdl``        enriches with the PDL person record through the same cache;
+                   failures leave the case unenriched rather than dropping it
+    ``dedup``      drops numbers already stored (one query per batch)
+    ``insert``     writes the batch with a single multi-row INSERT
+    """
+
+    def __init__(self, eoir_scraper=None, pdl_scraper=None, case_repository=None,
+                 eoir_workers: int = CASE_PIPELINE_EOIR_WORKERS, pdl_workers: int = CASE_PIPELINE_PDL_WORKERS,
+                 batch_size: int = CASE_PIPELINE_BATCH_SIZE, queue_size: int = CASE_PIPELINE_QUEUE_SIZE):
+        self._eoir = eoir_scraper
+        self._pdl = pdl_scraper
+        self._cases = case_repository
+        # Numbers recently queued for insert, so a hit repeated while its batch
+        # is still in flight isn't inserted twice
+        self._recent: 'OrderedDict[str, None]' = OrderedDict()
+        self._recent_lock = threading.Lock()
+        super().__init__('case-pipeline', [
+            Stage('sweep', self._accept_hit, workers=1, queue_size=queue_size),
+            Stage('eoir', self._fetch_detail, workers=eoir_workers, queue_size=queue_size),
+            Stage('pdl', self._enrich, workers=pdl_workers, queue_size=queue_size),
+            Stage('dedup', self._dedup, workers=1, queue_size=queue_size, batch_size=batch_size),
+            Stage('insert', self._insert, workers=1, queue_size=queue_size, batch_size=batch_size),
+        ])
+
+    @property
+    def eoir(self):
+        if self._eoir is None:
+            from utils.resources import resources
+            self._eoir = resources.get('eoir_scraper')
+        return self._eoir
+
+    @property
+    def pdl(self):
+        if self._pdl is None:
+            from utils.resources import resources
+            self._pdl = resources.get('pdl_scraper')
+        return self._pdl
+
+    @property
+    def cases(self):
+        if self._cases is None:
+            from utils.repository import cases
+            self._cases = cases
+        return self._cases
+
+    def submit_result(self, number: str, result: Dict[str, Any], user_id: Optional[int],
+                      timeout: Optional[float] = CASE_PIPELINE_SUBMIT_TIMEOUT) -> bool:
+        """Feed one EOIR search result; only hits go further than the first stage."""
+        return self.submit({'number': number, 'eoir_result': result, 'user_id': user_id}, timeout)
+
+    def _accept_hit(self, item):
+        result = item.get('eoir_result') or {}
+        if result.get('status') != 'success':
+            return None
+        if item.get('user_id') is None:
+            # cases.created_by is NOT NULL: one ownerless row would fail its whole insert batch
+            logger.warning(f"EOIR hit {item['number']} has no owner; not creating a case")
+            return None
+        return {'number': item['number'], 'user_id': item.get('user_id'), 'eoir_data': result.get('data')}
+
+    def _fetch_detail(self, item):
+        if item.get('eoir_data'):
+            return item
+        result = self.eoir.search(item['number'])
+        if result.get('status') != 'success':
+            raise RuntimeError(f"EOIR detail for {item['number']}: {result.get('error') or result.get('status')}")
+        return {**item, 'eoir_data': result.get('data') or {}}
+
+    def _enrich(self, item):
+        try:
+            result = self.pdl.search(item['number'])
+        except Exception as e:
+            logger.warning(f"PDL enrichment failed for {item['number']}: {e}")
+            result = {'status': 'error'}
+        return {**item, 'pdl_data': result.get('data') if result.get('status') == 'success' else None}
+
+    def _dedup(self, items):
+        existing = self.cases.existing_numbers([item['number'] for item in items])
+        fresh = []
+        with self._recent_lock:
+            for item in items:
+                number = item['number']
+                if number in existing or number in self._recent:
+                    continue
+                self._recent[number] = None
+                while len(self._recent) > 10000:
+                    self._recent.popitem(last=False)
+                fresh.append(item)
+        return fresh
+
+    def _insert(self, items):
+        cases = [build_case(item) for item in items]
+        try:
+            self.cases.insert_many(cases)
+        except Exception:
+            # _dedup claimed these numbers; a later hit must be able to store them
+            with self._recent_lock:
+                for item in items:
+                    self._recent.pop(item['number'], None)
+            raise
+        return cases
+
+def get_case_pipeline() -> CasePipeline:
+    from utils.resources import resources
+    return resources.get('case_pipeline')
@@ -0,0 +1,176 @@
+import re
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+from utils.db_backends import DatabaseBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r'\D')
+_PHONE_CHARS = re.compile(r'^[\d\s().+-]*\d[\d\s().+-]*$')
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Digits only, without a leading US country code."""
+    digits = _NON_DIGITS.sub('', phone or '')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Smallest string greater than every string starting with ``prefix``
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class CaseSearch:
+    """Indexed search over cases.
+
+    Queries are classified before they reach the database: A-numbers use an
+    exact or prefix lookup, phone numbers are normalized and matched against
+    the digits-only columns, and anything else goes to trigram/full-text
+    search on names and addresses. The indexes are created by migration
+    0005_case_search.
+    """
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def classify(self, query: str) -> str:
+        """Return 'a_number', 'phone', 'prefix' or 'text' for a search query."""
+        query = query.strip()
+        if query[:1] in ('A', 'a') and _PHONE_CHARS.match(query[1:]):
+            return 'a_number' if len(_NON_DIGITS.sub('', query)) == 9 else 'prefix'
+        if not _PHONE_CHARS.match(query):
+            return 'text'
+        digits = normalize_phone(query)
+        if len(digits) == 9:
+            return 'a_number'
+        return 'phone' if len(digits) >= 7 else 'prefix'
+
+    def search(self, query: str, limit: int = 20, created_by: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = (query or '').strip()
+        if not query:
+            return []
+        kind = self.classify(query)
+        started = time.perf_counter()
+
+        if kind == 'a_number':
+            rows = self._search_a_number(query, limit, created_by)
+            if not rows:
+                # A 9-digit value may just as well be a phone without area code
+                rows = self._search_phone(normalize_phone(query), limit, created_by)
+        elif kind == 'phone':
+            rows = self._search_phone(normalize_phone(query), limit, created_by)
+        elif kind == 'prefix':
+            rows = self._search_prefix(_NON_DIGITS.sub('', query), limit, created_by)
+        else:
+            rows = self._search_text(query, limit, created_by)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(f"Case search '{query}' ({kind}): {len(rows)} rows in {elapsed_ms:.1f}ms")
+        for row in rows:
+            row.setdefault('match_type', kind)
+        return rows
+
+    @staticmethod
+    def _owner_clause(created_by, alias='c'):
+        if created_by is None:
+            return '', {}
+        return f" AND {alias}.created_by = %(created_by)s", {'created_by': created_by}
+
+    def _search_a_number(self, query, limit, created_by):
+        owner, params = self._owner_clause(created_by)
+        params.update(a_number=_NON_DIGITS.sub('', query), limit=limit)
+        return self.backend.fetch_all(
+            f"SELECT c.* FROM cases c WHERE c.a_number = %(a_number)s{owner} LIMIT %(limit)s",
+            params
+        )
+
+    def _search_phone(self, digits, limit, created_by):
+        owner, params = self._owner_clause(created_by)
+        # Stored numbers may still carry the +1 country code
+        params.update(digits=digits, with_code='1' + digits, limit=limit)
+        # Two indexed lookups rather than an OR the planner may not split
+        return self.backend.fetch_all(
+            f"""
+            SELECT c.* FROM cases c
+            WHERE c.client_phone_digits IN (%(digits)s, %(with_code)s){owner}
+            UNION
+            SELECT c.* FROM cases c
+            WHERE c.other_client_phone_digits IN (%(digits)s, %(with_code)s){owner}
+            LIMIT %(limit)s
+            """,
+            params
+        )
+
+    def _search_prefix(self, digits, limit, created_by):
+        owner, params = self._owner_clause(created_by)
+        params.update(low=digits, high=_prefix_upper_bound(digits), limit=limit)
+        return self.backend.fetch_all(
+            f"""
+            SELECT c.* FROM cases c
+            WHERE c.a_number >= %(low)s AND c.a_number < %(high)s{owner}
+            UNION
+            SELECT c.* FROM cases c
+            WHERE c.client_phone_digits >= %(low)s AND c.client_phone_digits < %(high)s{owner}
+            LIMIT %(limit)s
+            """,
+            params
+        )
+
+    def _search_text(self, query, limit, created_by):
+        owner, params = self._owner_clause(created_by)
+        params.update(q=query, limit=limit)
+        if self.backend.dialect == 'postgresql':
+            return self.backend.fetch_all(
+                f"""
+                SELECT c.*,
+                       GREATEST(
+                           similarity(c.first_name || ' ' || c.last_name, %(q)s),
+                           similarity(coalesce(c.client_address, ''), %(q)s),
+                           similarity(coalesce(c.court_address, ''), %(q)s)
+                       ) AS score
+                FROM cases c
+                WHERE ((c.first_name || ' ' || c.last_name) %% %(q)s
+                       OR coalesce(c.client_address, '') %% %(q)s
+                       OR coalesce(c.court_address, '') %% %(q)s
+                       OR to_tsvector('simple', c.first_name || ' ' || c.last_name || ' ' ||
+                                      coalesce(c.client_address, '') || ' ' || coalesce(c.court_address, ''))
+                          @@ plainto_tsquery('simple', %(q)s)){owner}
+                ORDER BY score DESC
+                LIMIT %(limit)s
+                """,
+                params
+            )
+
+        # The trigram tokenizer needs at least three characters per term
+        terms = [t for t in re.split(r'\s+', query) if len(t) >= 3]
+        if not terms:
+            params['like'] = query + '%'
+            return self.backend.fetch_all(
+                f"""
+                SELECT c.* FROM cases c
+                WHERE (c.first_name LIKE %(like)s OR c.last_name LIKE %(like)s){owner}
+                LIMIT %(limit)s
+                """,
+                params
+            )
+        params['match'] = ' AND '.join('"' + t.replace('"', '""') + '"' for t in terms)
+        # Trigram matches are exact substrings, so results are not ranked:
+        # scoring with bm25() would visit every match of a common name.
+        return self.backend.fetch_all(
+            f"""
+            SELECT c.*
+            FROM cases_fts
+            JOIN cases c ON c.id = cases_fts.rowid
+            WHERE cases_fts MATCH %(match)s{owner}
+            LIMIT %(limit)s
+            """,
+            params
+        )
+
+# Singleton instance
+case_search = CaseSearch()
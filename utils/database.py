@@ -2,7 +2,7 @@ import os
 import psycopg2
 import json
 from psycopg2.extras import RealDictCursor
-from auth import verify_password, hash_password
+from utils.auth_utils import verify_password, hash_password
 
 def get_db_connection():
     return psycopg2.connect(
@@ -14,65 +14,9 @@ def get_db_connection():
     )
 
 def init_db():
-    return psycopg2.connect(
-        host=os.environ['PGHOST'],
-        database=os.environ['PGDATABASE'],
-        user=os.environ['PGUSER'],
-        password=os.environ['PGPASSWORD'],
-        port=os.environ['PGPORT']
-    )
-
-def init_db():
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    # Crear tabla de usuarios
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            username VARCHAR(50) UNIQUE NOT NULL,
-            password_hash VARCHAR(200) NOT NULL,
-            role_id INTEGER REFERENCES user_roles(id)
-        );
-    """)
-
-    # Crear tabla de roles de usuario
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS user_roles (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(50) UNIQUE NOT NULL
-        );
-    """)
-
-    # Crear tabla de llamadas telefónicas
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS phone_calls (
-            id SERIAL PRIMARY KEY,
-            search_id INTEGER,
-            phone_number VARCHAR(20),
-            call_status VARCHAR(50),
-            call_duration INTEGER,
-            call_notes TEXT,
-            call_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # Crear tabla de formularios de verificación
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS verification_forms (
-            id SERIAL PRIMARY KEY,
-            search_id INTEGER,
-            verified_by INTEGER REFERENCES users(id),
-            form_data JSONB,
-            status VARCHAR(50),
-            notes TEXT,
-            verification_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    """Create or upgrade the schema through the migration runner."""
+    from utils.migrations import MigrationRunner
+    return MigrationRunner().migrate()
 
 def add_phone_call(user_id, phone_number, status, duration, notes):
     conn = get_db_connection()
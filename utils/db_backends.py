@@ -0,0 +1,429 @@
+import re
+import uuid
+import time
+import queue
+import random
+import logging
+import sqlite3
+import weakref
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from config import (
+    DATABASE_BACKEND,
+    SQLITE_PATH,
+    DB_POOL_MIN,
+    DB_POOL_MAX,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_RETRY_ATTEMPTS
+)
+
+logger = logging.getLogger(__name__)
+
+# Statements are written once, in psycopg2 style (%s / %(name)s), and
+# translated for backends that use a different paramstyle.
+_PLACEHOLDER_RE = re.compile(r"%\((\w+)\)s|%s|%%")
+
+def _to_qmark(sql: str) -> str:
+    def repl(match):
+        if match.group(0) == '%%':
+            return '%'
+        if match.group(1):
+            return f":{match.group(1)}"
+        return '?'
+    return _PLACEHOLDER_RE.sub(repl, sql)
+
+def _to_numbered(sql: str) -> str:
+    counter = iter(range(1, 10000))
+    return _PLACEHOLDER_RE.sub(
+        lambda m: '%' if m.group(0) == '%%' else f"${next(counter)}", sql
+    )
+
+class Session:
+    """A unit of work on one connection. Commits on success, rolls back on error."""
+
+    def __init__(self, backend: 'DatabaseBackend', conn):
+        self.backend = backend
+        self.conn = conn
+
+    def _cursor(self):
+        return self.backend._cursor(self.conn)
+
+    def _run(self, cur, sql: str, params, prepare: Optional[str]):
+        self.backend._execute(self.conn, cur, sql, params, prepare)
+
+    def fetch_all(self, sql: str, params: Any = None, prepare: Optional[str] = None) -> List[Dict[str, Any]]:
+        cur = self._cursor()
+        try:
+            self._run(cur, sql, params, prepare)
+            return [dict(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+    def fetch_one(self, sql: str, params: Any = None, prepare: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        cur = self._cursor()
+        try:
+            self._run(cur, sql, params, prepare)
+            row = cur.fetchone()
+            return dict(row) if row is not None else None
+        finally:
+            cur.close()
+
+    def execute(self, sql: str, params: Any = None, prepare: Optional[str] = None) -> int:
+        cur = self._cursor()
+        try:
+            self._run(cur, sql, params, prepare)
+            return cur.rowcount
+        finally:
+            cur.close()
+
+    def stream(self, sql: str, params: Any = None, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the result in lists of up to ``batch_size`` rows.
+
+        PostgreSQL uses a server-side (named) cursor, so only one batch is held
+        in memory however large the result is.
+        """
+        cur = self.backend._stream_cursor(self.conn, batch_size)
+        try:
+            self._run(cur, sql, params, None)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [dict(row) for row in rows]
+        finally:
+            cur.close()
+
+    def insert(self, sql: str, params: Any = None) -> Optional[int]:
+        """Run an INSERT and return the id of the new row."""
+        return self.backend._insert(self.conn, sql, params)
+
+    def insert_many(self, sql: str, rows: Sequence[Sequence[Any]]) -> int:
+        """Multi-row insert. ``sql`` contains a single ``VALUES %s`` marker."""
+        if not rows:
+            return 0
+        return self.backend._insert_many(self.conn, sql, rows)
+
+    def insert_many_returning(self, sql: str, rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """``insert_many`` for SQL ending in ``RETURNING``: the rows actually inserted
+        (those skipped by ``ON CONFLICT DO NOTHING`` return nothing)."""
+        if not rows:
+            return []
+        return self.backend._insert_many_returning(self.conn, sql, rows)
+
+class DatabaseBackend:
+    """Common interface of the storage backends."""
+
+    dialect = None
+
+    @contextmanager
+    def _connect(self):
+        raise NotImplementedError
+
+    @contextmanager
+    def session(self):
+        with self._connect() as conn:
+            try:
+                yield Session(self, conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    # Single-statement helpers run in their own session and may be retried
+    retry_attempts = 1
+    retry_backoff = 0.05
+
+    def _is_retryable(self, error: Exception) -> bool:
+        return False
+
+    def _in_session(self, method: str, *args):
+        attempt = 0
+        while True:
+            try:
+                with self.session() as s:
+                    return getattr(s, method)(*args)
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.retry_attempts or not self._is_retryable(e):
+                    raise
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                logger.warning(f"{self.dialect}: {e}; retrying in {delay:.2f}s ({attempt}/{self.retry_attempts})")
+                time.sleep(delay + random.uniform(0, delay))
+
+    def fetch_all(self, sql, params=None, prepare=None):
+        return self._in_session('fetch_all', sql, params, prepare)
+
+    def fetch_one(self, sql, params=None, prepare=None):
+        return self._in_session('fetch_one', sql, params, prepare)
+
+    def execute(self, sql, params=None, prepare=None):
+        return self._in_session('execute', sql, params, prepare)
+
+    def insert(self, sql, params=None):
+        return self._in_session('insert', sql, params)
+
+    def insert_many(self, sql, rows):
+        return self._in_session('insert_many', sql, rows)
+
+    def stream(self, sql, params=None, batch_size=1000):
+        """Generator over row batches; holds a connection until exhausted or closed."""
+        with self.session() as s:
+            yield from s.stream(sql, params, batch_size)
+
+    def _stream_cursor(self, conn, batch_size):
+        return self._cursor(conn)
+
+    def ping(self) -> bool:
+        self.fetch_one("SELECT 1 AS ok")
+        return True
+
+    def close(self):
+        pass
+
+class PostgresBackend(DatabaseBackend):
+    """PostgreSQL through a psycopg2 threaded connection pool, with server-side
+    prepared statements cached per connection."""
+
+    dialect = 'postgresql'
+
+    def __init__(self, minconn: int = DB_POOL_MIN, maxconn: int = DB_POOL_MAX, dsn: Optional[str] = None):
+        import os
+        import psycopg2
+        from psycopg2 import extensions, pool
+        from psycopg2.extras import RealDictCursor
+
+        class PreparingConnection(extensions.connection):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.prepared = set()
+
+        self._psycopg2 = psycopg2
+        self._cursor_factory = RealDictCursor
+        connect_kwargs = {'connection_factory': PreparingConnection, 'connect_timeout': 10}
+        if dsn or os.environ.get('DATABASE_URL'):
+            connect_kwargs['dsn'] = dsn or os.environ['DATABASE_URL']
+        else:
+            connect_kwargs.update(
+                host=os.environ.get('PGHOST', 'localhost'),
+                database=os.environ.get('PGDATABASE', 'postgres'),
+                user=os.environ.get('PGUSER', 'postgres'),
+                password=os.environ.get('PGPASSWORD', 'postgres'),
+                port=os.environ.get('PGPORT', '5432')
+            )
+        self.pool = pool.ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        logger.info(f"PostgreSQL pool created ({minconn}-{maxconn} connections)")
+
+    @contextmanager
+    def _connect(self):
+        conn = self.pool.getconn()
+        broken = False
+        try:
+            yield conn
+        except self._psycopg2.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.pool.putconn(conn, close=broken or conn.closed)
+
+    def _cursor(self, conn):
+        return conn.cursor(cursor_factory=self._cursor_factory)
+
+    def _stream_cursor(self, conn, batch_size):
+        cur = conn.cursor(name=f"stream_{uuid.uuid4().hex}", cursor_factory=self._cursor_factory)
+        cur.itersize = batch_size
+        return cur
+
+    def _execute(self, conn, cur, sql, params, prepare):
+        if prepare and not isinstance(params, dict):
+            if prepare not in conn.prepared:
+                cur.execute(f"PREPARE {prepare} AS {_to_numbered(sql)}")
+                conn.prepared.add(prepare)
+            params = tuple(params or ())
+            if params:
+                cur.execute(f"EXECUTE {prepare} ({', '.join(['%s'] * len(params))})", params)
+            else:
+                cur.execute(f"EXECUTE {prepare}")
+        else:
+            cur.execute(sql, params)
+
+    def _insert(self, conn, sql, params):
+        if 'RETURNING' not in sql.upper():
+            sql = sql.rstrip().rstrip(';') + " RETURNING id"
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            row = cur.fetchone()
+            return row[0] if row else None
+        finally:
+            cur.close()
+
+    def _insert_many(self, conn, sql, rows):
+        from psycopg2.extras import execute_values
+        cur = conn.cursor()
+        try:
+            execute_values(cur, sql, rows, page_size=len(rows))
+            return len(rows)
+        finally:
+            cur.close()
+
+    def _insert_many_returning(self, conn, sql, rows):
+        from psycopg2.extras import execute_values
+        cur = self._cursor(conn)
+        try:
+            return [dict(row) for row in execute_values(cur, sql, rows, page_size=len(rows), fetch=True)]
+        finally:
+            cur.close()
+
+    def close(self):
+        self.pool.closeall()
+
+class _ThreadConnection:
+    """Holds a thread's cached SQLite connection.
+
+    When the owning thread exits its ``threading.local`` storage is dropped and
+    the connection goes back to the backend's idle pool instead of being closed.
+    """
+
+    def __init__(self, conn, release):
+        self.conn = conn
+        weakref.finalize(self, release, conn)
+
+class SQLiteBackend(DatabaseBackend):
+    """SQLite tuned for local and small deployments.
+
+    Connections run in WAL mode with ``synchronous=NORMAL`` (no fsync per
+    commit), memory-mapped reads and a larger page cache. Each thread reuses
+    one cached connection, writers take the lock up front with
+    ``BEGIN IMMEDIATE`` and wait on ``busy_timeout``, and single-statement
+    helpers are retried with backoff if the database is still locked.
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path: str = SQLITE_PATH, busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS,
+                 mmap_size: int = SQLITE_MMAP_SIZE, cache_size_kb: int = SQLITE_CACHE_SIZE_KB,
+                 retry_attempts: int = SQLITE_RETRY_ATTEMPTS):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.retry_attempts = retry_attempts
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._all_lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level='IMMEDIATE',
+            check_same_thread=False,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size=-{abs(int(self.cache_size_kb))}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._all_lock:
+            self._all.append(conn)
+        return conn
+
+    def _release(self, conn):
+        with self._all_lock:
+            if conn in self._all:
+                self._idle.put(conn)
+
+    def _thread_connection(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            holder = _ThreadConnection(conn, self._release)
+            self._local.holder = holder
+        return holder.conn
+
+    @contextmanager
+    def _connect(self):
+        yield self._thread_connection()
+
+    def _is_retryable(self, error: Exception) -> bool:
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+    def close(self):
+        with self._all_lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all = []
+        self._local = threading.local()
+        self._idle = queue.LifoQueue()
+
+    def _cursor(self, conn):
+        return conn.cursor()
+
+    def _execute(self, conn, cur, sql, params, prepare):
+        # sqlite3 keeps its own statement cache, so ``prepare`` needs no extra work
+        cur.execute(_to_qmark(sql), params if params is not None else ())
+
+    def _insert(self, conn, sql, params):
+        cur = conn.cursor()
+        try:
+            cur.execute(_to_qmark(sql), params if params is not None else ())
+            return cur.lastrowid
+        finally:
+            cur.close()
+
+    def _insert_many(self, conn, sql, rows):
+        placeholders = '(' + ', '.join(['?'] * len(rows[0])) + ')'
+        prefix, suffix = sql.split('%s', 1)
+        statement = _to_qmark(prefix) + placeholders + _to_qmark(suffix)
+        cur = conn.cursor()
+        try:
+            cur.executemany(statement, rows)
+            return len(rows)
+        finally:
+            cur.close()
+
+    def _insert_many_returning(self, conn, sql, rows):
+        # executemany can't return rows; one statement per row is cheap inside the transaction
+        placeholders = '(' + ', '.join(['?'] * len(rows[0])) + ')'
+        prefix, suffix = sql.split('%s', 1)
+        statement = _to_qmark(prefix) + placeholders + _to_qmark(suffix)
+        cur = conn.cursor()
+        try:
+            returned = []
+            for row in rows:
+                cur.execute(statement, row)
+                returned.extend(dict(r) for r in cur.fetchall())
+            return returned
+        finally:
+            cur.close()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> DatabaseBackend:
+    """Return the process-wide storage backend selected by ``DATABASE_BACKEND``."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if DATABASE_BACKEND == 'sqlite':
+                    _backend = SQLiteBackend()
+                else:
+                    _backend = PostgresBackend()
+    return _backend
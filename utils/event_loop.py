@@ -0,0 +1,115 @@
+import atexit
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class BackgroundLoop:
+    """A single asyncio loop running in a daemon thread for the whole process.
+
+    Streamlit re-executes scripts on every interaction, so anything created
+    under ``asyncio.run`` (websockets, HTTP sessions) died with the loop at the
+    end of the rerun. Async clients live on this loop instead and synchronous
+    code reaches them through ``submit`` (a ``concurrent.futures.Future``) or
+    ``run_sync`` (blocks for the result).
+    """
+
+    def __init__(self, name: str = 'background-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._started = threading.Event()
+        self._shutdown_callbacks: List[Callable[[], Any]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self.start()
+        return self._loop
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            try:
+                pending = asyncio.all_tasks(self._loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            finally:
+                self._loop.close()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_sync(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result."""
+        if self.in_loop_thread():
+            # Blocking here would wait on ourselves forever
+            coro.close()
+            raise RuntimeError("run_sync() called from the background loop; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def call_soon(self, callback: Callable, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def on_shutdown(self, callback: Callable[[], Any]):
+        """Register a function or coroutine function to close a client at exit."""
+        self._shutdown_callbacks.append(callback)
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None or not self._thread.is_alive():
+            return
+
+        async def _shutdown():
+            for callback in reversed(self._shutdown_callbacks):
+                try:
+                    result = callback()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Error closing resource on {self.name}: {e}")
+
+        try:
+            self.run_sync(_shutdown(), timeout=timeout)
+        except Exception as e:
+            logger.error(f"Error shutting down {self.name}: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+# Singleton instance
+background_loop = BackgroundLoop()
+atexit.register(background_loop.stop)
+
+def submit(coro: Awaitable) -> concurrent.futures.Future:
+    return background_loop.submit(coro)
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    return background_loop.run_sync(coro, timeout)
@@ -0,0 +1,432 @@
+import os
+import re
+import csv
+import gzip
+import json
+import time
+import secrets
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config import (
+    EXPORT_DIR, EXPORT_WORKERS, EXPORT_BATCH_SIZE, EXPORT_INLINE_MAX_ROWS, EXPORT_TTL,
+    EXPORT_DOWNLOAD_BASE_URL
+)
+from utils.db_backends import DatabaseBackend, get_backend
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# name, CSV header, type
+_CASE_COLUMNS = [
+    ('id', 'ID', 'int'),
+    ('number', 'Número', 'str'),
+    ('status', 'Estado', 'str'),
+    ('is_positive', 'Positivo', 'bool'),
+    ('first_name', 'Nombre', 'str'),
+    ('last_name', 'Apellido', 'str'),
+    ('a_number', 'A-Number', 'str'),
+    ('court_address', 'Dirección de la Corte', 'str'),
+    ('court_phone', 'Teléfono de la Corte', 'str'),
+    ('client_phone', 'Teléfono del Cliente', 'str'),
+    ('other_client_phone', 'Otro Teléfono', 'str'),
+    ('client_address', 'Dirección del Cliente', 'str'),
+    ('client_email', 'Email del Cliente', 'str'),
+    ('created_by', 'Creado Por', 'int'),
+    ('created_at', 'Fecha de Creación', 'timestamp'),
+]
+
+_SEARCH_HISTORY_COLUMNS = [
+    ('id', 'ID', 'int'),
+    ('number', 'Número', 'str'),
+    ('search_date', 'Fecha', 'timestamp'),
+    ('source', 'Fuente', 'str'),
+    ('status', 'Estado', 'str'),
+    ('pdl_found', 'PDL Encontrado', 'bool'),
+    ('eoir_found', 'EOIR Encontrado', 'bool'),
+    ('is_positive', 'Positivo', 'bool'),
+    ('searched_by', 'Buscado Por', 'int'),
+]
+
+EXPORTS: Dict[str, Dict[str, Any]] = {
+    'cases': {
+        'label': 'Casos',
+        'select': "SELECT {columns} FROM cases",
+        'order': "ORDER BY id",
+        'user_column': 'created_by',
+        'columns': _CASE_COLUMNS,
+    },
+    'search_history': {
+        'label': 'Historial de Búsquedas',
+        'select': "SELECT {columns} FROM search_history",
+        'order': "ORDER BY search_date DESC, id DESC",
+        'user_column': 'searched_by',
+        'columns': _SEARCH_HISTORY_COLUMNS,
+        'expressions': {'pdl_found': "(source = 'pdl' AND status = 'success') AS pdl_found"},
+    },
+}
+
+# format -> (file extension, MIME type)
+FORMATS: Dict[str, tuple] = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+_JOB_ID = re.compile(r'^[A-Za-z0-9_-]{20,64}$')
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or PYARROW_AVAILABLE]
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        # SQLite returns timestamps as text
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+COERCE = {
+    'int': lambda v: None if v is None else int(v),
+    'str': lambda v: None if v is None else str(v),
+    'bool': lambda v: None if v is None else bool(v),
+    'float': lambda v: None if v is None else float(v),
+    'timestamp': _to_datetime,
+}
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: List[tuple], compress: bool):
+        opener = gzip.open if compress else open
+        self._file = opener(path, 'wt', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([label for _, label, _ in columns])
+
+    def write(self, rows: List[list]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+_ARROW_TYPES = {'int': 'int64', 'str': 'string', 'bool': 'bool_', 'float': 'float64'}
+
+def arrow_schema(columns: List[tuple]):
+    """Arrow schema for ``(name, label, type)`` column specs."""
+    return pa.schema([
+        pa.field(name, pa.timestamp('us') if kind == 'timestamp' else getattr(pa, _ARROW_TYPES[kind])())
+        for name, _, kind in columns
+    ])
+
+class ParquetRowWriter:
+    """Typed Parquet output; batches are converted to Arrow as they arrive
+    and written out one row group at a time."""
+
+    ROW_GROUP_SIZE = 65536
+
+    def __init__(self, path: str, columns: List[tuple]):
+        self._schema = arrow_schema(columns)
+        self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+        self._pending: list = []
+        self._pending_rows = 0
+
+    def write(self, rows: List[list]):
+        if not rows:
+            return
+        columns = zip(*rows)
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)]
+        self._pending.append(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        table = pa.Table.from_batches(self._pending, schema=self._schema).combine_chunks()
+        self._pending, self._pending_rows = [], 0
+        self._writer.write_table(table, row_group_size=self.ROW_GROUP_SIZE)
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+def _open_writer(fmt: str, path: str, columns: List[tuple]):
+    if fmt == 'parquet':
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export requires pyarrow")
+        return ParquetRowWriter(path, columns)
+    return _CsvWriter(path, columns, compress=(fmt == 'csv.gz'))
+
+class ExportJob:
+    """One export and its output file, described by a JSON file next to it.
+
+    The id is a random token; knowing it is what authorizes the download, so
+    links are only handed to the user who started the export and stop working
+    after ``EXPORT_TTL``.
+    """
+
+    FIELDS = ('job_id', 'kind', 'fmt', 'requested_by', 'user_id', 'status', 'rows', 'total',
+              'error', 'created_at', 'finished_at', 'expires_at', 'size_bytes')
+
+    def __init__(self, job_id: str, kind: str, fmt: str, requested_by: Optional[int],
+                 user_id: Optional[int] = None, status: str = 'pending', rows: int = 0,
+                 total: Optional[int] = None, error: Optional[str] = None,
+                 created_at: Optional[float] = None, finished_at: Optional[float] = None,
+                 expires_at: Optional[float] = None, size_bytes: int = 0):
+        self.job_id = job_id
+        self.kind = kind
+        self.fmt = fmt
+        self.requested_by = requested_by
+        self.user_id = user_id
+        self.status = status
+        self.rows = rows
+        self.total = total
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.finished_at = finished_at
+        self.expires_at = expires_at
+        self.size_bytes = size_bytes
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.fmt][0]
+
+    @property
+    def mimetype(self) -> str:
+        return FORMATS[self.fmt][1]
+
+    @property
+    def filename(self) -> str:
+        stamp = datetime.fromtimestamp(self.created_at).strftime('%Y%m%d_%H%M%S')
+        return f"{self.kind}_{stamp}{self.extension}"
+
+    @property
+    def download_url(self) -> str:
+        return f"{EXPORT_DOWNLOAD_BASE_URL.rstrip('/')}/api/exports/{self.job_id}/download"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_at is not None and (now or time.time()) > self.expires_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExportJob':
+        return cls(**{field: data.get(field) for field in cls.FIELDS if field in data})
+
+class ExportManager:
+    """Streams cases and search history into CSV, gzip CSV or Parquet files.
+
+    Rows come from ``DatabaseBackend.stream`` (a server-side cursor on
+    PostgreSQL) and go straight to the writer, so memory stays at one cursor
+    batch plus, for Parquet, one row group, whatever the table size. Exports
+    of up to ``inline_max_rows`` rows run in the caller; larger ones run on a
+    small thread pool and the caller polls ``get``. Finished files are served
+    by the API at ``/api/exports/<job_id>/download``.
+    """
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None, directory: str = EXPORT_DIR,
+                 workers: int = EXPORT_WORKERS, batch_size: int = EXPORT_BATCH_SIZE,
+                 inline_max_rows: int = EXPORT_INLINE_MAX_ROWS, ttl: float = EXPORT_TTL):
+        self._backend = backend
+        self.directory = directory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.inline_max_rows = inline_max_rows
+        self.ttl = ttl
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def _meta_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def file_path(self, job: ExportJob) -> str:
+        return os.path.join(self.directory, f"{job.job_id}{job.extension}")
+
+    def _save(self, job: ExportJob):
+        tmp_path = f"{self._meta_path(job.job_id)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, self._meta_path(job.job_id))
+
+    def _recover(self):
+        """Load jobs from a previous run; unfinished ones died with it."""
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            job = load_job(name[:-5], self.directory)
+            if job is None:
+                continue
+            if not job.finished:
+                job.status, job.error = 'failed', 'interrupted'
+                job.finished_at = job.expires_at = time.time()
+                self._save(job)
+            self._jobs[job.job_id] = job
+        self.cleanup()
+
+    def _query(self, kind: str, user_id: Optional[int]):
+        spec = EXPORTS[kind]
+        expressions = spec.get('expressions', {})
+        columns = ', '.join(expressions.get(name, name) for name, _, _ in spec['columns'])
+        sql = spec['select'].format(columns=columns)
+        params: tuple = ()
+        if user_id is not None:
+            sql += f" WHERE {spec['user_column']} = %s"
+            params = (user_id,)
+        return sql, params
+
+    def count(self, kind: str, user_id: Optional[int] = None) -> int:
+        spec = EXPORTS[kind]
+        sql = spec['select'].format(columns='COUNT(*) AS n')
+        params: tuple = ()
+        if user_id is not None:
+            sql += f" WHERE {spec['user_column']} = %s"
+            params = (user_id,)
+        row = self.backend.fetch_one(sql, params)
+        return row['n'] if row else 0
+
+    def export(self, kind: str, fmt: str, requested_by: Optional[int],
+               user_id: Optional[int] = None) -> ExportJob:
+        """Start an export of ``kind`` in ``fmt``.
+
+        ``user_id`` limits the rows to that user's; ``None`` exports all of
+        them. Returns the finished job for small exports, otherwise a job that
+        runs in the background.
+        """
+        if kind not in EXPORTS:
+            raise ValueError(f"Unknown export: {kind}")
+        if fmt not in available_formats():
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.cleanup()
+
+        if kind == 'search_history':
+            # Include lookups still waiting in the batch writer
+            from utils.search_history import search_history_log
+            search_history_log.flush()
+
+        job = ExportJob(secrets.token_urlsafe(24), kind, fmt, requested_by, user_id)
+        job.total = self.count(kind, user_id)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._save(job)
+
+        if job.total <= self.inline_max_rows:
+            self._run(job)
+        else:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='export')
+            self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: ExportJob):
+        spec = EXPORTS[job.kind]
+        columns = spec['columns']
+        coerce = [COERCE[kind] for _, _, kind in columns]
+        names = [name for name, _, _ in columns]
+        path = self.file_path(job)
+        part_path = f"{path}.part"
+        sql, params = self._query(job.kind, job.user_id)
+        sql = f"{sql} {spec['order']}"
+        job.status = 'running'
+        started = time.monotonic()
+        try:
+            writer = _open_writer(job.fmt, part_path, columns)
+            try:
+                for batch in self.backend.stream(sql, params, self.batch_size):
+                    writer.write([[fn(row[name]) for fn, name in zip(coerce, names)] for row in batch])
+                    job.rows += len(batch)
+            finally:
+                writer.close()
+            os.replace(part_path, path)
+        except Exception as e:
+            logger.error(f"Export {job.kind}/{job.fmt} failed after {job.rows} rows: {e}")
+            job.status, job.error = 'failed', str(e)
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        else:
+            job.status = 'done'
+            job.size_bytes = os.path.getsize(path)
+            logger.info(
+                f"Exported {job.rows} {job.kind} rows to {job.fmt} "
+                f"({job.size_bytes / 1048576:.1f} MB) in {time.monotonic() - started:.1f}s"
+            )
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.ttl
+        self._save(job)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+
+    def list_for_user(self, requested_by: Optional[int], limit: int = 10) -> List[ExportJob]:
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.requested_by == requested_by]
+        jobs.sort(key=lambda job: job.created_at, reverse=True)
+        return jobs[:limit]
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Delete expired files; returns how many jobs were removed."""
+        now = now or time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expired(now)]
+            for job in expired:
+                del self._jobs[job.job_id]
+        for job in expired:
+            for path in (self.file_path(job), self._meta_path(job.job_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not remove expired export {path}: {e}")
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            'jobs': len(jobs),
+            'running': sum(job.status == 'running' for job in jobs),
+            'pending': sum(job.status == 'pending' for job in jobs),
+            'bytes_on_disk': sum(job.size_bytes or 0 for job in jobs),
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def load_job(job_id: str, directory: str = EXPORT_DIR) -> Optional[ExportJob]:
+    """Read a job's description from disk (used by the API process)."""
+    if not _JOB_ID.match(job_id or ''):
+        return None
+    try:
+        with open(os.path.join(directory, f"{job_id}.json")) as f:
+            return ExportJob.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+def get_exports() -> ExportManager:
+    from utils.resources import resources
+    return resources.get('exports')
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_AGE, HTTP_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Responses worth keeping; 429/5xx and auth failures are always refetched
+CACHEABLE_STATUS = frozenset({200, 203, 300, 301, 308, 404, 410})
+
+# Bodies are checked against max_bytes after this many stores
+PRUNE_EVERY = 5000
+
+# Dropped on store: bodies are kept decoded, and these describe one transfer
+_SKIP_HEADERS = frozenset({
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive',
+    'set-cookie', 'date', 'age',
+})
+
+def canonical_url(url: str) -> str:
+    """Lowercase scheme/host, sorted query, no fragment: one key however the URL was built."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+def request_key(method: str, url: str) -> str:
+    return hashlib.sha1(f"{method.upper()} {canonical_url(url)}".encode()).hexdigest()
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+    validated_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.validated_at
+
+    def validators(self) -> Dict[str, str]:
+        """Headers that turn a refetch into a conditional request."""
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        validators = {}
+        if 'etag' in headers:
+            validators['If-None-Match'] = headers['etag']
+        if 'last-modified' in headers:
+            validators['If-Modified-Since'] = headers['last-modified']
+        return validators
+
+class HttpCache:
+    """GET responses shared by every client of the same upstream pages.
+
+    The EOIR scrapers (``CachingAdapter`` on a ``requests.Session``) and the
+    Scrapy crawl (``eoir_scraper.httpcache``) read and write the same store, so
+    a page fetched by one is not fetched again by the other while it is
+    younger than ``max_age``. After that a response with an ETag or
+    Last-Modified is revalidated with a conditional request; a 304 only
+    renews it.
+
+    Bodies are zlib-compressed files named by the SHA-256 of their content,
+    so identical pages are stored once.
+    An SQLite index maps ``METHOD canonical-URL`` to status, headers and body
+    hash; WAL mode lets the app, sweep workers and crawls share it.
+    ``prune`` drops the oldest entries beyond ``max_bytes`` and unreferenced
+    bodies.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_age: float = HTTP_CACHE_MAX_AGE,
+                 max_bytes: int = int(HTTP_CACHE_MAX_MB * 1048576)):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL,"
+            " body_hash TEXT NOT NULL, body_size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL, validated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_validated ON responses (validated_at)")
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0, 'stores': 0, 'revalidated': 0, 'deduplicated': 0}
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, 'objects', body_hash[:2], body_hash[2:] + '.z')
+
+    def get(self, method: str, url: str) -> Optional[CachedResponse]:
+        """The stored response, fresh or not; None when there is none or its body is gone."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body_hash, stored_at, validated_at FROM responses WHERE key = ?",
+                (request_key(method, url),)
+            ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        try:
+            with open(self._body_path(row[3]), 'rb') as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            logger.warning(f"HTTP cache body for {row[0]} unreadable: {e}")
+            self.stats['misses'] += 1
+            return None
+        cached = CachedResponse(row[0], row[1], json.loads(row[2]), body, row[4], row[5])
+        self.stats['hits' if self.is_fresh(cached) else 'stale'] += 1
+        return cached
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        return cached.age < self.max_age
+
+    def has_fresh(self, method: str, url: str) -> bool:
+        """Whether ``get`` would return a fresh response; reads only the index."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT validated_at FROM responses WHERE key = ?", (request_key(method, url),)
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.max_age
+
+    def put(self, method: str, url: str, status: int, headers: Iterable[Tuple[str, str]], body: bytes) -> bool:
+        """Store a response; False when its status or method is not cached."""
+        if method.upper() != 'GET' or status not in CACHEABLE_STATUS:
+            return False
+        kept = {k: v for k, v in headers if k.lower() not in _SKIP_HEADERS}
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+        if os.path.exists(path):
+            self.stats['deduplicated'] += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body_hash, body_size, stored_at, validated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (request_key(method, url), canonical_url(url), status, json.dumps(kept), body_hash, len(body), now, now)
+            )
+        self.stats['stores'] += 1
+        if self.stats['stores'] % PRUNE_EVERY == 0:
+            self.prune()
+        return True
+
+    def revalidated(self, method: str, url: str, headers: Iterable[Tuple[str, str]] = ()):
+        """Upstream answered 304: the stored response is fresh again, with any new validators."""
+        updates = {k: v for k, v in headers if k.lower() in ('etag', 'last-modified', 'cache-control', 'expires')}
+        key = request_key(method, url)
+        with self._lock:
+            if updates:
+                row = self._conn.execute("SELECT headers FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    merged = {**json.loads(row[0]), **updates}
+                    self._conn.execute("UPDATE responses SET headers = ? WHERE key = ?", (json.dumps(merged), key))
+            self._conn.execute("UPDATE responses SET validated_at = ? WHERE key = ?", (time.time(), key))
+        self.stats['revalidated'] += 1
+
+    def prune(self) -> int:
+        """Drop the least recently validated entries beyond ``max_bytes``, then orphaned bodies."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(body_size), 0) FROM responses").fetchone()[0]
+            dropped = 0
+            if total > self.max_bytes:
+                for key, size in self._conn.execute(
+                    "SELECT key, body_size FROM responses ORDER BY validated_at"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
+                    dropped += 1
+            referenced = {row[0] for row in self._conn.execute("SELECT DISTINCT body_hash FROM responses")}
+        objects = os.path.join(self.directory, 'objects')
+        for prefix in os.listdir(objects):
+            for name in os.listdir(os.path.join(objects, prefix)):
+                if name.endswith('.z') and prefix + name[:-2] not in referenced:
+                    try:
+                        os.remove(os.path.join(objects, prefix, name))
+                    except OSError:
+                        pass
+        if dropped:
+            logger.info(f"HTTP cache pruned {dropped} responses")
+        return dropped
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size, bodies = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(body_size), 0), COUNT(DISTINCT body_hash) FROM responses"
+            ).fetchone()
+        return {**self.stats, 'entries': entries, 'bodies': bodies, 'logical_mb': round(size / 1048576, 2)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class CachingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` that answers GETs from an ``HttpCache`` and stores what it fetches.
+
+    Mounted on a scraper's session in place of the plain adapter. Responses
+    served from the cache carry ``X-Http-Cache: hit`` or ``revalidated``.
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET' or stream:
+            return super().send(request, stream=stream, **kwargs)
+        cached = self.cache.get('GET', request.url)
+        if cached is not None and self.cache.is_fresh(cached):
+            return self._from_cache(request, cached, 'hit')
+        if cached is not None:
+            for name, value in cached.validators().items():
+                request.headers.setdefault(name, value)
+
+        response = super().send(request, stream=stream, **kwargs)
+        if cached is not None and response.status_code == 304:
+            self.cache.revalidated('GET', request.url, response.headers.items())
+            response.close()
+            return self._from_cache(request, cached, 'revalidated')
+        self.cache.put('GET', request.url, response.status_code, response.headers.items(), response.content)
+        return response
+
+    def _from_cache(self, request, cached: CachedResponse, how: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = cached.status
+        response.headers = CaseInsensitiveDict({**cached.headers, 'X-Http-Cache': how})
+        response._content = cached.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+def get_http_cache() -> Optional[HttpCache]:
+    """The process's shared cache, or None when HTTP_CACHE_ENABLED is off."""
+    from config import HTTP_CACHE_ENABLED
+    if not HTTP_CACHE_ENABLED:
+        return None
+    from utils.resources import resources
+    return resources.get('http_cache')
@@ -0,0 +1,248 @@
+import math
+import os
+import re
+import struct
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from config import (
+    KNOWN_NUMBERS_PATH, KNOWN_NUMBERS_CAPACITY, KNOWN_NUMBERS_FP_RATE,
+    KNOWN_NUMBERS_REFRESH_INTERVAL
+)
+from utils.db_backends import DatabaseBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+def normalize_a_number(value: Any) -> Optional[str]:
+    """9-digit form of an A-number ('A123-456-789', '12345678' -> '012345678')."""
+    digits = re.sub(r'\D', '', str(value or ''))
+    if len(digits) not in (8, 9):
+        return None
+    return digits.zfill(9)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing on BLAKE2b."""
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None, count: int = 0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> 'BloomFilter':
+        num_bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('ascii'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """Set the item's bits; False (and ``count`` unchanged) if they were all set already.
+
+        Numbers are re-added on every refresh and search, so counting each call
+        would inflate ``count`` and the estimated false-positive rate.
+        """
+        bits = self.bits
+        new = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+class KnownNumbers:
+    """Which A-numbers are already in ``cases`` or ``search_history``.
+
+    Sweeps ask ``might_contain`` before querying EOIR and skip numbers that
+    are probably known, without a database round trip. The filter is saved to
+    ``path`` together with the highest ``cases.id`` and ``search_history.id``
+    it has seen, so a restart loads it and only scans rows added since;
+    ``refresh`` does the same catch-up for rows inserted by other processes.
+    Deleted rows stay in the filter until it is rebuilt. False positives mean
+    a sweep occasionally skips an unknown number (``fp_rate`` of them).
+    """
+
+    _MAGIC = b'KNF1'
+    _HEADER = struct.Struct('<4sQIQQQ')
+    _SCAN_BATCH = 50000
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None, path: Optional[str] = KNOWN_NUMBERS_PATH,
+                 capacity: int = KNOWN_NUMBERS_CAPACITY, fp_rate: float = KNOWN_NUMBERS_FP_RATE,
+                 refresh_interval: float = KNOWN_NUMBERS_REFRESH_INTERVAL):
+        self._backend = backend
+        self.path = path
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._cases_watermark = 0
+        self._history_watermark = 0
+        self._last_refresh = 0.0
+        self._dirty = False
+        self.stats = {'lookups': 0, 'hits': 0, 'rebuilds': 0}
+        self.filter = self._load() or BloomFilter.for_capacity(capacity, fp_rate)
+        self.refresh(force=True)
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def _load(self) -> Optional[BloomFilter]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                magic, num_bits, num_hashes, count, cases_wm, history_wm = self._HEADER.unpack(
+                    f.read(self._HEADER.size)
+                )
+                bits = bytearray(f.read())
+            if magic != self._MAGIC or len(bits) != (num_bits + 7) // 8:
+                raise ValueError("unrecognized file")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Ignoring known-numbers filter at {self.path}: {e}")
+            return None
+        self._cases_watermark, self._history_watermark = cases_wm, history_wm
+        logger.info(f"Loaded known-numbers filter ({count} numbers, {len(bits) / 1048576:.1f} MB)")
+        return BloomFilter(num_bits, num_hashes, bits, count)
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            header = self._HEADER.pack(
+                self._MAGIC, self.filter.num_bits, self.filter.num_hashes, self.filter.count,
+                self._cases_watermark, self._history_watermark
+            )
+            bits = bytes(self.filter.bits)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(bits)
+        os.replace(tmp_path, self.path)
+
+    def _add_all(self, numbers: Iterable[Any]):
+        for value in numbers:
+            number = normalize_a_number(value)
+            if number is not None and self.filter.add(number):
+                self._dirty = True
+
+    def add(self, value: Any):
+        """Record a number as known (new case or completed search)."""
+        with self._lock:
+            self._add_all((value,))
+            grow = self.filter.count > self.capacity
+        if grow:
+            self.rebuild(self.capacity * 2)
+
+    def might_contain(self, value: Any) -> bool:
+        number = normalize_a_number(value)
+        if number is None:
+            return False
+        if time.monotonic() - self._last_refresh > self.refresh_interval:
+            self.refresh()
+        self.stats['lookups'] += 1
+        found = number in self.filter
+        if found:
+            self.stats['hits'] += 1
+        return found
+
+    def _scan(self, sql: str, column: str, watermark: int) -> int:
+        while True:
+            rows = self.backend.fetch_all(sql, (watermark, self._SCAN_BATCH))
+            if not rows:
+                return watermark
+            with self._lock:
+                self._add_all(row[column] for row in rows)
+            watermark = rows[-1]['id']
+
+    def refresh(self, force: bool = False):
+        """Add rows inserted since the last scan (by any process)."""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=force):
+            return
+        try:
+            self._last_refresh = now
+            before = self.filter.count
+            self._cases_watermark = self._scan(
+                "SELECT id, a_number FROM cases WHERE id > %s ORDER BY id LIMIT %s",
+                'a_number', self._cases_watermark
+            )
+            # Failed lookups learned nothing; rows from before status was recorded were real answers
+            self._history_watermark = self._scan(
+                "SELECT id, number FROM search_history WHERE id > %s "
+                "AND (status IS NULL OR status IN ('success', 'not_found')) ORDER BY id LIMIT %s",
+                'number', self._history_watermark
+            )
+        except Exception as e:
+            logger.error(f"Could not refresh known-numbers filter: {e}")
+            return
+        finally:
+            self._refresh_lock.release()
+        if self.filter.count > self.capacity:
+            self.rebuild(self.capacity * 2)
+        elif self.filter.count > before:
+            logger.debug(f"Known-numbers filter caught up {self.filter.count - before} numbers")
+            if self.filter.count - before >= self._SCAN_BATCH:
+                # Don't repeat a long initial scan after a crash
+                self.save()
+
+    def rebuild(self, capacity: Optional[int] = None):
+        """Rebuild from scratch, e.g. after the filter outgrew its capacity."""
+        with self._lock:
+            self.capacity = capacity or self.capacity
+            self.filter = BloomFilter.for_capacity(self.capacity, self.fp_rate)
+            self._cases_watermark = self._history_watermark = 0
+            self._dirty = True
+            self.stats['rebuilds'] += 1
+        logger.info(f"Rebuilding known-numbers filter for {self.capacity} numbers")
+        self.refresh(force=True)
+        self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['lookups']
+        return {
+            'numbers': self.filter.count,
+            'capacity': self.capacity,
+            'memory_bytes': self.filter.size_bytes,
+            'bits_per_number': self.filter.num_bits / max(1, self.filter.count),
+            'hash_functions': self.filter.num_hashes,
+            'expected_fp_rate': self.filter.false_positive_rate(),
+            'lookups': lookups,
+            'skip_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'rebuilds': self.stats['rebuilds'],
+        }
+
+    def close(self):
+        try:
+            self.save()
+        except OSError as e:
+            logger.error(f"Could not save known-numbers filter: {e}")
@@ -0,0 +1,199 @@
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import deque
+from datetime import date
+from typing import Any, Deque, Dict, Optional
+
+from config import (
+    LIVE_FEED_ENABLED, LIVE_FEED_URL, LIVE_FEED_SECRET, LIVE_FEED_INSECURE, LIVE_FEED_MAX_PENDING
+)
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_CHANNEL = 'supervisor'
+
+def feed_token(ttl: float = 3600, secret: Optional[str] = LIVE_FEED_SECRET) -> str:
+    """Signed, expiring token that lets a client use the supervisor feed."""
+    expires = str(int(time.time() + ttl))
+    if not secret:
+        return expires
+    signature = hmac.new(secret.encode('utf-8'), expires.encode('ascii'), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+def verify_feed_token(token: Any, secret: Optional[str] = LIVE_FEED_SECRET,
+                      insecure: bool = LIVE_FEED_INSECURE) -> bool:
+    """Without a secret configured every token is rejected, unless ``insecure``
+    (LIVE_FEED_INSECURE, for local development) opens the feed."""
+    if not secret:
+        return insecure
+    expires, _, signature = str(token or '').partition('.')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode('utf-8'), expires.encode('ascii'), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+class FeedState:
+    """Running totals for the supervisor tiles, kept by the signaling server.
+
+    Each event updates the tiles and gets a sequence number; the server
+    pushes the event together with the new tile values, so browsers only
+    redraw what they receive. Counters reset at midnight (server time).
+    """
+
+    def __init__(self, recent: int = 50):
+        self.seq = 0
+        self.day = date.today().isoformat()
+        self.counters = self._zero()
+        self.active_calls: Dict[str, Dict[str, Any]] = {}
+        self.services: Dict[str, str] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+
+    @staticmethod
+    def _zero() -> Dict[str, int]:
+        return {'calls_started': 0, 'calls_ended': 0, 'cases_created': 0, 'sweep_hits': 0}
+
+    def apply(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day, self.counters = today, self._zero()
+
+        kind = event.get('kind')
+        if kind == 'call':
+            call_uuid, status = event.get('call_uuid'), event.get('status')
+            if status == 'initiated':
+                self.counters['calls_started'] += 1
+                self.active_calls[call_uuid] = {'user_id': event.get('user_id'), 'status': status, 'since': event.get('at')}
+            elif status == 'ended':
+                self.counters['calls_ended'] += 1
+                self.active_calls.pop(call_uuid, None)
+            elif call_uuid in self.active_calls and status != 'note':
+                self.active_calls[call_uuid]['status'] = status
+        elif kind == 'case_created':
+            self.counters['cases_created'] += 1
+        elif kind == 'sweep_hit':
+            self.counters['sweep_hits'] += 1
+        elif kind == 'service_health':
+            self.services[event.get('service')] = event.get('status')
+
+        self.seq += 1
+        event = {**event, 'seq': self.seq}
+        self.recent.append(event)
+        return event
+
+    def tiles(self) -> Dict[str, Any]:
+        return {
+            'day': self.day,
+            **self.counters,
+            'active_calls': len(self.active_calls),
+            'on_hold': sum(1 for call in self.active_calls.values() if call['status'] == 'on_hold'),
+            'services': dict(self.services),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'seq': self.seq, 'tiles': self.tiles(), 'recent': list(self.recent)}
+
+class LiveFeedPublisher:
+    """Sends events from write paths to the signaling server.
+
+    ``publish`` never blocks or raises: events go into a bounded buffer
+    (oldest dropped when full) and a task on the background loop keeps one
+    websocket open and drains it, reconnecting with backoff when the server
+    is down.
+    """
+
+    def __init__(self, url: str = LIVE_FEED_URL, channel: str = SUPERVISOR_CHANNEL,
+                 max_pending: int = LIVE_FEED_MAX_PENDING, enabled: bool = LIVE_FEED_ENABLED):
+        self.url = url
+        self.channel = channel
+        self.enabled = enabled
+        self._pending: Deque[Dict[str, Any]] = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._started = False
+        self.stats = {'published': 0, 'sent': 0, 'dropped': 0, 'reconnects': 0, 'connected': False}
+
+    def publish(self, kind: str, **data):
+        if not self.enabled:
+            return
+        event = {'kind': kind, 'at': time.time(), **data}
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.stats['dropped'] += 1
+            self._pending.append(event)
+            self.stats['published'] += 1
+        try:
+            self._ensure_started()
+            from utils.event_loop import background_loop
+            background_loop.call_soon(self._wake)
+        except Exception as e:
+            logger.debug(f"Live feed unavailable: {e}")
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            from utils.event_loop import background_loop
+            background_loop.submit(self._run())
+            self._started = True
+
+    async def _run(self):
+        import websockets
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        backoff = 1.0
+        while True:
+            await self._wakeup.wait()
+            try:
+                async with websockets.connect(self.url, open_timeout=5, close_timeout=2) as ws:
+                    self.stats['connected'] = True
+                    backoff = 1.0
+                    reader = asyncio.ensure_future(self._read(ws))
+                    try:
+                        while True:
+                            self._wakeup.clear()
+                            await self._drain(ws)
+                            await self._wakeup.wait()
+                    finally:
+                        reader.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['connected'] = False
+                self.stats['reconnects'] += 1
+                logger.debug(f"Live feed connection to {self.url} failed: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                self._wakeup.set()
+
+    async def _read(self, ws):
+        # The server only answers publishers with errors; read them so they don't queue up
+        async for message in ws:
+            logger.warning(f"Live feed server replied: {message}")
+
+    async def _drain(self, ws):
+        while self._pending:
+            event = self._pending[0]
+            await ws.send(json.dumps({
+                'type': 'event', 'channel': self.channel, 'token': feed_token(60), 'event': event
+            }, default=str))
+            with self._lock:
+                if self._pending and self._pending[0] is event:
+                    self._pending.popleft()
+            self.stats['sent'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': len(self._pending)}
+
+# Singleton instance
+live_feed = LiveFeedPublisher()
@@ -0,0 +1,149 @@
+import copy
+import logging
+import re
+import threading
+import time
+import concurrent.futures
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config import LOOKUP_CACHE_MAX_SIZE, LOOKUP_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, Hashable]
+
+def normalize_query(query: Any) -> str:
+    """Canonical form of an A-number or phone: digits only, without a US country code."""
+    digits = re.sub(r'\D', '', str(query or ''))
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits or str(query or '').strip().lower()
+
+class LookupCache:
+    """Process-wide TTL cache of external lookup results, LRU-evicted.
+
+    Keys are ``(source, normalized query)``. Sources can have their own TTL
+    (``ttls``); everything else uses ``ttl``.
+    """
+
+    def __init__(self, max_size: int = LOOKUP_CACHE_MAX_SIZE, ttl: float = LOOKUP_CACHE_TTL,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self._data: 'OrderedDict[Key, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Key) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Key, value: Any):
+        ttl = self.ttls.get(key[0], self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+def _cacheable(result: Any) -> bool:
+    # Scraper results are dicts with a status; errors are never cached
+    return isinstance(result, dict) and result.get('status') in ('success', 'not_found')
+
+class SingleFlight:
+    """Coalesce concurrent lookups of the same ``(source, query)``.
+
+    The first caller (the leader) runs the fetch; callers that arrive while it
+    is in flight wait for the same future instead of going to the network, and
+    the result is published into the lookup cache for later callers. Every
+    caller gets its own copy so one session cannot mutate another's result.
+    """
+
+    def __init__(self, cache: Optional[LookupCache] = None):
+        self.cache = cache if cache is not None else LookupCache()
+        self._inflight: Dict[Key, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, source: str, counter: str):
+        stats = self._stats.setdefault(
+            source, {'calls': 0, 'cache_hits': 0, 'fetches': 0, 'coalesced': 0, 'errors': 0}
+        )
+        stats[counter] += 1
+
+    def call(self, source: str, query: Any, fetch: Callable[[], Any],
+             normalize: Callable[[Any], Hashable] = normalize_query,
+             cacheable: Callable[[Any], bool] = _cacheable,
+             timeout: Optional[float] = None) -> Any:
+        key = (source, normalize(query))
+
+        with self._lock:
+            self._count(source, 'calls')
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count(source, 'cache_hits')
+                return copy.deepcopy(cached)
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+                self._count(source, 'fetches')
+            else:
+                self._count(source, 'coalesced')
+
+        if not leader:
+            return copy.deepcopy(future.result(timeout))
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._count(source, 'errors')
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        # Publish before releasing the key so no caller can miss both
+        with self._lock:
+            if cacheable(result):
+                self.cache.set(key, result)
+            del self._inflight[key]
+        future.set_result(result)
+        return copy.deepcopy(result)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_source = {source: dict(stats) for source, stats in self._stats.items()}
+        return {
+            'sources': per_source,
+            'coalesced': sum(s['coalesced'] for s in per_source.values()),
+            'in_flight': len(self._inflight),
+            'cached_entries': len(self.cache),
+        }
+
+# Singleton instance
+lookups = SingleFlight()
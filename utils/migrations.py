@@ -0,0 +1,217 @@
+import os
+import re
+import sys
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from config import MIGRATIONS_DIR
+from utils.db_backends import DatabaseBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+_FILENAME_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent starts migrate once
+_PG_LOCK_KEY = 7201131
+
+_VERSION_TABLE = {
+    'postgresql': """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+}
+
+class MigrationError(Exception):
+    """Raised when applied migrations no longer match the files on disk."""
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+    sql: str
+    checksum: str
+
+def _split_sqlite(sql: str) -> List[str]:
+    """Split a script into statements, keeping trigger bodies intact."""
+    statements, current = [], ''
+    for line in sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ''
+    if current.strip() and not all(
+        l.strip().startswith('--') or not l.strip() for l in current.splitlines()
+    ):
+        statements.append(current.strip())
+    return statements
+
+class MigrationRunner:
+    """Apply the SQL files in ``migrations/<dialect>/`` in version order.
+
+    Each file runs in its own transaction together with its row in
+    ``schema_migrations``. When nothing is pending the runner costs a single
+    query against that table; applied files whose checksum changed raise
+    ``MigrationError`` instead of being silently skipped.
+    """
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None, directory: str = MIGRATIONS_DIR):
+        self._backend = backend
+        self.directory = directory
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def available(self) -> List[Migration]:
+        directory = os.path.join(self.directory, self.backend.dialect)
+        migrations = []
+        for filename in sorted(os.listdir(directory)):
+            match = _FILENAME_RE.match(filename)
+            if not match:
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, 'r', encoding='utf-8') as f:
+                sql = f.read()
+            checksum = hashlib.sha256(sql.replace('\r\n', '\n').encode('utf-8')).hexdigest()
+            migrations.append(Migration(int(match.group(1)), match.group(2), path, sql, checksum))
+        versions = [m.version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise MigrationError(f"Duplicate migration versions in {directory}")
+        return sorted(migrations)
+
+    def applied(self) -> Optional[Dict[int, str]]:
+        """Map of applied version to checksum, or None if never migrated."""
+        try:
+            rows = self.backend.fetch_all("SELECT version, checksum FROM schema_migrations")
+        except Exception:
+            return None
+        return {row['version']: row['checksum'] for row in rows}
+
+    def _verify(self, migrations: List[Migration], applied: Dict[int, str]):
+        for migration in migrations:
+            checksum = applied.get(migration.version)
+            if checksum is not None and checksum != migration.checksum:
+                raise MigrationError(
+                    f"Migration {migration.version:04d}_{migration.name} was modified after being applied"
+                )
+
+    def pending(self) -> List[Migration]:
+        migrations = self.available()
+        applied = self.applied() or {}
+        self._verify(migrations, applied)
+        return [m for m in migrations if m.version not in applied]
+
+    def migrate(self) -> List[Migration]:
+        """Apply pending migrations and return the ones that ran."""
+        migrations = self.available()
+        applied = self.applied()
+        if applied is not None:
+            self._verify(migrations, applied)
+            if all(m.version in applied for m in migrations):
+                return []
+
+        done = []
+        for migration in migrations:
+            if applied is not None and migration.version in applied:
+                continue
+            if self._apply(migration):
+                done.append(migration)
+        return done
+
+    def _apply(self, migration: Migration) -> bool:
+        dialect = self.backend.dialect
+        with self.backend.session() as s:
+            cur = s.conn.cursor()
+            try:
+                if dialect == 'postgresql':
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (_PG_LOCK_KEY,))
+                elif not s.conn.in_transaction:
+                    # DDL does not open a transaction implicitly in sqlite3
+                    cur.execute("BEGIN IMMEDIATE")
+                cur.execute(_VERSION_TABLE[dialect])
+
+                # Another process may have applied it while we waited for the lock
+                cur.execute(
+                    "SELECT checksum FROM schema_migrations WHERE version = "
+                    + ('%s' if dialect == 'postgresql' else '?'),
+                    (migration.version,)
+                )
+                if cur.fetchone() is not None:
+                    return False
+
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                if dialect == 'postgresql':
+                    cur.execute(migration.sql)
+                else:
+                    for statement in _split_sqlite(migration.sql):
+                        try:
+                            cur.execute(statement)
+                        except sqlite3.OperationalError as e:
+                            # sqlite has no ADD COLUMN IF NOT EXISTS
+                            if 'duplicate column' not in str(e).lower():
+                                raise
+
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES "
+                    + ('(%s, %s, %s)' if dialect == 'postgresql' else '(?, ?, ?)'),
+                    (migration.version, migration.name, migration.checksum)
+                )
+                return True
+            finally:
+                cur.close()
+
+    def status(self) -> List[Dict]:
+        applied = self.applied() or {}
+        return [
+            {
+                'version': m.version,
+                'name': m.name,
+                'applied': m.version in applied,
+                'modified': m.version in applied and applied[m.version] != m.checksum
+            }
+            for m in self.available()
+        ]
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def ensure_schema(backend: Optional[DatabaseBackend] = None) -> List[Migration]:
+    """Bring the schema up to date once per process."""
+    global _schema_ready
+    if _schema_ready:
+        return []
+    with _schema_lock:
+        if _schema_ready:
+            return []
+        applied = MigrationRunner(backend).migrate()
+        if applied:
+            logger.info(f"Applied {len(applied)} migration(s)")
+        _schema_ready = True
+        return applied
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    runner = MigrationRunner()
+    if len(sys.argv) > 1 and sys.argv[1] == 'status':
+        for row in runner.status():
+            state = 'modificada' if row['modified'] else ('aplicada' if row['applied'] else 'pendiente')
+            print(f"{row['version']:04d}_{row['name']:<30} {state}")
+    else:
+        applied = runner.migrate()
+        print(f"Migraciones aplicadas: {len(applied)}")
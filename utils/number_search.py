@@ -1,95 +1,113 @@
 import streamlit as st
+import pandas as pd
+from config import EOIR_SIMULATOR
 from utils.auth_utils import check_authentication
-from scrapers.eoir_scraper import EOIRScraper
-import threading
+from utils.resources import resources
+from utils.sweep_queue import sweep_queue
+
+SWEEP_STATUS = {'active': 'En curso', 'done': 'Completado', 'failed': 'Con errores', 'cancelled': 'Detenido'}
 
 def number_search_page():
     check_authentication()
     st.title("Búsqueda por Número")
 
-    # Inicializar estado de sesión
-    if 'search_running' not in st.session_state:
-        st.session_state.search_running = False
-    if 'stop_search' not in st.session_state:
-        st.session_state.stop_search = threading.Event()
-    if 'search_stats' not in st.session_state:
-        st.session_state.search_stats = {
-            'total_attempts': 0,
-            'successful_attempts': 0,
-            'not_found_attempts': 0,
-            'failed_attempts': 0,
-            'last_number': None,
-            'last_error': None
-        }
-
     # Generar números
     st.header("Generar Número")
     col1, col2 = st.columns([1, 3])
 
     with col1:
+        number = None
         if st.button("Generar Siguiente Número"):
-            st.session_state.generated_numbers.append(generate_next_number())
+            number = generate_next_number()
         if st.button("Generar Número Aleatorio"):
-            st.session_state.generated_numbers.append(generate_random_number())
+            number = generate_random_number()
+        if number:
+            st.session_state.generated_numbers.append(number)
 
     with col2:
-        current_number = st.session_state.generated_numbers[-1] if st.session_state.generated_numbers else generate_next_number()
+        current_number = st.session_state.generated_numbers[-1] if st.session_state.generated_numbers else "000000000"
         st.markdown(f'<div class="matrix-number">{current_number}</div>', unsafe_allow_html=True)
 
-    # Búsqueda Continua
+    # Búsqueda Continua: queued for worker processes, so it outlives this tab
     st.header("Búsqueda Continua")
-    search_col1, search_col2 = st.columns([2, 1])
-
-    with search_col1:
-        if not st.session_state.search_running:
-            if st.button("Iniciar Búsqueda Continua", type="primary"):
-                st.session_state.search_running = True
-                st.session_state.stop_search.clear()
-                st.experimental_rerun()
-        else:
-            if st.button("Detener Búsqueda", type="secondary"):
-                st.session_state.stop_search.set()
-                st.session_state.search_running = False
-                st.experimental_rerun()
-
-    with search_col2:
-        st.metric("Total Intentos", st.session_state.search_stats['total_attempts'])
-
-    if st.session_state.search_running:
-        progress_placeholder = st.empty()
-        stats_col1, stats_col2, stats_col3 = st.columns(3)
-
-        with stats_col1:
-            st.metric("Búsquedas Exitosas", st.session_state.search_stats['successful_attempts'])
-        with stats_col2:
-            st.metric("No Encontrados", st.session_state.search_stats['not_found_attempts'])
-        with stats_col3:
-            st.metric("Errores", st.session_state.search_stats['failed_attempts'])
-
-        if st.session_state.search_stats['last_error']:
-            st.warning(f"Último error: {st.session_state.search_stats['last_error']}")
-
-        scraper = EOIRScraper()
-        current_number = st.session_state.current_prefix * 1000000
-        result = scraper.search_until_found(
-            str(current_number),
-            max_attempts=1000,
-            delay=1.0,
-            progress_callback=lambda p, n: update_progress(p, n),
-            stop_flag=st.session_state.stop_search
-        )
-
-        if result['status'] == 'found':
-            st.success(f"¡Caso encontrado! Número: {result['found_case']['number']}")
-            st.session_state.search_running = False
+    render_sweeps()
+    render_priority_sweep()
+
+def render_sweeps():
+    user_id = st.session_state.user_id
+    if not EOIR_SIMULATOR:
+        st.warning("Los barridos solo funcionan contra upstream_simulator.py (EOIR_SIMULATOR=true): "
+                   "el portal ACIS real es una aplicación JavaScript que este analizador no reconoce.")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        start = st.number_input("Número inicial", min_value=0, max_value=999999999,
+                                value=st.session_state.current_prefix * 1000, step=1, format="%d")
+    with col2:
+        count = st.number_input("Cantidad de números", min_value=1, max_value=10000000, value=1000, step=100)
+    with col3:
+        st.write("")
+        if st.button("Iniciar Búsqueda Continua", type="primary", disabled=not EOIR_SIMULATOR):
+            count = min(int(count), 1000000000 - int(start))
+            sweep_id = sweep_queue.create_sweep(int(start), count, user_id)
+            st.success(f"Barrido #{sweep_id} en cola ({count:,} números)")
+
+    workers = sweep_queue.active_workers()
+    if workers:
+        st.caption(f"{len(workers)} worker(s) activo(s): " + ", ".join(w['worker_id'] for w in workers))
+    else:
+        st.warning("No hay workers activos; los barridos esperarán hasta que se inicie `python worker.py`.")
+
+    for sweep in sweep_queue.list_sweeps(user_id, limit=10):
+        total = sweep['end_number'] - sweep['start_number']
+        done = sweep['numbers_done'] or 0
+        label = (f"#{sweep['id']} {str(sweep['start_number']).zfill(9)}–{str(sweep['end_number'] - 1).zfill(9)} · "
+                 f"{SWEEP_STATUS.get(sweep['status'], sweep['status'])} · {sweep['hits'] or 0} encontrados · "
+                 f"{sweep['skipped'] or 0} omitidos · {sweep['errors'] or 0} errores")
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.progress(min(done / total, 1.0) if total else 1.0, text=label)
+        with col2:
+            if sweep['status'] == 'active' and st.button("Detener", key=f"cancel_sweep_{sweep['id']}"):
+                sweep_queue.cancel_sweep(sweep['id'], user_id)
+                st.rerun()
+
+def render_priority_sweep():
+    """Queue sweeps over the blocks with the best expected hit rate"""
+    user_id = st.session_state.user_id
+    scheduler = resources.get('block_scheduler')
+    st.subheader("Barrido Priorizado")
+    st.caption("Reparte las búsquedas entre los bloques de números con más casos encontrados y sus vecinos.")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        budget = st.number_input("Búsquedas a repartir", min_value=100, max_value=1000000, value=2000, step=100)
+    with col2:
+        st.write("")
+        if st.button("Encolar Barrido Priorizado", disabled=not EOIR_SIMULATOR):
+            ranges = scheduler.plan(int(budget))
+            for start, count in ranges:
+                sweep_queue.create_sweep(start, count, user_id)
+            blocks = {start // scheduler.block_size for start, _ in ranges}
+            st.success(f"{len(ranges)} barrido(s) en cola en {len(blocks)} bloque(s)")
+
+    top = scheduler.top_blocks(10)
+    if top:
+        st.dataframe(pd.DataFrame([{
+            'Desde': row['first_number'],
+            'Buscados': row['searched'],
+            'Encontrados': row['hits'],
+            'Esperados por 1000': row['expected_per_1000'],
+        } for row in top]), use_container_width=True, hide_index=True)
+
+def _next_number(random_offset):
+    number = resources.get('block_scheduler').next_number(
+        random_offset=random_offset, is_new=lambda n: not resources.get('known_numbers').might_contain(n)
+    )
+    if number is not None:
+        st.session_state.current_prefix = int(number) // 1000
+    return number
 
 def generate_next_number():
-    return str(st.session_state.current_prefix * 1000 + random.randint(100000, 999999)).zfill(9)
+    return _next_number(random_offset=False)
 
 def generate_random_number():
-    return str(random.randint(100000, 999999999)).zfill(9)
-
-def update_progress(progress, number):
-    progress_placeholder.progress(progress / 100)
-    st.session_state.search_stats.update(scraper.get_search_stats())
-    st.experimental_rerun()
\ No newline at end of file
+    return _next_number(random_offset=True)
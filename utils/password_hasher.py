@@ -0,0 +1,260 @@
+import base64
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+import concurrent.futures
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Optional
+
+from config import (
+    PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_ADMIT_TIMEOUT, LOGIN_MAX_ATTEMPTS, LOGIN_ATTEMPT_WINDOW
+)
+
+logger = logging.getLogger(__name__)
+
+SALT_BYTES = 16
+HASH_ALGORITHM = 'pbkdf2_sha256'
+# Unsalted hex SHA-256 written by create_supervisor.py and the old number generator login
+_LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+# Bare base64(salt + digest) hashes from before the iteration count was stored used 100k rounds
+_BARE_ITERATIONS = 100000
+
+class HasherBusy(RuntimeError):
+    """Too many hashes queued; the caller should ask the user to retry."""
+
+class LoginThrottled(RuntimeError):
+    """Too many login attempts for one username."""
+
+    def __init__(self, username: str, retry_after: float):
+        super().__init__(f"Too many login attempts for {username}")
+        self.retry_after = retry_after
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    # Runs in the worker processes; keep it a plain module-level function so it pickles
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+def is_legacy_hash(stored_hash: str) -> bool:
+    return bool(stored_hash) and bool(_LEGACY_SHA256.match(stored_hash))
+
+def _encode(salt: bytes, digest: bytes, iterations: int) -> str:
+    """``pbkdf2_sha256$<iterations>$<salt>$<digest>``, salt and digest in base64."""
+    return '$'.join((
+        HASH_ALGORITHM, str(iterations),
+        base64.b64encode(salt).decode('ascii'), base64.b64encode(digest).decode('ascii')
+    ))
+
+def _decode(stored_hash: str):
+    """(iterations, salt, digest) of a PBKDF2 hash in either format."""
+    if stored_hash.startswith(HASH_ALGORITHM + '$'):
+        _, iterations, salt, digest = stored_hash.split('$')
+        return int(iterations), base64.b64decode(salt), base64.b64decode(digest)
+    decoded = base64.b64decode(stored_hash.encode('utf-8'))
+    return _BARE_ITERATIONS, decoded[:SALT_BYTES], decoded[SALT_BYTES:]
+
+class PasswordHasher:
+    """PBKDF2 hashing on a bounded process pool.
+
+    Each hash is ~100k SHA-256 rounds. Run on the Streamlit script thread, a
+    floor of operators logging in at shift start queued behind each other and
+    froze every session in the process. Hashes go to a small process pool
+    instead, and at most ``max_pending`` may be queued or running at once; a
+    caller that cannot get a slot within ``admit_timeout`` gets ``HasherBusy``
+    rather than joining an unbounded queue.
+
+    Hashes carry their iteration count, so raising ``iterations`` leaves
+    existing hashes verifiable; ``needs_rehash`` flags them (and legacy
+    formats) for an upgrade at the next successful login.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 admit_timeout: float = PASSWORD_HASH_ADMIT_TIMEOUT,
+                 iterations: int = PASSWORD_HASH_ITERATIONS):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.admit_timeout = admit_timeout
+        self.iterations = iterations
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.stats = {'hashed': 0, 'verified': 0, 'rejected_busy': 0, 'pool_restarts': 0}
+
+    def _pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking the multi-threaded Streamlit server is unsafe
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _reset_pool(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.stats['pool_restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _derive(self, password: str, salt: bytes, iterations: int) -> bytes:
+        if not self._slots.acquire(timeout=self.admit_timeout):
+            self.stats['rejected_busy'] += 1
+            raise HasherBusy("Password hasher saturated")
+        try:
+            for attempt in range(2):
+                executor = self._pool()
+                try:
+                    return executor.submit(_pbkdf2, password, salt, iterations).result()
+                except BrokenProcessPool:
+                    logger.warning("Password hashing pool died, restarting it")
+                    self._reset_pool(executor)
+            # Workers cannot start here; pbkdf2_hmac releases the GIL, so hash
+            # on this thread rather than fail the login
+            logger.error("Password hashing pool unavailable, hashing inline")
+            return _pbkdf2(password, salt, iterations)
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.iterations)
+        self.stats['hashed'] += 1
+        return _encode(salt, digest, self.iterations)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        if not stored_hash:
+            return False
+        if is_legacy_hash(stored_hash):
+            # A single SHA-256 is cheap; no need to take a pool slot
+            calculated = hashlib.sha256(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(calculated, stored_hash)
+        try:
+            iterations, salt, expected = _decode(stored_hash)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Unreadable password hash: {e}")
+            return False
+        digest = self._derive(password, salt, iterations)
+        self.stats['verified'] += 1
+        return hmac.compare_digest(digest, expected)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        if is_legacy_hash(stored_hash) or not stored_hash.startswith(HASH_ALGORITHM + '$'):
+            return True
+        try:
+            return _decode(stored_hash)[0] != self.iterations
+        except (ValueError, TypeError):
+            return False
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first login."""
+        executor = self._pool()
+        for future in [executor.submit(_pbkdf2, '', b'', 1) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+class LoginRateLimiter:
+    """Sliding-window limit on login attempts per username.
+
+    Successful logins clear the window, so only repeated failures (or a
+    storm of retries from one user) lock an account out, and only for
+    ``window`` seconds. Usernames whose window has passed are dropped every
+    ``_PRUNE_EVERY`` checks, so attempts against made-up names don't pile up.
+    """
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, max_attempts: int = LOGIN_MAX_ATTEMPTS, window: float = LOGIN_ATTEMPT_WINDOW):
+        self.max_attempts = max_attempts
+        self.window = window
+        self._attempts: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return (username or '').strip().lower()
+
+    def check(self, username: str):
+        """Record an attempt or raise ``LoginThrottled``."""
+        key = self._key(username)
+        now = time.monotonic()
+        with self._lock:
+            self._checks += 1
+            if self._checks % self._PRUNE_EVERY == 0:
+                self._prune(now)
+            attempts = self._attempts.setdefault(key, deque())
+            while attempts and now - attempts[0] > self.window:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                raise LoginThrottled(username, self.window - (now - attempts[0]))
+            attempts.append(now)
+
+    def reset(self, username: str):
+        with self._lock:
+            self._attempts.pop(self._key(username), None)
+
+    def _prune(self, now: float):
+        for key in [k for k, v in self._attempts.items() if not v or now - v[-1] > self.window]:
+            del self._attempts[key]
+
+    def prune(self):
+        with self._lock:
+            self._prune(time.monotonic())
+
+def get_hasher() -> PasswordHasher:
+    # Imported lazily so worker processes do not load the registry
+    from utils.resources import resources
+    return resources.get('password_hasher')
+
+# Singleton instance
+login_limiter = LoginRateLimiter()
+
+def _dummy_hash(iterations: int) -> str:
+    # Verified against unknown usernames so that they cost the same as wrong passwords
+    return _encode(b'\0' * SALT_BYTES, b'\0' * 32, iterations)
+
+def authenticate(username: str, password: str, user_repository=None,
+                 hasher: Optional[PasswordHasher] = None,
+                 limiter: Optional[LoginRateLimiter] = None) -> Optional[Dict[str, Any]]:
+    """Check credentials and return the user row, or None.
+
+    Raises ``LoginThrottled`` or ``HasherBusy``; callers turn those into a
+    "try again later" message. A hash that verifies but is in a legacy format
+    or uses a different iteration count is replaced before returning.
+    """
+    if user_repository is None:
+        from utils.repository import users as user_repository
+
+    limiter = limiter or login_limiter
+    hasher = hasher or get_hasher()
+    limiter.check(username)
+    user = user_repository.get_by_username(username)
+    if not user:
+        hasher.verify(_dummy_hash(hasher.iterations), password)
+        return None
+    if not hasher.verify(user['password_hash'], password):
+        return None
+
+    limiter.reset(username)
+    if hasher.needs_rehash(user['password_hash']):
+        try:
+            new_hash = hasher.hash(password)
+            user_repository.update_password_hash(user['id'], new_hash)
+            user = dict(user, password_hash=new_hash)
+            logger.info(f"Upgraded password hash for user {user['username']}")
+        except Exception as e:
+            # The login itself succeeded; the upgrade is retried next time
+            logger.error(f"Could not upgrade password hash for user {user['username']}: {e}")
+    return user
@@ -2,10 +2,22 @@ import streamlit as st
 import threading
 import time
 from utils.webrtc import WebRTCHandler
+from utils.event_loop import run_sync
 from utils.usb_manager import USBManager
-from utils.database import add_phone_call, get_phone_calls, add_verification_form, get_verification_forms
+from utils.database import get_phone_calls, add_verification_form, get_verification_forms
+from utils.repository import cases as case_repository
+from utils.call_events import CallEventLog, CallStatus, get_call_event_log
+from components.call_timer import render_call_timer
 
 class PhoneCallPage:
+    # Call statuses as understood by the browser-side timer
+    _TIMER_STATES = {
+        'initiated': 'connected',
+        'in_progress': 'connected',
+        'on_hold': 'on_hold',
+        'ended': 'ended'
+    }
+
     def __init__(self):
         self.webrtc = WebRTCHandler()
         self.usb_manager = USBManager()
@@ -47,6 +59,12 @@ class PhoneCallPage:
 
         if self.current_call:
             st.write(f"Llamada en curso con el número: {self.current_call['phone_number']}")
+            render_call_timer(
+                self.current_call['id'],
+                self._TIMER_STATES.get(self.current_call['status'], self.current_call['status']),
+                started_at=self.call_start_time,
+                elapsed=self.call_duration
+            )
             self._render_call_controls_during_call()
 
     def _render_call_controls_during_call(self):
@@ -75,21 +93,16 @@ class PhoneCallPage:
             st.error("No hay caso seleccionado para llamar")
             return
             
-        conn = get_db_connection()
-        cur = conn.cursor()
         try:
-            cur.execute("""
-                SELECT client_phone, other_client_phone, first_name, last_name
-                FROM cases WHERE id = %s
-            """, (st.session_state.current_case,))
-            case_info = cur.fetchone()
-            
-            if not case_info or not case_info[0]:
+            case_info = case_repository.get(st.session_state.current_case)
+
+            if not case_info or not case_info['client_phone']:
                 st.error("No hay número de teléfono disponible para este caso")
                 return
-                
-            phone_number = st.session_state.get('current_phone', case_info[0])
-            success = self.webrtc.start_call(phone_number)
+
+            phone_number = st.session_state.get('current_phone', case_info['client_phone'])
+            call_id = CallEventLog.new_call_id()
+            success = run_sync(self.webrtc.start_call(phone_number, call_id=call_id), timeout=15)
             
             if success:
                 self.current_call = {
@@ -100,31 +113,41 @@ class PhoneCallPage:
                     'case_id': st.session_state.current_case
                 }
                 
-                call_id = add_phone_call(
-                    user_id=st.session_state.user_id,
+                get_call_event_log().record(
+                    call_id,
+                    CallStatus.INITIATED,
                     phone_number=phone_number,
-                    status='initiated',
-                    duration=0,
-                    notes=None,
-                    case_id=st.session_state.current_case
+                    user_id=st.session_state.user_id,
+                    search_id=st.session_state.current_case
                 )
-                
+
                 self.current_call['id'] = call_id
+                self.call_duration = 0
                 self.call_start_time = time.time()
-                st.success(f"Llamando a {case_info[2]} {case_info[3]} - {phone_number}")
-                self._update_call_duration()
+                st.success(f"Llamando a {case_info['first_name']} {case_info['last_name']} - {phone_number}")
                 
         except Exception as e:
             st.error(f"Error al iniciar la llamada: {str(e)}")
-        finally:
-            cur.close()
-            conn.close()
+
+    def _record_event(self, status, notes=None):
+        """Append a call state change to the event log without waiting on the DB."""
+        get_call_event_log().record(
+            self.current_call['id'],
+            status,
+            phone_number=self.current_call['phone_number'],
+            user_id=st.session_state.get('user_id'),
+            search_id=self.current_call.get('case_id'),
+            duration=self.current_call['duration'],
+            notes=notes
+        )
 
     def _hold_call(self):
         if self.current_call:
             self.current_call['status'] = 'on_hold'
-            self.webrtc.hold_call()
+            run_sync(self.webrtc.hold_call(), timeout=5)
             self._update_call_duration()
+            self.call_start_time = None
+            self._record_event(CallStatus.ON_HOLD)
         else:
             st.error("No active call to put on hold")
 
@@ -134,17 +157,18 @@ class PhoneCallPage:
             return
             
         self.current_call['status'] = 'in_progress'
-        self.webrtc.resume_call()
+        run_sync(self.webrtc.resume_call(), timeout=5)
         self.call_start_time = time.time()
-        self._update_call_duration()
+        self._record_event(CallStatus.IN_PROGRESS)
 
     def _end_call(self):
         if not self.current_call:
             return
             
+        self._update_call_duration()
         self.current_call['status'] = 'ended'
-        self.current_call['duration'] = self.call_duration
-        self.webrtc.end_call()
+        run_sync(self.webrtc.end_call(), timeout=10)
+        self._record_event(CallStatus.ENDED)
         self.current_call = None
         self.call_duration = 0
         self.call_start_time = None
@@ -157,13 +181,7 @@ class PhoneCallPage:
         note = st.text_input("Agregar nota a la llamada")
         if note and st.button("Guardar Nota"):
             self.current_call['notes'] = note
-            add_phone_call(
-                st.session_state.user_id,
-                self.current_call['phone_number'],
-                self.current_call['status'],
-                self.current_call['duration'],
-                self.current_call['notes']
-            )
+            self._record_event(CallStatus.NOTE, notes=note)
 
     def _generate_verification_form(self):
         if not self.current_call:
@@ -227,8 +245,13 @@ class PhoneCallPage:
                 self.usb_manager.configure_device(selected_device)
 
     def _update_call_duration(self):
-        while self.current_call and self.current_call['status'] in ['in_progress', 'on_hold']:
-            if self.call_start_time is not None:
-                self.call_duration = int(time.time() - self.call_start_time)
-                st.session_state.experimental_rerun()
-            time.sleep(1)
\ No newline at end of file
+        """Fold the running segment into the accumulated duration.
+
+        Called only on state transitions; the live timer runs in the browser.
+        """
+        if self.call_start_time is not None:
+            now = time.time()
+            self.call_duration += now - self.call_start_time
+            self.call_start_time = now
+        if self.current_call:
+            self.current_call['duration'] = int(self.call_duration)
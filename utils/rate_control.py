@@ -0,0 +1,336 @@
+import os
+import time
+import socket
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Optional
+
+import requests
+
+from config import (
+    EOIR_MAX_CONCURRENCY, EOIR_MAX_RATE, EOIR_TIMEOUT, PDL_MAX_CONCURRENCY, PDL_MAX_RATE, PDL_TIMEOUT,
+    UPSTREAM_TARGET_LATENCY, BREAKER_FAILURE_RATE, BREAKER_WINDOW, BREAKER_OPEN_SECONDS,
+    BREAKER_MAX_OPEN_SECONDS
+)
+from utils.live_feed import live_feed
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpen(Exception):
+    """The source's breaker is open; retry after ``retry_after`` seconds."""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"{source} unavailable, retry in {retry_after:.0f}s")
+        self.source = source
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Closed -> open after sustained failures -> half-open probe -> closed.
+
+    Opens when at least ``failure_rate`` of the last ``window`` calls failed
+    (once ``window // 2`` calls have been seen), or straight away on ``trip``
+    (e.g. rejected credentials). While open every call fails fast; after
+    ``open_seconds`` a single probe goes through and decides. Each failed
+    probe doubles the open period, up to ``max_open_seconds``.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name: str, failure_rate: float = BREAKER_FAILURE_RATE, window: int = BREAKER_WINDOW,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = self.CLOSED
+        self.reason: Optional[str] = None
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._open_until = 0.0
+        self._current_open = open_seconds
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Raise ``CircuitOpen`` unless a call may go out now; True for the half-open probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state == self.OPEN and now >= self._open_until:
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            raise CircuitOpen(self.name, max(self._open_until - now, 1.0))
+
+    def record(self, success: Optional[bool]):
+        """Count a call's outcome; ``None`` is neutral (e.g. throttled) except as a probe."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._outcomes.clear()
+                    self._current_open = self.open_seconds
+                    self.reason = None
+                    self._transition(self.CLOSED)
+                else:
+                    self._current_open = min(self._current_open * 2, self.max_open_seconds)
+                    self._open(self._current_open, self.reason)
+                return
+            if self.state != self.CLOSED or success is None:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= max(self._outcomes.maxlen // 2, 1)
+                    and failures >= self.failure_rate * len(self._outcomes)):
+                self._open(self._current_open, f"{failures}/{len(self._outcomes)} fallos recientes")
+
+    def trip(self, seconds: float, reason: str):
+        """Open immediately, for failures that retrying won't fix."""
+        with self._lock:
+            self._probing = False
+            self._open(seconds, reason)
+
+    def _open(self, seconds: float, reason: Optional[str]):
+        self._open_until = time.monotonic() + seconds
+        self.reason = reason
+        self.opened += 1
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state and state != self.OPEN:
+            return
+        previous, self.state = self.state, state
+        logger.warning(f"Circuit {self.name}: {previous} -> {state}" + (f" ({self.reason})" if self.reason else ''))
+        live_feed.publish('service_health', service=f"upstream:{self.name}", status=BREAKER_HEALTH[state],
+                          previous=BREAKER_HEALTH.get(previous), error=self.reason,
+                          host=f"{socket.gethostname()}:{os.getpid()}")
+
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def retry_after(self) -> float:
+        return max(self._open_until - time.monotonic(), 0.0) if self.state == self.OPEN else 0.0
+
+BREAKER_HEALTH = {CircuitBreaker.CLOSED: 'healthy', CircuitBreaker.HALF_OPEN: 'warning', CircuitBreaker.OPEN: 'unhealthy'}
+
+class _Call:
+    """One request through a controller; ``observe`` classifies the response."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.outcome: Optional[str] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, status_code: int, retry_after: Optional[str] = None):
+        if status_code == 429:
+            self.outcome = 'overload'
+        elif status_code >= 500:
+            self.outcome = 'error'
+        elif status_code in (401, 402, 403):
+            self.outcome = 'rejected'
+        else:
+            # Other 4xx (e.g. no match) are answers, not upstream trouble
+            self.outcome = 'ok'
+        if retry_after:
+            try:
+                self.retry_after = float(retry_after)
+            except ValueError:
+                pass
+
+class AdaptiveController:
+    """Request control for one upstream source, shared by all threads of a process.
+
+    - Concurrency limit, AIMD: each fast success adds ``1/limit`` (about +1
+      per round of ``limit`` requests); a timeout, 5xx, 429 or a response
+      slower than ``target_latency`` halves it, at most once per round trip.
+    - Pacing: requests start at most ``max_rate`` per second. After a 429,
+      5xx or timeout, new requests also wait for ``Retry-After`` or a short
+      exponential backoff. A 429 alone never opens the circuit.
+    - Timeout: smoothed latency plus four deviations (as TCP does), between
+      ``min_timeout`` and ``max_timeout``.
+    - Circuit breaker: see ``CircuitBreaker``. Rejected credentials open it
+      for ``auth_open_seconds``.
+    """
+
+    def __init__(self, name: str, max_limit: int = 8, initial_limit: float = 1.0, min_limit: float = 1.0,
+                 max_rate: float = 0.0, target_latency: float = UPSTREAM_TARGET_LATENCY,
+                 min_timeout: float = 2.0, max_timeout: float = 10.0, backoff: float = 0.5,
+                 auth_open_seconds: float = BREAKER_MAX_OPEN_SECONDS, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max(min(initial_limit, max_limit), min_limit)
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.backoff = backoff
+        self.auth_open_seconds = auth_open_seconds
+        self.breaker = breaker or CircuitBreaker(name)
+        self.in_flight = 0
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self._next_start = 0.0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._overloads = 0
+        self._completed: Deque[float] = deque(maxlen=10000)
+        self._cond = threading.Condition()
+        self.counts = {'ok': 0, 'overload': 0, 'error': 0, 'rejected': 0, 'short_circuited': 0}
+
+    # ---------------------------------------------------------------- timing
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.max_timeout
+        return min(max(self.srtt + 4 * self.rttvar, self.min_timeout), self.max_timeout)
+
+    def _observe_latency(self, latency: float):
+        if self.srtt is None:
+            self.srtt, self.rttvar = latency, latency / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - latency)
+            self.srtt = 0.875 * self.srtt + 0.125 * latency
+
+    # -------------------------------------------------------------- admission
+    def _acquire(self):
+        if self.breaker.allow():
+            # The half-open probe goes straight out: its answer decides for everyone
+            with self._cond:
+                self.in_flight += 1
+            return
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(self._paused_until - now, 0.0)
+                if not wait and self.in_flight >= int(self.limit):
+                    wait = 1.0  # woken early by releases
+                if not wait and self.max_rate > 0:
+                    wait = max(self._next_start - now, 0.0)
+                if not wait:
+                    break
+                self._cond.wait(wait)
+                # The breaker may have opened while we waited
+                if self.breaker.state != CircuitBreaker.CLOSED:
+                    raise CircuitOpen(self.name, self.breaker.retry_after())
+            self.in_flight += 1
+            if self.max_rate > 0:
+                self._next_start = max(self._next_start, now) + 1.0 / self.max_rate
+
+    def _decrease(self, now: float):
+        # One cut per round trip: a burst of failures from the same window is one signal
+        if now - self._last_decrease >= (self.srtt or 1.0):
+            self.limit = max(self.limit * self.backoff, self.min_limit)
+            self._last_decrease = now
+
+    def _release(self, call: _Call, latency: float):
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            outcome = call.outcome or 'ok'
+            self.counts[outcome] += 1
+            self._completed.append(now)
+            if outcome == 'ok':
+                self._observe_latency(latency)
+                self._overloads = 0
+                if latency > self.target_latency:
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.limit + 1.0 / self.limit, self.max_limit)
+            elif outcome in ('overload', 'error'):
+                self._overloads += 1
+                self._decrease(now)
+                # Short pauses only; sustained trouble is the breaker's job
+                pause = call.retry_after if call.retry_after is not None else 0.25 * 2 ** min(self._overloads, 5)
+                self._paused_until = max(self._paused_until, now + min(pause, self.breaker.max_open_seconds))
+            self._cond.notify_all()
+
+        if outcome == 'rejected':
+            self.breaker.trip(self.auth_open_seconds, "credenciales rechazadas")
+        elif outcome == 'overload':
+            # Throttling is handled by pausing; it only keeps an open circuit open
+            self.breaker.record(None)
+        else:
+            self.breaker.record(outcome == 'ok')
+
+    @contextmanager
+    def request(self):
+        """Admit one request; yields a call whose ``timeout`` the request should use.
+
+        Raises ``CircuitOpen`` without waiting when the breaker is open.
+        Timeouts and connection errors raised inside the block count as
+        errors; call ``observe(status_code, retry_after)`` for responses.
+        """
+        try:
+            self._acquire()
+        except CircuitOpen:
+            with self._cond:
+                self.counts['short_circuited'] += 1
+            raise
+        call = _Call(self.timeout())
+        started = time.monotonic()
+        try:
+            yield call
+        except (requests.Timeout, requests.ConnectionError):
+            call.outcome = 'error'
+            raise
+        except Exception:
+            if call.outcome is None:
+                call.outcome = 'error'
+            raise
+        finally:
+            self._release(call, time.monotonic() - started)
+
+    # ------------------------------------------------------------------ stats
+    def rate(self, window: float = 60.0) -> float:
+        """Completed requests per second over the last ``window`` seconds."""
+        cutoff = time.monotonic() - window
+        with self._cond:
+            while self._completed and self._completed[0] < cutoff:
+                self._completed.popleft()
+            return len(self._completed) / window
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'source': self.name,
+            'state': self.breaker.state,
+            'status': BREAKER_HEALTH[self.breaker.state],
+            'reason': self.breaker.reason,
+            'retry_after': round(self.breaker.retry_after(), 1),
+            'limit': round(self.limit, 2),
+            'max_limit': self.max_limit,
+            'in_flight': self.in_flight,
+            'rate': round(self.rate(), 2),
+            'max_rate': self.max_rate,
+            'latency_ms': round(self.srtt * 1000, 1) if self.srtt is not None else None,
+            'timeout': round(self.timeout(), 2),
+            'error_rate': round(self.breaker.error_rate(), 3),
+            'paused_for': round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            'breaker_opened': self.breaker.opened,
+            **self.counts,
+        }
+
+_SOURCES = {
+    'eoir': dict(max_limit=EOIR_MAX_CONCURRENCY, max_rate=EOIR_MAX_RATE, max_timeout=EOIR_TIMEOUT),
+    'pdl': dict(max_limit=PDL_MAX_CONCURRENCY, max_rate=PDL_MAX_RATE, max_timeout=PDL_TIMEOUT),
+}
+
+_controllers: Dict[str, AdaptiveController] = {}
+_controllers_lock = threading.Lock()
+
+def controller_for(source: str) -> AdaptiveController:
+    """The process-wide controller of an upstream source."""
+    controller = _controllers.get(source)
+    if controller is None:
+        with _controllers_lock:
+            controller = _controllers.get(source)
+            if controller is None:
+                controller = _controllers[source] = AdaptiveController(source, **_SOURCES.get(source, {}))
+    return controller
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: controller.get_stats() for name, controller in list(_controllers.items())}
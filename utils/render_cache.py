@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config import RENDER_CACHE_MAX_ENTRIES, RENDER_CACHE_MAX_MB
+from utils.resources import deep_sizeof
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, Hashable, Hashable]
+
+class RenderCache:
+    """Rendered charts and query results keyed by the version of their data.
+
+    Entries are ``(name, data version, params)``; a new snapshot of a table
+    changes its version, so stale figures are never served and are simply
+    evicted (LRU, bounded by entry count and approximate bytes). Values are
+    shared between sessions and must not be mutated: PNG bytes, plotly
+    figures, small frames and dicts. A render for a key already being
+    rendered by another session waits for that result instead of repeating it.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_MAX_ENTRIES, max_bytes: int = int(RENDER_CACHE_MAX_MB * 1048576)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: 'OrderedDict[Key, Tuple[int, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._rendering: Dict[Key, threading.Event] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_render(self, name: str, version: Optional[Hashable], render: Callable[[], Any],
+                      params: Hashable = ()) -> Any:
+        """Cached ``render()``; without a data version nothing is cached."""
+        if version is None:
+            return render()
+        key = (name, version, params)
+        while True:
+            with self._lock:
+                entry = self._data.get(key)
+                if entry is not None:
+                    self._data.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                waiting = self._rendering.get(key)
+                if waiting is None:
+                    self._rendering[key] = threading.Event()
+                    self.stats['misses'] += 1
+                    break
+            # Another session is rendering it; if that fails, try ourselves
+            waiting.wait()
+
+        try:
+            value = render()
+            self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._rendering.pop(key).set()
+
+    def _store(self, key: Key, value: Any):
+        size = len(value) if isinstance(value, bytes) else deep_sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0]
+            self._data[key] = (size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._data),
+            'bytes': self._bytes,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+        }
+
+def get_render_cache() -> RenderCache:
+    from utils.resources import resources
+    return resources.get('render_cache')
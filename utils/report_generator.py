@@ -1,51 +1,108 @@
+import io
 import streamlit as st
-import pandas as pd
+from utils.render_cache import get_render_cache
+from utils.snapshots import case_summary, get_snapshots, monthly_counts, to_table, value_counts
 
 try:
-    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
+def _png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    return buffer.getvalue()
+
 class ReportGenerator:
-    def __init__(self, data):
+    """Case report aggregated from the analytics snapshot.
+
+    Without ``data`` the report reads the ``cases`` snapshot, one column set
+    per section, and never queries the database. Summaries, chart PNGs and the
+    detail table are cached per version of the snapshot's cases, so repeat
+    views neither read nor draw anything. A list of case dicts can still be
+    passed for ad-hoc reports; those are aggregated the same way, uncached.
+
+    Charts are drawn on standalone ``Figure`` objects rather than through
+    ``pyplot``'s global state, so sessions can render them concurrently.
+    """
+
+    DETAIL_ROWS = 1000
+
+    def __init__(self, data=None, snapshots=None, cache=None):
         self.data = data
+        self._snapshots = snapshots
+        self._cache = cache
+        self._table = to_table('cases', data) if data is not None else None
+
+    @property
+    def snapshots(self):
+        return self._snapshots or get_snapshots()
+
+    @property
+    def cache(self):
+        return self._cache or get_render_cache()
+
+    def _cases(self, columns):
+        if self._table is not None:
+            return self._table.select(columns)
+        return self.snapshots.table('cases', columns)
+
+    def _cached(self, name, render):
+        version = None if self._table is not None else self.snapshots.data_version('cases')
+        return self.cache.get_or_render(f"report.{name}", version, render)
 
     def generate_summary(self):
-        summary = {
-            "Total Cases": len(self.data),
-            "Positive Cases": sum(1 for case in self.data if case['is_positive']),
-            "Negative Cases": sum(1 for case in self.data if not case['is_positive'])
+        summary = self._cached('summary', lambda: case_summary(self._cases(['is_positive'])))
+        return {
+            "Total Cases": summary['total'],
+            "Positive Cases": summary['positive'],
+            "Negative Cases": summary['negative']
         }
-        return summary
+
+    def _status_chart(self):
+        status_counts = value_counts(self._cases(['status']), 'status')
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        ax.pie([row['count'] for row in status_counts], labels=[row['status'] for row in status_counts],
+               autopct='%1.1f%%')
+        ax.set_title("Case Status Distribution")
+        return _png(fig)
+
+    def _monthly_chart(self):
+        monthly = monthly_counts(self._cases(['created_at']), 'created_at')
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+        ax.bar([row['month'] for row in monthly], [row['count'] for row in monthly])
+        ax.set_title("Cases by Month")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Number of Cases")
+        ax.tick_params(axis='x', labelrotation=45)
+        return _png(fig)
 
     def generate_charts(self):
         if not MATPLOTLIB_AVAILABLE:
             st.warning("Matplotlib is not available. Charts cannot be generated.")
             return
 
-        # Pie chart for case status
-        status_counts = pd.Series([case['status'] for case in self.data]).value_counts()
-        plt.figure(figsize=(10, 6))
-        plt.pie(status_counts.values, labels=status_counts.index, autopct='%1.1f%%')
-        plt.title("Case Status Distribution")
-        st.pyplot(plt)
-
-        # Bar chart for cases by month
-        df = pd.DataFrame(self.data)
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        monthly_counts = df.groupby(df['created_at'].dt.to_period("M")).size()
-        plt.figure(figsize=(12, 6))
-        monthly_counts.plot(kind='bar')
-        plt.title("Cases by Month")
-        plt.xlabel("Month")
-        plt.ylabel("Number of Cases")
-        plt.xticks(rotation=45)
-        st.pyplot(plt)
+        st.image(self._cached('status_chart', self._status_chart))
+        st.image(self._cached('monthly_chart', self._monthly_chart))
+
+    def _detail(self):
+        cases = self._cases(['id', 'number', 'status', 'is_positive', 'a_number', 'created_by', 'created_at'])
+        return cases.sort_by([('created_at', 'descending')]).slice(0, self.DETAIL_ROWS).to_pandas()
+
+    def generate_detail(self):
+        """Most recent cases; the full list is available as an export."""
+        st.dataframe(self._cached('detail', self._detail))
 
     def generate_report(self):
         st.header("Case Report")
 
+        if self._table is None and not self.snapshots.available():
+            st.info("Preparando los datos de análisis; vuelva a intentarlo en unos minutos.")
+            return
+
         summary = self.generate_summary()
         st.subheader("Summary")
         for key, value in summary.items():
@@ -55,5 +112,4 @@ class ReportGenerator:
         self.generate_charts()
 
         st.subheader("Detailed Case List")
-        st.dataframe(pd.DataFrame(self.data))
-
+        self.generate_detail()
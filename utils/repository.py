@@ -0,0 +1,339 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.db_backends import DatabaseBackend, get_backend
+from utils.live_feed import live_feed
+
+logger = logging.getLogger(__name__)
+
+CASE_COLUMNS = (
+    'number', 'status', 'is_positive', 'first_name', 'last_name', 'a_number',
+    'court_address', 'court_phone', 'client_phone', 'other_client_phone',
+    'client_address', 'client_email', 'created_by'
+)
+
+# Columns a user may change on an existing case
+CASE_UPDATABLE_COLUMNS = set(CASE_COLUMNS) - {'created_by'}
+
+def _note_known_number(number):
+    # Only update the sweep pre-screen if this process has built it; a new
+    # filter picks the row up from the table anyway
+    from utils.resources import resources
+    known = resources.peek('known_numbers')
+    if known is not None and number:
+        known.add(number)
+
+class CaseRepository:
+    """Single data-access path for cases, regardless of the storage backend."""
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def insert(self, case_data: Dict[str, Any]) -> Optional[int]:
+        values = [case_data.get(column) for column in CASE_COLUMNS]
+        if values[CASE_COLUMNS.index('is_positive')] is None:
+            values[CASE_COLUMNS.index('is_positive')] = case_data.get('status') == 'Positivo'
+        case_id = self.backend.insert(
+            f"INSERT INTO cases ({', '.join(CASE_COLUMNS)}) "
+            f"VALUES ({', '.join(['%s'] * len(CASE_COLUMNS))})",
+            values
+        )
+        _note_known_number(case_data.get('a_number'))
+        live_feed.publish('case_created', case_id=case_id, created_by=case_data.get('created_by'),
+                          status=case_data.get('status'), is_positive=bool(values[CASE_COLUMNS.index('is_positive')]))
+        return case_id
+
+    def insert_many(self, cases: List[Dict[str, Any]]) -> int:
+        """Insert several cases in one statement and announce the rows actually stored.
+
+        ``cases`` has no unique index on number/A-number (users may each keep
+        the same case), so callers filter duplicates first, as ``CasePipeline``
+        does with ``existing_numbers``; ``ON CONFLICT DO NOTHING`` only guards
+        against constraints a deployment adds itself.
+        """
+        if not cases:
+            return 0
+        rows = []
+        for case_data in cases:
+            values = [case_data.get(column) for column in CASE_COLUMNS]
+            if values[CASE_COLUMNS.index('is_positive')] is None:
+                values[CASE_COLUMNS.index('is_positive')] = case_data.get('status') == 'Positivo'
+            rows.append(values)
+        with self.backend.session() as s:
+            inserted = [row['a_number'] for row in s.insert_many_returning(
+                f"INSERT INTO cases ({', '.join(CASE_COLUMNS)}) VALUES %s ON CONFLICT DO NOTHING RETURNING a_number",
+                rows
+            )]
+        # Only rows the database took are announced; ON CONFLICT skipped the rest
+        unannounced = set(inserted)
+        for case_data in cases:
+            _note_known_number(case_data.get('a_number'))
+            if case_data.get('a_number') not in unannounced:
+                continue
+            unannounced.discard(case_data.get('a_number'))
+            live_feed.publish('case_created', number=case_data.get('a_number'),
+                              created_by=case_data.get('created_by'), status=case_data.get('status'),
+                              is_positive=case_data.get('status') == 'Positivo')
+        return len(inserted)
+
+    def existing_numbers(self, numbers: List[str]) -> set:
+        """The subset of ``numbers`` already stored as a case number or A-number."""
+        numbers = [n for n in set(numbers) if n]
+        if not numbers:
+            return set()
+        placeholders = ', '.join(['%s'] * len(numbers))
+        rows = self.backend.fetch_all(
+            f"SELECT number, a_number FROM cases "
+            f"WHERE number IN ({placeholders}) OR a_number IN ({placeholders})",
+            [*numbers, *numbers]
+        )
+        found = {row['number'] for row in rows} | {row['a_number'] for row in rows}
+        return found & set(numbers)
+
+    def update(self, case_id: int, user_id: int, updates: Dict[str, Any]) -> bool:
+        """Update a case owned by ``user_id``. Returns False if nothing matched."""
+        updates = {k: v for k, v in updates.items() if k in CASE_UPDATABLE_COLUMNS}
+        if not updates:
+            return False
+        if 'status' in updates:
+            updates['is_positive'] = updates['status'] == 'Positivo'
+        set_clause = ', '.join(f"{column} = %s" for column in updates)
+        rowcount = self.backend.execute(
+            f"UPDATE cases SET {set_clause} WHERE id = %s AND created_by = %s",
+            [*updates.values(), case_id, user_id]
+        )
+        return rowcount > 0
+
+    def get(self, case_id: int) -> Optional[Dict[str, Any]]:
+        return self.backend.fetch_one(
+            "SELECT * FROM cases WHERE id = %s", (case_id,), prepare='case_by_id'
+        )
+
+    def list_by_user(self, user_id: int) -> List[Dict[str, Any]]:
+        return self.backend.fetch_all(
+            "SELECT * FROM cases WHERE created_by = %s ORDER BY created_at DESC",
+            (user_id,),
+            prepare='cases_by_user'
+        )
+
+class UserRepository:
+    """Data-access path for users."""
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def get_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        return self.backend.fetch_one(
+            "SELECT * FROM users WHERE username = %s", (username,), prepare='user_by_username'
+        )
+
+    def get_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self.backend.fetch_one(
+            "SELECT * FROM users WHERE id = %s", (user_id,), prepare='user_by_id'
+        )
+
+    def create(self, username: str, password_hash: str, email: str,
+               first_name: Optional[str] = None, last_name: Optional[str] = None,
+               role: str = 'operator') -> Optional[int]:
+        return self.backend.insert(
+            """
+            INSERT INTO users (username, email, password_hash, first_name, last_name, role)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (username, email, password_hash, first_name, last_name, role)
+        )
+
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        self.backend.execute(
+            "UPDATE users SET password_hash = %s WHERE id = %s", (password_hash, user_id)
+        )
+
+class CallRepository:
+    """Call events and the phone_calls projection derived from them."""
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def add_events(self, events: List[Dict[str, Any]]) -> int:
+        """Insert a batch of call events and refresh the phone_calls rows they touch.
+
+        Events are idempotent on ``event_id`` so replaying a write-ahead file
+        after a crash never duplicates rows.
+        """
+        if not events:
+            return 0
+        call_uuids = sorted({e['call_uuid'] for e in events})
+        with self.backend.session() as s:
+            s.insert_many(
+                """
+                INSERT INTO call_events
+                (event_id, call_uuid, search_id, user_id, phone_number, status, duration, notes, occurred_at)
+                VALUES %s
+                ON CONFLICT (event_id) DO NOTHING
+                """,
+                [
+                    (e['event_id'], e['call_uuid'], e.get('search_id'), e.get('user_id'),
+                     e.get('phone_number'), e['status'], e.get('duration'), e.get('notes'),
+                     e['occurred_at'])
+                    for e in events
+                ]
+            )
+            # phone_calls is a projection of the latest state event of each call
+            s.execute(
+                f"""
+                INSERT INTO phone_calls
+                (call_uuid, search_id, user_id, phone_number, call_status, call_duration, call_notes, call_date)
+                SELECT
+                    e.call_uuid,
+                    e.search_id,
+                    (SELECT u.user_id FROM call_events u
+                     WHERE u.call_uuid = e.call_uuid AND u.user_id IS NOT NULL
+                     ORDER BY u.occurred_at, u.id LIMIT 1),
+                    e.phone_number,
+                    e.status,
+                    e.duration,
+                    (SELECT n.notes FROM call_events n
+                     WHERE n.call_uuid = e.call_uuid AND n.notes IS NOT NULL
+                     ORDER BY n.occurred_at DESC, n.id DESC LIMIT 1),
+                    (SELECT MIN(f.occurred_at) FROM call_events f WHERE f.call_uuid = e.call_uuid)
+                FROM call_events e
+                WHERE e.call_uuid IN ({', '.join(['%s'] * len(call_uuids))})
+                  AND e.id = (SELECT l.id FROM call_events l
+                              WHERE l.call_uuid = e.call_uuid AND l.status <> 'note'
+                              ORDER BY l.occurred_at DESC, l.id DESC LIMIT 1)
+                ON CONFLICT (call_uuid) DO UPDATE SET
+                    user_id = COALESCE(phone_calls.user_id, EXCLUDED.user_id),
+                    call_status = EXCLUDED.call_status,
+                    call_duration = EXCLUDED.call_duration,
+                    call_notes = EXCLUDED.call_notes
+                """,
+                call_uuids
+            )
+        return len(events)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        # NULLIF: PostgreSQL raises on division by zero when there are no calls yet
+        return self.backend.fetch_one("""
+            SELECT
+                COUNT(*) AS total_searches,
+                COALESCE(SUM(CASE WHEN call_status = 'successful' THEN 1 ELSE 0 END), 0) AS successful_calls,
+                COALESCE(ROUND(SUM(CASE WHEN call_status = 'successful' THEN 1 ELSE 0 END) * 100.0
+                               / NULLIF(COUNT(*), 0), 2), 0) AS success_rate,
+                COALESCE(ROUND(AVG(call_duration), 2), 0) AS avg_duration
+            FROM phone_calls
+        """) or {}
+
+    def get_daily_activity(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Initiated and successful calls per day over the last ``days`` days."""
+        return self.backend.fetch_all("""
+            SELECT
+                DATE(call_date) AS date,
+                COUNT(CASE WHEN call_status = 'initiated' THEN 1 END) AS searches,
+                COUNT(CASE WHEN call_status = 'successful' THEN 1 END) AS calls
+            FROM phone_calls
+            WHERE call_date >= %s
+            GROUP BY DATE(call_date)
+            ORDER BY date DESC
+        """, (datetime.now() - timedelta(days=days),))
+
+    def get_status_counts(self) -> List[Dict[str, Any]]:
+        return self.backend.fetch_all("""
+            SELECT call_status, COUNT(*) AS count
+            FROM phone_calls
+            GROUP BY call_status
+        """)
+
+class SearchHistoryRepository:
+    """Persistent record of EOIR/PDL lookups, read in keyset-paginated slices."""
+
+    COLUMNS = 'id, entry_id, number, source, status, eoir_found, is_positive, search_date, searched_by'
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def add_many(self, entries: List[Dict[str, Any]]) -> int:
+        """Insert a batch of lookups; idempotent on ``entry_id`` for WAL replays."""
+        if not entries:
+            return 0
+        with self.backend.session() as s:
+            return s.insert_many(
+                """
+                INSERT INTO search_history
+                (entry_id, number, source, status, eoir_found, is_positive, result_data, search_date, searched_by)
+                VALUES %s
+                ON CONFLICT (entry_id) DO NOTHING
+                """,
+                [
+                    (e['entry_id'], e['number'], e['source'], e['status'], bool(e.get('eoir_found')),
+                     e.get('is_positive'), json.dumps(e['data'], default=str) if e.get('data') else None,
+                     e['searched_at'], e['searched_by'])
+                    for e in entries
+                ]
+            )
+
+    def page(self, user_id: Optional[int], limit: int = 50,
+             before: Optional[Tuple[Any, int]] = None) -> List[Dict[str, Any]]:
+        """Newest-first slice. Pass the last row's ``(search_date, id)`` as ``before``
+        for the next page; ``user_id=None`` pages over everyone (supervisors)."""
+        where, params = [], []
+        if user_id is not None:
+            where.append("searched_by = %s")
+            params.append(user_id)
+        if before is not None:
+            where.append("(search_date, id) < (%s, %s)")
+            params.extend(before)
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        return self.backend.fetch_all(
+            f"SELECT {self.COLUMNS} FROM search_history {clause} "
+            f"ORDER BY search_date DESC, id DESC LIMIT %s",
+            [*params, limit]
+        )
+
+    def iter_all(self, user_id: Optional[int], batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Every row, newest first, holding one page in memory at a time."""
+        before = None
+        while True:
+            rows = self.page(user_id, batch_size, before)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            before = (rows[-1]['search_date'], rows[-1]['id'])
+
+    def count(self, user_id: Optional[int] = None) -> int:
+        if user_id is None:
+            row = self.backend.fetch_one("SELECT COUNT(*) AS n FROM search_history")
+        else:
+            row = self.backend.fetch_one(
+                "SELECT COUNT(*) AS n FROM search_history WHERE searched_by = %s", (user_id,)
+            )
+        return row['n'] if row else 0
+
+    def latest_for_number(self, number: str) -> Optional[Dict[str, Any]]:
+        return self.backend.fetch_one(
+            f"SELECT {self.COLUMNS} FROM search_history WHERE number = %s "
+            f"ORDER BY search_date DESC, id DESC LIMIT 1",
+            (number,)
+        )
+
+cases = CaseRepository()
+users = UserRepository()
+calls = CallRepository()
+search_history = SearchHistoryRepository()
@@ -0,0 +1,277 @@
+import sys
+import time
+import atexit
+import inspect
+import logging
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+from config import SESSION_MEMORY_LIMIT_MB, SESSION_MEMORY_CHECK_INTERVAL, SESSION_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class _Entry:
+    __slots__ = ('factory', 'close', 'instance', 'created_at', 'lock')
+
+    def __init__(self, factory: Callable[[], Any], close: Optional[Callable[[Any], Any]]):
+        self.factory = factory
+        self.close = close
+        self.instance = None
+        self.created_at = None
+        self.lock = threading.Lock()
+
+class ResourceRegistry:
+    """Process-wide shared resources (scraper clients, caches, DB pool, i18n).
+
+    Resources are registered with a factory and an optional close hook, built
+    lazily on first ``get`` and shared by every Streamlit session in the
+    process. ``close_all`` runs the close hooks in reverse creation order at
+    exit. Anything stored here must be safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._order: List[str] = []
+        self._lock = threading.Lock()
+        self.session_sizes: Dict[str, int] = {}
+        self.session_seen: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 close: Optional[Callable[[Any], Any]] = None, replace: bool = False):
+        with self._lock:
+            if name in self._entries and not replace:
+                return
+            self._entries[name] = _Entry(factory, close)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown shared resource: {name}")
+        if entry.instance is None:
+            with entry.lock:
+                if entry.instance is None:
+                    entry.instance = entry.factory()
+                    entry.created_at = time.time()
+                    with self._lock:
+                        self._order.append(name)
+                    logger.info(f"Shared resource '{name}' created")
+        return entry.instance
+
+    def peek(self, name: str) -> Optional[Any]:
+        """The instance if it has been created, without creating it."""
+        entry = self._entries.get(name)
+        return entry.instance if entry is not None else None
+
+    def shared(self, name: str, factory: Callable[[], Any],
+               close: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Register ``name`` if needed and return its instance."""
+        self.register(name, factory, close)
+        return self.get(name)
+
+    def reset(self, name: str):
+        """Close and drop an instance; the next ``get`` builds a new one."""
+        entry = self._entries.get(name)
+        if entry is None or entry.instance is None:
+            return
+        with entry.lock:
+            instance, entry.instance = entry.instance, None
+            with self._lock:
+                if name in self._order:
+                    self._order.remove(name)
+        self._close(name, entry, instance)
+
+    def _close(self, name: str, entry: _Entry, instance: Any):
+        if entry.close is None:
+            return
+        try:
+            entry.close(instance)
+        except Exception as e:
+            logger.error(f"Error closing shared resource '{name}': {e}")
+
+    def close_all(self):
+        with self._lock:
+            names = list(reversed(self._order))
+        for name in names:
+            self.reset(name)
+
+    def shared_ids(self) -> set:
+        return {id(e.instance) for e in self._entries.values() if e.instance is not None}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'resources': {
+                name: {
+                    'created': entry.instance is not None,
+                    'created_at': entry.created_at,
+                    'type': type(entry.instance).__name__ if entry.instance is not None else None
+                }
+                for name, entry in self._entries.items()
+            },
+            'sessions': len(self.session_sizes),
+            'session_bytes_total': sum(self.session_sizes.values())
+        }
+
+def deep_sizeof(obj: Any, exclude_ids: Optional[set] = None, max_objects: int = 200000) -> int:
+    """Approximate memory held by ``obj`` and everything it references.
+
+    Objects in ``exclude_ids`` (shared resources), modules, classes and
+    functions are not counted, so the result is what the object owns.
+    """
+    seen = set(exclude_ids or ())
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, (ModuleType, type)) or inspect.isroutine(current):
+            continue
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            attrs = getattr(current, '__dict__', None)
+            if attrs is not None:
+                stack.append(attrs)
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+def session_memory(session_state) -> Dict[str, int]:
+    """Bytes owned by each key of a session, excluding shared resources."""
+    shared = resources.shared_ids()
+    return {str(key): deep_sizeof(value, shared) for key, value in session_state.items()}
+
+def report_session_memory(session_state, session_id: Optional[str] = None, force: bool = False) -> Optional[int]:
+    """Record this session's footprint and warn when it exceeds the limit.
+
+    Runs at most once per ``SESSION_MEMORY_CHECK_INTERVAL`` per session.
+    """
+    now = time.time()
+    last = session_state.get('_memory_checked_at', 0)
+    if not force and now - last < SESSION_MEMORY_CHECK_INTERVAL:
+        return session_state.get('_memory_bytes')
+
+    sizes = session_memory(session_state)
+    total = sum(sizes.values())
+    session_state['_memory_checked_at'] = now
+    session_state['_memory_bytes'] = total
+    if session_id:
+        resources.session_sizes[session_id] = total
+        resources.session_seen[session_id] = now
+        # Streamlit doesn't report closed tabs; sessions silent for a whole timeout are gone
+        for stale in [sid for sid, seen in resources.session_seen.items() if now - seen > SESSION_TIMEOUT]:
+            forget_session(stale)
+
+    limit = SESSION_MEMORY_LIMIT_MB * 1024 * 1024
+    if total > limit:
+        largest = sorted(sizes.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        logger.warning(
+            f"Session {session_id or '?'} uses {total / 1048576:.1f} MB "
+            f"(limit {SESSION_MEMORY_LIMIT_MB} MB); largest keys: "
+            + ', '.join(f"{k}={v / 1048576:.1f}MB" for k, v in largest)
+        )
+    return total
+
+def forget_session(session_id: str):
+    resources.session_sizes.pop(session_id, None)
+    resources.session_seen.pop(session_id, None)
+
+# Default shared resources. Factories import lazily so registering is free.
+
+def _db_backend():
+    from utils.db_backends import get_backend
+    return get_backend()
+
+def _i18n():
+    from utils.i18n import I18nManager
+    return I18nManager()
+
+def _supervisor_analytics():
+    from utils.supervisor_analytics import SupervisorAnalytics
+    return SupervisorAnalytics()
+
+def _eoir_scraper():
+    from scrapers.eoir_scraper import EOIRScraper
+    from utils.http_cache import get_http_cache
+    return EOIRScraper(cache=get_http_cache())
+
+def _pdl_scraper():
+    from config import PDL_API_KEY
+    from scrapers.pdl_scraper import PDLScraper
+    return PDLScraper(api_key=PDL_API_KEY)
+
+def _lookups():
+    from utils.lookups import lookups
+    return lookups
+
+def _known_numbers():
+    from utils.known_numbers import KnownNumbers
+    return KnownNumbers()
+
+def _block_scheduler():
+    from utils.block_scheduler import BlockScheduler
+    return BlockScheduler()
+
+def _http_cache():
+    from utils.http_cache import HttpCache
+    return HttpCache()
+
+def _service_monitor():
+    from utils.service_monitor import monitor
+    return monitor
+
+def _password_hasher():
+    from utils.password_hasher import PasswordHasher
+    return PasswordHasher()
+
+def _exports():
+    from utils.exports import ExportManager
+    return ExportManager()
+
+def _snapshots():
+    from utils.snapshots import SnapshotStore
+    return SnapshotStore()
+
+def _render_cache():
+    from utils.render_cache import RenderCache
+    return RenderCache()
+
+def _case_pipeline():
+    from utils.case_pipeline import CasePipeline
+    return CasePipeline()
+
+def _event_loop():
+    from utils.event_loop import background_loop
+    return background_loop
+
+# Singleton instance
+resources = ResourceRegistry()
+resources.register('db', _db_backend, close=lambda backend: backend.close())
+resources.register('i18n', _i18n)
+resources.register('supervisor_analytics', _supervisor_analytics)
+resources.register('eoir_scraper', _eoir_scraper, close=lambda scraper: scraper.close())
+resources.register('pdl_scraper', _pdl_scraper, close=lambda scraper: scraper.close())
+resources.register('lookups', _lookups)
+resources.register('known_numbers', _known_numbers, close=lambda known: known.close())
+resources.register('block_scheduler', _block_scheduler)
+resources.register('http_cache', _http_cache, close=lambda cache: cache.close())
+resources.register('service_monitor', _service_monitor)
+resources.register('password_hasher', _password_hasher, close=lambda hasher: hasher.close())
+resources.register('exports', _exports, close=lambda exports: exports.close())
+resources.register('snapshots', _snapshots)
+resources.register('render_cache', _render_cache)
+resources.register('case_pipeline', _case_pipeline, close=lambda pipeline: pipeline.close())
+resources.register('event_loop', _event_loop, close=lambda loop: loop.stop())
+atexit.register(resources.close_all)
@@ -0,0 +1,98 @@
+import atexit
+import uuid
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import (
+    SEARCH_HISTORY_WAL, SEARCH_HISTORY_BATCH_SIZE, SEARCH_HISTORY_FLUSH_INTERVAL,
+    SEARCH_HISTORY_PAGE_SIZE
+)
+from utils.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Entries kept per session so a search shows up before its batch is flushed
+RECENT_PER_SESSION = 20
+
+def _flush_search_history(entries):
+    # Imported lazily so searches never wait on a database driver import
+    from utils.repository import search_history
+    search_history.add_many(entries)
+
+class SearchHistoryLog:
+    """Every EOIR/PDL lookup, appended to ``search_history``.
+
+    ``record`` only appends to a local write-ahead file and an in-memory
+    buffer; a background thread inserts the rows in batches. Views read
+    paginated slices back through ``page``, so a session holds at most one
+    page plus its last ``RECENT_PER_SESSION`` unflushed entries, however long
+    a sweep runs.
+    """
+
+    def __init__(self, wal_path: Optional[str] = SEARCH_HISTORY_WAL,
+                 max_batch: int = SEARCH_HISTORY_BATCH_SIZE,
+                 flush_interval: float = SEARCH_HISTORY_FLUSH_INTERVAL):
+        self.writer = BatchWriter(
+            'search_history',
+            _flush_search_history,
+            max_batch=max_batch,
+            flush_interval=flush_interval,
+            wal_path=wal_path
+        )
+
+    def record(self, number: str, user_id: int, result: Dict[str, Any], source: str = 'eoir',
+               session_state=None) -> Dict[str, Any]:
+        """Append one lookup result (the dict returned by a scraper's ``search``)."""
+        status = result.get('status', 'error')
+        data = result.get('data') if status == 'success' else None
+        case_status = str((data or {}).get('status', '')).lower()
+        entry = {
+            'entry_id': str(uuid.uuid4()),
+            'number': str(number),
+            'source': source,
+            'status': status,
+            'eoir_found': source == 'eoir' and status == 'success',
+            'is_positive': ("positivo" in case_status or "en proceso" in case_status) if data else False,
+            'data': data,
+            'searched_at': datetime.now().isoformat(sep=' '),
+            'searched_by': user_id
+        }
+        self.writer.append(entry)
+
+        if session_state is not None:
+            recent = session_state.get('recent_searches')
+            if recent is None:
+                recent = session_state['recent_searches'] = deque(maxlen=RECENT_PER_SESSION)
+            recent.append(entry)
+        return entry
+
+    def page(self, user_id: Optional[int], limit: int = SEARCH_HISTORY_PAGE_SIZE,
+             before=None, session_state=None) -> List[Dict[str, Any]]:
+        """A newest-first page; the first page includes this session's unflushed entries."""
+        from utils.repository import search_history
+        rows = search_history.page(user_id, limit, before)
+        if before is not None or session_state is None or not session_state.get('recent_searches'):
+            return rows
+        stored = {row['entry_id'] for row in rows}
+        pending = [
+            {**entry, 'search_date': entry['searched_at']}
+            for entry in reversed(session_state['recent_searches'])
+            if entry['entry_id'] not in stored and (user_id is None or entry['searched_by'] == user_id)
+        ]
+        merged = sorted(pending + rows, key=lambda r: str(r['search_date']), reverse=True)
+        return merged[:limit]
+
+    def flush(self) -> int:
+        return self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.writer.get_stats()
+
+# Singleton instance
+search_history_log = SearchHistoryLog()
+atexit.register(search_history_log.close)
@@ -9,6 +9,9 @@ from typing import Dict, Any, Optional
 import os
 import socket
 import concurrent.futures
+from config import SERVICE_MONITOR_INTERVAL
+from utils.live_feed import live_feed
+from utils.rate_control import upstream_stats
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +48,7 @@ class ServiceMonitor:
         self.metrics: Dict[str, Any] = {}
         self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
         self.last_check: Dict[str, datetime] = {}
+        self._probe_task = None
 
     async def check_port(self, port: int) -> bool:
         """Check if a port is in use with enhanced error handling"""
@@ -74,7 +78,7 @@ class ServiceMonitor:
             try:
                 start_time = datetime.now()
                 async with asyncio.timeout(timeout):
-                    loop = asyncio.get_event_loop()
+                    loop = asyncio.get_running_loop()
                     response = await loop.run_in_executor(
                         self._executor,
                         lambda: requests.get(service_info['url'], timeout=timeout)
@@ -139,17 +143,26 @@ class ServiceMonitor:
             'error': error_message
         }
 
+    def _set_metric(self, service_name: str, metric: Dict[str, Any]):
+        """Store a probe result and tell the supervisor feed when the status changed"""
+        previous = self.metrics.get(service_name, {}).get('status')
+        self.metrics[service_name] = metric
+        if metric['status'] != previous:
+            live_feed.publish('service_health', service=service_name, status=metric['status'],
+                              previous=previous, error=metric.get('error'))
+
     async def monitor_services(self) -> Dict[str, Any]:
         """Monitor all services with concurrent execution and enhanced error handling"""
         tasks = []
+        names = []
         
         for service_name, service_info in self.services.items():
             # Check port first
             port_active = await self.check_port(service_info['port'])
             if not port_active:
-                self.metrics[service_name] = self._create_error_metric(
+                self._set_metric(service_name, self._create_error_metric(
                     f"Puerto {service_info['port']} no está activo"
-                )
+                ))
                 continue
 
             # Create monitoring task based on service type
@@ -159,28 +172,62 @@ class ServiceMonitor:
                 task = self.check_websocket_service(service_name, service_info)
             
             tasks.append(task)
+            names.append(service_name)
 
         # Execute all monitoring tasks concurrently
         try:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # Update metrics with results
-            for service_name, result in zip(
-                [s for s, i in self.services.items() if await self.check_port(i['port'])],
-                results
-            ):
+            for service_name, result in zip(names, results):
                 if isinstance(result, Exception):
-                    self.metrics[service_name] = self._create_error_metric(str(result))
+                    self._set_metric(service_name, self._create_error_metric(str(result)))
                 else:
-                    self.metrics[service_name] = result
+                    self._set_metric(service_name, result)
                     
         except Exception as e:
             logger.error(f"Error monitoring services: {str(e)}")
-            
+
+        self._refresh_upstream()
         return self.metrics
 
+    def _refresh_upstream(self):
+        """Copy this process's upstream controllers (EOIR, PDL) into the metrics.
+
+        Breakers publish their own transitions to the live feed, from whichever
+        process they trip in, so these are stored without publishing again.
+        """
+        for source, stats in upstream_stats().items():
+            self.metrics[f"upstream:{source}"] = {
+                'status': stats['status'],
+                'response_time': stats['latency_ms'],
+                'last_check': datetime.now().isoformat(),
+                'error': stats['reason'],
+                'upstream': stats
+            }
+
+    async def _probe_forever(self, interval: float):
+        while True:
+            try:
+                await self.monitor_services()
+            except Exception as e:
+                logger.error(f"Error in background service probe: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def start_background(self, interval: float = SERVICE_MONITOR_INTERVAL):
+        """Probe the services every ``interval`` seconds on the background loop.
+
+        Status changes reach supervisors through the live feed, so pages only
+        read ``get_metrics()`` instead of probing and rerunning themselves.
+        """
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        from utils.event_loop import submit
+        self._probe_task = submit(self._probe_forever(interval))
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get the latest metrics"""
+        self._refresh_upstream()
         return self.metrics
 
     def get_service_status(self, service_name: str) -> Optional[Dict[str, Any]]:
@@ -1,11 +1,20 @@
 import streamlit as st
-from .number_search import number_search_page
-from .phone_call import PhoneCallPage
-from .supervisor_analytics import SupervisorAnalytics
-from .i18n import I18nManager
+from .resources import resources, report_session_memory
+
+def current_session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
 
 def initialize_session_state():
-    """Initialize and validate session state"""
+    """Initialize and validate session state.
+
+    Only light per-user state lives here. Shared objects (i18n catalog,
+    analytics, scraper clients, DB pool) come from ``utils.resources``.
+    """
     # Core session state initialization
     if 'user_id' not in st.session_state:
         st.session_state.user_id = None
@@ -24,12 +33,7 @@ def initialize_session_state():
     if 'session_initialized' not in st.session_state:
         st.session_state.session_initialized = False
 
-    # Pages state initialization
-    if 'number_search' not in st.session_state:
-        st.session_state.number_search = number_search_page
-    if 'phone_call' not in st.session_state:
-        st.session_state.phone_call = PhoneCallPage()
-    if 'supervisor_analytics' not in st.session_state:
-        st.session_state.supervisor_analytics = SupervisorAnalytics()
-    if 'i18n' not in st.session_state:
-        st.session_state.i18n = I18nManager()
\ No newline at end of file
+    # Warm the shared catalog once per process
+    resources.get('i18n')
+
+    report_session_memory(st.session_state, current_session_id())
@@ -0,0 +1,362 @@
+import os
+import json
+import hashlib
+import time
+import shutil
+import logging
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import SNAPSHOT_DIR, SNAPSHOT_INTERVAL, SNAPSHOT_KEEP, EXPORT_BATCH_SIZE
+from utils.db_backends import DatabaseBackend, get_backend
+from utils.exports import PYARROW_AVAILABLE, COERCE
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    from utils.exports import ParquetRowWriter, arrow_schema
+
+logger = logging.getLogger(__name__)
+
+# Only what reports aggregate on; client names and contact details stay in the database
+SNAPSHOT_TABLES: Dict[str, Dict[str, Any]] = {
+    'cases': {
+        'partition_by': 'created_at',
+        'columns': [
+            ('id', 'id', 'int'),
+            ('number', 'number', 'str'),
+            ('status', 'status', 'str'),
+            ('is_positive', 'is_positive', 'bool'),
+            ('a_number', 'a_number', 'str'),
+            ('created_by', 'created_by', 'int'),
+            ('created_at', 'created_at', 'timestamp'),
+        ],
+    },
+    'phone_calls': {
+        'partition_by': 'call_date',
+        'columns': [
+            ('id', 'id', 'int'),
+            ('call_uuid', 'call_uuid', 'str'),
+            ('user_id', 'user_id', 'int'),
+            ('call_status', 'call_status', 'str'),
+            ('call_duration', 'call_duration', 'int'),
+            ('call_date', 'call_date', 'timestamp'),
+        ],
+    },
+    'search_history': {
+        'partition_by': 'search_date',
+        'columns': [
+            ('id', 'id', 'int'),
+            ('number', 'number', 'str'),
+            ('source', 'source', 'str'),
+            ('status', 'status', 'str'),
+            ('eoir_found', 'eoir_found', 'bool'),
+            ('is_positive', 'is_positive', 'bool'),
+            ('searched_by', 'searched_by', 'int'),
+            ('search_date', 'search_date', 'timestamp'),
+        ],
+    },
+}
+
+class SnapshotStore:
+    """Periodic Parquet copies of ``cases``, ``phone_calls`` and ``search_history``.
+
+    Each refresh streams the tables (ordered by date, so one partition file is
+    open at a time) into ``<directory>/<version>/<table>/month=YYYY-MM/`` and
+    then points ``CURRENT`` at the new version; readers keep using the version
+    they opened, and the last ``keep`` versions stay on disk. Reports read
+    only the columns and months they need through ``table`` and aggregate with
+    Arrow compute, so they never query the production database. A lock file
+    keeps two processes from refreshing at the same time.
+    """
+
+    _LOCK_STALE = 3600  # seconds before an abandoned lock file is taken over
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None, directory: str = SNAPSHOT_DIR,
+                 interval: float = SNAPSHOT_INTERVAL, keep: int = SNAPSHOT_KEEP,
+                 batch_size: int = EXPORT_BATCH_SIZE):
+        self._backend = backend
+        self.directory = directory
+        self.interval = interval
+        self.keep = max(1, keep)
+        self.batch_size = batch_size
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._manifest_mtime = 0.0
+        self._datasets: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.last_error: Optional[str] = None
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    @property
+    def _current_path(self) -> str:
+        return os.path.join(self.directory, 'CURRENT')
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """Manifest of the newest complete snapshot, re-read when it changes."""
+        try:
+            mtime = os.path.getmtime(self._current_path)
+        except OSError:
+            return None
+        if self._manifest is None or mtime != self._manifest_mtime:
+            try:
+                with open(self._current_path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable snapshot manifest: {e}")
+                return self._manifest
+            with self._lock:
+                self._manifest, self._manifest_mtime = manifest, mtime
+                self._datasets = {}
+        return self._manifest
+
+    def age(self) -> Optional[float]:
+        manifest = self.current()
+        return time.time() - manifest['created_at'] if manifest else None
+
+    def data_version(self, name: str) -> Optional[str]:
+        """Changes only when table ``name`` changed, not with every refresh."""
+        manifest = self.current()
+        if manifest is None:
+            return None
+        return manifest.get('fingerprints', {}).get(name, manifest['version'])
+
+    def available(self) -> bool:
+        """Whether reports can be served from a snapshot; starts a refresh if stale."""
+        if not PYARROW_AVAILABLE:
+            return False
+        age = self.age()
+        if age is None or age > self.interval:
+            self.refresh_async()
+        return age is not None
+
+    def refresh_async(self) -> bool:
+        if not PYARROW_AVAILABLE or self._refreshing.locked():
+            return False
+        threading.Thread(target=self._refresh_quietly, name='snapshot-refresh', daemon=True).start()
+        return True
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Snapshot refresh failed: {e}")
+
+    def _acquire_file_lock(self) -> bool:
+        os.makedirs(self.directory, exist_ok=True)
+        lock_path = os.path.join(self.directory, 'refresh.lock')
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) < self._LOCK_STALE:
+                        return False
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """Write a new snapshot of every table; None if another refresh is running."""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Snapshots require pyarrow")
+        if not self._refreshing.acquire(blocking=False):
+            return None
+        try:
+            if not self._acquire_file_lock():
+                logger.info("Snapshot refresh already running in another process")
+                return None
+            try:
+                return self._refresh()
+            finally:
+                os.remove(os.path.join(self.directory, 'refresh.lock'))
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self._refreshing.release()
+
+    def _refresh(self) -> Dict[str, Any]:
+        started = time.time()
+        version = datetime.fromtimestamp(started).strftime('%Y%m%dT%H%M%S%f')
+        tmp_root = os.path.join(self.directory, f"{version}.tmp")
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        rows, fingerprints = {}, {}
+        for name, spec in SNAPSHOT_TABLES.items():
+            rows[name], fingerprints[name] = self._write_table(name, spec, tmp_root)
+        os.replace(tmp_root, os.path.join(self.directory, version))
+
+        manifest = {
+            'version': version, 'created_at': started, 'duration': time.time() - started,
+            'rows': rows, 'fingerprints': fingerprints
+        }
+        tmp_path = f"{self._current_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._current_path)
+        self.last_error = None
+        logger.info(f"Snapshot {version} written in {manifest['duration']:.1f}s: {rows}")
+        self._prune(version)
+        return manifest
+
+    def _write_table(self, name: str, spec: Dict[str, Any], root: str) -> Tuple[int, str]:
+        """Write one table; returns its row count and a digest of its contents."""
+        columns = spec['columns']
+        names = [column for column, _, _ in columns]
+        coerce = [COERCE[kind] for _, _, kind in columns]
+        date_index = names.index(spec['partition_by'])
+        sql = f"SELECT {', '.join(names)} FROM {name} ORDER BY {spec['partition_by']}, id"
+
+        def month(row):
+            value = row[date_index]
+            return value.strftime('%Y-%m') if value is not None else 'none'
+
+        writer, current_month, total = None, None, 0
+        digest = hashlib.blake2b(digest_size=16)
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+        try:
+            for batch in self.backend.stream(sql, None, self.batch_size):
+                converted = [[fn(row[n]) for fn, n in zip(coerce, names)] for row in batch]
+                digest.update(repr(converted).encode('utf-8'))
+                for key, group in itertools.groupby(converted, key=month):
+                    if key != current_month:
+                        if writer is not None:
+                            writer.close()
+                        partition = os.path.join(root, name, f"month={key}")
+                        os.makedirs(partition, exist_ok=True)
+                        # A month seen twice (mixed timestamp formats) gets a second file
+                        part = len(os.listdir(partition))
+                        writer = ParquetRowWriter(os.path.join(partition, f"part-{part}.parquet"), columns)
+                        current_month = key
+                    group = list(group)
+                    writer.write(group)
+                    total += len(group)
+        finally:
+            if writer is not None:
+                writer.close()
+        return total, digest.hexdigest()
+
+    def _prune(self, current_version: str):
+        versions = sorted(
+            entry for entry in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, entry)) and entry != current_version
+        )
+        # Leftovers of failed refreshes, then complete versions beyond ``keep``
+        partial = [v for v in versions if v.endswith('.tmp')]
+        complete = [v for v in versions if not v.endswith('.tmp')]
+        stale = partial + complete[:max(0, len(complete) - (self.keep - 1))]
+        for version in stale:
+            shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+
+    def _dataset(self, name: str):
+        manifest = self.current()
+        if manifest is None:
+            raise LookupError("No analytics snapshot yet")
+        with self._lock:
+            dataset = self._datasets.get(name)
+            if dataset is None:
+                path = os.path.join(self.directory, manifest['version'], name)
+                schema = arrow_schema(SNAPSHOT_TABLES[name]['columns']).append(pa.field('month', pa.string()))
+                dataset = ds.dataset(path, schema=schema, format='parquet', partitioning='hive')
+                self._datasets[name] = dataset
+        return dataset
+
+    def table(self, name: str, columns: Optional[List[str]] = None, since_month: Optional[str] = None):
+        """Arrow table of a snapshot, reading only ``columns`` and months from ``since_month``."""
+        dataset = self._dataset(name)
+        condition = ds.field('month') >= since_month if since_month else None
+        return dataset.to_table(columns=columns, filter=condition)
+
+    def get_stats(self) -> Dict[str, Any]:
+        manifest = self.current()
+        return {
+            'version': manifest['version'] if manifest else None,
+            'age_seconds': self.age(),
+            'rows': manifest['rows'] if manifest else {},
+            'refreshing': self._refreshing.locked(),
+            'last_error': self.last_error,
+        }
+
+# Aggregations over snapshot (or in-memory) Arrow tables
+
+def to_table(name: str, rows: List[Dict[str, Any]]):
+    """Typed Arrow table of ``rows`` shaped like snapshot table ``name``."""
+    columns = SNAPSHOT_TABLES[name]['columns']
+    data = [{column: COERCE[kind](row.get(column)) for column, _, kind in columns} for row in rows]
+    return pa.Table.from_pylist(data, schema=arrow_schema(columns))
+
+def since_month(days: int) -> str:
+    """First partition that can hold rows from the last ``days`` days."""
+    return datetime.fromtimestamp(time.time() - days * 86400).strftime('%Y-%m')
+
+def case_summary(table) -> Dict[str, int]:
+    total = table.num_rows
+    positive = (pc.sum(table['is_positive']).as_py() or 0) if total else 0
+    return {'total': total, 'positive': positive, 'negative': total - positive}
+
+def value_counts(table, column: str) -> List[Dict[str, Any]]:
+    counts = pc.value_counts(table[column]).to_pylist() if table.num_rows else []
+    counts.sort(key=lambda item: item['counts'], reverse=True)
+    return [{column: item['values'], 'count': item['counts']} for item in counts]
+
+def monthly_counts(table, column: str) -> List[Dict[str, Any]]:
+    if not table.num_rows:
+        return []
+    months = pc.strftime(table[column], format='%Y-%m')
+    counts = pa.table({'month': months}).group_by('month').aggregate([('month', 'count')])
+    return sorted(
+        ({'month': m, 'count': c} for m, c in zip(counts['month'].to_pylist(), counts['month_count'].to_pylist())
+         if m is not None),
+        key=lambda item: item['month']
+    )
+
+def call_metrics(table) -> Dict[str, Any]:
+    total = table.num_rows
+    if not total:
+        return {'total_searches': 0, 'successful_calls': 0, 'success_rate': 0, 'avg_duration': 0}
+    successful = pc.sum(pc.equal(table['call_status'], 'successful')).as_py() or 0
+    avg_duration = pc.mean(table['call_duration']).as_py()
+    return {
+        'total_searches': total,
+        'successful_calls': successful,
+        'success_rate': round(successful * 100.0 / total, 2),
+        'avg_duration': round(avg_duration, 2) if avg_duration is not None else 0,
+    }
+
+def daily_activity(table, days: int = 30) -> List[Dict[str, Any]]:
+    """Initiated and successful calls per day over the last ``days`` days, newest
+    first (like CallRepository)."""
+    if not table.num_rows:
+        return []
+    cutoff = pa.scalar(datetime.now() - timedelta(days=days), type=table['call_date'].type)
+    table = table.filter(pc.greater_equal(table['call_date'], cutoff))
+    status = table['call_status']
+    daily = pa.table({
+        'date': pc.cast(table['call_date'], pa.date32()),
+        'searches': pc.cast(pc.equal(status, 'initiated'), pa.int64()),
+        'calls': pc.cast(pc.equal(status, 'successful'), pa.int64()),
+    }).group_by('date').aggregate([('searches', 'sum'), ('calls', 'sum')])
+    rows = [
+        {'date': d, 'searches': s, 'calls': c}
+        for d, s, c in zip(daily['date'].to_pylist(), daily['searches_sum'].to_pylist(), daily['calls_sum'].to_pylist())
+        if d is not None
+    ]
+    rows.sort(key=lambda row: row['date'], reverse=True)
+    return rows
+
+def get_snapshots() -> SnapshotStore:
+    from utils.resources import resources
+    return resources.get('snapshots')
+
+if __name__ == '__main__':
+    # For cron: python -m utils.snapshots
+    logging.basicConfig(level=logging.INFO)
+    print(SnapshotStore().refresh())
@@ -2,19 +2,37 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from utils.database import get_db_connection
+from datetime import date
+from utils.repository import calls as call_repository
 from utils.auth_utils import check_role
+from utils.render_cache import get_render_cache
+from utils.snapshots import call_metrics, daily_activity, get_snapshots, since_month, value_counts
 
 class SupervisorAnalytics:
+    """Call metrics for supervisors, read from the analytics snapshot.
+
+    Metrics and figures are cached per version of the ``phone_calls``
+    snapshot. Until the first snapshot exists the same figures come from the
+    live table, uncached.
+    """
+
     def render(self):
         check_role('supervisor')
         st.title("Supervisor Dashboard")
         self._show_metrics()
         self._show_daily_activity()
         self._show_call_metrics()
+        self._show_freshness()
+
+    def _data_version(self):
+        snapshots = get_snapshots()
+        return snapshots.data_version('phone_calls') if snapshots.available() else None
+
+    def _cached(self, name, render, params=()):
+        return get_render_cache().get_or_render(f"analytics.{name}", self._data_version(), render, params)
 
     def _show_metrics(self):
-        metrics = self._get_metrics()
+        metrics = self._cached('metrics', self._get_metrics)
         cols = st.columns(4)
         cols[0].metric("Total Búsquedas", metrics['total_searches'])
         cols[1].metric("Llamadas Exitosas", metrics['successful_calls'])
@@ -22,51 +40,44 @@ class SupervisorAnalytics:
         cols[3].metric("Tiempo Promedio", f"{metrics['avg_duration']}s")
 
     def _show_daily_activity(self):
-        data = self._get_daily_activity()
-        fig = px.line(data, x='date', y=['searches', 'calls'], title="Actividad Diaria")
-        st.plotly_chart(fig)
+        # The 30-day window moves even when the data doesn't
+        st.plotly_chart(self._cached('daily_activity', self._daily_activity_figure, date.today()))
 
     def _show_call_metrics(self):
+        st.plotly_chart(self._cached('call_status', self._call_status_figure))
+
+    def _show_freshness(self):
+        age = get_snapshots().age()
+        if age is not None:
+            st.caption(f"Datos de hace {int(age // 60)} min")
+
+    def _daily_activity_figure(self):
+        data = self._get_daily_activity()
+        return px.line(data, x='date', y=['searches', 'calls'], title="Actividad Diaria")
+
+    def _call_status_figure(self):
         data = self._get_call_metrics()
-        fig = go.Figure(data=[go.Pie(labels=data['status'], values=data['count'])])
-        st.plotly_chart(fig)
+        return go.Figure(data=[go.Pie(labels=data['status'], values=data['count'])])
 
     def _get_metrics(self):
-        with get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT 
-                    COUNT(*) AS total_searches,
-                    SUM(CASE WHEN call_status = 'successful' THEN 1 ELSE 0 END) AS successful_calls,
-                    ROUND(SUM(CASE WHEN call_status = 'successful' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS success_rate,
-                    ROUND(AVG(call_duration), 2) AS avg_duration
-                FROM phone_calls
-            """)
-            return dict(zip(['total_searches', 'successful_calls', 'success_rate', 'avg_duration'], cur.fetchone()))
+        if self._data_version() is not None:
+            metrics = call_metrics(get_snapshots().table('phone_calls', ['call_status', 'call_duration']))
+        else:
+            metrics = call_repository.get_metrics()
+        return {key: metrics.get(key) or 0 for key in
+                ['total_searches', 'successful_calls', 'success_rate', 'avg_duration']}
 
-    def _get_daily_activity(self):
-        with get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT 
-                    DATE(call_date) AS date,
-                    COUNT(CASE WHEN call_status = 'initiated' THEN 1 END) AS searches,
-                    COUNT(CASE WHEN call_status = 'successful' THEN 1 END) AS calls
-                FROM phone_calls
-                GROUP BY date
-                ORDER BY date DESC
-                LIMIT 30
-            """)
-            return pd.DataFrame(cur.fetchall(), columns=['date', 'searches', 'calls'])
+    def _get_daily_activity(self, days=30):
+        if self._data_version() is not None:
+            calls = get_snapshots().table('phone_calls', ['call_status', 'call_date'], since_month=since_month(days))
+            rows = daily_activity(calls, days)
+        else:
+            rows = call_repository.get_daily_activity(days)
+        return pd.DataFrame(rows, columns=['date', 'searches', 'calls'])
 
     def _get_call_metrics(self):
-        with get_db_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT 
-                    call_status, 
-                    COUNT(*) AS count
-                FROM phone_calls
-                GROUP BY call_status
-            """)
-            return {'status': [row[0] for row in cur.fetchall()], 'count': [row[1] for row in cur.fetchall()]}
\ No newline at end of file
+        if self._data_version() is not None:
+            rows = value_counts(get_snapshots().table('phone_calls', ['call_status']), 'call_status')
+        else:
+            rows = call_repository.get_status_counts()
+        return {'status': [row['call_status'] for row in rows], 'count': [row['count'] for row in rows]}
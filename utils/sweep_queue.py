@@ -0,0 +1,241 @@
+import os
+import socket
+import logging
+from typing import Any, Dict, List, Optional
+
+from config import SWEEP_CHUNK_SIZE, SWEEP_LEASE_SECONDS, SWEEP_MAX_ATTEMPTS
+from utils.db_backends import DatabaseBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_COUNTERS = ('searched', 'skipped', 'hits', 'errors')
+
+class SweepQueue:
+    """Durable queue of sweep chunks shared by every worker process.
+
+    A sweep covers ``[start_number, end_number)`` and is stored as chunks of
+    ``chunk_size`` numbers. Workers claim one open chunk at a time with
+    ``claim``: PostgreSQL skips rows other workers have locked (``FOR UPDATE
+    SKIP LOCKED``), SQLite relies on writers being serialized. A claim is a
+    lease; the worker extends it with ``heartbeat``, which also saves the
+    chunk's checkpoint. If the worker dies, the lease runs out and the next
+    claim takes the chunk over from its checkpoint, up to ``max_attempts``
+    times before the chunk is marked failed.
+
+    Every timestamp comes from the database clock (``_clock``), never from
+    the worker's: leases written by one host are compared by another, whose
+    clock or time zone may differ.
+    """
+
+    def __init__(self, backend: Optional[DatabaseBackend] = None,
+                 lease_seconds: float = SWEEP_LEASE_SECONDS, max_attempts: int = SWEEP_MAX_ATTEMPTS):
+        self._backend = backend
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @property
+    def backend(self) -> DatabaseBackend:
+        return self._backend or get_backend()
+
+    def _clock(self, offset: str = '0') -> str:
+        """SQL for the database's current time plus ``offset`` seconds (a literal or ``%s``)."""
+        if self.backend.dialect == 'postgresql':
+            return f"(LOCALTIMESTAMP + {offset} * INTERVAL '1 second')"
+        return f"datetime('now', {offset} || ' seconds')"
+
+    # ------------------------------------------------------------ producers
+    def create_sweep(self, start_number: int, count: int, user_id: int,
+                     chunk_size: int = SWEEP_CHUNK_SIZE) -> int:
+        """Queue a sweep of ``count`` numbers from ``start_number``; returns its id.
+
+        ``user_id`` owns the sweep and the cases created from its hits.
+        """
+        if count <= 0 or chunk_size <= 0:
+            raise ValueError("count and chunk_size must be positive")
+        if user_id is None:
+            raise ValueError("a sweep needs the user who will own its cases")
+        start_number, end_number = int(start_number), int(start_number) + int(count)
+        with self.backend.session() as s:
+            sweep_id = s.insert(
+                "INSERT INTO sweeps (start_number, end_number, chunk_size, created_by, created_at) "
+                f"VALUES (%s, %s, %s, %s, {self._clock()})",
+                (start_number, end_number, chunk_size, user_id)
+            )
+            s.insert_many(
+                "INSERT INTO sweep_chunks (sweep_id, start_number, end_number, next_number) VALUES %s",
+                [(sweep_id, first, min(first + chunk_size, end_number), first)
+                 for first in range(start_number, end_number, chunk_size)]
+            )
+        return sweep_id
+
+    def cancel_sweep(self, sweep_id: int, user_id: Optional[int] = None) -> bool:
+        """Stop a sweep; workers holding its chunks drop them at their next heartbeat."""
+        owner = " AND created_by = %s" if user_id is not None else ''
+        params = [sweep_id] + ([user_id] if user_id is not None else [])
+        with self.backend.session() as s:
+            updated = s.execute(
+                f"UPDATE sweeps SET status = 'cancelled', finished_at = {self._clock()} "
+                f"WHERE id = %s AND status = 'active'{owner}",
+                params
+            )
+            if updated:
+                s.execute(
+                    "UPDATE sweep_chunks SET status = 'cancelled', lease_owner = NULL, lease_expires_at = NULL "
+                    "WHERE sweep_id = %s AND status IN ('pending', 'running')",
+                    (sweep_id,)
+                )
+        return updated > 0
+
+    # -------------------------------------------------------------- workers
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the oldest open chunk: pending, or running with an expired lease."""
+        now = self._clock()
+        lock = ' FOR UPDATE SKIP LOCKED' if self.backend.dialect == 'postgresql' else ''
+        with self.backend.session() as s:
+            # Chunks whose workers kept dying are not handed out forever
+            failed = s.fetch_all(
+                f"UPDATE sweep_chunks SET status = 'failed', lease_owner = NULL, finished_at = {now}, "
+                f"last_error = COALESCE(last_error, 'lease expired') "
+                f"WHERE status = 'running' AND lease_expires_at < {now} AND attempts >= %s RETURNING sweep_id",
+                (self.max_attempts,)
+            )
+            for sweep_id in {row['sweep_id'] for row in failed}:
+                self._close_if_finished(s, sweep_id)
+            chunk = s.fetch_one(
+                f"""
+                UPDATE sweep_chunks
+                SET status = 'running', lease_owner = %s, lease_expires_at = {self._clock('%s')}, heartbeat_at = {now},
+                    attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM sweep_chunks
+                    WHERE (status = 'pending' OR (status = 'running' AND lease_expires_at < {now}))
+                      AND sweep_id IN (SELECT id FROM sweeps WHERE status = 'active')
+                    ORDER BY id
+                    LIMIT 1{lock}
+                )
+                RETURNING *
+                """,
+                (worker_id, self.lease_seconds)
+            )
+            if chunk is not None:
+                sweep = s.fetch_one("SELECT created_by FROM sweeps WHERE id = %s", (chunk['sweep_id'],))
+                chunk['created_by'] = sweep['created_by'] if sweep else None
+        return chunk
+
+    def _counters(self, counts: Dict[str, int]) -> List[int]:
+        return [int(counts.get(name, 0)) for name in _CHUNK_COUNTERS]
+
+    def heartbeat(self, chunk_id: int, worker_id: str, next_number: int, counts: Dict[str, int]) -> bool:
+        """Extend the lease and save progress. False means the chunk is no longer
+        this worker's (lease taken over, or the sweep was cancelled)."""
+        updated = self.backend.execute(
+            f"UPDATE sweep_chunks SET lease_expires_at = {self._clock('%s')}, heartbeat_at = {self._clock()}, "
+            f"next_number = %s, searched = %s, skipped = %s, hits = %s, errors = %s "
+            f"WHERE id = %s AND lease_owner = %s AND status = 'running'",
+            [self.lease_seconds, next_number, *self._counters(counts), chunk_id, worker_id]
+        )
+        return updated > 0
+
+    def complete(self, chunk_id: int, worker_id: str, counts: Dict[str, int]) -> bool:
+        now = self._clock()
+        with self.backend.session() as s:
+            chunk = s.fetch_one(
+                f"UPDATE sweep_chunks SET status = 'done', next_number = end_number, finished_at = {now}, "
+                f"lease_owner = NULL, lease_expires_at = NULL, searched = %s, skipped = %s, hits = %s, errors = %s "
+                f"WHERE id = %s AND lease_owner = %s AND status = 'running' RETURNING sweep_id",
+                [*self._counters(counts), chunk_id, worker_id]
+            )
+            if chunk is None:
+                return False
+            s.execute(
+                f"UPDATE sweep_workers SET chunks_done = chunks_done + 1, last_seen = {now} WHERE worker_id = %s",
+                (worker_id,)
+            )
+            self._close_if_finished(s, chunk['sweep_id'])
+        return True
+
+    def _close_if_finished(self, s, sweep_id: int):
+        """The last chunk to finish, done or failed, closes its sweep."""
+        s.execute(
+            f"UPDATE sweeps SET finished_at = {self._clock()}, status = CASE WHEN EXISTS "
+            f"(SELECT 1 FROM sweep_chunks WHERE sweep_id = %s AND status = 'failed') THEN 'failed' ELSE 'done' END "
+            f"WHERE id = %s AND status = 'active' "
+            f"AND NOT EXISTS (SELECT 1 FROM sweep_chunks WHERE sweep_id = %s AND status IN ('pending', 'running'))",
+            (sweep_id, sweep_id, sweep_id)
+        )
+
+    def release(self, chunk_id: int, worker_id: str, next_number: int, counts: Dict[str, int],
+                error: Optional[str] = None) -> bool:
+        """Hand a chunk back with its checkpoint, for another claim to resume.
+
+        Without ``error`` (the worker is shutting down) the claim doesn't count
+        as an attempt; with one, it does and the chunk fails after ``max_attempts``.
+        """
+        attempts = 'attempts' if error else 'attempts - 1'
+        with self.backend.session() as s:
+            chunk = s.fetch_one(
+                f"UPDATE sweep_chunks SET status = CASE WHEN %s AND attempts >= %s THEN 'failed' ELSE 'pending' END, "
+                f"attempts = CASE WHEN %s THEN attempts ELSE {attempts} END, "
+                f"finished_at = CASE WHEN %s AND attempts >= %s THEN {self._clock()} ELSE finished_at END, "
+                f"lease_owner = NULL, lease_expires_at = NULL, next_number = %s, last_error = COALESCE(%s, last_error), "
+                f"searched = %s, skipped = %s, hits = %s, errors = %s "
+                f"WHERE id = %s AND lease_owner = %s AND status = 'running' RETURNING sweep_id, status",
+                [bool(error), self.max_attempts, bool(error), bool(error), self.max_attempts,
+                 next_number, error, *self._counters(counts), chunk_id, worker_id]
+            )
+            if chunk is None:
+                return False
+            if chunk['status'] == 'failed':
+                self._close_if_finished(s, chunk['sweep_id'])
+        return True
+
+    def register_worker(self, worker_id: str):
+        now = self._clock()
+        self.backend.execute(
+            f"INSERT INTO sweep_workers (worker_id, hostname, pid, started_at, last_seen) VALUES (%s, %s, %s, {now}, {now}) "
+            f"ON CONFLICT (worker_id) DO UPDATE SET hostname = EXCLUDED.hostname, pid = EXCLUDED.pid, "
+            f"started_at = EXCLUDED.started_at, last_seen = EXCLUDED.last_seen",
+            (worker_id, socket.gethostname(), os.getpid())
+        )
+
+    def touch_worker(self, worker_id: str):
+        self.backend.execute(
+            f"UPDATE sweep_workers SET last_seen = {self._clock()} WHERE worker_id = %s", (worker_id,)
+        )
+
+    # -------------------------------------------------------------- readers
+    def list_sweeps(self, user_id: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest sweeps with their progress summed over the chunks."""
+        where = "WHERE s.created_by = %s" if user_id is not None else ''
+        params = ([user_id] if user_id is not None else []) + [limit]
+        return self.backend.fetch_all(
+            f"""
+            SELECT s.id, s.start_number, s.end_number, s.status, s.created_by, s.created_at, s.finished_at,
+                   COUNT(c.id) AS chunks,
+                   SUM(CASE WHEN c.status = 'done' THEN 1 ELSE 0 END) AS chunks_done,
+                   SUM(CASE WHEN c.status = 'running' THEN 1 ELSE 0 END) AS chunks_running,
+                   SUM(CASE WHEN c.status = 'failed' THEN 1 ELSE 0 END) AS chunks_failed,
+                   SUM(c.next_number - c.start_number) AS numbers_done,
+                   SUM(c.searched) AS searched, SUM(c.skipped) AS skipped,
+                   SUM(c.hits) AS hits, SUM(c.errors) AS errors
+            FROM sweeps s
+            LEFT JOIN sweep_chunks c ON c.sweep_id = s.id
+            {where}
+            GROUP BY s.id, s.start_number, s.end_number, s.status, s.created_by, s.created_at, s.finished_at
+            ORDER BY s.id DESC
+            LIMIT %s
+            """,
+            params
+        )
+
+    def active_workers(self, within: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Workers seen in the last ``within`` seconds (a lease period by default)."""
+        within = within if within is not None else self.lease_seconds
+        return self.backend.fetch_all(
+            f"SELECT worker_id, hostname, pid, started_at, last_seen, chunks_done FROM sweep_workers "
+            f"WHERE last_seen >= {self._clock('%s')} ORDER BY worker_id",
+            (-within,)
+        )
+
+# Singleton instance
+sweep_queue = SweepQueue()
@@ -5,6 +5,8 @@ import logging
 from datetime import datetime
 import sounddevice as sd
 
+from utils.live_feed import feed_token
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +23,8 @@ class WebRTCHandler:
         self.state = CallState.IDLE
         self.connection = None
         self.call_start_time = None
+        self.call_id = None
+        self._elapsed_before_segment = 0
         self._volume = 1.0
         self._muted = False
         self._recording_stream = None
@@ -35,7 +39,29 @@ class WebRTCHandler:
             logger.error(f"Failed to connect to signaling server: {e}")
             return False
 
-    async def start_call(self, number: str) -> bool:
+    async def _publish_status(self):
+        """Push the current call state to browsers subscribed to this call.
+
+        Browsers run the duration timer themselves from ``startedAt`` and
+        ``elapsed``, so the server only speaks on real state transitions.
+        """
+        if not self.connection or not self.call_id:
+            return
+        message = {
+            "type": "call_status",
+            "callId": self.call_id,
+            "state": self.state,
+            "startedAt": self.call_start_time.timestamp() if self.call_start_time else None,
+            "elapsed": self._elapsed_before_segment,
+            "timestamp": datetime.now().isoformat(),
+            "token": feed_token(60)
+        }
+        try:
+            await self.connection.send(json.dumps(message))
+        except Exception as e:
+            logger.error(f"Error publishing call status: {e}")
+
+    async def start_call(self, number: str, call_id: str = None) -> bool:
         if self.state != CallState.IDLE:
             logger.warning("Cannot start call: Call already in progress")
             return False
@@ -61,7 +87,10 @@ class WebRTCHandler:
             self._start_audio_stream()
 
             self.state = CallState.CONNECTED
+            self.call_id = call_id
             self.call_start_time = datetime.now()
+            self._elapsed_before_segment = 0
+            await self._publish_status()
             logger.info(f"Call started to {number}")
             return True
 
@@ -70,6 +99,25 @@ class WebRTCHandler:
             self.state = CallState.IDLE
             return False
 
+    async def hold_call(self) -> bool:
+        if self.state != CallState.CONNECTED:
+            return False
+        self._elapsed_before_segment = self.get_call_duration()
+        self.call_start_time = None
+        self.state = CallState.ON_HOLD
+        await self._publish_status()
+        logger.info("Call on hold")
+        return True
+
+    async def resume_call(self) -> bool:
+        if self.state != CallState.ON_HOLD:
+            return False
+        self.call_start_time = datetime.now()
+        self.state = CallState.CONNECTED
+        await self._publish_status()
+        logger.info("Call resumed")
+        return True
+
     async def end_call(self) -> bool:
         if self.state == CallState.IDLE:
             return True
@@ -79,6 +127,11 @@ class WebRTCHandler:
             if self._recording_stream:
                 self._stop_recording()
 
+            self._elapsed_before_segment = self.get_call_duration()
+            self.state = CallState.ENDED
+            self.call_start_time = None
+            await self._publish_status()
+
             # Send end call message
             if self.connection:
                 message = {
@@ -90,7 +143,7 @@ class WebRTCHandler:
 
             self._stop_audio_stream()
             self.state = CallState.IDLE
-            self.call_start_time = None
+            self.call_id = None
             logger.info("Call ended")
             return True
 
@@ -129,6 +182,7 @@ class WebRTCHandler:
         self._muted = muted
 
     def get_call_duration(self) -> int:
-        if self.call_start_time and self.state in [CallState.CONNECTED, CallState.ON_HOLD]:
-            return int((datetime.now() - self.call_start_time).total_seconds())
-        return 0
\ No newline at end of file
+        """Seconds spent connected, excluding time on hold. Computed on demand, never polled."""
+        if self.call_start_time and self.state == CallState.CONNECTED:
+            return self._elapsed_before_segment + int((datetime.now() - self.call_start_time).total_seconds())
+        return self._elapsed_before_segment
\ No newline at end of file
@@ -1,6 +1,5 @@
 import json
 import asyncio
-import nest_asyncio
 import websockets
 import sounddevice as sd
 import soundfile as sf
@@ -10,8 +9,8 @@ from dataclasses import dataclass
 from typing import Optional, Callable, Dict, Any
 from datetime import datetime
 import os
-import threading
-from contextlib import asynccontextmanager
+import time
+from utils.event_loop import run_sync
 
 # Configure logging
 logging.basicConfig(
@@ -20,9 +19,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Enable nested event loops
-nest_asyncio.apply()
-
 @dataclass
 class WebRTCConfig:
     ice_servers: list[dict[str, list[str]]] | None = None
@@ -53,25 +49,7 @@ class WebRTCHandler:
         self._recording_stream = None
         self._reconnect_attempts = 0
         self._max_reconnect_attempts = 3
-        self._loop = None
-        self._thread_local = threading.local()
-        
-    @asynccontextmanager
-    async def _get_event_loop(self):
-        """Ensure we have a proper event loop in the current thread."""
-        try:
-            if not hasattr(self._thread_local, 'loop'):
-                self._thread_local.loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(self._thread_local.loop)
-            yield self._thread_local.loop
-        except Exception as e:
-            logger.error(f"Event loop error: {e}")
-            raise
-        finally:
-            if hasattr(self._thread_local, 'loop'):
-                self._thread_local.loop.close()
-                delattr(self._thread_local, 'loop')
-        
+
         # Ensure recording directory exists
         os.makedirs(self.config.recording_path, exist_ok=True)
 
@@ -85,24 +63,23 @@ class WebRTCHandler:
             logger.info(f"Starting call to {number}")
             
             async def _start_call_async():
-                async with self._get_event_loop() as loop:
-                    for attempt in range(self._max_reconnect_attempts):
-                        try:
-                            success = await self._connect_and_call(number)
-                            if success:
-                                self.state = CallState.CONNECTED
-                                self.call_start_time = loop.time()
-                                logger.info("Call connected successfully")
-                                return True
-                        except Exception as e:
-                            logger.error(f"Connection attempt {attempt + 1} failed: {e}")
-                            if attempt < self._max_reconnect_attempts - 1:
-                                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                            continue
-                    return False
+                for attempt in range(self._max_reconnect_attempts):
+                    try:
+                        success = await self._connect_and_call(number)
+                        if success:
+                            self.state = CallState.CONNECTED
+                            self.call_start_time = time.monotonic()
+                            logger.info("Call connected successfully")
+                            return True
+                    except Exception as e:
+                        logger.error(f"Connection attempt {attempt + 1} failed: {e}")
+                        if attempt < self._max_reconnect_attempts - 1:
+                            await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                        continue
+                return False
             
-            # Run in the current thread's event loop
-            success = asyncio.run(_start_call_async())
+            # The websocket lives on the shared background loop and outlives this call
+            success = run_sync(_start_call_async())
             if not success:
                 self.state = CallState.IDLE
                 logger.error("Failed to establish call after multiple attempts")
@@ -136,7 +113,7 @@ class WebRTCHandler:
             if self._recording_stream:
                 self.stop_recording()
             
-            asyncio.get_event_loop().run_until_complete(self._disconnect())
+            run_sync(self._disconnect(), timeout=10)
             self.state = CallState.ENDED
             self.call_start_time = None
 
@@ -228,7 +205,7 @@ class WebRTCHandler:
 
     def get_call_duration(self) -> Optional[int]:
         if self.call_start_time and self.state in [CallState.CONNECTED, CallState.RECORDING, CallState.ON_HOLD]:
-            return int((asyncio.get_event_loop().time() - self.call_start_time))
+            return int(time.monotonic() - self.call_start_time)
         return None
 
     def get_state(self) -> str:
@@ -1,10 +1,13 @@
 import asyncio
 import websockets
 import json
+import time
 import logging
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from websockets.exceptions import ConnectionClosed, InvalidHandshake
+from config import LIVE_FEED_SECRET, LIVE_FEED_INSECURE
+from utils.live_feed import FeedState, SUPERVISOR_CHANNEL, verify_feed_token
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -13,9 +16,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# A call's last status is dropped after this long even if "ended" never arrives
+LAST_MESSAGE_TTL = 6 * 3600
+
 class SignalingServer:
     def __init__(self):
         self.connections: Dict[str, websockets.WebSocketServerProtocol] = {}
+        # Channel subscriptions (e.g. "call:<id>") and the last message per channel
+        self.subscriptions: Dict[str, Set[websockets.WebSocketServerProtocol]] = {}
+        self.last_messages: Dict[str, Dict[str, Any]] = {}
+        self._last_message_at: Dict[str, float] = {}
+        # Event feeds (supervisor dashboard): running tiles per channel, token protected
+        self.feeds: Dict[str, FeedState] = {SUPERVISOR_CHANNEL: FeedState()}
         
     async def register(self, websocket: websockets.WebSocketServerProtocol, client_id: str):
         """Register a new client connection"""
@@ -31,6 +43,8 @@ class SignalingServer:
     async def unregister(self, websocket: websockets.WebSocketServerProtocol):
         """Unregister a client connection"""
         try:
+            for channel in list(self.subscriptions):
+                self._unsubscribe(channel, websocket)
             for client_id, ws in list(self.connections.items()):
                 if ws == websocket:
                     del self.connections[client_id]
@@ -88,6 +102,61 @@ class SignalingServer:
                 else:
                     logger.warning(f"Target client {target_id} not found")
                     await self._send_error(websocket, f"Target client {target_id} not found")
+
+            elif msg_type == 'subscribe':
+                channel = message.get('channel')
+                if not channel:
+                    await self._send_error(websocket, "Missing channel")
+                    return
+                if channel in self.feeds and not verify_feed_token(message.get('token')):
+                    await self._send_error(websocket, "Unauthorized")
+                    return
+                self.subscriptions.setdefault(channel, set()).add(websocket)
+                logger.debug(f"Client subscribed to {channel}")
+                # Late subscribers get the current state right away
+                if channel in self.feeds:
+                    await websocket.send(json.dumps({
+                        'type': 'feed_state', 'channel': channel, **self.feeds[channel].snapshot()
+                    }, default=str))
+                elif channel in self.last_messages:
+                    await websocket.send(json.dumps(self.last_messages[channel]))
+
+            elif msg_type == 'unsubscribe':
+                self._unsubscribe(message.get('channel'), websocket)
+
+            elif msg_type == 'call_status':
+                call_id = message.get('callId')
+                if not call_id:
+                    await self._send_error(websocket, "Missing callId")
+                    return
+                # Only the app's call handlers may move a call's state
+                if not verify_feed_token(message.pop('token', None)):
+                    await self._send_error(websocket, "Unauthorized")
+                    return
+                channel = f"call:{call_id}"
+                if message.get('state') == 'ended':
+                    self.last_messages.pop(channel, None)
+                    self._last_message_at.pop(channel, None)
+                else:
+                    self._expire_last_messages()
+                    self.last_messages[channel] = message
+                    self._last_message_at[channel] = time.monotonic()
+                await self._publish(channel, message)
+
+            elif msg_type == 'event':
+                channel = message.get('channel')
+                event = message.get('event')
+                if channel not in self.feeds or not isinstance(event, dict):
+                    await self._send_error(websocket, "Invalid event")
+                    return
+                if not verify_feed_token(message.get('token')):
+                    await self._send_error(websocket, "Unauthorized")
+                    return
+                feed = self.feeds[channel]
+                event = feed.apply(event)
+                await self._publish(channel, {
+                    'type': 'event', 'channel': channel, 'event': event, 'tiles': feed.tiles()
+                })
             else:
                 logger.warning(f"Unknown message type received: {msg_type}")
                 await self._send_error(websocket, f"Unknown message type: {msg_type}")
@@ -179,6 +248,32 @@ class SignalingServer:
         except Exception as e:
             logger.error(f"Error sending error message: {str(e)}")
             
+    async def _publish(self, channel: str, message: Dict[str, Any]):
+        """Send a message to every subscriber of a channel"""
+        payload = json.dumps(message, default=str)
+        for websocket in list(self.subscriptions.get(channel, ())):
+            try:
+                await websocket.send(payload)
+            except Exception as e:
+                logger.error(f"Error publishing to {channel}: {str(e)}")
+                self._unsubscribe(channel, websocket)
+
+    def _unsubscribe(self, channel: Optional[str], websocket: websockets.WebSocketServerProtocol):
+        """Remove a subscriber, and the channel once nobody listens to it"""
+        subscribers = self.subscriptions.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(websocket)
+        if not subscribers:
+            del self.subscriptions[channel]
+
+    def _expire_last_messages(self):
+        """Forget the status of calls whose "ended" message was lost"""
+        cutoff = time.monotonic() - LAST_MESSAGE_TTL
+        for channel in [c for c, at in self._last_message_at.items() if at < cutoff]:
+            self.last_messages.pop(channel, None)
+            del self._last_message_at[channel]
+
     async def _broadcast_message(self, message: Dict[str, Any], exclude: Optional[str] = None):
         """Broadcast message to all connected clients except excluded one"""
         for client_id, websocket in self.connections.items():
@@ -190,6 +285,9 @@ class SignalingServer:
 
 async def main():
     server = SignalingServer()
+    if not LIVE_FEED_SECRET and not LIVE_FEED_INSECURE:
+        logger.warning("LIVE_FEED_SECRET is not set: feed subscriptions, events and call_status are rejected "
+                       "(set LIVE_FEED_INSECURE=true for local development)")
     
     async def handler(websocket):
         await server.handle_connection(websocket)
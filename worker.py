@@ -0,0 +1,211 @@
+"""Sweep worker: claims chunks of queued sweeps and searches them in EOIR.
+
+Run as many as needed, on any machine that reaches the database:
+
+    python worker.py --concurrency 4
+
+Each hit goes to the case pipeline and every lookup to the search history.
+Chunks are leased; if a worker dies its chunks are reassigned once the lease
+expires and resume from their last checkpoint. SIGINT/SIGTERM hand the
+current chunks back immediately.
+"""
+import os
+import signal
+import socket
+import logging
+import argparse
+import threading
+import time
+import uuid
+from typing import Any, Dict, List
+
+from config import (
+    SWEEP_WORKER_CONCURRENCY, SWEEP_POLL_INTERVAL, SWEEP_HEARTBEAT_INTERVAL, SWEEP_DELAY,
+    SWEEP_MAX_CONSECUTIVE_ERRORS, EOIR_SIMULATOR
+)
+from utils.resources import resources
+from utils.search_history import search_history_log
+from utils.case_pipeline import get_case_pipeline
+from utils.live_feed import live_feed
+from utils.sweep_queue import SweepQueue, sweep_queue
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('sweep_worker')
+
+class ChunkAbandoned(Exception):
+    """The chunk's lease was lost or its sweep cancelled."""
+
+class SweepWorker:
+    def __init__(self, worker_id: str, queue: SweepQueue = sweep_queue, scraper=None,
+                 concurrency: int = SWEEP_WORKER_CONCURRENCY, delay: float = SWEEP_DELAY,
+                 heartbeat_interval: float = SWEEP_HEARTBEAT_INTERVAL, poll_interval: float = SWEEP_POLL_INTERVAL,
+                 max_consecutive_errors: int = SWEEP_MAX_CONSECUTIVE_ERRORS, pipeline=None):
+        self.worker_id = worker_id
+        self.queue = queue
+        self._scraper = scraper
+        self._pipeline = pipeline
+        self.concurrency = concurrency
+        self.delay = delay
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.max_consecutive_errors = max_consecutive_errors
+        self.stop_flag = threading.Event()
+
+    @property
+    def scraper(self):
+        return self._scraper or resources.get('eoir_scraper')
+
+    @property
+    def pipeline(self):
+        return self._pipeline or get_case_pipeline()
+
+    def run(self):
+        self.queue.register_worker(self.worker_id)
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} slot(s)")
+        threads = [
+            threading.Thread(target=self._slot, name=f"sweep-slot-{n}", daemon=True)
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        while not self.stop_flag.wait(self.heartbeat_interval):
+            try:
+                self.queue.touch_worker(self.worker_id)
+            except Exception as e:
+                logger.warning(f"Could not update worker heartbeat: {e}")
+        for thread in threads:
+            thread.join()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self, *_):
+        self.stop_flag.set()
+
+    def _slot(self):
+        while not self.stop_flag.is_set():
+            try:
+                chunk = self.queue.claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"Claim failed: {e}")
+                chunk = None
+            if chunk is None:
+                self.stop_flag.wait(self.poll_interval)
+                continue
+            try:
+                self.run_chunk(chunk)
+            except Exception as e:
+                # Database unreachable while handing the chunk back: its lease
+                # runs out and another claim resumes it from the last heartbeat
+                logger.error(f"Chunk {chunk['id']}: {e}")
+                self.stop_flag.wait(self.poll_interval)
+
+    def _heartbeat(self, chunk_id: int, checkpoint: int, counts: Dict[str, int], last_beat: float) -> float:
+        if time.monotonic() - last_beat < self.heartbeat_interval:
+            return last_beat
+        if not self.queue.heartbeat(chunk_id, self.worker_id, checkpoint, counts):
+            raise ChunkAbandoned()
+        return time.monotonic()
+
+    def _handle_result(self, chunk: Dict[str, Any], number: str, result: Dict[str, Any], counts: Dict[str, int]):
+        """Record an answered lookup ('success' or 'not_found') and pass hits on."""
+        counts['searched'] += 1
+        search_history_log.record(number, chunk.get('created_by'), result, 'eoir')
+        if result['status'] == 'success':
+            counts['hits'] += 1
+            live_feed.publish('sweep_hit', number=number, chunk_id=chunk['id'], sweep_id=chunk['sweep_id'])
+            self.pipeline.submit_result(number, result, chunk.get('created_by'), timeout=None)
+
+    def _retry_failed(self, chunk: Dict[str, Any], failed: List[str], counts: Dict[str, int]) -> List[str]:
+        """Search the numbers that errored during the chunk again; returns those still failing."""
+        still_failing = []
+        for number in failed:
+            if self.stop_flag.is_set():
+                return still_failing + failed[failed.index(number):]
+            result = self.scraper.search(number)
+            if result['status'] in ('success', 'not_found'):
+                self._handle_result(chunk, number, result, counts)
+            else:
+                still_failing.append(number)
+        return still_failing
+
+    def run_chunk(self, chunk: Dict[str, Any]):
+        chunk_id = chunk['id']
+        first, end = int(chunk['next_number']), int(chunk['end_number'])
+        counts = {name: chunk.get(name) or 0 for name in ('searched', 'skipped', 'hits', 'errors')}
+        checkpoint = first
+        consecutive_errors = 0
+        # Numbers whose lookup failed; the checkpoint never moves past the first of them
+        failed: List[str] = []
+        last_beat = time.monotonic()
+        logger.info(f"Chunk {chunk_id}: numbers {first}..{end - 1} (attempt {chunk['attempts']})")
+
+        try:
+            for number, result in self.scraper.sweep(first, end - first, self.delay, self.stop_flag):
+                if result is None:
+                    counts['skipped'] += 1
+                elif result['status'] == 'paused':
+                    # EOIR circuit open: the checkpoint holds, only the lease is kept alive
+                    last_beat = self._heartbeat(chunk_id, checkpoint, counts, last_beat)
+                    continue
+                elif result['status'] == 'error':
+                    counts['errors'] += 1
+                    consecutive_errors += 1
+                    failed.append(number)
+                    if consecutive_errors >= self.max_consecutive_errors:
+                        raise RuntimeError(result.get('error') or 'EOIR error')
+                    continue
+                else:
+                    self._handle_result(chunk, number, result, counts)
+                consecutive_errors = 0
+                checkpoint = int(failed[0]) if failed else int(number) + 1
+
+                last_beat = self._heartbeat(chunk_id, checkpoint, counts, last_beat)
+
+            if failed and not self.stop_flag.is_set():
+                # Isolated errors get one more try before the chunk can complete
+                failed = self._retry_failed(chunk, failed, counts)
+                if failed and not self.stop_flag.is_set():
+                    raise RuntimeError(f"{len(failed)} number(s) still failing, first {failed[0]}")
+                checkpoint = int(failed[0]) if failed else end
+        except ChunkAbandoned:
+            logger.info(f"Chunk {chunk_id}: lease lost or sweep cancelled; stopping at {checkpoint}")
+            return
+        except Exception as e:
+            logger.error(f"Chunk {chunk_id}: handing back at {checkpoint} after error: {e}")
+            self.queue.release(chunk_id, self.worker_id, checkpoint, counts, error=str(e))
+            return
+
+        if self.stop_flag.is_set():
+            self.queue.release(chunk_id, self.worker_id, checkpoint, counts)
+            logger.info(f"Chunk {chunk_id}: released at {checkpoint} for shutdown")
+        elif self.queue.complete(chunk_id, self.worker_id, counts):
+            logger.info(f"Chunk {chunk_id}: done ({counts['searched']} searched, {counts['hits']} hits)")
+        else:
+            logger.warning(f"Chunk {chunk_id}: finished after its lease was taken over")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--id', default=f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}",
+                        help="worker id shown on the dashboard and used as lease owner")
+    parser.add_argument('--concurrency', type=int, default=SWEEP_WORKER_CONCURRENCY)
+    parser.add_argument('--delay', type=float, default=SWEEP_DELAY, help="extra pause between EOIR requests per slot")
+    args = parser.parse_args()
+    if not EOIR_SIMULATOR:
+        # Every chunk would fail against ACIS, whose pages the parser can't read
+        parser.error("sweeps only run against upstream_simulator.py; set EOIR_SIMULATOR=true")
+
+    from utils.migrations import MigrationRunner
+    MigrationRunner().migrate()
+
+    worker = SweepWorker(args.id, concurrency=args.concurrency, delay=args.delay)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run()
+    # Flush queued hits and history before exiting
+    resources.close_all()
+    search_history_log.close()
+
+if __name__ == '__main__':
+    main()